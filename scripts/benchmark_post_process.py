@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Micro-benchmark ``post_process_response`` against the plain-Python version.
+
+``post_process_response`` scores, filters and picks the top N rows of large
+GraphQL responses on NumPy columns and only touches the survivors as dicts.
+This script times it against the previous implementation (per-item score
+loop, list-comprehension filters, full ``list.sort`` then slice), kept below
+as ``reference_post_process``, on synthetic responses of several sizes, and
+checks that both return the same rows.
+
+No database, API key or network access is needed.
+
+Usage::
+
+    uv run python scripts/benchmark_post_process.py
+
+    # Other sizes / more repetitions
+    uv run python scripts/benchmark_post_process.py --rows 1000 20000 --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import logging
+import random
+import sys
+import timeit
+from pathlib import Path
+
+# Add project root to sys.path so we can import src modules
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.graphql_pipeline import (  # noqa: E402
+    _POST_PROCESS_RULES,
+    post_process_response,
+)
+
+logger = logging.getLogger(__name__)
+
+QUERY_TYPES = ("treemap_products", "feasibility")
+
+
+def reference_post_process(query_type: str, raw_response: dict) -> dict:
+    """The previous sort-based implementation (no enrichment, no metadata)."""
+    rules = _POST_PROCESS_RULES[query_type]
+    items = raw_response[rules["root"]]
+    score_weights = rules.get("score_weights")
+    if score_weights:
+        for item in items:
+            item["compositeScore"] = round(
+                sum((item.get(f) or 0.0) * w for f, w in score_weights.items()), 4
+            )
+    if rules.get("filter") == "rca_lt_1":
+        items = [item for item in items if (item.get("exportRca") or 0) < 1]
+    sort_field = rules["sort"]
+    items.sort(
+        key=lambda x: (x.get(sort_field) is not None, x.get(sort_field) or 0),
+        reverse=not rules.get("sort_ascending", False),
+    )
+    return {rules["root"]: items[: rules["top_n"]]}
+
+
+def synthetic_response(query_type: str, rows: int, seed: int = 0) -> dict:
+    """A countryProductYear-shaped response with *rows* products."""
+    rng = random.Random(seed)
+    items = [
+        {
+            "productId": i,
+            "year": 2024,
+            "exportValue": None if rng.random() < 0.02 else rng.randint(0, 10**9),
+            "importValue": rng.randint(0, 10**9),
+            "exportRca": rng.uniform(0, 3),
+            "distance": rng.random(),
+            "cog": rng.uniform(-1, 1),
+            "normalizedDistance": rng.random(),
+            "normalizedPci": rng.uniform(-2, 2),
+            "normalizedCog": rng.uniform(-2, 2),
+        }
+        for i in range(rows)
+    ]
+    return {_POST_PROCESS_RULES[query_type]["root"]: items}
+
+
+def _time_per_call(fn, query_type: str, copies: list[dict], repeat: int) -> float:
+    """Seconds per call of ``fn(query_type, raw)``, each on a fresh copy."""
+    return timeit.timeit(lambda: fn(query_type, copies.pop()), number=repeat) / repeat
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    logger.info(
+        "%-18s %7s %11s %11s %8s", "query type", "rows", "reference", "numpy", "speedup"
+    )
+    for query_type in QUERY_TYPES:
+        root = _POST_PROCESS_RULES[query_type]["root"]
+        for rows in args.rows:
+            raw = synthetic_response(query_type, rows)
+            expected = reference_post_process(query_type, copy.deepcopy(raw))[root]
+            actual = post_process_response(query_type, copy.deepcopy(raw))[root]
+            if actual != expected:
+                sys.exit(f"{query_type} ({rows} rows): results differ")
+
+            # Copies are made outside the timed region
+            copies = [copy.deepcopy(raw) for _ in range(2 * args.repeat)]
+            reference = _time_per_call(
+                reference_post_process, query_type, copies, args.repeat
+            )
+            vectorized = _time_per_call(
+                post_process_response, query_type, copies, args.repeat
+            )
+            logger.info(
+                "%-18s %7d %9.2fms %9.2fms %7.1fx",
+                query_type,
+                rows,
+                reference * 1000,
+                vectorized * 1000,
+                reference / vectorized,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Build the GraphQL catalog snapshots that workers load at startup.
+
+Fetches every catalog in ``src.cache.GRAPHQL_CATALOGS`` (countries, HS92 /
+HS12 / SITC products, services, groups) from the Atlas Explore API and
+writes one versioned JSON snapshot per catalog.  Bake the output into an
+image, or point ``CATALOG_SNAPSHOT_DIR`` at it, and startup needs no
+catalog requests until the snapshots pass their TTL.
+
+Without this script the first worker to start writes the same files.
+
+Usage::
+
+    uv run python scripts/build_catalog_snapshots.py
+
+    # Custom output directory
+    uv run python scripts/build_catalog_snapshots.py --output /srv/atlas/catalogs
+
+    # Refetch even if fresh snapshots exist
+    uv run python scripts/build_catalog_snapshots.py --force
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Add project root to sys.path so we can import src modules
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+load_dotenv(PROJECT_ROOT / ".env")
+
+logger = logging.getLogger(__name__)
+
+
+async def build_snapshots(output: Path, *, force: bool = False) -> None:
+    """Fetch all GraphQL catalogs and write their snapshots to *output*."""
+    from src.cache import (
+        GRAPHQL_CATALOGS,
+        attach_catalog_snapshots,
+        wire_catalog_fetchers,
+    )
+    from src.config import get_settings
+    from src.graphql_client import AtlasGraphQLClient, get_shared_budget_tracker
+
+    if force:
+        for catalog in GRAPHQL_CATALOGS:
+            (output / f"{catalog.name}.json").unlink(missing_ok=True)
+
+    client = AtlasGraphQLClient(
+        base_url=get_settings().graphql_explore_url,
+        timeout=30.0,
+        budget_tracker=get_shared_budget_tracker(),
+    )
+    wire_catalog_fetchers(client)
+    attach_catalog_snapshots(output)
+    try:
+        for catalog in GRAPHQL_CATALOGS:
+            entries = await catalog.get_all()
+            stats = catalog.stats()
+            logger.info(
+                "%s: %d entries (%s)",
+                catalog.name,
+                len(entries),
+                "loaded existing snapshot" if stats["snapshot_loads"] else "fetched",
+            )
+    finally:
+        await client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=PROJECT_ROOT / "cache" / "catalogs",
+        help="Snapshot directory (default: cache/catalogs)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Delete existing snapshots and refetch every catalog",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    asyncio.run(build_snapshots(args.output, force=args.force))
+
+
+if __name__ == "__main__":
+    main()
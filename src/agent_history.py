@@ -0,0 +1,272 @@
+"""Context policy for the agent node: which conversation history the LLM sees.
+
+The checkpoint keeps every message of a thread, including each tool result
+(up to ~15k characters).  Sending all of it on every agent call makes the
+prompt, and with it latency and cost, grow without bound over a long
+conversation.  :func:`build_history_view` builds the view actually sent:
+
+- The last ``keep_turns`` turns are sent verbatim.
+- In older turns every ``ToolMessage`` is condensed: the first one of a
+  turn carries a digest of that turn's ``turn_summaries`` entry (entities,
+  SQL, row counts, GraphQL query types, docs consulted), the others a short
+  pointer to it.  Turns without a summary keep the head of each result.
+  The messages themselves stay, so every tool call still has its
+  ``ToolMessage`` as OpenAI requires.
+- With a summary model, older turns are dropped whole and folded into a
+  rolling summary (``history_summary`` in the state) that is appended to
+  the system prompt.  It is only extended when more turns leave the window.
+
+A turn starts at each user ``HumanMessage``; ``turn_summaries[i]`` belongs
+to turn ``i``, as in the history API.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from src.prompts import build_conversation_summary_prompt
+from src.result_encoding import approx_tokens
+
+logger = logging.getLogger(__name__)
+
+# Start of the graph's tool_call_nudge message, which continues a turn
+TOOL_CALL_NUDGE_PREFIX = "You must call a tool before answering"
+
+# Characters kept from a tool result of an old turn that has no summary
+TOOL_RESULT_HEAD_CHARS = 300
+# Characters of each SQL query / final answer kept in digests
+DIGEST_SQL_CHARS = 400
+SUMMARY_ANSWER_CHARS = 1500
+
+_SEE_DIGEST = "[Earlier tool result condensed; see the turn digest above.]"
+
+
+@dataclass
+class HistoryView:
+    """The history sent to the agent LLM for one call.
+
+    Attributes:
+        messages: Messages to send after the system prompt.
+        summary: Rolling summary text to append to the system prompt, or "".
+        history_summary: New ``history_summary`` state value when the
+            rolling summary was extended, else None.
+        summary_message: The summary model's response, for usage tracking.
+        tokens_saved: Estimated prompt tokens saved against the full history.
+    """
+
+    messages: list[BaseMessage]
+    summary: str = ""
+    history_summary: dict | None = None
+    summary_message: AIMessage | None = None
+    tokens_saved: int = 0
+
+
+def _text(content: Any) -> str:
+    """Plain text of a message's content (str or list of content blocks)."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content
+    )
+
+
+def message_tokens(messages: list[BaseMessage]) -> int:
+    """Estimated prompt tokens of *messages* (content plus tool-call args)."""
+    total = 0
+    for msg in messages:
+        total += approx_tokens(_text(msg.content))
+        if isinstance(msg, AIMessage) and msg.tool_calls:
+            total += approx_tokens(json.dumps([tc["args"] for tc in msg.tool_calls]))
+    return total
+
+
+def _starts_turn(msg: BaseMessage) -> bool:
+    return isinstance(msg, HumanMessage) and not _text(msg.content).startswith(
+        TOOL_CALL_NUDGE_PREFIX
+    )
+
+
+def split_turns(messages: list[BaseMessage]) -> list[list[BaseMessage]]:
+    """Split a thread's messages into turns, each starting at a user message."""
+    turns: list[list[BaseMessage]] = []
+    for msg in messages:
+        if not turns or _starts_turn(msg):
+            turns.append([])
+        turns[-1].append(msg)
+    return turns
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit] + " … [truncated]"
+
+
+def turn_digest(summary: dict | None) -> str:
+    """Compact text of a ``turn_summaries`` entry, or "" if it has nothing."""
+    if not summary:
+        return ""
+    lines: list[str] = []
+    entities = summary.get("entities") or {}
+    products = [
+        f"{p['name']} ({p.get('schema')}: {', '.join(p.get('codes') or []) or '-'})"
+        for p in entities.get("products") or []
+    ]
+    countries = [
+        f"{c['name']} ({c['iso3_code']})" for c in entities.get("countries") or []
+    ]
+    if products:
+        lines.append("Products: " + "; ".join(products))
+    if countries:
+        lines.append("Countries: " + ", ".join(countries))
+    for query in summary.get("queries") or []:
+        columns = ", ".join(query.get("columns") or [])
+        lines.append(
+            f"SQL ({query.get('row_count', 0)} rows; columns: {columns}): "
+            + _clip(" ".join((query.get("sql") or "").split()), DIGEST_SQL_CHARS)
+        )
+    for gql in summary.get("graphql_summaries") or []:
+        query_type = (gql.get("classification") or {}).get("query_type") or "?"
+        entities_json = json.dumps(gql.get("entities") or {}, default=str)
+        lines.append(f"GraphQL {query_type}: {entities_json}")
+    if summary.get("docs_consulted"):
+        lines.append("Docs consulted: " + ", ".join(summary["docs_consulted"]))
+    if not lines:
+        return ""
+    return "[Earlier tool results condensed. Turn digest:]\n" + "\n".join(lines)
+
+
+def condense_turn(turn: list[BaseMessage], summary: dict | None) -> list[BaseMessage]:
+    """*turn* with each ToolMessage replaced by the digest or a pointer to it."""
+    digest = turn_digest(summary)
+    condensed: list[BaseMessage] = []
+    digest_placed = False
+    for msg in turn:
+        if isinstance(msg, ToolMessage):
+            original = _text(msg.content)
+            if digest and not digest_placed:
+                replacement = digest
+                digest_placed = True
+            elif digest:
+                replacement = _SEE_DIGEST
+            else:
+                replacement = _clip(original, TOOL_RESULT_HEAD_CHARS)
+            if len(replacement) < len(original):
+                msg = msg.model_copy(update={"content": replacement})
+        condensed.append(msg)
+    return condensed
+
+
+def render_turns(
+    turns: list[list[BaseMessage]], turn_summaries: list[dict], start: int
+) -> str:
+    """Text of *turns* (turn indices from *start*) for the summary prompt."""
+    blocks: list[str] = []
+    for index, turn in enumerate(turns, start):
+        summary = turn_summaries[index] if index < len(turn_summaries) else None
+        question = _text(turn[0].content) if _starts_turn(turn[0]) else ""
+        answers = [
+            _text(m.content)
+            for m in turn
+            if isinstance(m, AIMessage) and not m.tool_calls and _text(m.content)
+        ]
+        tools = turn_digest(summary) or "\n".join(
+            _clip(_text(m.content), TOOL_RESULT_HEAD_CHARS)
+            for m in turn
+            if isinstance(m, ToolMessage)
+        )
+        lines = [f"User: {question}"]
+        if tools:
+            lines.append(f"Tools: {tools}")
+        if answers:
+            lines.append(f"Assistant: {_clip(answers[-1], SUMMARY_ANSWER_CHARS)}")
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def drop_unpaired_tool_messages(messages: list[BaseMessage]) -> list[BaseMessage]:
+    """Drop ToolMessages whose tool call is not in *messages*."""
+    call_ids = {
+        tc["id"]
+        for m in messages
+        if isinstance(m, AIMessage) and m.tool_calls
+        for tc in m.tool_calls
+    }
+    return [
+        m
+        for m in messages
+        if not isinstance(m, ToolMessage) or m.tool_call_id in call_ids
+    ]
+
+
+async def build_history_view(
+    messages: list[BaseMessage],
+    *,
+    turn_summaries: list[dict] | None,
+    keep_turns: int,
+    history_summary: dict | None = None,
+    summary_llm: BaseLanguageModel | None = None,
+) -> HistoryView:
+    """Build the history to send to the agent LLM (see the module docstring).
+
+    Args:
+        messages: The thread's full message history.
+        turn_summaries: The thread's ``turn_summaries``.
+        keep_turns: Turns sent verbatim; 0 sends the full history.
+        history_summary: Current rolling summary ``{"turns", "text"}``, if any.
+        summary_llm: Model for the rolling summary; None condenses instead.
+
+    Returns:
+        The :class:`HistoryView` for this call.
+    """
+    turns = split_turns(messages)
+    if keep_turns <= 0 or len(turns) <= keep_turns:
+        return HistoryView(messages=messages)
+    old, recent = turns[:-keep_turns], turns[-keep_turns:]
+    turn_summaries = turn_summaries or []
+
+    view = HistoryView(messages=[])
+    covered = 0
+    if summary_llm is not None:
+        summary = history_summary or {}
+        covered = min(summary.get("turns", 0), len(old))
+        if covered < len(old):
+            prompt = build_conversation_summary_prompt(
+                summary.get("text", ""),
+                render_turns(old[covered:], turn_summaries, covered),
+            )
+            try:
+                response = await summary_llm.ainvoke(prompt)
+            except Exception:
+                # Condense the turns the summary does not cover yet instead
+                logger.warning("Conversation summary failed", exc_info=True)
+            else:
+                view.summary_message = response
+                summary = {"turns": len(old), "text": _text(response.content).strip()}
+                view.history_summary = summary
+                covered = len(old)
+        if covered:
+            view.summary = summary.get("text", "")
+
+    for index in range(covered, len(old)):
+        summary_entry = turn_summaries[index] if index < len(turn_summaries) else None
+        view.messages.extend(condense_turn(old[index], summary_entry))
+    for turn in recent:
+        view.messages.extend(turn)
+    if covered:
+        # Orphan-repair stubs are appended at the end of the history and may
+        # answer a tool call of a dropped turn
+        view.messages = drop_unpaired_tool_messages(view.messages)
+
+    view.tokens_saved = max(
+        0,
+        message_tokens(messages)
+        - message_tokens(view.messages)
+        - approx_tokens(view.summary),
+    )
+    return view
@@ -17,6 +17,7 @@ from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, Tool
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 
+from src.agent_history import build_history_view
 from src.config import AgentMode
 from src.docs_pipeline import _docs_tool_schema
 from src.docs_retrieval import format_chunks_for_prompt
@@ -117,8 +118,8 @@ def resolve_effective_mode(
         return AgentMode.GRAPHQL_ONLY
     if config_mode == AgentMode.GRAPHQL_SQL:
         return AgentMode.GRAPHQL_SQL
-    # AUTO: check budget
-    if budget_tracker is not None and budget_tracker.is_available():
+    # AUTO: check budget (in queue mode, a token freeing up soon is enough)
+    if budget_tracker is not None and budget_tracker.admissible():
         return AgentMode.GRAPHQL_SQL
     return AgentMode.SQL_ONLY
 
@@ -134,6 +135,8 @@ def make_agent_node(
     max_uses: int,
     top_k_per_query: int,
     budget_tracker: GraphQLBudgetTracker | None = None,
+    history_turns: int = 0,
+    summary_llm: BaseLanguageModel | None = None,
 ) -> Callable[[AtlasAgentState], Awaitable[dict]]:
     """Create the agent_node async callable for use in the Atlas graph.
 
@@ -143,6 +146,10 @@ def make_agent_node(
         max_uses: Maximum number of tool uses per question.
         top_k_per_query: Maximum rows returned per SQL query.
         budget_tracker: Optional budget tracker for AUTO mode.
+        history_turns: Turns of history sent verbatim; older tool results
+            are condensed (0 sends the full history, see ``src.agent_history``).
+        summary_llm: Optional model that folds turns older than
+            ``history_turns`` into a rolling summary instead.
 
     Returns:
         An async callable that takes AtlasAgentState and returns a dict update.
@@ -176,6 +183,17 @@ def make_agent_node(
                     orphan_stubs.append(stub)
                     messages.append(stub)
 
+            # Only the LLM's view of the history is windowed; the checkpoint
+            # keeps every message.
+            history = await build_history_view(
+                messages,
+                turn_summaries=state.get("turn_summaries"),
+                keep_turns=history_turns,
+                history_summary=state.get("history_summary"),
+                summary_llm=summary_llm,
+            )
+            messages = history.messages
+
             # Per-request override takes precedence over construction-time config
             state_mode = state.get("override_agent_mode")
             effective_config_mode = AgentMode(state_mode) if state_mode else agent_mode
@@ -229,6 +247,12 @@ def make_agent_node(
                 )
                 prompt_text += "\n\nThese overrides take precedence over what the question implies. If the question contradicts an override, briefly note the conflict but follow the override."
 
+            if history.summary:
+                prompt_text += (
+                    "\n\n**Earlier in this conversation** (summary of turns no "
+                    "longer shown):\n" + history.summary
+                )
+
             # Inject auto-retrieved doc chunks into the last human message
             # so the agent can see them without needing to call docs_tool.
             # The modified message is only used for the LLM call — the
@@ -261,11 +285,24 @@ def make_agent_node(
             )
             t.mark_llm(llm_start, time.monotonic())
 
+        usage_records = []
+        if history.summary_message is not None:
+            usage_records.append(
+                make_usage_record_from_msg(
+                    "agent_history_summary", "agent", history.summary_message
+                )
+            )
         usage_record = make_usage_record_from_msg("agent", "agent", response)
-        return {
+        if history.tokens_saved:
+            usage_record["history_tokens_saved"] = history.tokens_saved
+        usage_records.append(usage_record)
+        update = {
             "messages": orphan_stubs + [response],
-            "token_usage": [usage_record],
+            "token_usage": usage_records,
             "step_timing": [t.record],
         }
+        if history.history_summary is not None:
+            update["history_summary"] = history.history_summary
+        return update
 
     return agent_node
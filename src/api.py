@@ -29,6 +29,7 @@ from src.conversations import (
     derive_title,
 )
 from src.docs_pipeline import DOCS_PIPELINE_NODES
+from src.entity_memory import aggregate_reuse
 from src.feedback import (
     FeedbackStore,
     InMemoryFeedbackStore,
@@ -36,7 +37,9 @@ from src.feedback import (
     rating_from_str,
     rating_to_str,
 )
+from src.graphql_client import set_request_deadline
 from src.graphql_pipeline import GRAPHQL_PIPELINE_NODES
+from src.http_clients import outbound_http
 from src.logging_config import configure_logging, set_request_id
 from src.streaming import AtlasTextToSQL, _build_turn_summary
 
@@ -97,6 +100,7 @@ class ChatResponse(BaseModel):
     cost: dict | None = None
     tool_call_counts: dict[str, int] | None = None
     step_timing: dict | None = None
+    entity_reuse: dict | None = None
 
 
 class ConversationSummary(BaseModel):
@@ -144,6 +148,7 @@ class TurnSummaryResponse(BaseModel):
     pipeline_steps: list[dict] = []
     graphql_call_details: list[dict] = []
     sql_call_details: list[dict] = []
+    entity_reuse: dict | None = None
 
 
 class TurnMetadataResponse(BaseModel):
@@ -272,6 +277,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     if _state.atlas_sql is not None:
         await _state.atlas_sql.aclose()
         _state.atlas_sql = None
+    await outbound_http.aclose()
     _state.conversation_store = None
     _state.feedback_store = None
 
@@ -383,6 +389,8 @@ async def request_logging_middleware(request: Request, call_next):
 @app.middleware("http")
 async def timeout_middleware(request: Request, call_next):
     """Apply a timeout to all requests."""
+    # GraphQL calls made for this request stop queueing for budget at the timeout
+    set_request_deadline(time.monotonic() + REQUEST_TIMEOUT_SECONDS)
     try:
         return await asyncio.wait_for(
             call_next(request), timeout=REQUEST_TIMEOUT_SECONDS
@@ -461,10 +469,39 @@ async def health() -> dict:
 
 @router.get("/debug/caches")
 async def cache_stats() -> dict:
-    """Read-only diagnostic endpoint for monitoring cache hit rates."""
-    from src.cache import registry
+    """Read-only diagnostic endpoint for monitoring cache hit rates and memory."""
+    from src.cache import data_version, registry
 
-    return registry.stats()
+    return {
+        **registry.stats(),
+        "memory": registry.memory_report(),
+        "data_version": data_version.stats(),
+    }
+
+
+@router.get("/debug/http")
+async def http_stats() -> dict:
+    """Read-only diagnostic endpoint for outbound HTTP pools and per-host connections."""
+    return outbound_http.stats()
+
+
+@router.get("/debug/graphql")
+async def graphql_stats() -> dict:
+    """Read-only diagnostic endpoint for GraphQL request coalescing and budget.
+
+    ``budget_queue`` reports the admission mode and queue depth / wait times.
+    """
+    from src.graphql_client import get_shared_budget_tracker
+
+    atlas_sql = _state.atlas_sql
+    if atlas_sql is None:
+        return {"error": "Service not ready"}
+    clients = getattr(atlas_sql, "graphql_clients", {})
+    return {
+        "clients": {name: client.stats() for name, client in clients.items()},
+        "budget_remaining": get_shared_budget_tracker().remaining(),
+        "budget_queue": get_shared_budget_tracker().queue_stats(),
+    }
 
 
 @router.get("/debug/pool")
@@ -888,6 +925,7 @@ async def chat(
         cost=result.cost,
         tool_call_counts=result.tool_call_counts,
         step_timing=result.step_timing,
+        entity_reuse=result.entity_reuse,
     )
 
 
@@ -1171,6 +1209,7 @@ async def chat_stream(body: ChatRequest, request: Request) -> EventSourceRespons
                 # Read call histories from checkpoint state
                 graphql_call_details: list[dict] = []
                 sql_call_details: list[dict] = []
+                entity_reuse = None
                 try:
                     ckpt_state = await atlas_sql.agent.aget_state(config)
                     all_gql = ckpt_state.values.get("graphql_call_history", [])
@@ -1179,6 +1218,9 @@ async def chat_stream(body: ChatRequest, request: Request) -> EventSourceRespons
                     all_sql = ckpt_state.values.get("sql_call_history", [])
                     if stream_queries and all_sql:
                         sql_call_details = all_sql[-len(stream_queries) :]
+                    entity_reuse = aggregate_reuse(
+                        ckpt_state.values.get("entity_reuse")
+                    )
                 except Exception:
                     logger.debug(
                         "Could not read call histories for thread %s",
@@ -1196,6 +1238,7 @@ async def chat_stream(body: ChatRequest, request: Request) -> EventSourceRespons
                     pipeline_steps=stream_pipeline_steps or None,
                     graphql_call_details=graphql_call_details or None,
                     sql_call_details=sql_call_details or None,
+                    entity_reuse=entity_reuse,
                 )
                 await atlas_sql.agent.aupdate_state(
                     config, {"turn_summaries": [summary]}
@@ -1259,8 +1302,10 @@ async def chat_stream(body: ChatRequest, request: Request) -> EventSourceRespons
         cost_data = None
         tool_call_counts_data = None
         step_timing_data = None
+        entity_reuse_data = None
         try:
             state = await atlas_sql.agent.aget_state(config)
+            entity_reuse_data = aggregate_reuse(state.values.get("entity_reuse"))
             raw_usage = state.values.get("token_usage", [])
             if raw_usage:
                 from src.token_usage import (
@@ -1338,6 +1383,8 @@ async def chat_stream(body: ChatRequest, request: Request) -> EventSourceRespons
             done_payload["tool_call_counts"] = tool_call_counts_data
         if step_timing_data:
             done_payload["step_timing"] = step_timing_data
+        if entity_reuse_data:
+            done_payload["entity_reuse"] = entity_reuse_data
         yield {
             "event": "done",
             "data": json.dumps(done_payload),
@@ -2,33 +2,80 @@
 
 Provides two cache styles:
 
-1. **Per-query TTLCache** — for product details lookups, text search, and
-   table DDL reflection.  Uses ``cachetools-async`` with built-in stampede
-   prevention (concurrent identical lookups trigger only one underlying call).
+1. **Per-query TTLCache** — for product details lookups, text search,
+   table DDL reflection and Atlas GraphQL responses.  Uses
+   ``cachetools-async`` with built-in stampede prevention (concurrent
+   identical lookups trigger only one underlying call).
 
-2. **CatalogCache** — lazy-loaded, TTL-based caches for entire GraphQL
+2. **SQL result cache** — a byte-bounded TTL/LRU cache of executed query
+   results keyed on a canonical sqlglot rendering of the SQL, shared by the
+   SQL sub-agent and the legacy ``execute_sql_node``.
+
+3. **CatalogCache** — lazy-loaded, TTL-based caches for entire GraphQL
    catalog datasets (countries, products, services).  Fetched once on first
    access, indexed for O(1) lookups by multiple keys, with stampede
-   prevention via ``asyncio.Lock``.
+   prevention via ``asyncio.Lock``.  Optional on-disk JSON snapshots let
+   every worker after the first start without fetching.
+
+4. **Entity choice cache** — the lightweight LLM's disambiguation
+   decisions in GraphQL ``resolve_ids``, keyed on the entity name, catalog
+   and candidate set, so a recurring ambiguous name ("Congo", "chips")
+   costs one LLM call rather than one per question.
+
+5. **EmbeddingCache** — query embeddings for product search and docs
+   retrieval, in an in-process LRU backed by a SQLite file that survives
+   restarts and is shared by all uvicorn workers on the host.
+
+Data caches are scoped by ``data_version`` — a fingerprint of the Atlas data
+release polled in the background — so a new release invalidates them all at
+once and their TTLs can be long.
 
 The ``CacheRegistry`` tracks all caches for observability (``/debug/caches``).
+Per-query caches can additionally be backed by a shared tier (SQLite file or
+Redis, see ``src/cache_backends.py``) so that all workers share their entries.
 """
 
 from __future__ import annotations
 
 import asyncio
+import bisect
+import contextlib
+import copy
+import hashlib
+import json
 import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
 import time
-from collections.abc import Awaitable, Callable
+import unicodedata
+from array import array
+from collections.abc import Awaitable, Callable, Hashable
+from difflib import SequenceMatcher
+from functools import wraps
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
 if TYPE_CHECKING:
     from src.graphql_client import AtlasGraphQLClient
+    from src.sql_execution import FetchedResult
 
+import sqlglot
 from cachetools import TTLCache
 from cachetools_async import cached as async_cached
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
+from sqlglot import exp
+from sqlglot.optimizer.normalize_identifiers import normalize_identifiers
+
+from src.cache_backends import CacheBackend, SharedTier, create_backend
 
 logger = logging.getLogger(__name__)
 
@@ -36,14 +83,38 @@ logger = logging.getLogger(__name__)
 # Cache configuration
 # ---------------------------------------------------------------------------
 
-PRODUCT_DETAILS_MAXSIZE = 512
-PRODUCT_DETAILS_TTL = 86400  # 24 hours
+# Per-query caches are capped in estimated bytes (see ``estimate_nbytes``)
+# so their footprint can be budgeted against the container memory limit.
+PRODUCT_DETAILS_MAXBYTES = 2 * 1024 * 1024  # 2 MiB
+PRODUCT_DETAILS_TTL = 7 * 86400  # 7 days; a data release invalidates early
+
+TEXT_SEARCH_MAXBYTES = 4 * 1024 * 1024  # 4 MiB
+TEXT_SEARCH_TTL = 7 * 86400
+
+TABLE_INFO_MAXBYTES = 4 * 1024 * 1024  # 4 MiB
+TABLE_INFO_TTL = 7 * 86400
+
+SQL_RESULT_MAXBYTES = 64 * 1024 * 1024  # 64 MiB of estimated row payload
+SQL_RESULT_TTL = 7 * 86400
+
+GRAPHQL_RESPONSE_MAXBYTES = 32 * 1024 * 1024  # 32 MiB
+GRAPHQL_RESPONSE_TTL = 7 * 86400
+
+ENTITY_CHOICE_MAXBYTES = 1 * 1024 * 1024  # 1 MiB
+ENTITY_CHOICE_TTL = 30 * 86400  # a data release invalidates early
+
+QUERY_EMBEDDING_MAXSIZE = 4096
+QUERY_EMBEDDING_TTL = 30 * 86400  # embeddings are deterministic per model
+QUERY_EMBEDDING_DISK_MAX_ENTRIES = 200_000
 
-TEXT_SEARCH_MAXSIZE = 1024
-TEXT_SEARCH_TTL = 21600  # 6 hours
+CATALOG_REFRESH_BACKOFF = 60  # first retry delay after a failed refresh
+CATALOG_SNAPSHOT_VERSION = 1  # bump when the snapshot layout changes
+CATALOG_SNAPSHOT_LOCK_TIMEOUT = 60  # wait this long for another worker's fetch
+CATALOG_SNAPSHOT_LOCK_POLL = 0.1
 
-TABLE_INFO_MAXSIZE = 32
-TABLE_INFO_TTL = 3600  # 1 hour
+PENDING_FUTURE_BYTES = 1024  # weight of a cached lookup until it resolves
+
+DATA_VERSION_POLL_INTERVAL = 300  # seconds between data release checks
 
 
 # ---------------------------------------------------------------------------
@@ -51,19 +122,248 @@ TABLE_INFO_TTL = 3600  # 1 hour
 # ---------------------------------------------------------------------------
 
 
+# Keys of data caches end with the current data version, so entries from an
+# earlier Atlas data release are never served (see ``DataVersion``).
+
+
 def product_details_key(codes: list[str], schema: str) -> tuple:
     """Normalize product detail lookup key — order-independent."""
-    return (frozenset(sorted(codes)), schema)
+    return (frozenset(sorted(codes)), schema, data_version.current)
 
 
 def text_search_key(product_to_search: str, schema: str) -> tuple:
     """Normalize text search key — case- and whitespace-insensitive."""
-    return (product_to_search.strip().lower(), schema)
+    return (product_to_search.strip().lower(), schema, data_version.current)
 
 
 def table_info_key(schemas: list[str], requires_group_tables: bool = False) -> tuple:
     """Normalize table info key — order-independent, includes group flag."""
-    return (frozenset(schemas), requires_group_tables)
+    return (frozenset(schemas), requires_group_tables, data_version.current)
+
+
+def entity_choice_key(
+    name: str, catalog: str, candidate_ids: list[str], question: str = ""
+) -> tuple:
+    """Normalize entity choice key — case/whitespace-insensitive, order-independent.
+
+    *question* is empty unless decisions are scoped to the question context.
+    """
+    return (
+        " ".join(name.lower().split()),
+        catalog,
+        tuple(sorted(candidate_ids)),
+        " ".join(question.lower().split()),
+        data_version.current,
+    )
+
+
+def sql_result_cache_key(sql: str, max_rows: int) -> tuple | None:
+    """Key of the SQL result cache for *sql* fetched with *max_rows*.
+
+    Returns ``None`` when :func:`sql_result_key` deems the SQL uncacheable.
+    """
+    sql_key = sql_result_key(sql)
+    if sql_key is None:
+        return None
+    return (sql_key, max_rows, data_version.current)
+
+
+# Functions whose output changes between executions — results must not be cached.
+_VOLATILE_SQL_NODES = (exp.Rand, exp.CurrentDate, exp.CurrentTime, exp.CurrentTimestamp)
+_VOLATILE_SQL_FUNCTIONS = frozenset(
+    {"clock_timestamp", "statement_timestamp", "timeofday", "random", "gen_random_uuid"}
+)
+
+
+def sql_result_key(sql: str) -> str | None:
+    """Normalize SQL result key — canonical sqlglot rendering of the query.
+
+    Whitespace, keyword and unquoted-identifier casing, and the order of
+    ``AND``-ed predicates are ignored.  String literals stay case-sensitive.
+
+    Returns ``None`` when the SQL cannot be parsed or calls a volatile
+    function, signalling that the result must not be cached.
+    """
+    try:
+        parsed = sqlglot.parse_one(sql, dialect="postgres")
+    except sqlglot.errors.ParseError:
+        return None
+    if parsed is None:
+        return None
+
+    for func in parsed.find_all(exp.Func):
+        if isinstance(func, _VOLATILE_SQL_NODES):
+            return None
+        if isinstance(func, exp.Anonymous) and func.name.lower() in (
+            _VOLATILE_SQL_FUNCTIONS
+        ):
+            return None
+
+    parsed = normalize_identifiers(parsed, dialect="postgres")
+    # Deepest AND chains first so nested groups are sorted before their parents
+    for node in reversed(list(parsed.find_all(exp.And))):
+        if isinstance(node.parent, exp.And):
+            continue
+        parts = sorted(node.flatten(), key=lambda e: e.sql(dialect="postgres"))
+        node.replace(exp.and_(*parts, copy=False))
+    return parsed.sql(dialect="postgres", normalize=True)
+
+
+_GRAPHQL_TOKEN_RE = re.compile(
+    r'"""(?:\\"""|[\s\S])*?"""'  # block string
+    r'|"(?:\\.|[^"\\\n])*"'  # string
+    r"|#[^\n\r]*"  # comment
+    r"|[\s,]+"  # ignored tokens (commas are insignificant in GraphQL)
+    r'|[^\s,"#]+'
+    r"|."
+)
+
+
+def normalize_graphql_query(query: str) -> str:
+    """Canonical GraphQL text — comments, commas and layout whitespace are
+    dropped; string literals are kept verbatim."""
+    parts: list[str] = []
+    for token in _GRAPHQL_TOKEN_RE.findall(query):
+        if token[0] in " \t\r\n,#":
+            continue
+        if parts and _is_name_char(parts[-1][-1]) and _is_name_char(token[0]):
+            parts.append(" ")
+        parts.append(token)
+    return "".join(parts)
+
+
+def _is_name_char(char: str) -> bool:
+    return char.isalnum() or char in '_$"'
+
+
+def graphql_response_key(base_url: str, query: str, variables: dict | None) -> tuple:
+    """Normalize GraphQL response key — layout-insensitive query text and
+    variables independent of key order."""
+    return (
+        base_url,
+        normalize_graphql_query(query),
+        json.dumps(variables or {}, sort_keys=True, default=str),
+        data_version.current,
+    )
+
+
+def embedding_key(model: str, dimensions: int, text: str) -> tuple[str, int, str]:
+    """Normalize query embedding key — Unicode form, case, whitespace and
+    trailing punctuation are ignored, so near-identical questions share an
+    embedding."""
+    normalized = " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+    return (model, dimensions, normalized.rstrip("?!. "))
+
+
+def sql_result_sizeof(value: FetchedResult) -> int:
+    """Approximate in-memory size of a cached query result in bytes."""
+    columns = value.columns
+    size = sys.getsizeof(columns) + sum(sys.getsizeof(c) for c in columns)
+    return size + value.rows.nbytes
+
+
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+
+def estimate_nbytes(obj: Any) -> int:
+    """Approximate deep in-memory size of *obj* in bytes.
+
+    Follows containers and instance attributes (``__dict__`` and
+    ``__slots__``); objects with an integer ``nbytes`` (NumPy arrays,
+    ``ResultSet``) report that instead.  A finished future counts as its
+    result and a pending one as ``PENDING_FUTURE_BYTES``.  Objects
+    reachable more than once are counted once.
+    """
+    seen: set[int] = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        if isinstance(o, asyncio.Future):
+            if o.done() and not o.cancelled() and o.exception() is None:
+                stack.append(o.result())
+            else:
+                total += PENDING_FUTURE_BYTES
+            continue
+        nbytes = getattr(o, "nbytes", None)
+        if isinstance(nbytes, int) and not isinstance(o, _ATOMIC_TYPES):
+            total += nbytes
+            continue
+        total += sys.getsizeof(o)
+        if isinstance(o, _ATOMIC_TYPES):
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif not callable(o):
+            if hasattr(o, "__dict__"):
+                stack.append(vars(o))
+            for cls in type(o).__mro__:
+                slots = cls.__dict__.get("__slots__", ())
+                for slot in (slots,) if isinstance(slots, str) else slots:
+                    if hasattr(o, slot):
+                        stack.append(getattr(o, slot))
+    return total
+
+
+class WeightedTTLCache(TTLCache):
+    """TTLCache whose *maxsize* is a budget in the units of *getsizeof*.
+
+    ``cachetools_async.cached`` stores the pending future of a lookup, so a
+    future is re-weighed once it resolves and charged for its result.
+    Values larger than the whole budget are not stored (instead of raising
+    ``ValueError`` or evicting everything else).
+    """
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        try:
+            super().__setitem__(key, value)
+        except ValueError:
+            self.pop(key, None)
+            logger.debug("Value too large for cache (budget %d)", self.maxsize)
+            return
+        if isinstance(value, asyncio.Future) and not value.done():
+            value.add_done_callback(lambda fut: self._reweigh(key, fut))
+
+    def _reweigh(self, key: Any, fut: asyncio.Future) -> None:
+        if fut.cancelled() or fut.exception() is not None:
+            return  # cachetools_async drops failed lookups itself
+        if self.get(key) is fut:
+            self[key] = fut
+
+
+_CGROUP_MEMORY_FILES = (
+    Path("/sys/fs/cgroup/memory.max"),  # cgroup v2
+    Path("/sys/fs/cgroup/memory/memory.limit_in_bytes"),  # cgroup v1
+)
+_NO_CGROUP_LIMIT = 1 << 60  # cgroup v1 reports "unlimited" as a huge number
+
+
+def _cgroup_memory_limit() -> int | None:
+    """Container memory limit in bytes, or ``None`` if unlimited/unknown."""
+    for path in _CGROUP_MEMORY_FILES:
+        try:
+            raw = path.read_text().strip()
+        except OSError:
+            continue
+        if raw == "max" or not raw.isdigit() or int(raw) >= _NO_CGROUP_LIMIT:
+            return None
+        return int(raw)
+    return None
+
+
+def _process_rss() -> int | None:
+    """Resident set size of this process in bytes (Linux only)."""
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
 
 
 # ---------------------------------------------------------------------------
@@ -72,28 +372,157 @@ def table_info_key(schemas: list[str], requires_group_tables: bool = False) -> t
 
 
 class CacheRegistry:
-    """Registry of named TTLCache and CatalogCache instances."""
+    """Registry of named TTLCache and CatalogCache instances.
+
+    A TTLCache may also have a shared tier attached with
+    :meth:`attach_backend`; code reading through :meth:`read_through`,
+    :meth:`aread_through` or :meth:`read_through_sync` then checks that
+    tier before computing a value.
+    """
 
     def __init__(self) -> None:
         self._caches: dict[str, TTLCache] = {}
         self._hits: dict[str, int] = {}
         self._misses: dict[str, int] = {}
+        self._calls_saved: dict[str, int] = {}
         self._config: dict[str, dict[str, Any]] = {}
         self._catalog_caches: dict[str, CatalogCache] = {}
+        self._tiered_caches: dict[str, EmbeddingCache] = {}
+        self._shared: dict[str, SharedTier] = {}
+
+    def create(
+        self,
+        name: str,
+        *,
+        maxsize: int,
+        ttl: int,
+        getsizeof: Callable[[Any], int] | None = None,
+    ) -> TTLCache:
+        """Create and register a new TTLCache.
 
-    def create(self, name: str, *, maxsize: int, ttl: int) -> TTLCache:
-        """Create and register a new TTLCache."""
-        cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        When *getsizeof* is given, *maxsize* is a budget in the units that
+        function returns (e.g. bytes) rather than an entry count, and the
+        cache is a :class:`WeightedTTLCache`.
+        """
+        cache: TTLCache = (
+            TTLCache(maxsize=maxsize, ttl=ttl)
+            if getsizeof is None
+            else WeightedTTLCache(maxsize=maxsize, ttl=ttl, getsizeof=getsizeof)
+        )
         self._caches[name] = cache
         self._hits[name] = 0
         self._misses[name] = 0
-        self._config[name] = {"maxsize": maxsize, "ttl": ttl}
+        self._config[name] = {
+            "maxsize": maxsize,
+            "ttl": ttl,
+            "weighted": getsizeof is not None,
+        }
         return cache
 
     def register_catalog(self, catalog: CatalogCache) -> None:
         """Register a CatalogCache for observability and clear_all support."""
         self._catalog_caches[catalog.name] = catalog
 
+    def register_tiered(self, cache: EmbeddingCache) -> None:
+        """Register a cache that keeps its own multi-tier stats."""
+        self._tiered_caches[cache.name] = cache
+
+    def attach_backend(self, name: str, backend: CacheBackend | None) -> None:
+        """Back the TTLCache *name* with a shared tier (``None`` detaches).
+
+        Shared entries use the cache's own TTL.
+
+        Raises:
+            KeyError: If no TTLCache named *name* was created.
+        """
+        if name not in self._caches:
+            raise KeyError(f"No cache named '{name}'")
+        if backend is None:
+            self._shared.pop(name, None)
+        else:
+            self._shared[name] = SharedTier(name, backend, self._config[name]["ttl"])
+
+    def read_through(
+        self, name: str, key: Callable[..., Hashable]
+    ) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+        """Decorate an async function to read through the shared tier of *name*.
+
+        Place it *under* ``cachetools_async.cached`` so that concurrent
+        in-process callers still share one future, and that future does
+        the shared-tier lookup::
+
+            @async_cached(cache=my_cache, key=my_key)
+            @registry.read_through("my_cache", key=my_key)
+            async def compute(...): ...
+        """
+
+        def decorator(fn: Callable[..., Awaitable[Any]]):
+            @wraps(fn)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                return await self.aread_through(
+                    name, key(*args, **kwargs), lambda: fn(*args, **kwargs)
+                )
+
+            return wrapper
+
+        return decorator
+
+    async def aread_through(
+        self,
+        name: str,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        *,
+        should_store: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        """Return *key* from the shared tier of *name*, else ``await compute()``.
+
+        Without a shared tier this just awaits *compute*.  Computed values
+        for which *should_store* returns false are not shared.
+        """
+        tier = self._shared.get(name)
+        if tier is None:
+            return await compute()
+        return await tier.get_or_compute(key, compute, should_store=should_store)
+
+    def read_through_sync(
+        self, name: str, key: Hashable, compute: Callable[[], Any]
+    ) -> Any:
+        """Synchronous :meth:`aread_through` (no cross-worker lease)."""
+        tier = self._shared.get(name)
+        if tier is None:
+            return compute()
+        value = tier.get(key)
+        if value is None:
+            value = compute()
+            tier.set(key, value)
+        return value
+
+    async def aget(self, name: str, key: Hashable) -> Any:
+        """Return *key* from the TTLCache *name* or its shared tier, else ``None``.
+
+        A shared-tier hit is copied into the in-process cache.  Records a
+        hit or miss for *name*.
+        """
+        value = self._caches[name].get(key)
+        tier = self._shared.get(name)
+        if value is None and tier is not None:
+            value = await asyncio.to_thread(tier.get, key)
+            if value is not None:
+                self._caches[name][key] = value
+        if value is None:
+            self.record_miss(name)
+        else:
+            self.record_hit(name)
+        return value
+
+    async def aset(self, name: str, key: Hashable, value: Any) -> None:
+        """Store *value* in the TTLCache *name* and its shared tier."""
+        self._caches[name][key] = value
+        tier = self._shared.get(name)
+        if tier is not None:
+            await asyncio.to_thread(tier.set, key, value)
+
     def record_hit(self, name: str) -> None:
         """Increment hit counter for *name*."""
         self._hits[name] = self._hits.get(name, 0) + 1
@@ -102,6 +531,10 @@ class CacheRegistry:
         """Increment miss counter for *name*."""
         self._misses[name] = self._misses.get(name, 0) + 1
 
+    def record_calls_saved(self, name: str, count: int = 1) -> None:
+        """Count *count* expensive calls (e.g. LLM calls) avoided by *name*."""
+        self._calls_saved[name] = self._calls_saved.get(name, 0) + count
+
     def stats(self) -> dict[str, dict[str, Any]]:
         """Return per-cache stats for both TTLCache and CatalogCache instances."""
         result: dict[str, dict[str, Any]] = {}
@@ -117,18 +550,55 @@ class CacheRegistry:
                 "size": len(cache),
                 "ttl": self._config[name]["ttl"],
             }
+            if self._config[name]["weighted"]:
+                result[name]["bytes"] = cache.currsize
+            else:
+                result[name]["bytes"] = estimate_nbytes(list(cache.values()))
+            if name in self._calls_saved:
+                result[name]["calls_saved"] = self._calls_saved[name]
+            if name in self._shared:
+                result[name]["shared"] = self._shared[name].stats()
         for name, catalog in self._catalog_caches.items():
             result[name] = catalog.stats()
+        for name, tiered in self._tiered_caches.items():
+            result[name] = tiered.stats()
         return result
 
+    def memory_report(self) -> dict[str, Any]:
+        """Return cache memory by cache, in total and against the process limits.
+
+        ``limit_bytes`` is the cgroup memory limit of the container (the
+        Cloud Run instance memory), or ``None`` when there is none.
+        ``cache_share_of_limit`` is the fraction of that limit held by
+        caches in this worker.
+        """
+        by_cache = {name: s["bytes"] for name, s in self.stats().items()}
+        total = sum(by_cache.values())
+        limit = _cgroup_memory_limit()
+        return {
+            "total_bytes": total,
+            "by_cache": by_cache,
+            "rss_bytes": _process_rss(),
+            "limit_bytes": limit,
+            "cache_share_of_limit": total / limit if limit else None,
+        }
+
     def clear(self, name: str) -> None:
-        """Clear a single cache and reset its counters."""
+        """Clear a single cache and reset its counters.
+
+        Shared tiers are used by other workers, so only their counters reset.
+        """
         if name in self._caches:
             self._caches[name].clear()
             self._hits[name] = 0
             self._misses[name] = 0
+            self._calls_saved.pop(name, None)
+        if name in self._shared:
+            self._shared[name].reset_stats()
         if name in self._catalog_caches:
             self._catalog_caches[name].clear()
+        if name in self._tiered_caches:
+            self._tiered_caches[name].clear()
 
     def clear_all(self) -> None:
         """Clear every registered cache and reset all counters."""
@@ -136,8 +606,13 @@ class CacheRegistry:
             self._caches[name].clear()
             self._hits[name] = 0
             self._misses[name] = 0
+        self._calls_saved.clear()
+        for tier in self._shared.values():
+            tier.reset_stats()
         for catalog in self._catalog_caches.values():
             catalog.clear()
+        for tiered in self._tiered_caches.values():
+            tiered.clear()
 
 
 # ---------------------------------------------------------------------------
@@ -176,6 +651,169 @@ class _Index:
         self.data = {}
 
 
+_WORD_RE = re.compile(r"\w+")
+
+# Ranking tiers of _TextIndex.search, best first.
+_TIER_EXACT = 0
+_TIER_PREFIX = 1
+_TIER_WORD_PREFIX = 2
+_TIER_SUBSTRING = 3
+_TIER_TOKEN_SET = 4
+
+FUZZY_MIN_RATIO = 0.75  # per query word, SequenceMatcher ratio
+FUZZY_MAX_VOCAB = 25  # vocabulary words rescored per query word
+
+
+def _fold_text(text: str) -> str:
+    """Casefold, strip accents and collapse whitespace for text search."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class _TextIndex:
+    """Inverted index over one string field of a catalog for ranked search.
+
+    Built once per catalog refresh, so a search touches only the entries
+    that share trigrams or words with the query instead of lower-casing
+    every name.  Matches are ranked by tier — exact, prefix, word prefix,
+    substring, then all query words as word prefixes in any order — and by
+    shorter name within a tier.  When nothing matches literally, query
+    words are matched against the vocabulary with a typo-tolerant ratio.
+    """
+
+    __slots__ = ("field", "values", "trigrams", "words", "vocab", "vocab_trigrams")
+
+    def __init__(self, field: str) -> None:
+        self.field = field
+        self.values: list[str | None] = []
+        self.trigrams: dict[str, list[int]] = {}
+        self.words: dict[str, list[int]] = {}
+        self.vocab: list[str] = []
+        self.vocab_trigrams: dict[str, list[str]] = {}
+
+    def build(self, entries: list[dict[str, Any]]) -> None:
+        """Rebuild from a full list of entries."""
+        values: list[str | None] = []
+        trigrams: dict[str, list[int]] = {}
+        words: dict[str, list[int]] = {}
+        for pos, entry in enumerate(entries):
+            raw = entry.get(self.field)
+            if not isinstance(raw, str):
+                values.append(None)
+                continue
+            value = _fold_text(raw)
+            values.append(value)
+            for gram in _trigrams(value):
+                trigrams.setdefault(gram, []).append(pos)
+            for word in dict.fromkeys(_WORD_RE.findall(value)):
+                words.setdefault(word, []).append(pos)
+        vocab_trigrams: dict[str, list[str]] = {}
+        for word in words:
+            for gram in _trigrams(f" {word} "):
+                vocab_trigrams.setdefault(gram, []).append(word)
+        self.values = values
+        self.trigrams = trigrams
+        self.words = words
+        self.vocab = sorted(words)
+        self.vocab_trigrams = vocab_trigrams
+
+    def search(self, query: str, limit: int) -> list[int]:
+        """Return positions of the best *limit* matching entries."""
+        q = _fold_text(query)
+        if not q:
+            # Empty query matches every string value, in catalog order.
+            return [i for i, v in enumerate(self.values) if v is not None][:limit]
+
+        ranked: dict[int, int] = {}
+        for pos in self._substring_candidates(q):
+            value = self.values[pos]
+            if value == q:
+                ranked[pos] = _TIER_EXACT
+            elif value.startswith(q):
+                ranked[pos] = _TIER_PREFIX
+            elif re.search(rf"(?<!\w){re.escape(q)}", value):
+                ranked[pos] = _TIER_WORD_PREFIX
+            else:
+                ranked[pos] = _TIER_SUBSTRING
+        query_words = _WORD_RE.findall(q)
+        if len(query_words) > 1:
+            for pos in self._token_set_matches(query_words):
+                ranked.setdefault(pos, _TIER_TOKEN_SET)
+        if ranked:
+            order = sorted(ranked, key=lambda p: (ranked[p], len(self.values[p]), p))
+            return order[:limit]
+        return self._fuzzy_matches(query_words, limit)
+
+    def _substring_candidates(self, q: str) -> list[int]:
+        """Positions whose value contains *q*, via trigram postings."""
+        if len(q) < 3:
+            return [i for i, v in enumerate(self.values) if v is not None and q in v]
+        postings = []
+        for gram in _trigrams(q):
+            posting = self.trigrams.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return [pos for pos in candidates if q in self.values[pos]]
+
+    def _prefixed_words(self, prefix: str) -> list[str]:
+        start = bisect.bisect_left(self.vocab, prefix)
+        end = bisect.bisect_left(self.vocab, prefix + "\U0010ffff", lo=start)
+        return self.vocab[start:end]
+
+    def _token_set_matches(self, query_words: list[str]) -> set[int]:
+        """Positions where every query word is a prefix of some value word."""
+        matches: set[int] | None = None
+        for word in query_words:
+            positions = {
+                pos
+                for vocab_word in self._prefixed_words(word)
+                for pos in self.words[vocab_word]
+            }
+            matches = positions if matches is None else matches & positions
+            if not matches:
+                return set()
+        return matches or set()
+
+    def _fuzzy_matches(self, query_words: list[str], limit: int) -> list[int]:
+        """Typo-tolerant fallback: every query word close to some value word."""
+        if not query_words:
+            return []
+        scores: dict[int, float] | None = None
+        for word in query_words:
+            shared: dict[str, int] = {}
+            for gram in _trigrams(f" {word} "):
+                for vocab_word in self.vocab_trigrams.get(gram, ()):
+                    shared[vocab_word] = shared.get(vocab_word, 0) + 1
+            best: dict[int, float] = {}
+            for vocab_word in sorted(shared, key=shared.__getitem__, reverse=True)[
+                :FUZZY_MAX_VOCAB
+            ]:
+                ratio = SequenceMatcher(None, word, vocab_word).ratio()
+                if ratio < FUZZY_MIN_RATIO:
+                    continue
+                for pos in self.words[vocab_word]:
+                    if ratio > best.get(pos, 0.0):
+                        best[pos] = ratio
+            if scores is None:
+                scores = best
+            else:
+                scores = {
+                    pos: scores[pos] + r for pos, r in best.items() if pos in scores
+                }
+            if not scores:
+                return []
+        order = sorted(scores, key=lambda p: (-scores[p], len(self.values[p]), p))
+        return order[:limit]
+
+
 class CatalogCache:
     """Lazy-loaded, TTL-based cache for a complete catalog dataset.
 
@@ -185,9 +823,19 @@ class CatalogCache:
 
     - **Lazy population** on first access (not at import/startup)
     - **Multiple named indexes** for O(1) exact lookups by different keys
-    - **Text search** (case-insensitive substring match)
+    - **Ranked text search** over a trigram/word inverted index per field
+      (prefix, substring, word-set and typo-tolerant matching)
     - **TTL-based invalidation** — re-fetches from source after expiry
+    - **Stale-while-revalidate** (when ``max_stale`` is set) — after expiry,
+      keeps serving the old data while one background task refetches and
+      swaps in the new entries and indexes; failed refreshes back off
+      exponentially, and data older than ``ttl + max_stale`` is refetched
+      in the foreground as before
     - **Stampede prevention** — concurrent first-accesses trigger only one fetch
+    - **Snapshots** (via ``attach_snapshot()``) — every fetch is written to a
+      versioned JSON file, and a cold cache loads that file instead of
+      fetching while it is within ``ttl`` (or ``ttl + max_stale``).  A file
+      lock makes concurrent workers wait for the first one's fetch.
     - **Direct population** via ``populate()`` for testing / pre-warming
     """
 
@@ -196,16 +844,45 @@ class CatalogCache:
         name: str,
         *,
         ttl: int,
+        max_stale: float | None = None,
+        refresh_backoff: float = CATALOG_REFRESH_BACKOFF,
         timer: Callable[[], float] = time.monotonic,
     ) -> None:
+        """Create an empty catalog cache.
+
+        Args:
+            name: Cache name shown in registry stats.
+            ttl: Seconds before the data is considered expired.
+            max_stale: Seconds past *ttl* during which expired data is still
+                served while a background refresh runs.  ``None`` disables
+                stale-while-revalidate: the first access after expiry
+                refetches in the foreground.
+            refresh_backoff: Delay before retrying a failed background
+                refresh; doubles per consecutive failure, capped at *ttl*.
+            timer: Monotonic clock (injectable for tests).
+        """
         self.name = name
         self._ttl = ttl
+        self._max_stale = max_stale
+        self._refresh_backoff = refresh_backoff
         self._timer = timer
         self._entries: list[dict[str, Any]] = []
         self._indexes: dict[str, _Index] = {}
+        self._text_indexes: dict[str, _TextIndex] = {}
         self._populated_at: float | None = None
         self._fetcher: Callable[[], Awaitable[list[dict[str, Any]]]] | None = None
         self._lock: asyncio.Lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+        self._retry_at: float | None = None
+        self._refresh_count = 0
+        self._refresh_failures = 0
+        self._consecutive_failures = 0
+        self._last_refresh_seconds: float | None = None
+        self._last_refresh_error: str | None = None
+        self._snapshot_path: Path | None = None
+        self._snapshot_loads = 0
+        self._snapshot_writes = 0
+        self._nbytes: tuple[tuple, int] | None = None
 
     # -- Configuration -------------------------------------------------------
 
@@ -233,6 +910,14 @@ class CatalogCache:
         """Set the async function that fetches catalog data from the source."""
         self._fetcher = fetcher
 
+    def attach_snapshot(self, path: Path | None) -> None:
+        """Persist fetched entries to *path* and load them on cold start.
+
+        ``None`` detaches.  Typically one file per catalog in a directory
+        shared by all workers on the host (see :func:`attach_catalog_snapshots`).
+        """
+        self._snapshot_path = path
+
     # -- Data access ---------------------------------------------------------
 
     async def lookup(self, index_name: str, key: str) -> dict[str, Any] | None:
@@ -275,23 +960,30 @@ class CatalogCache:
     async def search(
         self, field: str, query: str, *, limit: int = 5
     ) -> list[dict[str, Any]]:
-        """Case-insensitive substring search on a field across all entries.
+        """Ranked, case- and accent-insensitive text search on a field.
+
+        Entries whose *field* contains *query* come first, ordered exact
+        match, prefix, word prefix, then other substrings (shorter names
+        first within each).  Multi-word queries also match entries holding
+        every word as a word prefix in any order (``"cars motor"`` finds
+        ``"Motor cars"``).  Only when nothing matches literally are typo-
+        tolerant matches returned (``"Keyna"`` finds ``"Kenya"``).
+
+        The field's inverted index is built on first use and rebuilt
+        whenever the catalog is refreshed.
 
         Args:
             field: Entry dict key to search in (e.g. ``"nameShortEn"``).
-            query: Substring to match (case-insensitive).
+            query: Text to match.  An empty query matches every entry.
             limit: Maximum results to return.
         """
         await self._ensure_populated()
-        query_lower = query.strip().lower()
-        results: list[dict[str, Any]] = []
-        for entry in self._entries:
-            value = entry.get(field, "")
-            if isinstance(value, str) and query_lower in value.lower():
-                results.append(entry)
-                if len(results) >= limit:
-                    break
-        return results
+        index = self._text_indexes.get(field)
+        if index is None:
+            index = _TextIndex(field)
+            index.build(self._entries)
+            self._text_indexes[field] = index
+        return [self._entries[pos] for pos in index.search(query, limit)]
 
     async def get_all(self) -> list[dict[str, Any]]:
         """Return all catalog entries, populating from source if needed."""
@@ -325,18 +1017,59 @@ class CatalogCache:
             "populated": self.is_populated,
             "size": len(self._entries),
             "ttl": self._ttl,
+            "max_stale": self._max_stale,
             "age_seconds": age,
+            "stale": self.is_populated and not self._is_valid,
+            "refreshing": self._refresh_task is not None
+            and not self._refresh_task.done(),
+            "refresh_count": self._refresh_count,
+            "refresh_failures": self._refresh_failures,
+            "consecutive_failures": self._consecutive_failures,
+            "last_refresh_seconds": self._last_refresh_seconds,
+            "last_refresh_error": self._last_refresh_error,
+            "snapshot_path": str(self._snapshot_path) if self._snapshot_path else None,
+            "snapshot_loads": self._snapshot_loads,
+            "snapshot_writes": self._snapshot_writes,
             "indexes": list(self._indexes.keys()),
+            "text_indexes": list(self._text_indexes.keys()),
+            "bytes": self.nbytes(),
         }
 
+    def nbytes(self) -> int:
+        """Estimated memory held by the entries and all indexes.
+
+        Memoized until the catalog is repopulated or gains a text index.
+        """
+        state = (self._populated_at, id(self._entries), tuple(self._text_indexes))
+        if self._nbytes is None or self._nbytes[0] != state:
+            size = estimate_nbytes((self._entries, self._indexes, self._text_indexes))
+            self._nbytes = (state, size)
+        return self._nbytes[1]
+
     # -- Cache management ----------------------------------------------------
 
     def clear(self) -> None:
-        """Clear all data and reset the TTL timer."""
+        """Clear all data, cancel any background refresh and reset the TTL timer."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        self._refresh_task = None
+        self._retry_at = None
+        self._consecutive_failures = 0
         self._entries = []
         self._populated_at = None
         for idx in self._indexes.values():
             idx.clear()
+        self._text_indexes = {}
+
+    def expire(self) -> None:
+        """Mark the data as expired, e.g. after a new data release.
+
+        Within ``max_stale`` the old entries keep being served while the
+        next access refreshes them in the background.
+        """
+        if self._populated_at is not None:
+            self._populated_at = min(self._populated_at, self._timer() - self._ttl)
+        self._retry_at = None
 
     # -- Internal ------------------------------------------------------------
 
@@ -346,20 +1079,44 @@ class CatalogCache:
             return False
         return (self._timer() - self._populated_at) < self._ttl
 
+    @property
+    def _is_servable_stale(self) -> bool:
+        """Whether expired data may still be served (within ``max_stale``)."""
+        if self._populated_at is None or self._max_stale is None:
+            return False
+        return (self._timer() - self._populated_at) < self._ttl + self._max_stale
+
     async def _ensure_populated(self) -> None:
         """Populate from fetcher if cache is empty or TTL has expired.
 
         Uses ``asyncio.Lock`` for stampede prevention: if multiple coroutines
         call this concurrently, only the first actually fetches; the rest wait
         and then use the freshly cached data.
+
+        With ``max_stale`` set, expired-but-servable data is returned
+        immediately and a single background refresh is started instead.
         """
         if self._is_valid:
             return
 
+        if self._is_servable_stale:
+            self._schedule_refresh()
+            return
+
+        # Past max staleness: a background refresh may already be close to
+        # done — wait for it rather than starting a second fetch.
+        task = self._refresh_task
+        if task is not None and not task.done():
+            await asyncio.shield(task)
+            if self._is_valid:
+                return
+
         async with self._lock:
             # Double-check after acquiring lock (another coroutine may have populated)
             if self._is_valid:
                 return
+            if await self._load_snapshot():
+                return
 
             if self._fetcher is None:
                 raise RuntimeError(
@@ -367,19 +1124,622 @@ class CatalogCache:
                     "Call set_fetcher() or populate() before accessing data."
                 )
 
-            logger.info("Fetching catalog data for '%s'", self.name)
-            entries = await self._fetcher()
-            self._entries = list(entries)
-            self._rebuild_indexes()
-            self._populated_at = self._timer()
+            async with self._snapshot_file_lock():
+                # Another worker may have written the snapshot while we waited
+                if await self._load_snapshot():
+                    return
+                logger.info("Fetching catalog data for '%s'", self.name)
+                started = self._timer()
+                try:
+                    entries = await self._fetcher()
+                except Exception as e:
+                    self._record_refresh_failure(e)
+                    raise
+                self._entries = list(entries)
+                self._rebuild_indexes()
+                self._populated_at = self._timer()
+                self._record_refresh_success(started)
+                await self._save_snapshot(self._entries)
             logger.info(
                 "Populated catalog '%s' with %d entries", self.name, len(self._entries)
             )
 
+    def _schedule_refresh(self) -> None:
+        """Start a background refresh unless one is running or backing off."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        if self._retry_at is not None and self._timer() < self._retry_at:
+            return
+        if self._fetcher is None:
+            return
+        from src.graphql_client import without_request_deadline
+
+        # Not bound by the deadline of the request that happened to start it
+        self._refresh_task = asyncio.get_running_loop().create_task(
+            self._background_refresh(),
+            name=f"refresh-{self.name}",
+            context=without_request_deadline(),
+        )
+
+    async def _background_refresh(self) -> None:
+        """Refetch the catalog and swap it in without blocking readers.
+
+        Indexes for the new entries are built in a worker thread; the
+        entries, indexes and timestamp are then replaced together with no
+        ``await`` in between, so readers never see a half-built catalog.
+        """
+        started = self._timer()
+        logger.info("Refreshing stale catalog '%s' in the background", self.name)
+        try:
+            async with self._lock:
+                if self._is_valid:
+                    return
+                # Another worker may already have refreshed the shared snapshot
+                snapshot = await self._read_usable_snapshot(fresh_only=True)
+                if snapshot is not None:
+                    entries, age = snapshot
+                else:
+                    entries, age = list(await self._fetcher()), 0.0
+                # The thread gets copies: search() may add a field meanwhile
+                indexes, text_indexes = await asyncio.to_thread(
+                    self._build_indexes,
+                    entries,
+                    dict(self._indexes),
+                    list(self._text_indexes),
+                )
+                # Index what was registered or first searched during the build
+                for name in self._indexes.keys() - indexes.keys():
+                    idx = self._indexes[name]
+                    indexes[name] = _Index(idx.key_fn, idx.normalize_query)
+                    indexes[name].build(entries)
+                for field in self._text_indexes.keys() - text_indexes.keys():
+                    text_indexes[field] = _TextIndex(field)
+                    text_indexes[field].build(entries)
+                self._entries = entries
+                self._indexes = indexes
+                self._text_indexes = text_indexes
+                self._populated_at = self._timer() - age
+                if snapshot is None:
+                    await self._save_snapshot(entries)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._record_refresh_failure(e)
+            logger.warning(
+                "Background refresh of catalog '%s' failed (%d in a row); "
+                "serving stale data, retrying in %.0fs",
+                self.name,
+                self._consecutive_failures,
+                self._retry_at - self._timer(),
+                exc_info=True,
+            )
+            return
+        self._record_refresh_success(started)
+        logger.info(
+            "Refreshed catalog '%s' with %d entries", self.name, len(self._entries)
+        )
+
+    def _record_refresh_success(self, started: float) -> None:
+        self._refresh_count += 1
+        self._consecutive_failures = 0
+        self._retry_at = None
+        self._last_refresh_seconds = round(self._timer() - started, 3)
+        self._last_refresh_error = None
+
+    def _record_refresh_failure(self, error: Exception) -> None:
+        self._refresh_failures += 1
+        self._consecutive_failures += 1
+        self._last_refresh_error = f"{type(error).__name__}: {error}"
+        delay = min(
+            self._refresh_backoff * 2 ** (self._consecutive_failures - 1), self._ttl
+        )
+        self._retry_at = self._timer() + delay
+
+    # -- Snapshots -----------------------------------------------------------
+
+    async def _load_snapshot(self) -> bool:
+        """Populate from the snapshot file if it is recent enough.
+
+        A snapshot past ``ttl`` (but within ``max_stale``) is loaded as
+        stale data and a background refresh is scheduled.
+        """
+        snapshot = await self._read_usable_snapshot(fresh_only=False)
+        if snapshot is None:
+            return False
+        entries, age = snapshot
+        self._entries = entries
+        self._rebuild_indexes()
+        self._populated_at = self._timer() - age
+        self._snapshot_loads += 1
+        logger.info(
+            "Loaded catalog '%s' with %d entries from snapshot (age %.0fs)",
+            self.name,
+            len(entries),
+            age,
+        )
+        if not self._is_valid:
+            self._schedule_refresh()
+        return True
+
+    async def _read_usable_snapshot(
+        self, *, fresh_only: bool
+    ) -> tuple[list[dict[str, Any]], float] | None:
+        """Return ``(entries, age_seconds)`` from the snapshot if servable."""
+        if self._snapshot_path is None:
+            return None
+        snapshot = await asyncio.to_thread(self._read_snapshot_file)
+        if snapshot is None:
+            return None
+        entries, age, snapshot_data_version = snapshot
+        if data_version.current and snapshot_data_version != data_version.current:
+            # Written for another data release: at best servable stale data
+            age = max(age, self._ttl)
+        limit = self._ttl
+        if not fresh_only and self._max_stale is not None:
+            limit += self._max_stale
+        return (entries, age) if age < limit else None
+
+    def _read_snapshot_file(
+        self,
+    ) -> tuple[list[dict[str, Any]], float, str] | None:
+        path = self._snapshot_path
+        try:
+            with path.open(encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("Unreadable catalog snapshot %s", path, exc_info=True)
+            return None
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != CATALOG_SNAPSHOT_VERSION
+            or data.get("name") != self.name
+            or not isinstance(data.get("entries"), list)
+            or not isinstance(data.get("created_at"), (int, float))
+        ):
+            logger.info("Ignoring incompatible catalog snapshot %s", path)
+            return None
+        return (
+            data["entries"],
+            max(time.time() - data["created_at"], 0.0),
+            data.get("data_version", ""),
+        )
+
+    async def _save_snapshot(self, entries: list[dict[str, Any]]) -> None:
+        """Write *entries* to the snapshot file (best effort)."""
+        if self._snapshot_path is None:
+            return
+        try:
+            await asyncio.to_thread(self._write_snapshot_file, entries)
+        except (OSError, TypeError, ValueError):
+            logger.warning(
+                "Could not write catalog snapshot %s",
+                self._snapshot_path,
+                exc_info=True,
+            )
+            return
+        self._snapshot_writes += 1
+
+    def _write_snapshot_file(self, entries: list[dict[str, Any]]) -> None:
+        path = self._snapshot_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": CATALOG_SNAPSHOT_VERSION,
+            "name": self.name,
+            "created_at": time.time(),
+            "data_version": data_version.current,
+            "entries": entries,
+        }
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"), ensure_ascii=False)
+        # Atomic rename: readers see the old file or the new one, never half
+        os.replace(tmp, path)
+
+    @contextlib.asynccontextmanager
+    async def _snapshot_file_lock(self):
+        """Hold an exclusive cross-process lock while fetching for a snapshot.
+
+        The lock is polled without blocking, so a cancelled waiter never
+        leaves it held.  If another worker holds it for longer than
+        ``CATALOG_SNAPSHOT_LOCK_TIMEOUT`` seconds, this fetches without it.
+        Without a snapshot (or on non-POSIX systems) this is a no-op.
+        """
+        if self._snapshot_path is None or fcntl is None:
+            yield
+            return
+        lock_path = self._snapshot_path.with_name(f"{self._snapshot_path.name}.lock")
+        try:
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError:
+            logger.warning("Could not lock %s", lock_path, exc_info=True)
+            yield
+            return
+        try:
+            deadline = time.monotonic() + CATALOG_SNAPSHOT_LOCK_TIMEOUT
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        logger.warning(
+                            "Timed out waiting for %s; fetching without it",
+                            lock_path,
+                        )
+                        break
+                    await asyncio.sleep(CATALOG_SNAPSHOT_LOCK_POLL)
+                except OSError:
+                    logger.warning("Could not lock %s", lock_path, exc_info=True)
+                    break
+            yield
+        finally:
+            os.close(fd)  # releases the lock if held
+
+    @staticmethod
+    def _build_indexes(
+        entries: list[dict[str, Any]],
+        registered: dict[str, _Index],
+        text_fields: list[str],
+    ) -> tuple[dict[str, _Index], dict[str, _TextIndex]]:
+        """Build fresh copies of the *registered* and *text_fields* indexes."""
+        indexes = {}
+        for name, idx in registered.items():
+            fresh = _Index(idx.key_fn, idx.normalize_query)
+            fresh.build(entries)
+            indexes[name] = fresh
+        text_indexes = {}
+        for field in text_fields:
+            fresh_text = _TextIndex(field)
+            fresh_text.build(entries)
+            text_indexes[field] = fresh_text
+        return indexes, text_indexes
+
     def _rebuild_indexes(self) -> None:
-        """Rebuild all registered indexes from the current entries."""
+        """Rebuild all registered and previously searched indexes."""
         for idx in self._indexes.values():
             idx.build(self._entries)
+        for text_idx in self._text_indexes.values():
+            text_idx.build(self._entries)
+
+
+# ---------------------------------------------------------------------------
+# EmbeddingCache — two-tier (memory + shared SQLite) cache of query embeddings
+# ---------------------------------------------------------------------------
+
+_EMBEDDING_PRUNE_EVERY = 512  # disk writes between size checks
+_SWAP_BYTES = sys.byteorder != "little"
+
+
+class EmbeddingCache:
+    """Cache of query embeddings keyed by (model, dimensions, normalized text).
+
+    Lookups check an in-process TTL/LRU tier first, then an optional SQLite
+    file attached with :meth:`attach_disk`.  The file uses WAL mode so the
+    uvicorn workers on one host share it, and it survives restarts.  Only
+    successful embeddings are stored; concurrent lookups of the same key
+    share one embedding call.
+
+    Disk I/O runs in a worker thread and never raises — a broken or locked
+    file only costs an extra embedding call.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        maxsize: int,
+        ttl: int,
+        disk_max_entries: int = QUERY_EMBEDDING_DISK_MAX_ENTRIES,
+    ) -> None:
+        self.name = name
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._memory: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._disk_max_entries = disk_max_entries
+        self._disk_path: Path | None = None
+        self._conn: sqlite3.Connection | None = None
+        self._conn_lock = threading.Lock()
+        self._writes = 0
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._inflight_joins = 0
+
+    def attach_disk(self, path: Path | None) -> None:
+        """Back the cache with the SQLite file at *path* (``None`` detaches)."""
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._disk_path = None
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.commit()
+        except (OSError, sqlite3.Error):
+            logger.warning(
+                "Embedding cache file %s unavailable; using memory only",
+                path,
+                exc_info=True,
+            )
+            return
+        with self._conn_lock:
+            self._conn = conn
+            self._disk_path = path
+
+    async def get_or_embed(
+        self,
+        model: str,
+        dimensions: int,
+        text: str,
+        embed: Callable[[str], Awaitable[list[float] | None]],
+    ) -> list[float] | None:
+        """Return the cached embedding of *text*, calling *embed* on a miss.
+
+        Args:
+            model: Embedding model name (part of the key).
+            dimensions: Embedding size (part of the key).
+            text: Query text; normalized by :func:`embedding_key`.
+            embed: Coroutine function producing the embedding, or ``None``
+                on failure (failures are not cached).
+        """
+        key = embedding_key(model, dimensions, text)
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory_hits += 1
+            return vector
+        pending = self._inflight.get(key)
+        if pending is not None:
+            # Not a hit: the shared call may still fail
+            self._inflight_joins += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            digest = hashlib.sha256("\x1f".join(map(str, key)).encode()).hexdigest()
+            vector = await asyncio.to_thread(self._disk_get, digest)
+            if vector is not None:
+                self._disk_hits += 1
+            else:
+                self._misses += 1
+                vector = await embed(text)
+                if vector is not None:
+                    await asyncio.to_thread(self._disk_put, digest, vector)
+            if vector is not None:
+                self._memory[key] = vector
+            return vector
+        finally:
+            del self._inflight[key]
+            future.set_result(vector)
+
+    def _disk_get(self, digest: str) -> list[float] | None:
+        with self._conn_lock:
+            if self._conn is None:
+                return None
+            try:
+                row = self._conn.execute(
+                    "SELECT vector FROM query_embeddings WHERE key = ?", (digest,)
+                ).fetchone()
+            except sqlite3.Error:
+                logger.debug("Embedding cache read failed", exc_info=True)
+                return None
+        if row is None:
+            return None
+        values = array("f")
+        values.frombytes(row[0])
+        if _SWAP_BYTES:
+            values.byteswap()
+        return values.tolist()
+
+    def _disk_put(self, digest: str, vector: list[float]) -> None:
+        values = array("f", vector)
+        if _SWAP_BYTES:
+            values.byteswap()
+        with self._conn_lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings VALUES (?, ?, ?)",
+                    (digest, values.tobytes(), time.time()),
+                )
+                self._writes += 1
+                if self._writes % _EMBEDDING_PRUNE_EVERY == 0:
+                    self._conn.execute(
+                        "DELETE FROM query_embeddings WHERE key IN ("
+                        "SELECT key FROM query_embeddings "
+                        "ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                        (self._disk_max_entries,),
+                    )
+                self._conn.commit()
+            except sqlite3.Error:
+                logger.debug("Embedding cache write failed", exc_info=True)
+
+    def _disk_entries(self) -> int | None:
+        with self._conn_lock:
+            if self._conn is None:
+                return None
+            try:
+                return self._conn.execute(
+                    "SELECT COUNT(*) FROM query_embeddings"
+                ).fetchone()[0]
+            except sqlite3.Error:
+                return None
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counts per tier plus memory and disk sizes.
+
+        Lookups that joined an embedding call already in flight are counted
+        as ``inflight_joins``, not as hits or misses.
+        """
+        hits = self._memory_hits + self._disk_hits
+        total = hits + self._misses
+        return {
+            "hits": hits,
+            "memory_hits": self._memory_hits,
+            "disk_hits": self._disk_hits,
+            "misses": self._misses,
+            "inflight_joins": self._inflight_joins,
+            "hit_rate": hits / total if total else 0.0,
+            "size": len(self._memory),
+            "maxsize": self._maxsize,
+            "ttl": self._ttl,
+            "disk_path": str(self._disk_path) if self._disk_path else None,
+            "disk_entries": self._disk_entries(),
+            "bytes": self.nbytes(),
+        }
+
+    def nbytes(self) -> int:
+        """Estimated memory held by the in-process tier.
+
+        Vectors are lists of distinct floats, so they are sized by length
+        rather than walked element by element.
+        """
+        float_size = sys.getsizeof(0.0)
+        return sum(
+            estimate_nbytes(key) + sys.getsizeof(vector) + len(vector) * float_size
+            for key, vector in list(self._memory.items())
+        )
+
+    def clear(self) -> None:
+        """Clear the memory tier and reset counters.
+
+        The disk tier is shared with other workers and is left intact.
+        """
+        self._memory.clear()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+
+# ---------------------------------------------------------------------------
+# DataVersion — fingerprint of the Atlas data release
+# ---------------------------------------------------------------------------
+
+
+class DataVersion:
+    """Cheap fingerprint of the Atlas data release, polled in the background.
+
+    Each *probe* is a coroutine returning a short string that changes when
+    its source is updated (e.g. the latest year in ``public.year``).  The
+    fingerprint joins all probe results; keys of data caches include it,
+    and listeners registered with :meth:`on_change` run when it changes.
+
+    A failing probe keeps the previous fingerprint — an unreachable source
+    never invalidates caches.  Until the first successful check the
+    fingerprint is ``""``.
+    """
+
+    def __init__(
+        self,
+        *,
+        poll_interval: float = DATA_VERSION_POLL_INTERVAL,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.current = ""
+        self.poll_interval = poll_interval
+        self._timer = timer
+        self._probes: dict[str, Callable[[], Awaitable[str]]] = {}
+        self._listeners: list[Callable[[str, str], None]] = []
+        self._task: asyncio.Task | None = None
+        self._checks = 0
+        self._changes = 0
+        self._failures = 0
+        self._last_checked: float | None = None
+
+    def add_probe(self, name: str, probe: Callable[[], Awaitable[str]]) -> None:
+        """Register (or replace) the probe *name*."""
+        self._probes[name] = probe
+
+    def on_change(self, listener: Callable[[str, str], None]) -> None:
+        """Call ``listener(old, new)`` whenever a known fingerprint changes."""
+        self._listeners.append(listener)
+
+    async def check(self) -> bool:
+        """Run all probes; return whether the fingerprint changed.
+
+        The first fingerprint after startup only sets :attr:`current`;
+        listeners run on later changes.
+        """
+        if not self._probes:
+            return False
+        self._checks += 1
+        names = sorted(self._probes)
+        results = await asyncio.gather(
+            *(self._probes[name]() for name in names), return_exceptions=True
+        )
+        self._last_checked = self._timer()
+        failed = [n for n, r in zip(names, results) if isinstance(r, BaseException)]
+        if failed:
+            self._failures += 1
+            logger.warning(
+                "Data version check failed for %s; keeping %r",
+                ", ".join(failed),
+                self.current,
+            )
+            return False
+        fingerprint = ";".join(f"{n}={r}" for n, r in zip(names, results))
+        previous = self.current
+        if fingerprint == previous:
+            return False
+        self.current = fingerprint
+        if previous:
+            self._changes += 1
+            logger.info("Atlas data version changed: %r -> %r", previous, fingerprint)
+            for listener in self._listeners:
+                try:
+                    listener(previous, fingerprint)
+                except Exception:
+                    logger.exception("Data version listener failed")
+        return True
+
+    def start(self) -> None:
+        """Start polling every ``poll_interval`` seconds (no-op if <= 0)."""
+        if self.poll_interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            await self.check()
+
+    def stats(self) -> dict[str, Any]:
+        """Return the fingerprint and check counters."""
+        age: float | None = None
+        if self._last_checked is not None:
+            age = round(self._timer() - self._last_checked, 1)
+        return {
+            "current": self.current,
+            "probes": sorted(self._probes),
+            "poll_interval": self.poll_interval,
+            "polling": self._task is not None,
+            "checks": self._checks,
+            "changes": self._changes,
+            "failures": self._failures,
+            "last_checked_age_seconds": age,
+        }
 
 
 # ---------------------------------------------------------------------------
@@ -387,30 +1747,83 @@ class CatalogCache:
 # ---------------------------------------------------------------------------
 
 registry = CacheRegistry()
+data_version = DataVersion()
 
 product_details_cache = registry.create(
     "product_details",
-    maxsize=PRODUCT_DETAILS_MAXSIZE,
+    maxsize=PRODUCT_DETAILS_MAXBYTES,
     ttl=PRODUCT_DETAILS_TTL,
+    getsizeof=estimate_nbytes,
 )
 
 text_search_cache = registry.create(
     "text_search",
-    maxsize=TEXT_SEARCH_MAXSIZE,
+    maxsize=TEXT_SEARCH_MAXBYTES,
     ttl=TEXT_SEARCH_TTL,
+    getsizeof=estimate_nbytes,
 )
 
 table_info_cache = registry.create(
     "table_info",
-    maxsize=TABLE_INFO_MAXSIZE,
+    maxsize=TABLE_INFO_MAXBYTES,
     ttl=TABLE_INFO_TTL,
+    getsizeof=estimate_nbytes,
+)
+
+sql_result_cache = registry.create(
+    "sql_result",
+    maxsize=SQL_RESULT_MAXBYTES,
+    ttl=SQL_RESULT_TTL,
+    getsizeof=sql_result_sizeof,
+)
+
+
+graphql_response_cache = registry.create(
+    "graphql_response",
+    maxsize=GRAPHQL_RESPONSE_MAXBYTES,
+    ttl=GRAPHQL_RESPONSE_TTL,
+    getsizeof=estimate_nbytes,
+)
+
+
+# LLM disambiguation decisions of GraphQL resolve_ids: cached value is the
+# chosen candidate's catalog ID (see ``entity_choice_key``).  Persisted in the
+# shared tier (``cache_backends``), so decisions survive restarts.
+entity_choice_cache = registry.create(
+    "entity_choice",
+    maxsize=ENTITY_CHOICE_MAXBYTES,
+    ttl=ENTITY_CHOICE_TTL,
+    getsizeof=estimate_nbytes,
+)
+
+
+def cache_sql_result(key: Hashable | None, result: FetchedResult) -> None:
+    """Store an executed query result under *key* (no-op for uncacheable SQL).
+
+    Results larger than the whole cache budget are skipped rather than
+    evicting everything else.
+    """
+    if key is None:
+        return
+    sql_result_cache[key] = result
+
+
+# Query embeddings for product search and docs retrieval.  The disk tier is
+# attached at app startup (see ``AtlasTextToSQL.create_async``).
+query_embedding_cache = EmbeddingCache(
+    "query_embedding",
+    maxsize=QUERY_EMBEDDING_MAXSIZE,
+    ttl=QUERY_EMBEDDING_TTL,
 )
+registry.register_tiered(query_embedding_cache)
+
 
 # ---------------------------------------------------------------------------
 # GraphQL catalog caches (lazy-loaded on first access)
 # ---------------------------------------------------------------------------
 
-CATALOG_TTL = 86400  # 24 hours
+CATALOG_TTL = 7 * 86400  # 7 days; a data release invalidates early
+CATALOG_MAX_STALE = 3 * 86400  # serve expired catalogs while refreshing
 
 _name_key = lambda e: (  # noqa: E731
     (e.get("nameShortEn") or e.get("nameEn", "")).strip().lower() or None
@@ -418,7 +1831,9 @@ _name_key = lambda e: (  # noqa: E731
 _name_normalize = lambda q: q.strip().lower()  # noqa: E731
 
 # Country catalog: maps country names / ISO codes → Atlas country IDs
-country_catalog = CatalogCache("country_catalog", ttl=CATALOG_TTL)
+country_catalog = CatalogCache(
+    "country_catalog", ttl=CATALOG_TTL, max_stale=CATALOG_MAX_STALE
+)
 country_catalog.add_index(
     "iso3",
     key_fn=lambda e: (e.get("iso3Code") or "").upper() or None,
@@ -432,7 +1847,9 @@ country_catalog.add_index(
 registry.register_catalog(country_catalog)
 
 # Product catalog: dual-indexed by HS code AND by name
-hs92_product_catalog = CatalogCache("hs92_product_catalog", ttl=CATALOG_TTL)
+hs92_product_catalog = CatalogCache(
+    "hs92_product_catalog", ttl=CATALOG_TTL, max_stale=CATALOG_MAX_STALE
+)
 hs92_product_catalog.add_index(
     "code",
     key_fn=lambda e: (e.get("code") or "").strip() or None,
@@ -448,7 +1865,9 @@ hs92_product_catalog.add_index(
 registry.register_catalog(hs92_product_catalog)
 
 # HS12 Product catalog: dual-indexed by HS12 code AND by name
-hs12_product_catalog = CatalogCache("hs12_product_catalog", ttl=CATALOG_TTL)
+hs12_product_catalog = CatalogCache(
+    "hs12_product_catalog", ttl=CATALOG_TTL, max_stale=CATALOG_MAX_STALE
+)
 hs12_product_catalog.add_index(
     "code",
     key_fn=lambda e: (e.get("code") or "").strip() or None,
@@ -464,7 +1883,9 @@ hs12_product_catalog.add_index(
 registry.register_catalog(hs12_product_catalog)
 
 # SITC Product catalog: indexed by SITC code, name, and ID
-sitc_product_catalog = CatalogCache("sitc_product_catalog", ttl=CATALOG_TTL)
+sitc_product_catalog = CatalogCache(
+    "sitc_product_catalog", ttl=CATALOG_TTL, max_stale=CATALOG_MAX_STALE
+)
 sitc_product_catalog.add_index(
     "code",
     key_fn=lambda e: (e.get("code") or "").strip() or None,
@@ -480,7 +1901,9 @@ sitc_product_catalog.add_index(
 registry.register_catalog(sitc_product_catalog)
 
 # Services catalog: service category names, codes, and IDs
-services_catalog = CatalogCache("services_catalog", ttl=CATALOG_TTL)
+services_catalog = CatalogCache(
+    "services_catalog", ttl=CATALOG_TTL, max_stale=CATALOG_MAX_STALE
+)
 services_catalog.add_index(
     "code",
     key_fn=lambda e: (e.get("code") or "").strip() or None,
@@ -494,7 +1917,9 @@ services_catalog.add_index(
 registry.register_catalog(services_catalog)
 
 # Group catalog: maps location group names → Atlas group IDs
-group_catalog = CatalogCache("group_catalog", ttl=CATALOG_TTL)
+group_catalog = CatalogCache(
+    "group_catalog", ttl=CATALOG_TTL, max_stale=CATALOG_MAX_STALE
+)
 group_catalog.add_index(
     "name",
     key_fn=lambda e: (e.get("groupName") or "").strip().lower() or None,
@@ -525,12 +1950,12 @@ def wire_catalog_fetchers(explore_client: AtlasGraphQLClient) -> None:
 
     async def _fetch_countries() -> list[dict[str, Any]]:
         query = "{ locationCountry { countryId iso3Code nameShortEn nameEn } }"
-        data = await explore_client.execute(query)
+        data = await explore_client.execute(query, use_cache=False)
         return data.get("locationCountry", [])
 
     async def _fetch_products() -> list[dict[str, Any]]:
         query = "{ productHs92 { productId productLevel code nameShortEn nameEn } }"
-        data = await explore_client.execute(query)
+        data = await explore_client.execute(query, use_cache=False)
         return data.get("productHs92", [])
 
     async def _fetch_services() -> list[dict[str, Any]]:
@@ -538,22 +1963,22 @@ def wire_catalog_fetchers(explore_client: AtlasGraphQLClient) -> None:
             "{ productHs92(servicesClass: unilateral)"
             " { productId productLevel code nameShortEn nameEn } }"
         )
-        data = await explore_client.execute(query)
+        data = await explore_client.execute(query, use_cache=False)
         return data.get("productHs92", [])
 
     async def _fetch_groups() -> list[dict[str, Any]]:
         query = "{ locationGroup { groupId groupName groupType } }"
-        data = await explore_client.execute(query)
+        data = await explore_client.execute(query, use_cache=False)
         return data.get("locationGroup", [])
 
     async def _fetch_hs12_products() -> list[dict[str, Any]]:
         query = "{ productHs12 { productId productLevel code nameShortEn nameEn } }"
-        data = await explore_client.execute(query)
+        data = await explore_client.execute(query, use_cache=False)
         return data.get("productHs12", [])
 
     async def _fetch_sitc_products() -> list[dict[str, Any]]:
         query = "{ productSitc { productId productLevel code nameShortEn nameEn } }"
-        data = await explore_client.execute(query)
+        data = await explore_client.execute(query, use_cache=False)
         return data.get("productSitc", [])
 
     country_catalog.set_fetcher(_fetch_countries)
@@ -564,6 +1989,119 @@ def wire_catalog_fetchers(explore_client: AtlasGraphQLClient) -> None:
     group_catalog.set_fetcher(_fetch_groups)
 
 
+GRAPHQL_CATALOGS = (
+    country_catalog,
+    hs92_product_catalog,
+    hs12_product_catalog,
+    sitc_product_catalog,
+    services_catalog,
+    group_catalog,
+)
+
+
+def attach_catalog_snapshots(directory: Path | None) -> None:
+    """Back every GraphQL catalog with a snapshot file in *directory*.
+
+    Files are named ``<catalog name>.json``.  ``None`` detaches them.
+    """
+    for catalog in GRAPHQL_CATALOGS:
+        catalog.attach_snapshot(
+            directory / f"{catalog.name}.json" if directory is not None else None
+        )
+
+
+DATA_CACHES = (
+    product_details_cache,
+    text_search_cache,
+    table_info_cache,
+    sql_result_cache,
+    graphql_response_cache,
+    entity_choice_cache,
+)
+
+
+def invalidate_data_caches(old: str, new: str) -> None:
+    """Drop data cached for a previous data release (a ``DataVersion`` listener).
+
+    Versioned keys already keep old entries from being served; clearing
+    frees their memory.  Catalogs keep serving their old entries while
+    they refresh in the background.
+    """
+    for cache in DATA_CACHES:
+        cache.clear()
+    for catalog in GRAPHQL_CATALOGS:
+        catalog.expire()
+
+
+data_version.on_change(invalidate_data_caches)
+
+
+def wire_data_version_probes(
+    async_engine: Any, explore_client: AtlasGraphQLClient | None = None
+) -> None:
+    """Register the data release probes of ``data_version``.
+
+    The database probe hashes the small ``public.year`` table (one row per
+    year, with its deflator) and counts ``public.data_flags``; the Explore
+    API probe reads the year range of each classification from
+    ``dataAvailability``.
+    """
+
+    async def _probe_database() -> str:
+        query = text(
+            "SELECT (SELECT max(year) FROM public.year),"
+            " (SELECT md5(string_agg(year || ':' || deflator, ',' ORDER BY year))"
+            " FROM public.year),"
+            " (SELECT count(*) FROM public.data_flags)"
+        )
+        async with async_engine.connect() as conn:
+            row = (await conn.execute(query)).one()
+        return "/".join(str(v) for v in row)
+
+    async def _probe_explore_api() -> str:
+        query = "{ dataAvailability { productClassification yearMin yearMax } }"
+        data = await explore_client.execute(query, use_cache=False)
+        return ",".join(
+            sorted(
+                f"{r.get('productClassification')}:{r.get('yearMin')}-{r.get('yearMax')}"
+                for r in data.get("dataAvailability") or []
+            )
+        )
+
+    data_version.add_probe("db", _probe_database)
+    if explore_client is not None:
+        data_version.add_probe("api", _probe_explore_api)
+
+
+def attach_shared_backends(specs: dict[str, str], *, default_sqlite_path: Path) -> None:
+    """Attach the shared tiers configured in ``Settings.cache_backends``.
+
+    *specs* maps cache names to backend specs (see
+    :func:`src.cache_backends.create_backend`).  Caches with the same spec
+    share one backend.  Unknown cache names and unusable backends are
+    logged and skipped, leaving those caches in-process only.
+    """
+    backends: dict[str, CacheBackend | None] = {}
+    for name, spec in specs.items():
+        if name not in registry._caches:
+            logger.warning("cache_backends: no cache named '%s'", name)
+            continue
+        if spec not in backends:
+            try:
+                backends[spec] = create_backend(
+                    spec, default_sqlite_path=default_sqlite_path
+                )
+            except (OSError, RuntimeError, ValueError, sqlite3.Error):
+                logger.warning(
+                    "Shared cache backend %r unavailable; '%s' stays in-process",
+                    spec,
+                    name,
+                    exc_info=True,
+                )
+                continue
+        registry.attach_backend(name, backends[spec])
+
+
 # ---------------------------------------------------------------------------
 # Cached async DB query functions (with stampede prevention)
 # ---------------------------------------------------------------------------
@@ -578,14 +2116,32 @@ SCHEMA_TO_PRODUCTS_TABLE_MAP: dict[str, str] = {
 }
 
 
-@async_cached(
-    cache=product_details_cache,
-    key=lambda codes_tuple, schema, async_engine: product_details_key(
-        list(codes_tuple), schema
-    ),
-)
+def _product_details_args_key(codes_tuple, schema, async_engine) -> tuple:
+    return product_details_key(list(codes_tuple), schema)
+
+
+def _text_search_args_key(product_to_search, schema, async_engine) -> tuple:
+    return text_search_key(product_to_search, schema)
+
+
 async def cached_product_details(
     codes_tuple: tuple[str, ...], schema: str, async_engine: Any
+) -> list[dict[str, Any]]:
+    """Product details for *codes_tuple*, or ``[]`` on a database error.
+
+    Errors are not cached, so the next call retries the query.
+    """
+    try:
+        return await _query_product_details(codes_tuple, schema, async_engine)
+    except SQLAlchemyError as e:
+        logger.error("Database error during cached code verification: %s", e)
+        return []
+
+
+@async_cached(cache=product_details_cache, key=_product_details_args_key)
+@registry.read_through("product_details", key=_product_details_args_key)
+async def _query_product_details(
+    codes_tuple: tuple[str, ...], schema: str, async_engine: Any
 ) -> list[dict[str, Any]]:
     """Execute the actual DB query for product details. Cached with stampede prevention."""
     registry.record_miss("product_details")
@@ -599,31 +2155,37 @@ async def cached_product_details(
         FROM {products_table}
         WHERE code = ANY(:codes)
     """)
+    async with async_engine.connect() as conn:
+        result = await conn.execute(query, {"codes": list(codes_tuple)})
+        rows = result.fetchall()
+        return [
+            {
+                "product_code": str(r[0]),
+                "product_name": str(r[1]),
+                "product_id": str(r[2]),
+                "product_level": str(r[3]),
+            }
+            for r in rows
+        ]
+
+
+async def cached_text_search(
+    product_to_search: str, schema: str, async_engine: Any
+) -> list[dict[str, Any]]:
+    """Text search matches for *product_to_search*, or ``[]`` on a database error.
+
+    Errors are not cached, so the next call retries the query.
+    """
     try:
-        async with async_engine.connect() as conn:
-            result = await conn.execute(query, {"codes": list(codes_tuple)})
-            rows = result.fetchall()
-            return [
-                {
-                    "product_code": str(r[0]),
-                    "product_name": str(r[1]),
-                    "product_id": str(r[2]),
-                    "product_level": str(r[3]),
-                }
-                for r in rows
-            ]
+        return await _query_text_search(product_to_search, schema, async_engine)
     except SQLAlchemyError as e:
-        logger.error("Database error during cached code verification: %s", e)
+        logger.error("Database error during cached text search: %s", e)
         return []
 
 
-@async_cached(
-    cache=text_search_cache,
-    key=lambda product_to_search, schema, async_engine: text_search_key(
-        product_to_search, schema
-    ),
-)
-async def cached_text_search(
+@async_cached(cache=text_search_cache, key=_text_search_args_key)
+@registry.read_through("text_search", key=_text_search_args_key)
+async def _query_text_search(
     product_to_search: str, schema: str, async_engine: Any
 ) -> list[dict[str, Any]]:
     """Execute the actual DB query for text search. Cached with stampede prevention."""
@@ -658,29 +2220,11 @@ async def cached_text_search(
         LIMIT 5
     """)
 
-    try:
-        async with async_engine.connect() as conn:
-            result = await conn.execute(
-                ts_query, {"product_to_search": product_to_search}
-            )
-            ts_results = result.fetchall()
-
-            if ts_results:
-                return [
-                    {
-                        "product_name": str(r[0]),
-                        "product_code": str(r[1]),
-                        "product_id": str(r[2]),
-                        "product_level": str(r[3]),
-                    }
-                    for r in ts_results
-                ]
-
-            result = await conn.execute(
-                fuzzy_query, {"product_to_search": product_to_search}
-            )
-            fuzzy_results = result.fetchall()
+    async with async_engine.connect() as conn:
+        result = await conn.execute(ts_query, {"product_to_search": product_to_search})
+        ts_results = result.fetchall()
 
+        if ts_results:
             return [
                 {
                     "product_name": str(r[0]),
@@ -688,8 +2232,46 @@ async def cached_text_search(
                     "product_id": str(r[2]),
                     "product_level": str(r[3]),
                 }
-                for r in fuzzy_results
+                for r in ts_results
             ]
-    except SQLAlchemyError as e:
-        logger.error("Database error during cached text search: %s", e)
-        return []
+
+        result = await conn.execute(
+            fuzzy_query, {"product_to_search": product_to_search}
+        )
+        fuzzy_results = result.fetchall()
+
+        return [
+            {
+                "product_name": str(r[0]),
+                "product_code": str(r[1]),
+                "product_id": str(r[2]),
+                "product_level": str(r[3]),
+            }
+            for r in fuzzy_results
+        ]
+
+
+async def cached_graphql_response(
+    key: tuple, fetch: Callable[[], Awaitable[tuple[dict, list[dict]]]]
+) -> dict:
+    """Return the GraphQL ``data`` cached under *key*, else fetch and cache it.
+
+    *fetch* returns ``(data, partial_errors)``; responses with partial
+    errors are returned but never cached.  Each caller gets its own copy,
+    so callers may mutate the data.
+    """
+    cached = graphql_response_cache.get(key)
+    if cached is not None:
+        registry.record_hit("graphql_response")
+        return copy.deepcopy(cached)
+
+    async def _fetch() -> tuple[dict, list[dict]]:
+        registry.record_miss("graphql_response")
+        return await fetch()
+
+    data, errors = await registry.aread_through(
+        "graphql_response", key, _fetch, should_store=lambda result: not result[1]
+    )
+    if not errors:
+        graphql_response_cache[key] = data
+    return copy.deepcopy(data)
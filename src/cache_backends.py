@@ -0,0 +1,350 @@
+"""Shared cache tiers that sit behind the in-process caches of ``CacheRegistry``.
+
+Each uvicorn worker keeps its own ``TTLCache`` for per-query lookups
+(product details, text search, table DDL), so without a shared tier every
+worker warms the same entries independently.  A cache can be given a
+*backend* that all workers reach:
+
+- :class:`SQLiteCacheBackend` — one WAL-mode SQLite file per host, shared by
+  the workers on that machine.
+- :class:`RedisCacheBackend` — any Redis-protocol server (Redis, Valkey or a
+  local stand-in), shared across hosts.  Requires the optional ``redis``
+  package.
+
+Lookups are read-through: in-process tier, then the shared tier, then the
+real computation, whose result is written back to both.  :class:`SharedTier`
+also takes a short lease in the backend while computing, so concurrent
+misses in *other* workers wait for the first worker's value instead of
+repeating the query — the cross-worker counterpart of the in-process
+``cachetools_async`` futures, which still deduplicate within a worker.
+
+Values cross process boundaries as JSON, so only JSON-serializable results
+are shared; anything else silently stays in-process only.  Backend errors
+are logged and treated as misses — a shared tier can only make a lookup
+faster, never fail it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from pathlib import Path
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+LEASE_TTL = 30.0  # seconds another worker may hold a computation lease
+LEASE_POLL_INTERVAL = 0.05
+_SQLITE_PRUNE_EVERY = 256  # writes between expired-row sweeps
+
+_MISSING = object()
+
+
+class CacheBackend(Protocol):
+    """Byte store shared between workers, with per-key expiry.
+
+    Methods are synchronous; :class:`SharedTier` calls them from a worker
+    thread on the async path.
+    """
+
+    def get(self, key: str) -> bytes | None:
+        """Return the value stored under *key*, or ``None`` if absent/expired."""
+        ...
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store *value* under *key* for *ttl* seconds."""
+        ...
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Store *value* only if *key* is absent; return whether it was stored."""
+        ...
+
+    def delete(self, key: str) -> None:
+        """Remove *key* if present."""
+        ...
+
+    def close(self) -> None:
+        """Release connections."""
+        ...
+
+
+class SQLiteCacheBackend:
+    """:class:`CacheBackend` on a WAL-mode SQLite file shared by local workers."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+            self._after_write()
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE key = ? AND expires_at <= ?",
+                (key, now),
+            )
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO cache_entries VALUES (?, ?, ?)",
+                (key, value, now + ttl),
+            )
+            self._after_write()
+            return cursor.rowcount == 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _after_write(self) -> None:
+        self._writes += 1
+        if self._writes % _SQLITE_PRUNE_EVERY == 0:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)
+            )
+        self._conn.commit()
+
+
+class RedisCacheBackend:
+    """:class:`CacheBackend` on a Redis-protocol server.
+
+    Args:
+        url: ``redis://host:port/db`` connection URL.
+        client: An existing client with the ``redis.Redis`` ``get`` /
+            ``set(px=, nx=)`` / ``delete`` API (used instead of *url*).
+    """
+
+    def __init__(self, url: str | None = None, *, client: Any = None) -> None:
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError(
+                    "The redis cache backend requires the 'redis' package "
+                    "(uv add redis)"
+                ) from e
+            client = redis.Redis.from_url(
+                url, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+        self._client = client
+
+    def get(self, key: str) -> bytes | None:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._client.set(key, value, px=max(int(ttl * 1000), 1))
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(self._client.set(key, value, px=max(int(ttl * 1000), 1), nx=True))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def _stable(obj: Any) -> Any:
+    """Turn a cache key into JSON with a process-independent order."""
+    if isinstance(obj, (set, frozenset)):
+        return sorted((_stable(o) for o in obj), key=repr)
+    if isinstance(obj, (list, tuple)):
+        return [_stable(o) for o in obj]
+    return obj
+
+
+class SharedTier:
+    """Read-through access to a :class:`CacheBackend` for one named cache.
+
+    Keys are namespaced by cache name and hashed, so several caches can
+    share one backend.  Tracks hits, misses, lease waits and errors.
+    """
+
+    def __init__(self, name: str, backend: CacheBackend, ttl: float) -> None:
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.lease_waits = 0
+        self.errors = 0
+
+    def storage_key(self, key: Hashable) -> str:
+        """Backend key for an in-process cache key."""
+        digest = hashlib.sha256(
+            json.dumps(_stable(key), default=str).encode()
+        ).hexdigest()
+        return f"atlas:{self.name}:{digest}"
+
+    # -- Sync path -----------------------------------------------------------
+
+    def get(self, key: Hashable) -> Any:
+        """Return the shared value for *key*, or ``None`` on a miss."""
+        value = self._load(self.storage_key(key))
+        if value is _MISSING:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store *value* for *key* (skipped if not JSON-serializable)."""
+        self._store(self.storage_key(key), value)
+
+    # -- Async path ----------------------------------------------------------
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        *,
+        should_store: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        """Return the shared value for *key*, computing and storing it on a miss.
+
+        While computing, a lease key is held in the backend; another worker
+        missing the same key polls for the value until the lease is released
+        or expires, then computes only if no value appeared.  A computed
+        value is not stored when ``should_store(value)`` is false.
+        """
+        skey = self.storage_key(key)
+        value = await asyncio.to_thread(self._load, skey)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+
+        lease_key = f"{skey}:lease"
+        leased = await asyncio.to_thread(self._add_lease, lease_key)
+        if not leased:
+            self.lease_waits += 1
+            deadline = time.monotonic() + LEASE_TTL
+            while time.monotonic() < deadline:
+                await asyncio.sleep(LEASE_POLL_INTERVAL)
+                value = await asyncio.to_thread(self._load, skey)
+                if value is not _MISSING:
+                    return value
+                leased = await asyncio.to_thread(self._add_lease, lease_key)
+                if leased:
+                    break
+        try:
+            value = await compute()
+            if should_store is None or should_store(value):
+                await asyncio.to_thread(self._store, skey, value)
+            return value
+        finally:
+            if leased:
+                await asyncio.to_thread(self._release, lease_key)
+
+    # -- Internal ------------------------------------------------------------
+
+    def _load(self, skey: str) -> Any:
+        try:
+            raw = self.backend.get(skey)
+        except Exception:
+            self.errors += 1
+            logger.debug("Shared cache '%s' read failed", self.name, exc_info=True)
+            return _MISSING
+        if raw is None:
+            return _MISSING
+        try:
+            return json.loads(raw)
+        except ValueError:
+            self.errors += 1
+            return _MISSING
+
+    def _store(self, skey: str, value: Any) -> None:
+        try:
+            raw = json.dumps(value, separators=(",", ":")).encode()
+        except (TypeError, ValueError):
+            logger.debug("Shared cache '%s': value not JSON-serializable", self.name)
+            return
+        try:
+            self.backend.set(skey, raw, self.ttl)
+        except Exception:
+            self.errors += 1
+            logger.debug("Shared cache '%s' write failed", self.name, exc_info=True)
+
+    def _add_lease(self, lease_key: str) -> bool:
+        try:
+            return self.backend.add(lease_key, b"1", LEASE_TTL)
+        except Exception:
+            self.errors += 1
+            logger.debug("Shared cache '%s' lease failed", self.name, exc_info=True)
+            return True  # compute locally rather than wait on a broken backend
+
+    def _release(self, lease_key: str) -> None:
+        try:
+            self.backend.delete(lease_key)
+        except Exception:
+            self.errors += 1
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "lease_waits": self.lease_waits,
+            "errors": self.errors,
+        }
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.lease_waits = self.errors = 0
+
+
+def create_backend(spec: str, *, default_sqlite_path: Path) -> CacheBackend | None:
+    """Build a backend from a ``Settings.cache_backends`` value.
+
+    Accepted specs: ``"memory"`` (no shared tier, returns ``None``),
+    ``"sqlite"`` (file at *default_sqlite_path*), ``"sqlite:<path>"`` and
+    ``"redis://..."`` / ``"rediss://..."`` URLs.
+
+    Raises:
+        ValueError: For an unrecognized spec.
+    """
+    spec = spec.strip()
+    if spec in ("", "memory"):
+        return None
+    if spec == "sqlite":
+        return SQLiteCacheBackend(default_sqlite_path)
+    if spec.startswith("sqlite:"):
+        return SQLiteCacheBackend(Path(spec.removeprefix("sqlite:")))
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(spec)
+    raise ValueError(f"Unknown cache backend {spec!r}")
@@ -9,6 +9,7 @@ import logging
 from enum import StrEnum
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from langchain_core.language_models import BaseChatModel
 from langchain_core.rate_limiters import InMemoryRateLimiter
@@ -75,6 +76,14 @@ class AgentMode(StrEnum):
     GRAPHQL_ONLY = "graphql_only"
 
 
+class ProductSearchIndex(StrEnum):
+    """In-process representation of the product search index."""
+
+    SQLITE_VEC = "sqlite_vec"
+    NUMPY = "numpy"
+    NUMPY_INT8 = "numpy_int8"
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
@@ -193,6 +202,121 @@ class Settings(BaseSettings):
         description="Path to pre-built docs SQLite index for hybrid retrieval. "
         "Empty string = auto-detect src/docs_index.db",
     )
+    embedding_cache_path: str = Field(
+        "",
+        validation_alias=AliasChoices("EMBEDDING_CACHE_PATH", "embedding_cache_path"),
+        description="SQLite file holding cached query embeddings, shared by all "
+        "workers on the host. Empty string = cache/query_embeddings.db; "
+        "'none' = in-process cache only",
+    )
+    cache_backends: dict[str, str] = Field(
+        default_factory=lambda: {
+            "product_details": "sqlite",
+            "text_search": "sqlite",
+            "table_info": "sqlite",
+            "graphql_response": "sqlite",
+            "entity_choice": "sqlite",
+        },
+        validation_alias=AliasChoices("CACHE_BACKENDS", "cache_backends"),
+        description="Shared tier behind each per-query cache, as JSON mapping cache "
+        "name to 'memory' (in-process only), 'sqlite' (cache/shared_cache.db, "
+        "shared by the workers on a host), 'sqlite:<path>' or a redis:// URL "
+        "(shared across hosts; needs the redis package)",
+    )
+    graphql_shared_state: str = Field(
+        "sqlite",
+        validation_alias=AliasChoices("GRAPHQL_SHARED_STATE", "graphql_shared_state"),
+        description="Where the GraphQL budget and circuit breakers keep their state: "
+        "'memory' (per worker), 'sqlite' (cache/graphql_state.db, shared by the "
+        "workers on a host), 'sqlite:<path>' or a redis:// URL (shared across "
+        "hosts; needs the redis package)",
+    )
+    graphql_budget_admission: Literal["queue", "fail_fast"] = Field(
+        "queue",
+        validation_alias=AliasChoices(
+            "GRAPHQL_BUDGET_ADMISSION", "graphql_budget_admission"
+        ),
+        description="What a GraphQL call does when the budget window is full: "
+        "'queue' waits in a FIFO queue for the next token (bounded by "
+        "graphql_budget_max_wait_seconds and the request deadline); 'fail_fast' "
+        "raises BudgetExhaustedError at once",
+    )
+    graphql_budget_max_wait_seconds: float = Field(
+        10.0,
+        validation_alias=AliasChoices(
+            "GRAPHQL_BUDGET_MAX_WAIT_SECONDS", "graphql_budget_max_wait_seconds"
+        ),
+        description="Longest wait in the GraphQL budget queue. In AUTO mode, "
+        "GraphQL tools stay enabled while a token frees up within this time",
+    )
+    graphql_hedge_country_pages: bool = Field(
+        True,
+        validation_alias=AliasChoices(
+            "GRAPHQL_HEDGE_COUNTRY_PAGES", "graphql_hedge_country_pages"
+        ),
+        description="Hedge slow Country Pages API requests: send a duplicate once "
+        "a request outlasts the observed p95 latency and take the first response",
+    )
+    entity_choice_cache_scope: Literal["name", "question", "off"] = Field(
+        "name",
+        validation_alias=AliasChoices(
+            "ENTITY_CHOICE_CACHE_SCOPE", "entity_choice_cache_scope"
+        ),
+        description="Reuse of LLM entity disambiguation decisions in GraphQL "
+        "resolve_ids: 'name' caches by entity name, catalog and candidate set; "
+        "'question' also keys on the question and agent guidance; 'off' always "
+        "asks the LLM",
+    )
+    outbound_http2: bool = Field(
+        False,
+        validation_alias=AliasChoices("OUTBOUND_HTTP2", "outbound_http2"),
+        description="Use HTTP/2 for outbound HTTP clients (GraphQL APIs, "
+        "embedding APIs, PostHog); needs the h2 package, else HTTP/1.1",
+    )
+    outbound_max_connections: int = Field(
+        20,
+        validation_alias=AliasChoices(
+            "OUTBOUND_MAX_CONNECTIONS", "outbound_max_connections"
+        ),
+        description="Connection pool size of each outbound HTTP client",
+    )
+    outbound_keepalive_connections: int = Field(
+        10,
+        validation_alias=AliasChoices(
+            "OUTBOUND_KEEPALIVE_CONNECTIONS", "outbound_keepalive_connections"
+        ),
+        description="Idle connections each outbound HTTP client keeps open",
+    )
+    outbound_keepalive_expiry: float = Field(
+        60.0,
+        validation_alias=AliasChoices(
+            "OUTBOUND_KEEPALIVE_EXPIRY", "outbound_keepalive_expiry"
+        ),
+        description="Seconds an idle outbound connection is kept open",
+    )
+    outbound_warm_connections: int = Field(
+        2,
+        validation_alias=AliasChoices(
+            "OUTBOUND_WARM_CONNECTIONS", "outbound_warm_connections"
+        ),
+        description="Connections opened to each upstream host at startup, so the "
+        "first requests skip the TLS handshake. 0 disables warm-up",
+    )
+    catalog_snapshot_dir: str = Field(
+        "",
+        validation_alias=AliasChoices("CATALOG_SNAPSHOT_DIR", "catalog_snapshot_dir"),
+        description="Directory of GraphQL catalog snapshots shared by all workers "
+        "on the host, so only the first one fetches at startup. Empty string = "
+        "cache/catalogs; 'none' = always fetch",
+    )
+    data_version_poll_seconds: int = Field(
+        300,
+        validation_alias=AliasChoices(
+            "DATA_VERSION_POLL_SECONDS", "data_version_poll_seconds"
+        ),
+        description="Seconds between checks of the Atlas data release fingerprint; "
+        "a change invalidates all data caches. 0 = check only at startup",
+    )
     max_docs_per_selection: int = Field(
         _MODEL_DEFAULTS["max_docs_per_selection"],
         validation_alias=AliasChoices(
@@ -225,6 +349,26 @@ class Settings(BaseSettings):
         validation_alias=AliasChoices("MAX_RESULTS", "max_results_per_query"),
         description="Maximum rows returned per SQL query",
     )
+    max_fetch_rows: int = Field(
+        5000,
+        validation_alias=AliasChoices("MAX_FETCH_ROWS", "max_fetch_rows"),
+        description="Hard cap on rows fetched from the database per executed SQL "
+        "query; the remainder is left unfetched on the server-side cursor",
+    )
+    agent_history_turns: int = Field(
+        4,
+        ge=0,
+        validation_alias=AliasChoices("AGENT_HISTORY_TURNS", "agent_history_turns"),
+        description="Conversation turns the agent LLM sees verbatim; tool results "
+        "of older turns are replaced by a digest of their turn summary (0 sends "
+        "the full history). The checkpoint always keeps the full history",
+    )
+    agent_history_summary: bool = Field(
+        False,
+        validation_alias=AliasChoices("AGENT_HISTORY_SUMMARY", "agent_history_summary"),
+        description="Replace turns older than agent_history_turns with a rolling "
+        "summary written by the lightweight model instead of condensing them",
+    )
 
     # Logging
     log_level: str = Field(
@@ -258,6 +402,13 @@ class Settings(BaseSettings):
         description="Use merged entity extraction + code selection (single LLM call) "
         "instead of the legacy two-call pipeline. Requires a product search index.",
     )
+    product_search_index: ProductSearchIndex = Field(
+        ProductSearchIndex.SQLITE_VEC,
+        validation_alias=AliasChoices("PRODUCT_SEARCH_INDEX", "product_search_index"),
+        description="How merged extraction searches product embeddings: "
+        "'sqlite_vec' queries the index file, 'numpy' loads it into float32 "
+        "matrices per schema, 'numpy_int8' into int8-quantized matrices",
+    )
 
     enable_langsmith: bool = Field(
         True,
@@ -187,24 +187,53 @@ def _deserialize_embedding(data: bytes) -> list[float]:
     return list(struct.unpack(f"<{n}f", data))
 
 
-def _create_genai_client() -> genai.Client:  # noqa: F821
+def _create_genai_client(
+    httpx_async_client: httpx.AsyncClient | None = None,  # noqa: F821
+) -> genai.Client:  # noqa: F821
     """Create a google-genai Client using Gemini Developer API credentials.
 
     Uses GOOGLE_API_KEY or GEMINI_API_KEY from the environment.
     If neither is set, creates a client that will attempt auto-detection.
 
+    Args:
+        httpx_async_client: Optional HTTP client for the ``aio`` calls
+            (e.g. the shared pool from ``src.http_clients``).
+
     Returns:
         A configured genai.Client instance.
     """
     import os
 
     from google import genai
+    from google.genai import types
 
+    http_options = (
+        types.HttpOptions(httpx_async_client=httpx_async_client)
+        if httpx_async_client is not None
+        else None
+    )
     api_key = os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")
     if api_key:
-        return genai.Client(api_key=api_key)
+        return genai.Client(api_key=api_key, http_options=http_options)
 
-    return genai.Client()
+    return genai.Client(http_options=http_options)
+
+
+def _query_genai_client() -> genai.Client:  # noqa: F821
+    """Return the genai Client for query embeddings, on the shared Gemini pool.
+
+    Rebuilt only when the pooled HTTP client has been replaced.
+    """
+    global _genai
+    from src.http_clients import gemini_http_client
+
+    http_client = gemini_http_client()
+    if _genai is None or _genai[0] is not http_client:
+        _genai = (http_client, _create_genai_client(http_client))
+    return _genai[1]
+
+
+_genai: tuple | None = None
 
 
 def _normalize_embedding(vec: list[float]) -> list[float]:
@@ -222,21 +251,32 @@ def _normalize_embedding(vec: list[float]) -> list[float]:
 
 
 async def _embed_query(text: str) -> list[float] | None:
-    """Embed a single query string via the Gemini embedding model.
-
-    Uses MRL truncation to EMBEDDING_DIM dimensions and normalizes
-    the result. Returns None on failure (caller falls back to BM25-only).
+    """Embed a single query string, served from the query embedding cache.
 
     Args:
         text: The query text to embed.
 
     Returns:
-        Normalized embedding vector as a list of floats, or None on error.
+        Normalized embedding vector as a list of floats, or None on error
+        (caller falls back to BM25-only).
+    """
+    from src.cache import query_embedding_cache
+
+    return await query_embedding_cache.get_or_embed(
+        EMBEDDING_MODEL, EMBEDDING_DIM, text, _request_embedding
+    )
+
+
+async def _request_embedding(text: str) -> list[float] | None:
+    """Embed a single query string via the Gemini embedding model.
+
+    Uses MRL truncation to EMBEDDING_DIM dimensions and normalizes
+    the result. Returns None on failure.
     """
     try:
         from google.genai import types
 
-        client = _create_genai_client()
+        client = _query_genai_client()
         response = await client.aio.models.embed_content(
             model=EMBEDDING_MODEL,
             contents=text,
@@ -0,0 +1,196 @@
+"""Per-thread memory of resolved entities, reused by follow-up questions.
+
+A follow-up such as "and in 2015?" or "what about imports?" usually refers
+to the products and countries the previous turn already resolved.  The
+pipelines record what they resolved in two checkpointed state fields:
+
+- ``sql_entity_memory`` — the SQL pipeline's products, schemas, countries
+  and formatted product codes (written by ``lookup_codes`` and
+  ``plan_sql_entities``).
+- ``graphql_entity_memory`` — the catalog entries ``resolve_ids`` matched,
+  keyed by catalog and normalized reference (name or code).
+
+Before extracting, the SQL nodes ask :func:`recall_sql_entities` whether
+the new question refers back to the remembered entities; if so they reuse
+them instead of calling the LLM and querying the database again.
+``resolve_ids`` reuses a remembered catalog entry whenever the extraction
+names the same entity again.  Each reuse appends an ``entity_reuse``
+record with the LLM calls and lookups it avoided; :func:`aggregate_reuse`
+totals them per turn.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from src.product_and_schema_lookup import SchemasAndProductsFound
+
+# Remembered GraphQL catalog entries per thread (oldest dropped first)
+GRAPHQL_MEMORY_MAX_ENTRIES = 32
+
+# Words that can appear in a follow-up without introducing a new entity.
+# "goods" and "services" are deliberately absent: they switch schemas.
+_FOLLOW_UP_WORDS = frozenset(
+    """
+    a about after all also an and any are as at before between by can compare
+    compared could did do does during each else for from had has have how in
+    instead into is it its itself just last latest me more most much next no
+    now of on or over per please same show since so tell than that the their
+    them then there these they this those through to trend trends up us vs was
+    were what when where which while who why will with within would year years
+    yearly annual annually period value values amount amounts total share
+    shares growth change changes rate percent percentage rank ranking top
+    bottom largest biggest smallest main leading export exports exported
+    exporting exporter exporters import imports imported importing importer
+    importers trade traded trading partner partners bilateral flow flows usd
+    dollars million billion s t
+    """.split()
+)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_NUMBER_RE = re.compile(r"\d+(?:s)?")
+
+
+def _words(text: str) -> list[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def refers_back(question: str, entities: list[list[str]]) -> bool:
+    """Whether *question* asks about exactly the remembered *entities*.
+
+    Each entity is a list of alternative names (e.g. a country's name and
+    ISO3 code).  True when every word of the question is part of a
+    remembered name, a number or year, or generic follow-up vocabulary, and
+    the question mentions either all of the entities ("Kenya coffee exports
+    over time") or none of them ("and in 2015?", "what about imports?").
+    Any other word may be a new product or country, and mentioning only some
+    entities ("top exports of Kenya" after "Kenya coffee") broadens the
+    question, so in both cases it is resolved from scratch.
+    """
+    question_words = set(_words(question))
+    known: set[str] = set()
+    mentioned = 0
+    for names in entities:
+        words = {word for name in names for word in _words(name)}
+        known |= words
+        if (words - _FOLLOW_UP_WORDS) & question_words:
+            mentioned += 1
+    if not known or mentioned not in (0, len(entities)):
+        return False
+    return all(
+        word in known or word in _FOLLOW_UP_WORDS or _NUMBER_RE.fullmatch(word)
+        for word in question_words
+    )
+
+
+def reuse_record(node: str, *, llm_calls: int = 0, lookups: int = 0) -> dict:
+    """An ``entity_reuse`` record for work *node* skipped thanks to memory."""
+    return {"node": node, "llm_calls_avoided": llm_calls, "lookups_avoided": lookups}
+
+
+def aggregate_reuse(records: list[dict] | None) -> dict | None:
+    """Total LLM calls and lookups avoided, or ``None`` if nothing was reused."""
+    if not records:
+        return None
+    return {
+        "llm_calls_avoided": sum(r["llm_calls_avoided"] for r in records),
+        "lookups_avoided": sum(r["lookups_avoided"] for r in records),
+        "by_node": {
+            node: sum(1 for r in records if r["node"] == node)
+            for node in dict.fromkeys(r["node"] for r in records)
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# SQL pipeline
+# ---------------------------------------------------------------------------
+
+
+def remember_sql_entities(
+    products: SchemasAndProductsFound,
+    codes: str,
+    *,
+    override_schema: str | None = None,
+    override_mode: str | None = None,
+) -> dict:
+    """The ``sql_entity_memory`` value for resolved *products* and *codes*."""
+    return {
+        "products": products.model_dump(),
+        "codes": codes,
+        "override_schema": override_schema,
+        "override_mode": override_mode,
+    }
+
+
+def recall_sql_entities(
+    memory: dict | None,
+    question: str,
+    *,
+    override_schema: str | None = None,
+    override_mode: str | None = None,
+) -> tuple[SchemasAndProductsFound, str] | None:
+    """Remembered ``(pipeline_products, pipeline_codes)`` if *question* refers back.
+
+    Returns ``None`` when there is no memory, the schema/mode overrides
+    changed since it was written, or the question may name other entities.
+    """
+    if not memory:
+        return None
+    if (memory.get("override_schema"), memory.get("override_mode")) != (
+        override_schema,
+        override_mode,
+    ):
+        return None
+    products = SchemasAndProductsFound.model_validate(memory["products"])
+    entities = [[p.name] for p in products.products]
+    entities += [[c.name, c.iso3_code] for c in products.countries]
+    if not refers_back(question, entities):
+        return None
+    return products, memory["codes"]
+
+
+# ---------------------------------------------------------------------------
+# GraphQL pipeline
+# ---------------------------------------------------------------------------
+
+
+def graphql_memory_key(catalog: str, reference: str) -> str:
+    """Key of a remembered catalog entry: catalog name + normalized reference."""
+    return f"{catalog}|{' '.join(reference.lower().split())}"
+
+
+def recall_graphql_entity(
+    memory: dict | None, catalog: str, references: list[str | None]
+) -> dict[str, Any] | None:
+    """The entry remembered for any of *references* (name, code) in *catalog*."""
+    if not memory:
+        return None
+    for reference in references:
+        if reference:
+            entry = memory.get(graphql_memory_key(catalog, reference))
+            if entry is not None:
+                return entry
+    return None
+
+
+def remember_graphql_entities(
+    memory: dict | None, resolved: dict[str, tuple[str, list[str | None], dict]]
+) -> dict:
+    """Add *resolved* entries to the ``graphql_entity_memory`` value.
+
+    Args:
+        memory: The current memory, or ``None``.
+        resolved: ``{entity: (catalog, references, entry)}`` for each entity
+            ``resolve_ids`` matched this call.
+    """
+    updated = dict(memory or {})
+    for catalog, references, entry in resolved.values():
+        for reference in references:
+            if reference:
+                key = graphql_memory_key(catalog, reference)
+                updated.pop(key, None)  # re-insert as the newest
+                updated[key] = entry
+    while len(updated) > GRAPHQL_MEMORY_MAX_ENTRIES:
+        del updated[next(iter(updated))]
+    return updated
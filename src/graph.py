@@ -2,7 +2,8 @@
 
 Replaces create_sql_agent() from generate_query.py with a multi-tool graph
 that supports SQL-only, GraphQL+SQL, and AUTO modes, plus a documentation
-lookup pipeline (docs_tool) available in all modes.
+lookup pipeline (docs_tool) available in all modes.  Multiple tool calls from one
+agent step run concurrently (see src/parallel_tools.py).
 """
 
 from __future__ import annotations
@@ -17,7 +18,7 @@ from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
-from langgraph.types import RetryPolicy
+from langgraph.types import RetryPolicy, Send
 from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncEngine
 
@@ -41,6 +42,16 @@ from src.graphql_pipeline import (
     route_after_assessment,
 )
 from src.graphql_subagent import build_graphql_subagent, graphql_correction_agent_node
+from src.parallel_tools import (
+    MERGE_NODE,
+    PARALLEL_TOOL_NODE,
+    TOOL_ENTRY_NODES,
+    branch_input,
+    merge_parallel_results,
+    run_tool_branch,
+    select_parallel_calls,
+)
+from src.sql_execution import MAX_FETCH_ROWS
 from src.sql_multiple_schemas import SQLDatabaseWithSchemas
 from src.sql_pipeline import (
     extract_products_node,
@@ -90,6 +101,10 @@ def build_atlas_graph(
     docs_index=None,
     product_search_backend=None,
     use_merged_extraction: bool = False,
+    max_fetch_rows: int = MAX_FETCH_ROWS,
+    entity_choice_cache_scope: str = "name",
+    agent_history_turns: int = 0,
+    agent_history_summary: bool = False,
 ) -> CompiledStateGraph:
     """Build the full Atlas agent graph with SQL, optional GraphQL, and docs pipelines.
 
@@ -113,6 +128,12 @@ def build_atlas_graph(
         agent_mode: Operating mode (AUTO, GRAPHQL_SQL, SQL_ONLY).
         budget_tracker: Optional GraphQLBudgetTracker for AUTO mode.
         docs_dir: Path to documentation directory. Defaults to src/docs/.
+        max_fetch_rows: Hard cap on rows fetched per SQL query execution.
+        entity_choice_cache_scope: Key of memoized entity disambiguation
+            decisions in ``resolve_ids`` ("name", "question" or "off").
+        agent_history_turns: Turns the agent LLM sees verbatim (0: all).
+        agent_history_summary: Fold older turns into a rolling summary written
+            by ``lightweight_llm`` instead of condensing their tool results.
 
     Returns:
         A compiled LangGraph StateGraph.
@@ -125,15 +146,18 @@ def build_atlas_graph(
 
     def route_after_agent(
         state: AtlasAgentState,
-    ) -> Literal[
-        "extract_tool_question",
-        "extract_graphql_question",
-        "extract_docs_question",
-        "execute_catalog_lookup",
-        "max_queries_exceeded",
-        "tool_call_nudge",
-        "__end__",
-    ]:
+    ) -> (
+        Literal[
+            "extract_tool_question",
+            "extract_graphql_question",
+            "extract_docs_question",
+            "execute_catalog_lookup",
+            "max_queries_exceeded",
+            "tool_call_nudge",
+            "__end__",
+        ]
+        | list[Send]
+    ):
         last_msg = state["messages"][-1]
         if not (hasattr(last_msg, "tool_calls") and last_msg.tool_calls):
             # Agent wants to respond without a tool call — check if any tool
@@ -150,6 +174,16 @@ def build_atlas_graph(
                 if not nudge_already:
                     return "tool_call_nudge"
             return END
+        if len(last_msg.tool_calls) > 1:
+            # Several calls in one step: run them concurrently, each with its
+            # own pipeline state (see src/parallel_tools.py).
+            selected = select_parallel_calls(
+                last_msg.tool_calls, state.get("queries_executed", 0), max_uses
+            )
+            if selected:
+                return [
+                    Send(PARALLEL_TOOL_NODE, branch_input(state, tc)) for tc in selected
+                ]
         tool_name = last_msg.tool_calls[0]["name"]
         # Budget-free tools: bypass query budget gate
         if tool_name == "docs_tool":
@@ -189,53 +223,18 @@ def build_atlas_graph(
             return "format_graphql_results"
         return "resolve_ids"
 
-    # --- Build graph ---
-    builder = StateGraph(AtlasAgentState)
-
-    # Agent node
-    agent_fn = make_agent_node(
-        llm=llm,
-        agent_mode=agent_mode,
-        max_uses=max_uses,
-        top_k_per_query=top_k_per_query,
-        budget_tracker=budget_tracker,
-    )
-    builder.add_node("agent", agent_fn)
-
-    # SQL pipeline nodes
-    builder.add_node("extract_tool_question", extract_tool_question)
-
-    if use_merged_extraction:
-        # Merged path: single LLM call for extraction + code selection
-        builder.add_node(
-            "plan_sql_entities",
-            partial(
-                plan_sql_entities_node,
-                llm=lightweight_llm,
-                product_search_backend=product_search_backend,
-                country_cache=country_cache,
-            ),
-        )
-    else:
-        # Legacy path: two sequential LLM calls
-        builder.add_node(
-            "extract_products",
-            partial(extract_products_node, llm=lightweight_llm, engine=engine),
-        )
-        _lookup_kwargs = {"llm": lightweight_llm, "engine": engine}
-        if async_engine is not None:
-            _lookup_kwargs["async_engine"] = async_engine
-        builder.add_node("lookup_codes", partial(lookup_codes_node, **_lookup_kwargs))
+    def route_tool_call(
+        state: AtlasAgentState,
+    ) -> Literal[
+        "extract_tool_question",
+        "extract_graphql_question",
+        "extract_docs_question",
+        "execute_catalog_lookup",
+    ]:
+        """Entry routing of the branch graph: one tool call, one pipeline."""
+        return TOOL_ENTRY_NODES[state["messages"][-1].tool_calls[0]["name"]]
 
-    builder.add_node(
-        "get_table_info",
-        partial(
-            get_table_info_node,
-            db=db,
-            table_descriptions=table_descriptions,
-            async_db=async_db,
-        ),
-    )
+    # --- Shared pipeline components ---
     # SQL sub-agent (replaces generate_sql + validate_sql + execute_sql + retry loop)
     _subagent, _top_k = build_sql_subagent(
         llm=llm,
@@ -246,21 +245,18 @@ def build_atlas_graph(
         async_engine=async_engine if async_engine is not None else engine,
         async_db=async_db,
         top_k=top_k_per_query,
+        max_fetch_rows=max_fetch_rows,
     )
-    builder.add_node(
-        "sql_query_agent",
-        partial(
-            sql_query_agent_node,
-            subagent=_subagent,
-            top_k=_top_k,
-            example_queries=example_queries,
-        ),
+    _graphql_subagent = build_graphql_subagent(
+        llm=llm,
+        graphql_client=graphql_client,
+        country_pages_client=country_pages_client,
+        country_cache=country_cache,
+        product_caches=product_caches or {},
+        services_cache=services_cache,
+        group_cache=group_cache,
     )
-    builder.add_node("format_results", format_results_node)
-    builder.add_node("max_queries_exceeded", max_queries_exceeded_node)
 
-    # GraphQL pipeline nodes
-    #
     # RetryPolicy for nodes that make LLM calls: on transient errors (rate
     # limits, timeouts, connection failures) LangGraph retries the node
     # automatically.  plan_query lets errors propagate
@@ -274,88 +270,216 @@ def build_atlas_graph(
         max_attempts=3,
     )
 
-    builder.add_node(
-        "extract_graphql_question",
-        partial(extract_graphql_question),
-    )
-    builder.add_node(
-        "plan_query",
-        partial(plan_query, lightweight_model=lightweight_llm),
-        retry_policy=_llm_retry,
-    )
-    # resolve_ids needs catalog caches for entity resolution
-    _resolve_kwargs: dict = {
-        "lightweight_model": lightweight_llm,
-        "country_cache": country_cache,
-        "product_caches": product_caches or {},
-        "services_cache": services_cache,
-        "group_cache": group_cache,
-    }
-    builder.add_node(
-        "resolve_ids",
-        partial(resolve_ids, **_resolve_kwargs),
-        retry_policy=_llm_retry,
-    )
-    builder.add_node(
-        "build_and_execute_graphql",
-        partial(
-            build_and_execute_graphql,
-            graphql_client=graphql_client,
-            country_pages_client=country_pages_client,
-        ),
-    )
-    builder.add_node(
-        "format_graphql_results",
-        partial(
-            format_graphql_results,
-            product_caches=product_caches or {},
-            country_cache=country_cache,
-            services_cache=services_cache,
-        ),
-    )
+    def add_tool_pipelines(builder: StateGraph, exit_to: str) -> None:
+        """Register the SQL, GraphQL, catalog and docs pipelines on *builder*.
+
+        Every pipeline's terminal node routes to *exit_to*: the agent in the
+        main graph, END in the branch graph used for parallel tool calls.
+        """
+        # SQL pipeline nodes
+        builder.add_node("extract_tool_question", extract_tool_question)
+
+        if use_merged_extraction:
+            # Merged path: single LLM call for extraction + code selection
+            builder.add_node(
+                "plan_sql_entities",
+                partial(
+                    plan_sql_entities_node,
+                    llm=lightweight_llm,
+                    product_search_backend=product_search_backend,
+                    country_cache=country_cache,
+                ),
+            )
+        else:
+            # Legacy path: two sequential LLM calls
+            builder.add_node(
+                "extract_products",
+                partial(extract_products_node, llm=lightweight_llm, engine=engine),
+            )
+            _lookup_kwargs = {"llm": lightweight_llm, "engine": engine}
+            if async_engine is not None:
+                _lookup_kwargs["async_engine"] = async_engine
+            builder.add_node(
+                "lookup_codes", partial(lookup_codes_node, **_lookup_kwargs)
+            )
 
-    # GraphQL assessment + correction agent
-    builder.add_node(
-        "assess_graphql_result",
-        partial(assess_graphql_result, lightweight_model=lightweight_llm),
-        retry_policy=_llm_retry,
-    )
-    _graphql_subagent = build_graphql_subagent(
+        builder.add_node(
+            "get_table_info",
+            partial(
+                get_table_info_node,
+                db=db,
+                table_descriptions=table_descriptions,
+                async_db=async_db,
+            ),
+        )
+        builder.add_node(
+            "sql_query_agent",
+            partial(
+                sql_query_agent_node,
+                subagent=_subagent,
+                top_k=_top_k,
+                example_queries=example_queries,
+            ),
+        )
+        builder.add_node("format_results", format_results_node)
+
+        # GraphQL pipeline nodes
+        builder.add_node(
+            "extract_graphql_question",
+            partial(extract_graphql_question),
+        )
+        builder.add_node(
+            "plan_query",
+            partial(plan_query, lightweight_model=lightweight_llm),
+            retry_policy=_llm_retry,
+        )
+        # resolve_ids needs catalog caches for entity resolution
+        _resolve_kwargs: dict = {
+            "lightweight_model": lightweight_llm,
+            "country_cache": country_cache,
+            "product_caches": product_caches or {},
+            "services_cache": services_cache,
+            "group_cache": group_cache,
+            "choice_cache_scope": entity_choice_cache_scope,
+        }
+        builder.add_node(
+            "resolve_ids",
+            partial(resolve_ids, **_resolve_kwargs),
+            retry_policy=_llm_retry,
+        )
+        builder.add_node(
+            "build_and_execute_graphql",
+            partial(
+                build_and_execute_graphql,
+                graphql_client=graphql_client,
+                country_pages_client=country_pages_client,
+            ),
+        )
+        builder.add_node(
+            "format_graphql_results",
+            partial(
+                format_graphql_results,
+                product_caches=product_caches or {},
+                country_cache=country_cache,
+                services_cache=services_cache,
+            ),
+        )
+
+        # GraphQL assessment + correction agent
+        builder.add_node(
+            "assess_graphql_result",
+            partial(assess_graphql_result, lightweight_model=lightweight_llm),
+            retry_policy=_llm_retry,
+        )
+        builder.add_node(
+            "graphql_correction_agent",
+            partial(graphql_correction_agent_node, subagent=_graphql_subagent),
+        )
+
+        # Catalog lookup node (budget-free, like docs_tool)
+        builder.add_node(
+            "execute_catalog_lookup",
+            partial(
+                execute_catalog_lookup,
+                product_caches=product_caches or {},
+                country_cache=country_cache,
+                services_cache=services_cache,
+            ),
+        )
+
+        # Docs pipeline nodes (retrieval-based, no LLM at query time)
+        builder.add_node("extract_docs_question", extract_docs_question)
+        builder.add_node(
+            "retrieve_docs",
+            partial(retrieve_docs, docs_index=docs_index, top_k=6),
+        )
+        builder.add_node("format_docs_results", format_docs_results)
+
+        # --- Pipeline edges ---
+        builder.add_edge("execute_catalog_lookup", exit_to)
+
+        # SQL pipeline edges — two paths depending on use_merged_extraction
+        if use_merged_extraction:
+            # Merged path: single node produces both products + codes, then
+            # fan-out to get_table_info; both feed into sql_query_agent.
+            builder.add_edge("extract_tool_question", "plan_sql_entities")
+            builder.add_edge("plan_sql_entities", "get_table_info")
+            builder.add_edge("get_table_info", "sql_query_agent")
+        else:
+            # Legacy path — fan-out: lookup_codes and get_table_info run in parallel
+            # after extract_products.  get_table_info depends only on classification_schemas
+            # (set by extract_products), NOT on lookup_codes output.  LangGraph natively
+            # waits for both incoming edges before running sql_query_agent (fan-in).
+            builder.add_edge("extract_tool_question", "extract_products")
+            builder.add_edge("extract_products", "lookup_codes")
+            builder.add_edge("extract_products", "get_table_info")
+            builder.add_edge("lookup_codes", "sql_query_agent")
+            builder.add_edge("get_table_info", "sql_query_agent")
+        builder.add_edge("sql_query_agent", "format_results")
+        builder.add_edge("format_results", exit_to)
+
+        # GraphQL pipeline
+        builder.add_edge("extract_graphql_question", "plan_query")
+        builder.add_conditional_edges(
+            "plan_query",
+            route_after_plan,
+            {
+                "format_graphql_results": "format_graphql_results",
+                "resolve_ids": "resolve_ids",
+            },
+        )
+        builder.add_edge("resolve_ids", "build_and_execute_graphql")
+        builder.add_edge("build_and_execute_graphql", "assess_graphql_result")
+        builder.add_conditional_edges(
+            "assess_graphql_result",
+            route_after_assessment,
+            {
+                "format_graphql_results": "format_graphql_results",
+                "graphql_correction_agent": "graphql_correction_agent",
+            },
+        )
+        builder.add_edge("graphql_correction_agent", "format_graphql_results")
+        builder.add_edge("format_graphql_results", exit_to)
+
+        # Docs pipeline (retrieval-based: 3 nodes, no LLM)
+        builder.add_edge("extract_docs_question", "retrieve_docs")
+        builder.add_edge("retrieve_docs", "format_docs_results")
+        builder.add_edge("format_docs_results", exit_to)
+
+    # --- Branch graph: runs a single tool call for parallel fan-out ---
+    # Compiled without a checkpointer; each branch is one task of the parent
+    # graph and is checkpointed through it.
+    branch_builder = StateGraph(AtlasAgentState)
+    add_tool_pipelines(branch_builder, END)
+    branch_builder.add_conditional_edges(START, route_tool_call)
+    branch_graph = branch_builder.compile(checkpointer=False)
+
+    # --- Build graph ---
+    builder = StateGraph(AtlasAgentState)
+
+    # Agent node
+    agent_fn = make_agent_node(
         llm=llm,
-        graphql_client=graphql_client,
-        country_pages_client=country_pages_client,
-        country_cache=country_cache,
-        product_caches=product_caches or {},
-        services_cache=services_cache,
-        group_cache=group_cache,
-    )
-    builder.add_node(
-        "graphql_correction_agent",
-        partial(graphql_correction_agent_node, subagent=_graphql_subagent),
+        agent_mode=agent_mode,
+        max_uses=max_uses,
+        top_k_per_query=top_k_per_query,
+        budget_tracker=budget_tracker,
+        history_turns=agent_history_turns,
+        summary_llm=lightweight_llm if agent_history_summary else None,
     )
+    builder.add_node("agent", agent_fn)
+    add_tool_pipelines(builder, "agent")
+    builder.add_node("max_queries_exceeded", max_queries_exceeded_node)
 
-    # Catalog lookup node (budget-free, like docs_tool)
+    # Parallel tool calls: one task per call, then a single join
     builder.add_node(
-        "execute_catalog_lookup",
-        partial(
-            execute_catalog_lookup,
-            product_caches=product_caches or {},
-            country_cache=country_cache,
-            services_cache=services_cache,
-        ),
+        PARALLEL_TOOL_NODE, partial(run_tool_branch, branch_graph=branch_graph)
     )
+    builder.add_node(MERGE_NODE, merge_parallel_results)
 
     # Anti-hallucination nudge node
     builder.add_node("tool_call_nudge", tool_call_nudge)
 
-    # Docs pipeline nodes (retrieval-based, no LLM at query time)
-    builder.add_node("extract_docs_question", extract_docs_question)
-    builder.add_node(
-        "retrieve_docs",
-        partial(retrieve_docs, docs_index=docs_index, top_k=6),
-    )
-    builder.add_node("format_docs_results", format_docs_results)
-
     # Auto-injection node: retrieves docs context before each agent turn
     builder.add_node(
         "retrieve_docs_context",
@@ -378,60 +502,14 @@ def build_atlas_graph(
             "execute_catalog_lookup": "execute_catalog_lookup",
             "max_queries_exceeded": "max_queries_exceeded",
             "tool_call_nudge": "tool_call_nudge",
+            PARALLEL_TOOL_NODE: PARALLEL_TOOL_NODE,
             END: END,
         },
     )
     builder.add_edge("tool_call_nudge", "agent")
-    builder.add_edge("execute_catalog_lookup", "agent")
-
-    # SQL pipeline edges — two paths depending on use_merged_extraction
-    if use_merged_extraction:
-        # Merged path: single node produces both products + codes, then
-        # fan-out to get_table_info; both feed into sql_query_agent.
-        builder.add_edge("extract_tool_question", "plan_sql_entities")
-        builder.add_edge("plan_sql_entities", "get_table_info")
-        builder.add_edge("get_table_info", "sql_query_agent")
-    else:
-        # Legacy path — fan-out: lookup_codes and get_table_info run in parallel
-        # after extract_products.  get_table_info depends only on classification_schemas
-        # (set by extract_products), NOT on lookup_codes output.  LangGraph natively
-        # waits for both incoming edges before running sql_query_agent (fan-in).
-        builder.add_edge("extract_tool_question", "extract_products")
-        builder.add_edge("extract_products", "lookup_codes")
-        builder.add_edge("extract_products", "get_table_info")
-        builder.add_edge("lookup_codes", "sql_query_agent")
-        builder.add_edge("get_table_info", "sql_query_agent")
-    builder.add_edge("sql_query_agent", "format_results")
-    builder.add_edge("format_results", "agent")
     builder.add_edge("max_queries_exceeded", "agent")
-
-    # GraphQL pipeline
-    builder.add_edge("extract_graphql_question", "plan_query")
-    builder.add_conditional_edges(
-        "plan_query",
-        route_after_plan,
-        {
-            "format_graphql_results": "format_graphql_results",
-            "resolve_ids": "resolve_ids",
-        },
-    )
-    builder.add_edge("resolve_ids", "build_and_execute_graphql")
-    builder.add_edge("build_and_execute_graphql", "assess_graphql_result")
-    builder.add_conditional_edges(
-        "assess_graphql_result",
-        route_after_assessment,
-        {
-            "format_graphql_results": "format_graphql_results",
-            "graphql_correction_agent": "graphql_correction_agent",
-        },
-    )
-    builder.add_edge("graphql_correction_agent", "format_graphql_results")
-    builder.add_edge("format_graphql_results", "agent")
-
-    # Docs pipeline (retrieval-based: 3 nodes, no LLM)
-    builder.add_edge("extract_docs_question", "retrieve_docs")
-    builder.add_edge("retrieve_docs", "format_docs_results")
-    builder.add_edge("format_docs_results", "agent")
+    builder.add_edge(PARALLEL_TOOL_NODE, MERGE_NODE)
+    builder.add_edge(MERGE_NODE, "agent")
 
     memory = checkpointer if checkpointer is not None else MemorySaver()
     return builder.compile(checkpointer=memory)
@@ -11,21 +11,31 @@ Provides three main components:
   failures and wasted budget.
 
 - ``AtlasGraphQLClient``: Async HTTP client (httpx) for the Atlas GraphQL API
-  with automatic retries on transient errors, error classification, and
-  optional integration with the budget tracker and circuit breaker.
+  with automatic retries on transient errors, error classification,
+  coalescing of identical in-flight queries, and optional integration with
+  the budget tracker and circuit breaker.
 """
 
 import asyncio
+import contextvars
+import copy
 import enum
+import json
 import logging
+import math
+import random
 import time
 from collections import deque
 from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
 
 import httpx
 
 logger = logging.getLogger(__name__)
 
+ADMISSION_MODES = ("fail_fast", "queue")
+QUEUE_POLL_INTERVAL = 0.05  # seconds between checks while tokens are reserved
+
 
 # ---------------------------------------------------------------------------
 # Exceptions
@@ -41,7 +51,19 @@ class GraphQLError(Exception):
 
 
 class TransientGraphQLError(GraphQLError):
-    """Transient error that may succeed on retry (5xx, 429, timeout, network)."""
+    """Transient error that may succeed on retry (5xx, 429, timeout, network).
+
+    ``retry_after`` holds the server's ``Retry-After`` delay in seconds, if any.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        errors: list[dict] | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        self.retry_after = retry_after
+        super().__init__(message, errors)
 
 
 class BudgetExhaustedError(GraphQLError):
@@ -169,22 +191,47 @@ class GraphQLBudgetTracker:
     are consumed AFTER a successful HTTP response, not before — preventing
     API outages from burning through the budget.
 
+    With ``admission="queue"``, callers that find the window full wait in a
+    FIFO queue (see :meth:`admit`) instead of failing immediately, so short
+    bursts are smoothed rather than pushed onto the SQL pipeline.
+
     Args:
         max_requests: Maximum requests allowed in the window (default 100).
         window_seconds: Sliding window duration in seconds (default 60.0).
         max_requests_per_session: Optional per-session limit within the same
             window. When None, only the global limit applies.
+        admission: ``"fail_fast"`` (default) raises ``BudgetExhaustedError``
+            as soon as the window is full; ``"queue"`` waits for a token.
+        max_queue_wait: Longest wait in the admission queue, in seconds
+            (default 10.0). The request deadline can shorten it.
     """
 
     max_requests: int = 100
     window_seconds: float = 60.0
     max_requests_per_session: int | None = None
+    admission: str = "fail_fast"
+    max_queue_wait: float = 10.0
 
     _timestamps: deque[float] = field(default_factory=deque, init=False, repr=False)
     _session_timestamps: dict[str, deque[float]] = field(
         default_factory=dict, init=False, repr=False
     )
     _lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
+    # Admission queue: asyncio.Lock wakes waiters in FIFO order
+    _queue: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
+    _reserved: int = field(default=0, init=False, repr=False)
+    _queue_depth: int = field(default=0, init=False, repr=False)
+    _queue_max_depth: int = field(default=0, init=False, repr=False)
+    _queued: int = field(default=0, init=False, repr=False)
+    _queue_timeouts: int = field(default=0, init=False, repr=False)
+    _queue_wait_total: float = field(default=0.0, init=False, repr=False)
+    _queue_wait_max: float = field(default=0.0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.admission not in ADMISSION_MODES:
+            raise ValueError(
+                f"admission must be one of {ADMISSION_MODES}, got {self.admission!r}"
+            )
 
     def _prune_window(self, dq: deque[float]) -> None:
         """Remove entries older than the sliding window."""
@@ -248,6 +295,146 @@ class GraphQLBudgetTracker:
             self._timestamps.append(now)
             return True
 
+    def seconds_until_available(self, session_id: str | None = None) -> float:
+        """Seconds until the window has room for another call.
+
+        0.0 if it has room now; ``math.inf`` if the limit is zero.  Calls
+        admitted by :meth:`admit` but still in flight are not counted.
+        """
+        now = time.monotonic()
+        self._prune_window(self._timestamps)
+        wait = self._window_wait(self._timestamps, self.max_requests, now)
+        if session_id is not None and self.max_requests_per_session is not None:
+            session_dq = self._session_timestamps.get(session_id, deque())
+            self._prune_window(session_dq)
+            wait = max(
+                wait, self._window_wait(session_dq, self.max_requests_per_session, now)
+            )
+        return wait
+
+    def _window_wait(self, dq: deque[float], limit: int, now: float) -> float:
+        over = len(dq) - limit
+        if over < 0:
+            return 0.0
+        if limit <= 0:
+            return math.inf
+        return max(0.0, dq[over] + self.window_seconds - now)
+
+    def admissible(self, session_id: str | None = None) -> bool:
+        """Whether a call made now would be admitted.
+
+        In fail-fast mode this is :meth:`is_available`; in queue mode a call
+        is also admissible if a token frees up within ``max_queue_wait``.
+        """
+        if self.admission == "queue":
+            return self.seconds_until_available(session_id) <= self.max_queue_wait
+        return self.is_available(session_id=session_id)
+
+    async def admit(
+        self, session_id: str | None = None, deadline: float | None = None
+    ) -> bool:
+        """Wait in the admission queue for a token; return whether one was granted.
+
+        Waiters are admitted in arrival order.  Each admission reserves a
+        token until :meth:`release` is called, so a queue draining into a
+        barely-free window cannot overshoot the budget.  Gives up after
+        ``max_queue_wait`` seconds, at the monotonic *deadline* if that is
+        sooner, or at once when the window cannot free up before then.
+
+        Args:
+            session_id: If provided, waits for the session budget too.
+            deadline: ``time.monotonic()`` time by which the caller needs
+                an answer (e.g. the request deadline).
+        """
+        start = time.monotonic()
+        give_up_at = start + self.max_queue_wait
+        if deadline is not None:
+            give_up_at = min(give_up_at, deadline)
+
+        if not self._queue.locked() and self._reserve(session_id):
+            return True
+
+        self._queued += 1
+        self._queue_depth += 1
+        self._queue_max_depth = max(self._queue_max_depth, self._queue_depth)
+        admitted = False
+        try:
+            try:
+                await asyncio.wait_for(
+                    self._queue.acquire(), timeout=max(0.0, give_up_at - start)
+                )
+            except TimeoutError:
+                return False
+            try:
+                while True:
+                    if self._reserve(session_id):
+                        admitted = True
+                        return True
+                    now = time.monotonic()
+                    delay = self.seconds_until_available(session_id)
+                    if now + delay >= give_up_at:
+                        return False  # no token can free up in time
+                    # delay == 0: the room is reserved by admitted calls in flight
+                    await asyncio.sleep(
+                        min(delay or QUEUE_POLL_INTERVAL, give_up_at - now)
+                    )
+            finally:
+                self._queue.release()
+        finally:
+            waited = time.monotonic() - start
+            self._queue_depth -= 1
+            self._queue_wait_total += waited
+            self._queue_wait_max = max(self._queue_wait_max, waited)
+            if not admitted:
+                self._queue_timeouts += 1
+                logger.info(
+                    "GraphQL budget queue gave up after %.2fs (depth %d)",
+                    waited,
+                    self._queue_depth,
+                )
+
+    def _reserve(self, session_id: str | None) -> bool:
+        if self.remaining(session_id=session_id) - self._reserved <= 0:
+            return False
+        self._reserved += 1
+        return True
+
+    async def try_consume(
+        self, session_id: str | None = None, *, keep: int = 0
+    ) -> bool:
+        """Consume a token now if one is free, without waiting in the queue.
+
+        For calls sent outside :meth:`admit` (e.g. a hedged duplicate).
+        Fails while callers wait in the admission queue, and never takes a
+        token reserved for an admitted call or one of the *keep* tokens
+        left for calls in flight that hold no reservation.
+        """
+        if self._queue.locked():
+            return False
+        if self.remaining(session_id=session_id) - self._reserved <= keep:
+            return False
+        return await self.consume(session_id=session_id)
+
+    def release(self) -> None:
+        """Return a token reserved by :meth:`admit` once its call has finished."""
+        self._reserved = max(0, self._reserved - 1)
+
+    def queue_stats(self) -> dict:
+        """Admission mode and queue depth / wait-time metrics for diagnostics."""
+        return {
+            "admission": self.admission,
+            "depth": self._queue_depth,
+            "max_depth": self._queue_max_depth,
+            "reserved": self._reserved,
+            "queued": self._queued,
+            "timeouts": self._queue_timeouts,
+            "wait_seconds_total": round(self._queue_wait_total, 3),
+            "wait_seconds_max": round(self._queue_wait_max, 3),
+            "wait_seconds_avg": (
+                round(self._queue_wait_total / self._queued, 3) if self._queued else 0.0
+            ),
+        }
+
 
 # ---------------------------------------------------------------------------
 # Process-global budget tracker singleton
@@ -274,6 +461,49 @@ def get_shared_budget_tracker(
     return _shared_budget_tracker
 
 
+def set_shared_budget_tracker(tracker: GraphQLBudgetTracker) -> None:
+    """Replace the process-global budget tracker (e.g. with a shared-state one).
+
+    Call at startup, before clients capture the tracker.
+    """
+    global _shared_budget_tracker
+    _shared_budget_tracker = tracker
+
+
+# ---------------------------------------------------------------------------
+# Request deadline
+# ---------------------------------------------------------------------------
+
+_request_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "graphql_request_deadline", default=None
+)
+
+
+def set_request_deadline(deadline: float | None) -> contextvars.Token:
+    """Set the ``time.monotonic()`` deadline of the current request.
+
+    Tasks started afterwards (graph nodes, tools) inherit it; GraphQL calls
+    made in them stop waiting for budget at this time.
+    """
+    return _request_deadline.set(deadline)
+
+
+def get_request_deadline() -> float | None:
+    """Return the current request's deadline, or ``None`` if unset."""
+    return _request_deadline.get()
+
+
+def without_request_deadline() -> contextvars.Context:
+    """A copy of the current context with no request deadline.
+
+    For tasks that outlive the request that starts them (e.g. catalog
+    refreshes): ``loop.create_task(coro, context=without_request_deadline())``.
+    """
+    context = contextvars.copy_context()
+    context.run(_request_deadline.set, None)
+    return context
+
+
 # ---------------------------------------------------------------------------
 # AtlasGraphQLClient
 # ---------------------------------------------------------------------------
@@ -287,61 +517,200 @@ class AtlasGraphQLClient:
     """Async HTTP client for the Atlas GraphQL API.
 
     Features:
-        - Persistent connection pool (single httpx.AsyncClient reused across calls)
+        - Persistent connection pool (single httpx.AsyncClient reused across
+          calls, built by ``src.http_clients.outbound_http``)
         - Automatic retries on transient errors (5xx, 429, timeouts, network)
         - Error classification: transient vs. permanent
         - Optional budget tracker integration (consume-on-success)
         - Optional circuit breaker integration (fast-fail when API is down)
+        - Request coalescing: concurrent calls with the same query and
+          variables share one HTTP request (and one budget token)
+        - Optional response cache: repeated queries within a data release
+          are answered without an HTTP request or budget token
+        - Jittered exponential backoff that honours ``Retry-After``, bounded
+          by the caller's deadline
+        - Optional request hedging: a duplicate request is sent once an
+          attempt outlasts the observed p95 latency; the first response wins
 
     Args:
         base_url: GraphQL endpoint URL.
         timeout: Request timeout in seconds (default 10.0).
         max_retries: Number of retry attempts for transient errors (default 3).
         backoff_base: Base seconds for exponential backoff (default 1.0).
+            Each delay is drawn from ``[d/2, d]`` with ``d = backoff_base * 2**n``.
+        max_retry_after: Longest ``Retry-After`` the client will wait for
+            (default 60.0); a longer one ends the retries.
         budget_tracker: Optional budget tracker for rate limiting.
         circuit_breaker: Optional circuit breaker for health checking.
+        cache_responses: Serve repeated queries from
+            ``src.cache.graphql_response_cache`` (default False).
+        hedge: Send a hedged duplicate of slow requests (default False).
+        hedge_quantile: Latency quantile after which to hedge (default 0.95).
+        hedge_min_samples: Latencies observed before hedging starts
+            (default 20).
     """
 
     base_url: str
     timeout: float = 10.0
     max_retries: int = 3
     backoff_base: float = 1.0
+    max_retry_after: float = 60.0
     budget_tracker: GraphQLBudgetTracker | None = None
     circuit_breaker: CircuitBreaker | None = None
+    cache_responses: bool = False
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
 
     _http_client: httpx.AsyncClient | None = field(default=None, init=False, repr=False)
+    _inflight: dict[tuple[str, str, str], asyncio.Task] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _requests: int = field(default=0, init=False, repr=False)
+    _coalesced: int = field(default=0, init=False, repr=False)
+    # Latencies of recent successful requests, for the hedge delay
+    _latencies: deque[float] = field(
+        default_factory=lambda: deque(maxlen=200), init=False, repr=False
+    )
+    _hedged: int = field(default=0, init=False, repr=False)
+    _hedge_wins: int = field(default=0, init=False, repr=False)
 
     async def execute(
         self,
         query: str,
         variables: dict | None = None,
         session_id: str | None = None,
+        *,
+        use_cache: bool = True,
+        deadline: float | None = None,
     ) -> dict:
         """Execute a GraphQL query against the Atlas API.
 
+        With ``cache_responses``, a query answered earlier in the same data
+        release is served from the response cache before any pre-flight
+        check, so cache hits never consume budget.  Responses with partial
+        errors are not cached.
+
+        When the budget window is full, fails fast with
+        ``BudgetExhaustedError`` or, if the tracker's ``admission`` is
+        ``"queue"``, waits for a token until ``max_queue_wait`` or the
+        deadline.
+
+        Transient errors are retried with jittered backoff, waiting at least
+        as long as the server's ``Retry-After``.  No retry is started that
+        could not finish before the deadline, and each attempt's timeout is
+        cut to the time left.  A timeout of an attempt cut this way ends the
+        call and is not counted by the circuit breaker.
+
+        If an identical query (same endpoint, query text and variables) is
+        already in flight, waits for its response instead of sending another
+        request, even when the budget is exhausted; only the first caller's
+        request consumes budget.  Every
+        caller, the first included, gets its own copy of the data.
+
         Args:
             query: GraphQL query string.
             variables: Optional query variables.
             session_id: Optional session ID for per-session budget tracking.
+            use_cache: Set False to bypass the response cache (e.g. for
+                catalog fetches that are cached elsewhere).
+            deadline: ``time.monotonic()`` time by which the call must finish.
+                Defaults to the request deadline (:func:`set_request_deadline`).
 
         Returns:
             The ``data`` field from the GraphQL response.
 
         Raises:
-            BudgetExhaustedError: Budget is exhausted (no HTTP call made).
+            BudgetExhaustedError: Budget is exhausted, or no token freed up
+                in time in queue mode (no HTTP call made).
             CircuitOpenError: Circuit breaker is open (no HTTP call made).
             GraphQLError: Permanent error (4xx, GraphQL validation error).
-            TransientGraphQLError: Transient error after all retries exhausted.
+            TransientGraphQLError: Transient error after all retries exhausted,
+                or the deadline left no time for another attempt.
+        """
+        if deadline is None:
+            deadline = get_request_deadline()
+        if not (self.cache_responses and use_cache):
+            data, _errors = await self._execute_uncached(
+                query, variables, session_id, deadline
+            )
+            return data
+
+        from src.cache import cached_graphql_response, graphql_response_key
+
+        key = graphql_response_key(self.base_url, query, variables)
+        return await cached_graphql_response(
+            key,
+            lambda: self._execute_uncached(query, variables, session_id, deadline),
+        )
+
+    async def _execute_uncached(
+        self,
+        query: str,
+        variables: dict | None,
+        session_id: str | None,
+        deadline: float | None,
+    ) -> tuple[dict, list[dict]]:
+        """Pre-flight checks, then send (or join) the request.
+
+        Returns the data and any partial GraphQL errors returned with it.
         """
         # Pre-flight checks
         if self.circuit_breaker is not None and self.circuit_breaker.is_open():
             raise CircuitOpenError()
 
-        if self.budget_tracker is not None and not self.budget_tracker.is_available(
-            session_id=session_id
-        ):
-            raise BudgetExhaustedError()
-
+        key = (
+            self.base_url,
+            query,
+            json.dumps(variables or {}, sort_keys=True, default=str),
+        )
+        # Joining an identical request in flight needs no budget
+        task = self._inflight.get(key)
+        tracker = self.budget_tracker
+        admitted = False
+        if task is None and tracker is not None:
+            if tracker.admission == "queue":
+                if not await tracker.admit(session_id, deadline=deadline):
+                    raise BudgetExhaustedError()
+                admitted = True
+                # An identical request may have started while this one was queued
+                task = self._inflight.get(key)
+                if task is not None:
+                    tracker.release()
+            elif not tracker.is_available(session_id=session_id):
+                raise BudgetExhaustedError()
+        self._requests += 1
+        if task is not None:
+            self._coalesced += 1
+            return copy.deepcopy(await asyncio.shield(task))
+
+        # The request runs in its own task so that a cancelled first caller
+        # does not cancel it for the callers coalesced onto it.
+        task = asyncio.ensure_future(
+            self._execute_with_retries(query, variables, session_id, deadline)
+        )
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._forget_inflight(key, t))
+        if admitted:
+            task.add_done_callback(lambda _t: tracker.release())
+        # A copy for this caller too: it may resume before the coalesced
+        # callers have copied the shared result
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def _forget_inflight(self, key: tuple[str, str, str], task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller was cancelled
+
+    async def _execute_with_retries(
+        self,
+        query: str,
+        variables: dict | None,
+        session_id: str | None,
+        deadline: float | None = None,
+    ) -> tuple[dict, list[dict]]:
+        """Send the query, retrying transient errors (see :meth:`execute`)."""
         payload: dict = {"query": query}
         if variables:
             payload["variables"] = variables
@@ -350,34 +719,67 @@ class AtlasGraphQLClient:
         total_attempts = 1 + self.max_retries
 
         for attempt in range(total_attempts):
+            timeout = self.timeout
+            cut_by_deadline = False
+            if deadline is not None:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    raise last_error or TransientGraphQLError(
+                        "Request deadline passed before the GraphQL call"
+                    )
+                if left < timeout:
+                    timeout, cut_by_deadline = left, True
             try:
-                data = await self._send_request(payload)
+                result = await self._send_attempt(payload, timeout, session_id)
 
-                # Success — record on tracker/breaker
+                # Success — record on tracker/breaker (a hedge took its own token)
                 if self.circuit_breaker is not None:
                     self.circuit_breaker.record_success()
                 if self.budget_tracker is not None:
                     await self.budget_tracker.consume(session_id=session_id)
 
-                return data
+                return result
 
             except TransientGraphQLError as exc:
+                if cut_by_deadline and isinstance(
+                    exc.__cause__, httpx.TimeoutException
+                ):
+                    # The caller ran out of time; says nothing about the API
+                    logger.warning("GraphQL call cut off by the deadline: %s", exc)
+                    raise
                 last_error = exc
                 if self.circuit_breaker is not None:
                     self.circuit_breaker.record_failure()
 
-                if attempt < total_attempts - 1:
-                    delay = self.backoff_base * (2**attempt)
-                    logger.warning(
-                        "Transient error (attempt %d/%d), retrying in %.1fs: %s",
+                if attempt == total_attempts - 1:
+                    logger.error("All %d attempts failed: %s", total_attempts, exc)
+                    break
+                delay = self._retry_delay(attempt, exc.retry_after)
+                if delay is None:
+                    logger.error(
+                        "Retry-After %.0fs exceeds %.0fs, giving up: %s",
+                        exc.retry_after,
+                        self.max_retry_after,
+                        exc,
+                    )
+                    break
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    logger.error(
+                        "No time left for a retry before the deadline (attempt "
+                        "%d/%d): %s",
                         attempt + 1,
                         total_attempts,
-                        delay,
                         exc,
                     )
-                    await asyncio.sleep(delay)
-                else:
-                    logger.error("All %d attempts failed: %s", total_attempts, exc)
+                    break
+                logger.warning(
+                    "Transient error (attempt %d/%d), retrying in %.1fs: %s",
+                    attempt + 1,
+                    total_attempts,
+                    delay,
+                    exc,
+                )
+                await asyncio.sleep(delay)
 
             except GraphQLError:
                 # Permanent errors (bad query, validation) — API is healthy,
@@ -387,12 +789,121 @@ class AtlasGraphQLClient:
         # All retries exhausted
         raise last_error  # type: ignore[misc]
 
+    def _retry_delay(self, attempt: int, retry_after: float | None) -> float | None:
+        """Jittered backoff before retry *attempt*, at least ``retry_after``.
+
+        Returns None if the server asks for a longer wait than
+        ``max_retry_after``.
+        """
+        backoff = self.backoff_base * (2**attempt)
+        delay = random.uniform(backoff / 2, backoff)
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                return None
+            delay = max(delay, retry_after)
+        return delay
+
+    def hedge_delay(self) -> float | None:
+        """Seconds after which a request is hedged, or None if not hedging.
+
+        The ``hedge_quantile`` of recent successful latencies, once
+        ``hedge_min_samples`` of them have been observed.
+        """
+        if not self.hedge or len(self._latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(self.hedge_quantile * len(ordered)))]
+
+    async def _send_attempt(
+        self, payload: dict, timeout: float, session_id: str | None = None
+    ) -> tuple[dict, list[dict]]:
+        """One attempt, hedged if it outlasts :meth:`hedge_delay`.
+
+        The hedge is only sent if the budget tracker grants it a token of
+        its own (:meth:`GraphQLBudgetTracker.try_consume`); the primary's
+        token is consumed by the caller on success.
+        """
+        started = time.monotonic()
+        delay = self.hedge_delay()
+        if delay is None or delay >= timeout:
+            result = await self._send_request(payload, timeout)
+            self._latencies.append(time.monotonic() - started)
+            return result
+
+        primary = asyncio.ensure_future(self._send_request(payload, timeout))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done or not await self._take_hedge_token(session_id):
+                result = await primary
+                self._latencies.append(time.monotonic() - started)
+                return result
+
+            self._hedged += 1
+            hedge = asyncio.ensure_future(
+                self._send_request(payload, timeout - (time.monotonic() - started))
+            )
+            pending.add(hedge)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._hedge_wins += 1
+                        self._latencies.append(time.monotonic() - started)
+                        return task.result()
+                    if error is None or task is primary:
+                        error = task.exception()
+            raise error  # type: ignore[misc]
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _take_hedge_token(self, session_id: str | None) -> bool:
+        tracker = self.budget_tracker
+        if tracker is None:
+            return True
+        # In queue mode the primary holds an admission reservation; otherwise
+        # one token must stay free for it
+        keep = 0 if tracker.admission == "queue" else 1
+        return await tracker.try_consume(session_id, keep=keep)
+
+    def stats(self) -> dict:
+        """Return request and coalescing counters for diagnostics."""
+        return {
+            "base_url": self.base_url,
+            "requests": self._requests,
+            "sent": self._requests - self._coalesced,
+            "coalesced": self._coalesced,
+            "in_flight": len(self._inflight),
+            "hedged": self._hedged,
+            "hedge_wins": self._hedge_wins,
+            "circuit": (
+                self.circuit_breaker.state.value if self.circuit_breaker else None
+            ),
+        }
+
     def _get_http_client(self) -> httpx.AsyncClient:
-        """Return the persistent HTTP client, creating it on first use."""
+        """Return the persistent HTTP client, creating it on first use.
+
+        The client comes from ``src.http_clients.outbound_http`` (shared pool
+        limits, keep-alive, optional HTTP/2, per-host metrics).
+        """
         if self._http_client is None:
-            self._http_client = httpx.AsyncClient(timeout=httpx.Timeout(self.timeout))
+            from src.http_clients import outbound_http
+
+            self._http_client = outbound_http.create(
+                timeout=self.timeout, warm_urls=(self.base_url,)
+            )
         return self._http_client
 
+    def open_pool(self) -> None:
+        """Create the connection pool now, so startup warm-up can fill it."""
+        self._get_http_client()
+
     async def aclose(self) -> None:
         """Close the underlying HTTP client and release connections.
 
@@ -403,9 +914,16 @@ class AtlasGraphQLClient:
             await self._http_client.aclose()
             self._http_client = None
 
-    async def _send_request(self, payload: dict) -> dict:
+    async def _send_request(
+        self, payload: dict, timeout: float | None = None
+    ) -> tuple[dict, list[dict]]:
         """Send a single HTTP request and parse the response.
 
+        *timeout* overrides the client timeout for this request (e.g. to fit
+        the caller's deadline).
+
+        Returns the ``data`` field and any partial errors returned with it.
+
         Raises:
             TransientGraphQLError: For transient HTTP/network errors.
             GraphQLError: For permanent errors (4xx, GraphQL errors).
@@ -416,6 +934,7 @@ class AtlasGraphQLClient:
                 self.base_url,
                 json=payload,
                 headers={"Content-Type": "application/json"},
+                **({} if timeout is None else {"timeout": timeout}),
             )
         except httpx.TimeoutException as exc:
             raise TransientGraphQLError(f"Request timed out: {exc}") from exc
@@ -427,7 +946,8 @@ class AtlasGraphQLClient:
         # Classify HTTP status
         if response.status_code in _TRANSIENT_STATUS_CODES:
             raise TransientGraphQLError(
-                f"HTTP {response.status_code}: {response.text[:200]}"
+                f"HTTP {response.status_code}: {response.text[:200]}",
+                retry_after=_parse_retry_after(response.headers.get("Retry-After")),
             )
         if response.status_code >= 400:
             raise GraphQLError(f"HTTP {response.status_code}: {response.text[:200]}")
@@ -445,7 +965,7 @@ class AtlasGraphQLClient:
         if data is not None:
             if errors:
                 logger.warning("GraphQL response contained partial errors: %s", errors)
-            return data
+            return data, errors or []
 
         # No data — treat errors as the response
         if errors:
@@ -453,3 +973,17 @@ class AtlasGraphQLClient:
             raise GraphQLError(messages, errors=errors)
 
         raise GraphQLError("Empty GraphQL response: no data and no errors")
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Parse a ``Retry-After`` header (delta-seconds or HTTP-date) to seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
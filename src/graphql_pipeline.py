@@ -15,24 +15,38 @@ them via ``functools.partial`` binding at graph-construction time.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from typing import Any, Literal
 
+import numpy as np
 from langchain_core.messages import ToolMessage
 from pydantic import BaseModel, Field
 
 from src.atlas_links import generate_atlas_links
-from src.cache import CatalogCache
+from src.cache import CatalogCache, entity_choice_key, registry
+from src.entity_memory import (
+    recall_graphql_entity,
+    remember_graphql_entities,
+    reuse_record,
+)
 from src.graphql_client import AtlasGraphQLClient, BudgetExhaustedError, GraphQLError
 from src.prompts import (
     GRAPHQL_DATA_MAX_YEAR,
+    build_batch_id_resolution_prompt,
     build_classification_prompt,
     build_extraction_prompt,
     build_id_resolution_prompt,
     build_query_plan_prompt,
 )
+from src.result_encoding import (
+    TOOL_RESULT_TOKEN_BUDGET,
+    encode_records,
+    truncate_to_token_budget,
+)
 from src.state import AtlasAgentState
 from src.token_usage import (
     make_usage_record_from_callback,
@@ -46,8 +60,8 @@ logger = logging.getLogger(__name__)
 # Module-level constants
 # ---------------------------------------------------------------------------
 
-MAX_RESPONSE_CHARS: int = 15_000
-"""Cap on formatted response content sent to the LLM (~3.7K tokens).
+MAX_RESPONSE_TOKENS: int = TOOL_RESULT_TOKEN_BUDGET
+"""Cap on formatted response content sent to the LLM.
 
 Prevents context-window overflow when post-processed data is still large.
 """
@@ -620,6 +634,23 @@ class GraphQLQueryPlan(BaseModel):
         return classification, extraction
 
 
+class EntitySelection(BaseModel):
+    """The LLM's pick for one ambiguous entity in a batched disambiguation."""
+
+    entity: int = Field(description="Entity number from the prompt (1-based).")
+    choice: int = Field(
+        description="Number of the best candidate (1-based), or 0 if none match."
+    )
+
+
+class EntitySelections(BaseModel):
+    """Picks for every ambiguous entity, returned by one LLM call."""
+
+    selections: list[EntitySelection] = Field(
+        description="One selection per entity listed in the prompt."
+    )
+
+
 # ---------------------------------------------------------------------------
 # Node 1: extract_graphql_question
 # ---------------------------------------------------------------------------
@@ -846,11 +877,13 @@ async def resolve_ids(
     product_caches: dict[str, CatalogCache],
     group_cache: CatalogCache | None = None,
     services_cache: CatalogCache,
+    choice_cache_scope: Literal["name", "question", "off"] = "name",
 ) -> dict:
     """Resolve extracted entity names/codes to Atlas internal IDs.
 
     Uses CatalogCache lookups (code → ID, name → ID) with LLM fallback
-    for ambiguous matches.
+    for ambiguous matches.  LLM decisions are memoized in the
+    ``entity_choice`` cache.
 
     Args:
         state: Current agent state with extraction populated.
@@ -860,6 +893,10 @@ async def resolve_ids(
             (e.g. ``{"HS92": ..., "HS12": ...}``).  The extracted
             ``product_class`` selects which cache to use; defaults to HS12.
         services_cache: Services catalog cache.
+        choice_cache_scope: Key of memoized disambiguation decisions:
+            ``"name"`` (entity name, catalog and candidate set),
+            ``"question"`` (also the question and agent guidance) or
+            ``"off"`` (always ask the LLM).
 
     Returns:
         Dict with ``graphql_resolved_params`` and ``graphql_atlas_links``.
@@ -882,6 +919,7 @@ async def resolve_ids(
             product_caches=product_caches,
             group_cache=group_cache,
             services_cache=services_cache,
+            choice_cache_scope=choice_cache_scope,
         )
 
 
@@ -894,6 +932,7 @@ async def _resolve_ids_inner(
     product_caches: dict[str, CatalogCache],
     group_cache: CatalogCache | None = None,
     services_cache: CatalogCache,
+    choice_cache_scope: Literal["name", "question", "off"] = "name",
 ) -> dict:
     """Inner logic for resolve_ids, extracted so node_timer wraps the whole body."""
     classification = state.get("graphql_classification")
@@ -908,88 +947,143 @@ async def _resolve_ids_inner(
     resolution_notes: list[str] = []
     usage_sink: list[dict] = []
 
-    # Resolve country
     country_name = extraction.get("country_name")
     country_code = extraction.get("country_code_guess")
-    if country_name or country_code:
-        country = await _resolve_entity(
+    partner_name = extraction.get("partner_name")
+    partner_code = extraction.get("partner_code_guess")
+    product_name = extraction.get("product_name")
+    product_code = extraction.get("product_code_guess")
+    group_name = extraction.get("group_name")
+    partner_group_name = extraction.get("partner_group_name")
+
+    # Entities an earlier turn of this thread already resolved under the
+    # same name or code are reused without a catalog lookup.
+    memory = state.get("graphql_entity_memory")
+    reused: dict[str, dict[str, Any]] = {}
+    lookups_avoided = 0
+
+    def _recall(
+        entity: str, catalogs: list[str], name: str | None, code: str | None
+    ) -> bool:
+        nonlocal lookups_avoided
+        for catalog in catalogs:
+            entry = recall_graphql_entity(memory, catalog, [name, code])
+            if entry is not None:
+                reused[entity] = entry
+                lookups_avoided += bool(name) + bool(code)
+                return True
+        return False
+
+    product_class = extraction.get("product_class") or "HS12"
+    product_cache = product_caches.get(
+        product_class, next(iter(product_caches.values()))
+    )
+
+    # Catalog lookups for the different entities are independent, so they
+    # run concurrently; only the ambiguous ones then go to the LLM, in a
+    # single call when there are several.
+    lookups: dict[str, Awaitable[_EntityCandidates]] = {}
+    if (country_name or country_code) and not _recall(
+        "country", [country_cache.name], country_name, country_code
+    ):
+        lookups["country"] = _entity_candidates(
+            "country",
             name=country_name,
             code_guess=country_code,
             cache=country_cache,
             index_name="iso3",
             search_field="nameShortEn",
-            llm=lightweight_model,
-            question=question,
-            usage_sink=usage_sink,
-            context=context,
         )
-        if country:
-            resolved["country_id"] = country["countryId"]
-            resolved["country_name"] = country.get("nameShortEn", country_name)
-
-    if (country_name or country_code) and "country_id" not in resolved:
-        resolution_notes.append(
-            f"Could not resolve country '{country_name or country_code}' in catalog"
-        )
-
-    # Resolve partner country
-    partner_name = extraction.get("partner_name")
-    partner_code = extraction.get("partner_code_guess")
-    if partner_name or partner_code:
-        partner = await _resolve_entity(
+    if (partner_name or partner_code) and not _recall(
+        "partner", [country_cache.name], partner_name, partner_code
+    ):
+        lookups["partner"] = _entity_candidates(
+            "partner country",
             name=partner_name,
             code_guess=partner_code,
             cache=country_cache,
             index_name="iso3",
             search_field="nameShortEn",
-            llm=lightweight_model,
-            question=question,
-            usage_sink=usage_sink,
-            context=context,
         )
-        if partner:
-            resolved["partner_id"] = partner["countryId"]
-            resolved["partner_name"] = partner.get("nameShortEn", partner_name)
-
-    # Resolve product — select cache by product_class
-    product_name = extraction.get("product_name")
-    product_code = extraction.get("product_code_guess")
-    if product_name or product_code:
-        product_class = extraction.get("product_class") or "HS12"
-        active_product_cache = product_caches.get(
-            product_class, next(iter(product_caches.values()))
-        )
-        product = await _resolve_entity(
+    if (product_name or product_code) and not _recall(
+        "product",
+        [product_cache.name, services_cache.name],
+        product_name,
+        product_code,
+    ):
+        lookups["product"] = _product_candidates(
             name=product_name,
             code_guess=product_code,
-            cache=active_product_cache,
-            index_name="code",
-            search_field="nameShortEn",
-            llm=lightweight_model,
-            question=question,
-            usage_sink=usage_sink,
-            context=context,
+            product_cache=product_cache,
+            services_cache=services_cache,
         )
-        if product:
-            resolved["product_id"] = product["productId"]
-            resolved["product_name"] = product.get("nameShortEn", product_name)
-
-    # If product not found in the selected cache, try services_cache
-    if "product_id" not in resolved and (product_name or product_code):
-        service_entry = await _resolve_entity(
-            name=product_name,
-            code_guess=product_code,
-            cache=services_cache,
+    if (
+        group_name
+        and group_cache is not None
+        and not _recall("group", [group_cache.name], group_name, None)
+    ):
+        lookups["group"] = _entity_candidates(
+            "country group",
+            name=group_name,
+            code_guess=None,
+            cache=group_cache,
             index_name="name",
-            search_field="nameShortEn",
-            llm=lightweight_model,
-            question=question,
-            usage_sink=usage_sink,
-            context=context,
+            search_field="groupName",
+        )
+    if (
+        partner_group_name
+        and group_cache is not None
+        and not _recall("partner_group", [group_cache.name], partner_group_name, None)
+    ):
+        lookups["partner_group"] = _entity_candidates(
+            "partner country group",
+            name=partner_group_name,
+            code_guess=None,
+            cache=group_cache,
+            index_name="name",
+            search_field="groupName",
+        )
+    found = dict(zip(lookups, await asyncio.gather(*lookups.values()), strict=True))
+    entries = await _select_entities(
+        found,
+        llm=lightweight_model,
+        question=question,
+        usage_sink=usage_sink,
+        context=context,
+        choice_cache_scope=choice_cache_scope,
+    )
+    remembered = {
+        entity: (
+            found[entity].catalog,
+            [found[entity].name, found[entity].code_guess],
+            entry,
+        )
+        for entity, entry in entries.items()
+        if entity in found and entry is not None
+    }
+    entries.update(reused)
+
+    country = entries.get("country")
+    if country:
+        resolved["country_id"] = country["countryId"]
+        resolved["country_name"] = country.get("nameShortEn", country_name)
+
+    if (country_name or country_code) and "country_id" not in resolved:
+        resolution_notes.append(
+            f"Could not resolve country '{country_name or country_code}' in catalog"
         )
-        if service_entry:
-            resolved["product_id"] = service_entry.get("productId")
-            resolved["product_name"] = service_entry.get("nameShortEn", product_name)
+
+    partner = entries.get("partner")
+    if partner:
+        resolved["partner_id"] = partner["countryId"]
+        resolved["partner_name"] = partner.get("nameShortEn", partner_name)
+
+    # The product may come from the services catalog when the goods catalog
+    # has no candidates (see _product_candidates)
+    product = entries.get("product")
+    if product:
+        resolved["product_id"] = product.get("productId")
+        resolved["product_name"] = product.get("nameShortEn", product_name)
 
     if (product_name or product_code) and "product_id" not in resolved:
         resolution_notes.append(
@@ -1024,19 +1118,8 @@ async def _resolve_ids_inner(
         resolved["trade_direction"] = state["override_direction"]
 
     # Resolve group_name to group_id if a group cache is available
-    group_name = extraction.get("group_name")
     if group_name and group_cache is not None:
-        group_entry = await _resolve_entity(
-            name=group_name,
-            code_guess=None,
-            cache=group_cache,
-            index_name="name",
-            search_field="groupName",
-            llm=lightweight_model,
-            question=question,
-            usage_sink=usage_sink,
-            context=context,
-        )
+        group_entry = entries.get("group")
         if group_entry:
             resolved["group_id"] = group_entry["groupId"]
             resolved["group_name"] = group_entry.get("groupName", group_name)
@@ -1046,19 +1129,8 @@ async def _resolve_ids_inner(
             )
 
     # Resolve partner_group_name to partner_group_id (for CGPY queries)
-    partner_group_name = extraction.get("partner_group_name")
     if partner_group_name and group_cache is not None:
-        partner_group_entry = await _resolve_entity(
-            name=partner_group_name,
-            code_guess=None,
-            cache=group_cache,
-            index_name="name",
-            search_field="groupName",
-            llm=lightweight_model,
-            question=question,
-            usage_sink=usage_sink,
-            context=context,
-        )
+        partner_group_entry = entries.get("partner_group")
         if partner_group_entry:
             resolved["partner_group_id"] = partner_group_entry["groupId"]
             resolved["partner_group_name"] = partner_group_entry.get(
@@ -1134,32 +1206,39 @@ async def _resolve_ids_inner(
     }
     if usage_sink:
         result["token_usage"] = usage_sink
+    if remembered:
+        result["graphql_entity_memory"] = remember_graphql_entities(memory, remembered)
+    if reused:
+        result["entity_reuse"] = [reuse_record("resolve_ids", lookups=lookups_avoided)]
     return result
 
 
-async def _resolve_entity(
+@dataclass
+class _EntityCandidates:
+    """Catalog candidates found for one extracted entity reference."""
+
+    label: str  # what the entity is, for the batched disambiguation prompt
+    name: str | None
+    code_guess: str | None
+    catalog: str
+    search_field: str
+    candidates: list[dict[str, Any]]
+
+
+async def _entity_candidates(
+    label: str,
     *,
     name: str | None,
     code_guess: str | None,
     cache: CatalogCache,
     index_name: str,
     search_field: str,
-    llm: Any,
-    question: str,
-    usage_sink: list[dict] | None = None,
-    context: str = "",
-) -> dict[str, Any] | None:
-    """Resolve an entity name/code to a catalog entry.
+) -> _EntityCandidates:
+    """Collect catalog candidates for an entity name/code.
 
-    Strategy:
-    1. Step A: Try exact code lookup via the named index
-    2. Step B: Search by name (case-insensitive substring)
-    3. Step C: LLM disambiguation when multiple candidates exist
-
-    Args:
-        usage_sink: Optional list to append token usage records to when
-            the LLM is invoked for disambiguation.
-        context: Optional agent guidance passed through to the disambiguation prompt.
+    Step A tries an exact code lookup via the named index; Step B adds the
+    ranked name search results (prefix, substring, word-set, then
+    typo-tolerant), deduplicated against Step A.
     """
     candidates: list[dict[str, Any]] = []
 
@@ -1178,49 +1257,250 @@ async def _resolve_entity(
             if id(r) not in existing_ids:
                 candidates.append(r)
 
-    if not candidates:
-        return None
+    return _EntityCandidates(
+        label, name, code_guess, cache.name, search_field, candidates
+    )
 
-    if len(candidates) == 1:
-        return candidates[0]
 
-    # Try exact name match first (fast path, no LLM needed)
-    if name:
-        name_lower = name.strip().lower()
-        for c in candidates:
-            if (c.get(search_field) or "").strip().lower() == name_lower:
+async def _product_candidates(
+    *,
+    name: str | None,
+    code_guess: str | None,
+    product_cache: CatalogCache,
+    services_cache: CatalogCache,
+) -> _EntityCandidates:
+    """Product candidates, falling back to the services catalog if none match."""
+    found = await _entity_candidates(
+        "product",
+        name=name,
+        code_guess=code_guess,
+        cache=product_cache,
+        index_name="code",
+        search_field="nameShortEn",
+    )
+    if found.candidates:
+        return found
+    return await _entity_candidates(
+        "product",
+        name=name,
+        code_guess=code_guess,
+        cache=services_cache,
+        index_name="name",
+        search_field="nameShortEn",
+    )
+
+
+def _unambiguous_candidate(found: _EntityCandidates) -> dict[str, Any] | None:
+    """The single candidate or exact (case-insensitive) name match, if any."""
+    if len(found.candidates) == 1:
+        return found.candidates[0]
+    if found.name:
+        name_lower = found.name.strip().lower()
+        for c in found.candidates:
+            if (c.get(found.search_field) or "").strip().lower() == name_lower:
                 return c
+    return None
 
-    # Step C: LLM selects best from multiple candidates
-    try:
-        options = "\n".join(
-            f"{i + 1}. {c.get(search_field, c.get('nameShortEn', 'unknown'))} "
-            f"(code: {c.get('code', c.get('iso3Code', 'N/A'))})"
-            for i, c in enumerate(candidates)
+
+def _format_candidate_options(found: _EntityCandidates, indent: str = "") -> str:
+    """Numbered candidate list shown to the LLM for disambiguation."""
+    return "\n".join(
+        f"{indent}{i + 1}. "
+        f"{c.get(found.search_field, c.get('nameShortEn', 'unknown'))} "
+        f"(code: {c.get('code', c.get('iso3Code', 'N/A'))})"
+        for i, c in enumerate(found.candidates)
+    )
+
+
+def _catalog_id(entry: dict[str, Any]) -> str:
+    """Stable identifier of a catalog entry, as stored in the choice cache."""
+    for field_name in ("countryId", "productId", "groupId"):
+        if entry.get(field_name) is not None:
+            return str(entry[field_name])
+    return str(entry.get("code") or entry.get("nameShortEn"))
+
+
+def _choice_key(
+    found: _EntityCandidates, *, question: str, context: str, scope: str
+) -> tuple | None:
+    """Key of *found*'s disambiguation decision, or ``None`` when not cached."""
+    if scope == "off":
+        return None
+    return entity_choice_key(
+        found.name or found.code_guess or "",
+        found.catalog,
+        [_catalog_id(c) for c in found.candidates],
+        question=f"{question}\n{context}" if scope == "question" else "",
+    )
+
+
+async def _select_entities(
+    lookups: dict[str, _EntityCandidates],
+    *,
+    llm: Any,
+    question: str,
+    usage_sink: list[dict],
+    context: str = "",
+    choice_cache_scope: str = "name",
+) -> dict[str, dict[str, Any] | None]:
+    """Pick one catalog entry per entity (Step C).
+
+    Entities with no candidates map to ``None``; a single candidate or an
+    exact name match is taken without the LLM, and so is a decision the LLM
+    already made for the same name and candidates (the ``entity_choice``
+    cache).  One remaining ambiguous entity goes through the plain-text
+    selection prompt; several are disambiguated together in one structured
+    LLM call.  Token usage for the LLM call, if any, is appended to
+    *usage_sink*.
+    """
+    selected: dict[str, dict[str, Any] | None] = {}
+    ambiguous: list[str] = []
+    for key, found in lookups.items():
+        if not found.candidates:
+            selected[key] = None
+            continue
+        selected[key] = _unambiguous_candidate(found)
+        if selected[key] is None:
+            ambiguous.append(key)
+
+    choice_keys: dict[str, tuple | None] = {}
+    uncached: list[str] = []
+    for key in ambiguous:
+        found = lookups[key]
+        choice_keys[key] = _choice_key(
+            found, question=question, context=context, scope=choice_cache_scope
+        )
+        chosen_id = (
+            await registry.aget("entity_choice", choice_keys[key])
+            if choice_keys[key] is not None
+            else None
+        )
+        selected[key] = next(
+            (c for c in found.candidates if _catalog_id(c) == chosen_id), None
         )
+        if selected[key] is None:
+            uncached.append(key)
+    if ambiguous and not uncached:
+        registry.record_calls_saved("entity_choice")
+
+    if len(uncached) == 1:
+        picks = [
+            await _llm_select_candidate(
+                lookups[uncached[0]],
+                llm=llm,
+                question=question,
+                usage_sink=usage_sink,
+                context=context,
+            )
+        ]
+    elif uncached:
+        picks = await _llm_select_candidates_batch(
+            [lookups[key] for key in uncached],
+            llm=llm,
+            question=question,
+            usage_sink=usage_sink,
+            context=context,
+        )
+    else:
+        picks = []
+
+    for key, pick in zip(uncached, picks, strict=True):
+        if pick is None:
+            # No usable answer: fall back to the first result, uncached
+            selected[key] = lookups[key].candidates[0]
+            continue
+        selected[key] = pick
+        if choice_keys[key] is not None:
+            await registry.aset("entity_choice", choice_keys[key], _catalog_id(pick))
+    return selected
+
+
+async def _llm_select_candidate(
+    found: _EntityCandidates,
+    *,
+    llm: Any,
+    question: str,
+    usage_sink: list[dict],
+    context: str = "",
+) -> dict[str, Any] | None:
+    """Ask the LLM to pick among one entity's candidates.
+
+    Returns ``None`` when the call fails or the answer is not a candidate
+    number (including 0, "none match").
+    """
+    try:
         prompt = build_id_resolution_prompt(
             question=question,
-            options=options,
-            num_candidates=len(candidates),
+            options=_format_candidate_options(found),
+            num_candidates=len(found.candidates),
             context=context,
         )
         response = await llm.ainvoke(prompt)
 
         # Record token usage from the disambiguation LLM call
-        if usage_sink is not None:
-            usage_sink.append(
-                make_usage_record_from_msg("resolve_ids", "atlas_graphql", response)
-            )
+        usage_sink.append(
+            make_usage_record_from_msg("resolve_ids", "atlas_graphql", response)
+        )
 
         text = response.content.strip()
         idx = int(text) - 1
-        if 0 <= idx < len(candidates):
-            return candidates[idx]
+        if 0 <= idx < len(found.candidates):
+            return found.candidates[idx]
     except Exception:
         logger.debug("LLM entity selection failed, falling back to first result")
+    return None
+
+
+async def _llm_select_candidates_batch(
+    ambiguous: list[_EntityCandidates],
+    *,
+    llm: Any,
+    question: str,
+    usage_sink: list[dict],
+    context: str = "",
+) -> list[dict[str, Any] | None]:
+    """Disambiguate several entities in one structured LLM call.
+
+    Entities the LLM skips, or picks out of range (including 0, "none
+    match"), get ``None``, as do all of them when the call fails.
+    """
+    from langchain_core.callbacks import UsageMetadataCallbackHandler
+
+    picks: list[dict[str, Any] | None] = [None] * len(ambiguous)
+    try:
+        entities = "\n\n".join(
+            f'Entity {i + 1}: {found.label} "{found.name or found.code_guess}"\n'
+            f"{_format_candidate_options(found, indent='   ')}"
+            for i, found in enumerate(ambiguous)
+        )
+        prompt = build_batch_id_resolution_prompt(
+            question=question, entities=entities, context=context
+        )
+        chain = llm.with_structured_output(EntitySelections, method="function_calling")
+        usage_handler = UsageMetadataCallbackHandler()
+        result: EntitySelections = await chain.ainvoke(
+            prompt, config={"callbacks": [usage_handler]}
+        )
+        usage_sink.append(
+            make_usage_record_from_callback(
+                "resolve_ids", "atlas_graphql", usage_handler
+            )
+        )
 
-    # Fallback to first result
-    return candidates[0]
+        for selection in result.selections:
+            entity_idx = selection.entity - 1
+            choice_idx = selection.choice - 1
+            if 0 <= entity_idx < len(ambiguous) and 0 <= choice_idx < len(
+                ambiguous[entity_idx].candidates
+            ):
+                picks[entity_idx] = ambiguous[entity_idx].candidates[choice_idx]
+    except Exception:
+        logger.debug(
+            "Batched LLM entity selection failed, falling back to first results"
+        )
+        picks = [None] * len(ambiguous)
+
+    return picks
 
 
 # ---------------------------------------------------------------------------
@@ -1503,7 +1783,6 @@ async def format_graphql_results(
         else:
             # Success — warm caches before synchronous post-processing
             import asyncio
-            import json
 
             warm_tasks = []
             if product_caches:
@@ -1568,19 +1847,10 @@ async def format_graphql_results(
                     strategy=pp_strategy,
                     custom_weights=pp_custom_weights,
                 )
-            content = json.dumps(processed, indent=2, default=str)
+            content = encode_records(processed)
 
             # Cap response size to prevent context-window overflow
-            if len(content) > MAX_RESPONSE_CHARS:
-                truncated_notice = (
-                    f"\n\n[Response truncated from {len(content):,} to "
-                    f"{MAX_RESPONSE_CHARS:,} chars. "
-                    f"The data above is partial — answer based on what is shown.]"
-                )
-                content = (
-                    content[: MAX_RESPONSE_CHARS - len(truncated_notice)]
-                    + truncated_notice
-                )
+            content = truncate_to_token_budget(content, MAX_RESPONSE_TOKENS)
 
             # Build data-quality warnings
             warnings: list[str] = []
@@ -1925,11 +2195,6 @@ def _lookup_country_policy(
     return data.get(country_id, (None, None, None))
 
 
-def _compute_composite_score(item: dict, weights: dict[str, float]) -> float:
-    """Compute weighted composite score from normalized opportunity fields."""
-    return sum((item.get(f) or 0.0) * w for f, w in weights.items())
-
-
 # ---------------------------------------------------------------------------
 # Response post-processing — sort, truncate, enrich large responses
 # ---------------------------------------------------------------------------
@@ -2059,12 +2324,52 @@ _POST_PROCESS_RULES: dict[str, dict] = {
     },
 }
 
-_FILTERS: dict[str, Callable] = {
-    "rca_lt_1": lambda item: (item.get("exportRca") or 0) < 1,
-    "rca_lt_1_treemap": lambda item: (item.get("rca") or 0) < 1,
+# Row filters: keep items whose field (missing/None counts as 0) is below the limit
+_FILTERS: dict[str, tuple[str, float]] = {
+    "rca_lt_1": ("exportRca", 1.0),
+    "rca_lt_1_treemap": ("rca", 1.0),
 }
 
 
+def _column(items: list[dict], field: str) -> np.ndarray:
+    """Extract *field* from every item as float64, missing/None as NaN."""
+    return np.fromiter(
+        (np.nan if (v := item.get(field)) is None else v for item in items),
+        dtype=np.float64,
+        count=len(items),
+    )
+
+
+def _zero_filled(column: np.ndarray) -> np.ndarray:
+    """Missing values as 0 — the vector form of ``item.get(field) or 0``."""
+    return np.where(np.isnan(column), 0.0, column)
+
+
+def _composite_scores(items: list[dict], weights: dict[str, float]) -> np.ndarray:
+    """Weighted composite score of every item from normalized opportunity fields."""
+    scores = np.zeros(len(items))
+    for field, weight in weights.items():
+        scores += _zero_filled(_column(items, field)) * weight
+    return scores
+
+
+def _top_n_indices(keys: np.ndarray, top_n: int) -> np.ndarray:
+    """Indices of the *top_n* largest *keys*, largest first.
+
+    Equal keys keep their input order, as a stable sort would.  Uses a
+    partition, so only the survivors are fully sorted.
+    """
+    n = len(keys)
+    if n > top_n:
+        kth = np.partition(keys, n - top_n)[n - top_n]
+        above = np.flatnonzero(keys > kth)
+        ties = np.flatnonzero(keys == kth)[: top_n - len(above)]
+        candidates = np.concatenate([above, ties])
+    else:
+        candidates = np.arange(n)
+    return candidates[np.lexsort((candidates, -keys[candidates]))]
+
+
 def _enrich_items(
     items: list[dict],
     enrich_type: str,
@@ -2191,14 +2496,15 @@ def post_process_response(
             }
         score_weights = custom_weights
 
-    if score_weights:
-        for item in items:
-            item["compositeScore"] = round(
-                _compute_composite_score(item, score_weights), 4
-            )
+    # Scores, filters and the top-N are computed on NumPy columns; only the
+    # surviving rows are touched as dicts (scored and enriched).
+    scores = _composite_scores(items, score_weights) if score_weights else None
 
     # Small result sets: enrich only, no sort/truncate/metadata
     if len(items) <= top_n:
+        if scores is not None:
+            for item, score in zip(items, scores.tolist(), strict=True):
+                item["compositeScore"] = round(score, 4)
         _enrich_items(
             items,
             rules.get("enrich", "none"),
@@ -2211,11 +2517,13 @@ def post_process_response(
         return {root_key: items}
 
     total_items = len(items)
+    keep = np.ones(total_items, dtype=bool)
 
     # Apply filter if specified
-    filter_name = rules.get("filter")
-    if filter_name and filter_name in _FILTERS:
-        items = [item for item in items if _FILTERS[filter_name](item)]
+    filter_spec = _FILTERS.get(rules.get("filter") or "")
+    if filter_spec is not None:
+        field, limit = filter_spec
+        keep &= _zero_filled(_column(items, field)) < limit
 
     # PCI ceiling filter — growth_opportunities only, for low-income countries
     if (
@@ -2226,13 +2534,14 @@ def post_process_response(
     ):
         ceiling_offset = _PCI_CEILING_OFFSET.get(applied_strategy, 2.0)
         pci_ceiling = country_eci + ceiling_offset
-        before_ceiling = len(items)
-        items = [item for item in items if (item.get("pci") or 0) < pci_ceiling]
-        if len(items) < before_ceiling:
+        below_ceiling = _zero_filled(_column(items, "pci")) < pci_ceiling
+        removed = int(np.count_nonzero(keep & ~below_ceiling))
+        keep &= below_ceiling
+        if removed:
             logger.info(
                 "PCI ceiling filter (%.2f) removed %d items for country %s (GDPPC=%d)",
                 pci_ceiling,
-                before_ceiling - len(items),
+                removed,
                 country_id,
                 country_gdppc,
             )
@@ -2242,14 +2551,25 @@ def post_process_response(
     if trade_direction == "imports" and sort_field == "exportValue":
         sort_field = "importValue"
 
-    sort_ascending = rules.get("sort_ascending", False)
-    items.sort(
-        key=lambda x: (x.get(sort_field) is not None, x.get(sort_field) or 0),
-        reverse=not sort_ascending,
-    )
-
-    # Truncate
-    items = items[:top_n]
+    # Sort keys, largest first: present values before missing ones when
+    # descending, after them when ascending (ties keep input order)
+    if sort_field == "compositeScore" and scores is not None:
+        values = np.round(scores, 4)
+    else:
+        values = _column(items, sort_field)
+    present = ~np.isnan(values)
+    if rules.get("sort_ascending", False):
+        keys = np.where(present, -values, np.inf)
+    else:
+        keys = np.where(present, values, -np.inf)
+
+    # Top-N of the rows that passed the filters
+    survivors = np.flatnonzero(keep)
+    top = survivors[_top_n_indices(keys[survivors], top_n)].tolist()
+    if scores is not None:
+        for i in top:
+            items[i]["compositeScore"] = round(float(scores[i]), 4)
+    items = [items[i] for i in top]
 
     # Enrich with human-readable names
     _enrich_items(
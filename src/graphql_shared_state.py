@@ -0,0 +1,743 @@
+"""Fleet-wide GraphQL budget and circuit-breaker state.
+
+``GraphQLBudgetTracker`` and ``CircuitBreaker`` (``src/graphql_client.py``)
+keep their state in process memory.  With ``--workers 4`` the advertised
+100 requests/60 s budget is really 400 per container, and every worker
+discovers an upstream outage on its own, paying ``failure_threshold``
+timeouts each.  The subclasses here keep the same interface but keep their
+state in a :class:`SharedStateStore`:
+
+- :class:`SQLiteStateStore` — one WAL-mode SQLite file shared by the
+  workers on a host.
+- :class:`RedisStateStore` — any Redis-protocol server, shared by every
+  instance.  Requires the optional ``redis`` package.
+
+Shared timestamps are wall-clock (``time.time()``) so that they compare
+across processes and hosts.  Store errors are logged and the tracker or
+breaker falls back to its in-process state — a broken store never blocks
+GraphQL calls.
+
+The tracker and breaker keep the parent's synchronous interface, which is
+called on the event loop (pre-flight checks, ``admit`` polls, after each
+response).  There they never touch the store directly: reads are served
+from a snapshot at most ``snapshot_ttl`` seconds old and refreshed in a
+worker thread, and breaker updates are written in a worker thread.  Off
+the event loop (scripts, worker threads) they read and write the store
+directly.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+from src.graphql_client import CircuitBreaker, CircuitState, GraphQLBudgetTracker
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "atlas:graphql"
+_SQLITE_PRUNE_EVERY = 256  # admitted events between sweeps of idle windows
+_SNAPSHOT_TTL = 1.0  # seconds a store read is served on the event loop
+_SNAPSHOT_MAX_KEYS = 1024  # snapshots kept before expired ones are dropped
+_UNKNOWN = object()  # no snapshot yet, or the store failed: use local state
+
+
+class SharedStateStore(Protocol):
+    """Sliding windows and circuit-breaker records shared between workers."""
+
+    def window_admit(
+        self, key: str, limit: int, window: float, now: float
+    ) -> str | None:
+        """Record an event in window *key* unless it already holds *limit*
+        events from the last *window* seconds; return the event id or ``None``."""
+        ...
+
+    def window_release(self, key: str, event_id: str) -> None:
+        """Remove an event recorded by :meth:`window_admit`."""
+        ...
+
+    def window_count(self, key: str, window: float, now: float) -> int:
+        """Number of events in window *key* from the last *window* seconds."""
+        ...
+
+    def window_nth(self, key: str, window: float, now: float, n: int) -> float | None:
+        """Timestamp of the *n*-th oldest (0-based) event in window *key*."""
+        ...
+
+    def breaker_get(self, name: str) -> tuple[str, int, float]:
+        """Return ``(state, failure_count, opened_at)`` of breaker *name*."""
+        ...
+
+    def breaker_set(
+        self, name: str, state: str, failures: int, opened_at: float
+    ) -> None:
+        """Overwrite the record of breaker *name*."""
+        ...
+
+    def breaker_failure(
+        self, name: str, threshold: int, now: float
+    ) -> tuple[str, int, float]:
+        """Atomically record a failure of breaker *name*; return the new record.
+
+        A failure while half-open, or the *threshold*-th consecutive
+        failure, opens the breaker at *now*.
+        """
+        ...
+
+    def close(self) -> None:
+        """Release connections."""
+        ...
+
+
+def _after_failure(
+    record: tuple[str, int, float], threshold: int, now: float
+) -> tuple[str, int, float]:
+    """Breaker record after one more failure (see ``CircuitBreaker.record_failure``)."""
+    state, failures, opened_at = record
+    if state == CircuitState.HALF_OPEN.value:
+        return CircuitState.OPEN.value, threshold, now
+    failures += 1
+    if failures >= threshold and state != CircuitState.OPEN.value:
+        return CircuitState.OPEN.value, failures, now
+    return state, failures, opened_at
+
+
+_CLOSED_RECORD = (CircuitState.CLOSED.value, 0, 0.0)
+
+
+class SQLiteStateStore:
+    """:class:`SharedStateStore` on a WAL-mode SQLite file shared by local workers."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS window_events ("
+            "key TEXT NOT NULL, id TEXT NOT NULL, ts REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS window_events_key_ts ON window_events (key, ts)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS circuit_breakers ("
+            "name TEXT PRIMARY KEY, state TEXT NOT NULL, "
+            "failures INTEGER NOT NULL, opened_at REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        self._admitted = 0
+
+    def window_admit(
+        self, key: str, limit: int, window: float, now: float
+    ) -> str | None:
+        with self._lock, self._transaction():
+            self._conn.execute(
+                "DELETE FROM window_events WHERE key = ? AND ts <= ?",
+                (key, now - window),
+            )
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM window_events WHERE key = ?", (key,)
+            ).fetchone()
+            if count >= limit:
+                return None
+            event_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO window_events VALUES (?, ?, ?)", (key, event_id, now)
+            )
+            self._admitted += 1
+            if self._admitted % _SQLITE_PRUNE_EVERY == 0:
+                # Per-session windows are otherwise only pruned when reused
+                self._conn.execute(
+                    "DELETE FROM window_events WHERE ts <= ?", (now - window,)
+                )
+            return event_id
+
+    def window_release(self, key: str, event_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM window_events WHERE key = ? AND id = ?", (key, event_id)
+            )
+
+    def window_count(self, key: str, window: float, now: float) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM window_events WHERE key = ? AND ts > ?",
+                (key, now - window),
+            ).fetchone()
+        return count
+
+    def window_nth(self, key: str, window: float, now: float, n: int) -> float | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ts FROM window_events WHERE key = ? AND ts > ? "
+                "ORDER BY ts LIMIT 1 OFFSET ?",
+                (key, now - window, n),
+            ).fetchone()
+        return row[0] if row else None
+
+    def breaker_get(self, name: str) -> tuple[str, int, float]:
+        with self._lock:
+            return self._breaker_row(name)
+
+    def breaker_set(
+        self, name: str, state: str, failures: int, opened_at: float
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO circuit_breakers VALUES (?, ?, ?, ?)",
+                (name, state, failures, opened_at),
+            )
+
+    def breaker_failure(
+        self, name: str, threshold: int, now: float
+    ) -> tuple[str, int, float]:
+        with self._lock, self._transaction():
+            record = _after_failure(self._breaker_row(name), threshold, now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO circuit_breakers VALUES (?, ?, ?, ?)",
+                (name, *record),
+            )
+            return record
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _breaker_row(self, name: str) -> tuple[str, int, float]:
+        row = self._conn.execute(
+            "SELECT state, failures, opened_at FROM circuit_breakers WHERE name = ?",
+            (name,),
+        ).fetchone()
+        return tuple(row) if row else _CLOSED_RECORD
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Write-locked transaction, so read-check-write is atomic across workers."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+
+class RedisStateStore:
+    """:class:`SharedStateStore` on a Redis-protocol server.
+
+    Windows are sorted sets scored by timestamp.  An event is added first
+    and kept only if its rank is below the limit, so concurrent callers
+    never over-admit.
+
+    Args:
+        url: ``redis://host:port/db`` connection URL.
+        client: An existing client with the ``redis.Redis`` API (used
+            instead of *url*).
+    """
+
+    def __init__(self, url: str | None = None, *, client: Any = None) -> None:
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError(
+                    "The redis GraphQL state store requires the 'redis' package "
+                    "(uv add redis)"
+                ) from e
+            client = redis.Redis.from_url(
+                url, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+        self._client = client
+
+    def window_admit(
+        self, key: str, limit: int, window: float, now: float
+    ) -> str | None:
+        rkey = f"{_KEY_PREFIX}:window:{key}"
+        event_id = f"{now:.6f}:{uuid.uuid4().hex}"
+        self._client.zremrangebyscore(rkey, "-inf", now - window)
+        self._client.zadd(rkey, {event_id: now})
+        rank = self._client.zrank(rkey, event_id)
+        if rank is None or rank >= limit:
+            self._client.zrem(rkey, event_id)
+            return None
+        self._client.pexpire(rkey, max(int(window * 1000), 1))
+        return event_id
+
+    def window_release(self, key: str, event_id: str) -> None:
+        self._client.zrem(f"{_KEY_PREFIX}:window:{key}", event_id)
+
+    def window_count(self, key: str, window: float, now: float) -> int:
+        rkey = f"{_KEY_PREFIX}:window:{key}"
+        self._client.zremrangebyscore(rkey, "-inf", now - window)
+        return int(self._client.zcard(rkey))
+
+    def window_nth(self, key: str, window: float, now: float, n: int) -> float | None:
+        rkey = f"{_KEY_PREFIX}:window:{key}"
+        self._client.zremrangebyscore(rkey, "-inf", now - window)
+        entries = self._client.zrange(rkey, n, n, withscores=True)
+        return float(entries[0][1]) if entries else None
+
+    def breaker_get(self, name: str) -> tuple[str, int, float]:
+        raw = self._client.hgetall(f"{_KEY_PREFIX}:breaker:{name}")
+        if not raw:
+            return _CLOSED_RECORD
+        fields = {
+            (k.decode() if isinstance(k, bytes) else k): (
+                v.decode() if isinstance(v, bytes) else v
+            )
+            for k, v in raw.items()
+        }
+        return (
+            fields.get("state", CircuitState.CLOSED.value),
+            int(fields.get("failures", 0)),
+            float(fields.get("opened_at", 0.0)),
+        )
+
+    def breaker_set(
+        self, name: str, state: str, failures: int, opened_at: float
+    ) -> None:
+        self._client.hset(
+            f"{_KEY_PREFIX}:breaker:{name}",
+            mapping={"state": state, "failures": failures, "opened_at": opened_at},
+        )
+
+    def breaker_failure(
+        self, name: str, threshold: int, now: float
+    ) -> tuple[str, int, float]:
+        rkey = f"{_KEY_PREFIX}:breaker:{name}"
+        state, _failures, opened_at = self.breaker_get(name)
+        if state == CircuitState.HALF_OPEN.value:
+            record = _after_failure((state, 0, opened_at), threshold, now)
+            self.breaker_set(name, *record)
+            return record
+        failures = int(self._client.hincrby(rkey, "failures", 1))
+        if failures >= threshold and state != CircuitState.OPEN.value:
+            self._client.hset(
+                rkey, mapping={"state": CircuitState.OPEN.value, "opened_at": now}
+            )
+            return CircuitState.OPEN.value, failures, now
+        return state, failures, opened_at
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def _with_fallback(
+    what: str, op: Callable[[], Any], fallback: Callable[[], Any]
+) -> Any:
+    """Run *op* against the shared store, or *fallback* if the store fails."""
+    try:
+        return op()
+    except Exception:
+        logger.warning(
+            "Shared GraphQL state unavailable for %s; using this worker's state",
+            what,
+            exc_info=True,
+        )
+        return fallback()
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class _Snapshots:
+    """Recent store reads and queued store writes for one tracker or breaker.
+
+    :meth:`get` returns a snapshot younger than *ttl*; an older one is
+    returned while a worker thread refreshes it.  :meth:`write` runs store
+    updates in a worker thread, one after the other in call order.  Both
+    must be called on the event loop.
+    """
+
+    def __init__(self, what: str, ttl: float) -> None:
+        self.what = what
+        self.ttl = ttl
+        self._values: dict[Any, tuple[float, Any]] = {}
+        self._refreshing: dict[Any, asyncio.Future] = {}
+        self._last_write: asyncio.Future | None = None
+
+    def get(self, key: Any, read: Callable[[], Any]) -> Any:
+        """Snapshot of *key* (``_UNKNOWN`` if none), refreshed by *read* when old."""
+        cached = self._values.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+        if key not in self._refreshing:
+            future = asyncio.ensure_future(asyncio.to_thread(read))
+            self._refreshing[key] = future
+            future.add_done_callback(lambda f: self._refreshed(key, f))
+        return cached[1] if cached is not None else _UNKNOWN
+
+    def put(self, key: Any, value: Any) -> None:
+        """Record *value* as the current snapshot of *key*."""
+        if len(self._values) >= _SNAPSHOT_MAX_KEYS:
+            cutoff = time.monotonic() - self.ttl
+            self._values = {k: v for k, v in self._values.items() if v[0] >= cutoff}
+        self._values[key] = (time.monotonic(), value)
+
+    def write(self, key: Any, op: Callable[[], Any], fallback: Callable[[], None]):
+        """Run *op* in a worker thread and record its result as snapshot *key*.
+
+        If the store fails, *fallback* updates the in-process state instead.
+        """
+        previous = self._last_write
+
+        async def run() -> None:
+            if previous is not None:
+                await asyncio.wait([previous])
+            try:
+                result = await asyncio.to_thread(op)
+            except Exception:
+                self._warn()
+                fallback()
+            else:
+                self.put(key, result)
+
+        self._last_write = asyncio.ensure_future(run())
+
+    def _refreshed(self, key: Any, future: asyncio.Future) -> None:
+        del self._refreshing[key]
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self._warn(future.exception())
+            self.put(key, _UNKNOWN)  # retried once the snapshot expires
+        else:
+            self.put(key, future.result())
+
+    def _warn(self, error: BaseException | None = None) -> None:
+        logger.warning(
+            "Shared GraphQL state unavailable for %s; using this worker's state",
+            self.what,
+            exc_info=error or True,
+        )
+
+
+@dataclass
+class SharedBudgetTracker(GraphQLBudgetTracker):
+    """:class:`GraphQLBudgetTracker` whose sliding windows live in *store*.
+
+    Args:
+        store: Shared state; ``None`` behaves exactly like the parent class.
+        name: Namespace of the windows in the store.
+        snapshot_ttl: Seconds a read of the store is reused on the event loop.
+    """
+
+    store: SharedStateStore | None = None
+    name: str = "budget"
+    snapshot_ttl: float = _SNAPSHOT_TTL
+
+    _snapshots: _Snapshots = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self._snapshots = _Snapshots("budget", self.snapshot_ttl)
+
+    def remaining(self, session_id: str | None = None) -> int:
+        status = self._status(session_id)
+        if status is None:
+            return super().remaining(session_id)
+        return status[0]
+
+    async def consume(self, session_id: str | None = None) -> bool:
+        if self.store is None:
+            return await super().consume(session_id)
+        try:
+            return await asyncio.to_thread(self._shared_consume, session_id)
+        except Exception:
+            logger.warning(
+                "Shared GraphQL state unavailable for budget; using this worker's state",
+                exc_info=True,
+            )
+            return await super().consume(session_id)
+
+    async def try_consume(
+        self, session_id: str | None = None, *, keep: int = 0
+    ) -> bool:
+        if self.store is None:
+            return await super().try_consume(session_id, keep=keep)
+        if self._queue.locked():
+            return False
+        # The store checks the spare tokens atomically, not against a snapshot
+        spare = keep + self._reserved
+        try:
+            return await asyncio.to_thread(self._shared_consume, session_id, spare)
+        except Exception:
+            logger.warning(
+                "Shared GraphQL state unavailable for budget; using this worker's state",
+                exc_info=True,
+            )
+            return await super().try_consume(session_id, keep=keep)
+
+    def seconds_until_available(self, session_id: str | None = None) -> float:
+        status = self._status(session_id)
+        if status is None:
+            return super().seconds_until_available(session_id)
+        return status[1]
+
+    def _status(self, session_id: str | None) -> tuple[int, float] | None:
+        """Shared ``(remaining, seconds_until_available)``; ``None`` for local state."""
+        if self.store is None:
+            return None
+        if _on_event_loop():
+            status = self._snapshots.get(
+                session_id, lambda: self._shared_status(session_id)
+            )
+        else:
+            status = _with_fallback(
+                "budget", lambda: self._shared_status(session_id), lambda: _UNKNOWN
+            )
+        return None if status is _UNKNOWN else status
+
+    def _window_key(self, session_id: str | None) -> str:
+        return self.name if session_id is None else f"{self.name}:session:{session_id}"
+
+    def _shared_status(self, session_id: str | None) -> tuple[int, float]:
+        now = time.time()
+        status = (
+            self._shared_remaining(session_id, now),
+            self._shared_wait(session_id, now),
+        )
+        self._snapshots.put(session_id, status)
+        return status
+
+    def _shared_remaining(self, session_id: str | None, now: float) -> int:
+        used = self.store.window_count(self._window_key(None), self.window_seconds, now)
+        global_remaining = self.max_requests - used
+        if session_id is None or self.max_requests_per_session is None:
+            return max(0, global_remaining)
+        session_used = self.store.window_count(
+            self._window_key(session_id), self.window_seconds, now
+        )
+        return max(
+            0, min(global_remaining, self.max_requests_per_session - session_used)
+        )
+
+    def _shared_wait(self, session_id: str | None, now: float) -> float:
+        windows = [(self._window_key(None), self.max_requests)]
+        if session_id is not None and self.max_requests_per_session is not None:
+            windows.append(
+                (self._window_key(session_id), self.max_requests_per_session)
+            )
+        wait = 0.0
+        for key, limit in windows:
+            over = self.store.window_count(key, self.window_seconds, now) - limit
+            if over < 0:
+                continue
+            if limit <= 0:
+                return math.inf
+            oldest = self.store.window_nth(key, self.window_seconds, now, over)
+            if oldest is not None:
+                wait = max(wait, oldest + self.window_seconds - now)
+        return wait
+
+    def _shared_consume(self, session_id: str | None, spare: int = 0) -> bool:
+        admitted = self._shared_admit(session_id, spare)
+        # Refresh the snapshots while in the worker thread anyway
+        self._shared_status(None)
+        if session_id is not None:
+            self._shared_status(session_id)
+        return admitted
+
+    def _shared_admit(self, session_id: str | None, spare: int = 0) -> bool:
+        """Record a call in the shared windows if *spare* tokens stay free."""
+        now = time.time()
+        event = self.store.window_admit(
+            self._window_key(None), self.max_requests - spare, self.window_seconds, now
+        )
+        if event is None:
+            return False
+        if session_id is not None and self.max_requests_per_session is not None:
+            session_event = self.store.window_admit(
+                self._window_key(session_id),
+                self.max_requests_per_session - spare,
+                self.window_seconds,
+                now,
+            )
+            if session_event is None:
+                self.store.window_release(self._window_key(None), event)
+                return False
+        return True
+
+
+@dataclass
+class SharedCircuitBreaker(CircuitBreaker):
+    """:class:`CircuitBreaker` whose state lives in *store*.
+
+    A trip in one worker fast-fails every worker until the recovery
+    timeout, after which the next caller anywhere sends the probe.
+
+    Args:
+        store: Shared state; ``None`` behaves exactly like the parent class.
+        name: Breaker name in the store (one per upstream API).
+        snapshot_ttl: Seconds a read of the store is reused on the event loop.
+    """
+
+    store: SharedStateStore | None = None
+    name: str = "graphql"
+    snapshot_ttl: float = _SNAPSHOT_TTL
+
+    _snapshots: _Snapshots = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._snapshots = _Snapshots(
+            f"circuit breaker '{self.name}'", self.snapshot_ttl
+        )
+
+    @property
+    def state(self) -> CircuitState:
+        record = self._record()
+        if record is None:
+            return self._state
+        return CircuitState(record[0])
+
+    def is_open(self) -> bool:
+        if self.store is None:
+            return super().is_open()
+        if not _on_event_loop():
+            return _with_fallback(
+                self._snapshots.what,
+                self._shared_is_open,
+                lambda: super(SharedCircuitBreaker, self).is_open(),
+            )
+        record = self._record()
+        if record is None:
+            return super().is_open()
+        state, failures, opened_at = record
+        if state != CircuitState.OPEN.value:
+            return False
+        elapsed = time.time() - opened_at
+        if elapsed < self.recovery_timeout:
+            return True
+        half_open = (CircuitState.HALF_OPEN.value, failures, opened_at)
+        self._snapshots.put(None, half_open)
+
+        def op() -> tuple[str, int, float]:
+            self.store.breaker_set(self.name, *half_open)
+            return half_open
+
+        self._update(op, lambda: None)
+        logger.info(
+            "Circuit breaker '%s' transitioning to HALF_OPEN after %.1fs",
+            self.name,
+            elapsed,
+        )
+        return False
+
+    def record_success(self) -> None:
+        if self.store is None:
+            super().record_success()
+            return
+
+        def op() -> tuple[str, int, float]:
+            state, failures, _opened_at = self.store.breaker_get(self.name)
+            if state == CircuitState.HALF_OPEN.value:
+                logger.info("Circuit breaker '%s' closing — probe succeeded", self.name)
+            if state != CircuitState.CLOSED.value or failures:
+                self.store.breaker_set(self.name, CircuitState.CLOSED.value, 0, 0.0)
+            return _CLOSED_RECORD
+
+        self._update(op, lambda: super(SharedCircuitBreaker, self).record_success())
+
+    def record_failure(self) -> None:
+        if self.store is None:
+            super().record_failure()
+            return
+
+        def op() -> tuple[str, int, float]:
+            before = self.store.breaker_get(self.name)[0]
+            record = self.store.breaker_failure(
+                self.name, self.failure_threshold, time.time()
+            )
+            state, failures, _opened_at = record
+            if state == CircuitState.OPEN.value and before != state:
+                logger.warning(
+                    "Circuit breaker '%s' tripped after %d consecutive failures",
+                    self.name,
+                    failures,
+                )
+            return record
+
+        self._update(op, lambda: super(SharedCircuitBreaker, self).record_failure())
+
+    def _record(self) -> tuple[str, int, float] | None:
+        """Shared ``(state, failures, opened_at)``; ``None`` for local state."""
+        if self.store is None:
+            return None
+
+        def read() -> tuple[str, int, float]:
+            return self.store.breaker_get(self.name)
+
+        if _on_event_loop():
+            record = self._snapshots.get(None, read)
+        else:
+            record = _with_fallback(self._snapshots.what, read, lambda: _UNKNOWN)
+        return None if record is _UNKNOWN else record
+
+    def _update(
+        self, op: Callable[[], tuple[str, int, float]], fallback: Callable[[], None]
+    ) -> None:
+        """Apply *op* to the store (in a worker thread on the event loop)."""
+        if _on_event_loop():
+            self._snapshots.write(None, op, fallback)
+        else:
+            _with_fallback(self._snapshots.what, op, fallback)
+
+    def _shared_is_open(self) -> bool:
+        state, failures, opened_at = self.store.breaker_get(self.name)
+        if state != CircuitState.OPEN.value:
+            return False
+        elapsed = time.time() - opened_at
+        if elapsed >= self.recovery_timeout:
+            self.store.breaker_set(
+                self.name, CircuitState.HALF_OPEN.value, failures, opened_at
+            )
+            logger.info(
+                "Circuit breaker '%s' transitioning to HALF_OPEN after %.1fs",
+                self.name,
+                elapsed,
+            )
+            return False
+        return True
+
+
+def create_state_store(
+    spec: str, *, default_sqlite_path: Path
+) -> SharedStateStore | None:
+    """Build a store from ``Settings.graphql_shared_state``.
+
+    Accepted specs: ``"memory"`` (per-worker state, returns ``None``),
+    ``"sqlite"`` (file at *default_sqlite_path*), ``"sqlite:<path>"`` and
+    ``"redis://..."`` / ``"rediss://..."`` / ``"unix://..."`` URLs.
+
+    Raises:
+        ValueError: For an unrecognized spec.
+    """
+    spec = spec.strip()
+    if spec in ("", "memory"):
+        return None
+    if spec == "sqlite":
+        return SQLiteStateStore(default_sqlite_path)
+    if spec.startswith("sqlite:"):
+        return SQLiteStateStore(Path(spec.removeprefix("sqlite:")))
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStateStore(spec)
+    raise ValueError(f"Unknown GraphQL shared state store {spec!r}")
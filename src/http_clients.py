@@ -0,0 +1,243 @@
+"""Outbound HTTP clients with explicit pools, keep-alive and startup warm-up.
+
+Every outbound HTTP client (Atlas GraphQL APIs, the PostHog proxy, the
+OpenAI and Gemini embedding calls) is built by :data:`outbound_http`, so
+they share one set of pool limits and keep-alive settings instead of
+httpx defaults or a fresh client per call.
+
+- Pools: ``max_connections`` / ``max_keepalive_connections`` cap each
+  client; idle connections stay open for ``keepalive_expiry`` seconds.
+- HTTP/2: optional (``outbound_http2``), needs the ``h2`` package; without
+  it clients fall back to HTTP/1.1 with a warning.
+- Warm-up: :meth:`OutboundHttp.warm_up` opens ``warm_connections``
+  connections to each client's hosts during ``AtlasTextToSQL.create_async``,
+  so the first request after a scale-up does not pay DNS + TCP + TLS.
+- Metrics: per-host requests, new connections, TLS handshakes, reused
+  connections and HTTP/2 responses, counted from httpcore trace events and
+  served at ``/api/debug/http``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import weakref
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_TIMEOUT = 5.0  # seconds per warm-up request
+
+
+@dataclass
+class HostStats:
+    """Connection counters for one upstream host."""
+
+    requests: int = 0
+    connections: int = 0
+    tls_handshakes: int = 0
+    http2_responses: int = 0
+    warmed: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            **asdict(self),
+            "reused": max(0, self.requests - self.connections),
+        }
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class OutboundHttp:
+    """Factory and registry for outbound ``httpx.AsyncClient`` instances.
+
+    Clients made by :meth:`create` belong to the caller (which closes them);
+    clients made by :meth:`shared` are process-wide singletons closed by
+    :meth:`aclose`.  Both are tracked for warm-up and metrics.
+    """
+
+    def __init__(self) -> None:
+        self.http2 = False
+        self.max_connections = 20
+        self.max_keepalive_connections = 10
+        self.keepalive_expiry = 60.0
+        self.warm_connections = 2
+        self._http2_warned = False
+        self._shared: dict[str, httpx.AsyncClient] = {}
+        # client -> URLs whose hosts warm_up() connects to
+        self._warm_urls: weakref.WeakKeyDictionary[
+            httpx.AsyncClient, tuple[str, ...]
+        ] = weakref.WeakKeyDictionary()
+        self._hosts: defaultdict[str, HostStats] = defaultdict(HostStats)
+
+    def configure(
+        self,
+        *,
+        http2: bool | None = None,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        keepalive_expiry: float | None = None,
+        warm_connections: int | None = None,
+    ) -> None:
+        """Set pool options for clients created from now on."""
+        if http2 is not None:
+            self.http2 = http2
+        if max_connections is not None:
+            self.max_connections = max_connections
+        if max_keepalive_connections is not None:
+            self.max_keepalive_connections = max_keepalive_connections
+        if keepalive_expiry is not None:
+            self.keepalive_expiry = keepalive_expiry
+        if warm_connections is not None:
+            self.warm_connections = warm_connections
+
+    def _use_http2(self) -> bool:
+        if not self.http2:
+            return False
+        if _h2_available():
+            return True
+        if not self._http2_warned:
+            self._http2_warned = True
+            logger.warning(
+                "outbound_http2 is set but the 'h2' package is not installed "
+                "(uv add h2); using HTTP/1.1"
+            )
+        return False
+
+    def create(
+        self, *, timeout: float = 30.0, warm_urls: tuple[str, ...] = ()
+    ) -> httpx.AsyncClient:
+        """Build a pooled client; :meth:`warm_up` connects to *warm_urls*."""
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            http2=self._use_http2(),
+            event_hooks={
+                "request": [self._on_request],
+                "response": [self._on_response],
+            },
+        )
+        self._warm_urls[client] = warm_urls
+        return client
+
+    def shared(
+        self, name: str, *, timeout: float = 30.0, warm_urls: tuple[str, ...] = ()
+    ) -> httpx.AsyncClient:
+        """Return the process-wide client *name*, creating it on first use."""
+        client = self._shared.get(name)
+        if client is None or client.is_closed:
+            client = self.create(timeout=timeout, warm_urls=warm_urls)
+            self._shared[name] = client
+        return client
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        host = request.url.host
+        self._hosts[host].requests += 1
+        inner = request.extensions.get("trace")
+
+        async def trace(event: str, info: dict) -> None:
+            if event == "connection.connect_tcp.complete":
+                self._hosts[host].connections += 1
+            elif event == "connection.start_tls.complete":
+                self._hosts[host].tls_handshakes += 1
+            if inner is not None:
+                await inner(event, info)
+
+        request.extensions["trace"] = trace
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        if response.http_version == "HTTP/2":
+            self._hosts[response.request.url.host].http2_responses += 1
+
+    async def warm_up(self) -> None:
+        """Open ``warm_connections`` connections to every registered host.
+
+        Each connection is opened with a ``HEAD`` request; the status does
+        not matter, only that the TLS session is established and pooled.
+        Failures are logged and ignored.
+        """
+        targets: dict[tuple[int, str], tuple[httpx.AsyncClient, str]] = {}
+        for client, urls in list(self._warm_urls.items()):
+            if client.is_closed:
+                continue
+            for url in urls:
+                origin = urlsplit(url)
+                targets[(id(client), f"{origin.scheme}://{origin.netloc}")] = (
+                    client,
+                    url,
+                )
+        if not targets or self.warm_connections <= 0:
+            return
+
+        async def open_one(client: httpx.AsyncClient, url: str) -> bool:
+            try:
+                await client.head(url, timeout=WARM_UP_TIMEOUT)
+            except httpx.HTTPError as exc:
+                logger.warning("Warm-up request to %s failed: %s", url, exc)
+                return False
+            self._hosts[httpx.URL(url).host].warmed += 1
+            return True
+
+        opened = await asyncio.gather(
+            *(
+                open_one(client, url)
+                for client, url in targets.values()
+                for _ in range(self.warm_connections)
+            )
+        )
+        logger.info(
+            "Warmed %d outbound connections to %d hosts",
+            sum(opened),
+            len({origin for _, origin in targets}),
+        )
+
+    def stats(self) -> dict:
+        """Pool settings and per-host connection counters for diagnostics."""
+        return {
+            "http2": self._use_http2(),
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "keepalive_expiry": self.keepalive_expiry,
+            "hosts": {host: s.as_dict() for host, s in sorted(self._hosts.items())},
+        }
+
+    async def aclose(self) -> None:
+        """Close the shared clients."""
+        clients, self._shared = list(self._shared.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+outbound_http = OutboundHttp()
+
+
+# ---------------------------------------------------------------------------
+# Embedding API clients
+# ---------------------------------------------------------------------------
+
+OPENAI_API_URL = "https://api.openai.com/v1/"
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/"
+
+
+def openai_http_client() -> httpx.AsyncClient:
+    """Shared HTTP client for the OpenAI API (product search embeddings)."""
+    return outbound_http.shared("openai", timeout=60.0, warm_urls=(OPENAI_API_URL,))
+
+
+def gemini_http_client() -> httpx.AsyncClient:
+    """Shared HTTP client for the Gemini API (docs retrieval embeddings)."""
+    return outbound_http.shared("gemini", timeout=60.0, warm_urls=(GEMINI_API_URL,))
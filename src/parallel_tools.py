@@ -0,0 +1,187 @@
+"""Concurrent execution of the tool calls in one agent step.
+
+When the agent emits several tool calls in a single AIMessage (e.g. the same
+metric for Mexico and for Canada), ``route_after_agent`` fans them out with
+LangGraph ``Send``.  Each call runs in its own ``parallel_tool_call`` task,
+which drives a private copy of the tool pipelines (built by
+``build_atlas_graph``) so branches never see each other's pipeline state.
+``merge_parallel_results`` then folds the branches back into the parent
+state in tool-call order before the agent's next turn.
+
+Only ``query_tool`` and ``atlas_graphql`` count against ``max_uses``.  Calls
+beyond the remaining budget are not dispatched and are answered with the same
+error ``max_queries_exceeded_node`` returns.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Annotated, Any, get_origin, get_type_hints
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph.state import CompiledStateGraph
+
+from src.state import AtlasAgentState
+
+logger = logging.getLogger(__name__)
+
+PARALLEL_TOOL_NODE = "parallel_tool_call"
+MERGE_NODE = "merge_parallel_results"
+
+# Entry node of each tool's pipeline.
+TOOL_ENTRY_NODES = {
+    "query_tool": "extract_tool_question",
+    "atlas_graphql": "extract_graphql_question",
+    "docs_tool": "extract_docs_question",
+    "lookup_catalog": "execute_catalog_lookup",
+}
+
+BUDGETED_TOOLS = frozenset({"query_tool", "atlas_graphql"})
+
+# State channels with append reducers.  A branch starts with these empty, so
+# whatever it ends with is exactly what it contributed.
+ACCUMULATOR_FIELDS = frozenset(
+    name
+    for name, hint in get_type_hints(AtlasAgentState, include_extras=True).items()
+    if get_origin(hint) is Annotated
+) - {"messages", "parallel_results"}
+
+# Owned by the parent graph; branches must not write them back.
+_PARENT_FIELDS = frozenset({"messages", "queries_executed", "parallel_results"})
+
+
+def select_parallel_calls(
+    tool_calls: list[dict], queries_executed: int, max_uses: int
+) -> list[dict]:
+    """Pick the tool calls to dispatch, in order, within the query budget.
+
+    Unknown tools are skipped.  Budget-free tools (``docs_tool``,
+    ``lookup_catalog``) are always dispatched; budgeted tools only while
+    ``max_uses - queries_executed`` has room.
+    """
+    remaining = max_uses - queries_executed
+    selected = []
+    for tc in tool_calls:
+        if tc["name"] not in TOOL_ENTRY_NODES:
+            continue
+        if tc["name"] in BUDGETED_TOOLS:
+            if remaining <= 0:
+                continue
+            remaining -= 1
+        selected.append(tc)
+    return selected
+
+
+def branch_input(state: AtlasAgentState, tool_call: dict) -> dict:
+    """Build the private state for one branch of a fan-out.
+
+    The branch sees the full conversation, but its last AIMessage carries
+    only *tool_call*, so the pipeline nodes (which always act on
+    ``messages[-1].tool_calls[0]``) run exactly that call.
+    """
+    messages = list(state["messages"])
+    messages[-1] = messages[-1].model_copy(update={"tool_calls": [tool_call]})
+    branch = {
+        key: value
+        for key, value in state.items()
+        if key not in ACCUMULATOR_FIELDS and key != "parallel_results"
+    }
+    branch["messages"] = messages
+    return branch
+
+
+async def run_tool_branch(
+    state: AtlasAgentState, config: RunnableConfig, *, branch_graph: CompiledStateGraph
+) -> dict:
+    """Run one tool call of a fan-out through *branch_graph*.
+
+    Returns the branch's new ToolMessages and accumulator entries, plus a
+    ``parallel_results`` record holding the pipeline fields it changed, the
+    nodes it ran and how many budgeted queries it used.
+    """
+    tool_call = state["messages"][-1].tool_calls[0]
+    seen_ids = {m.id for m in state["messages"]}
+    nodes: list[str] = []
+    final: dict[str, Any] = dict(state)
+    async for mode, chunk in branch_graph.astream(
+        state, config, stream_mode=["updates", "values"]
+    ):
+        if mode == "updates":
+            nodes.extend(chunk)
+        else:
+            final = chunk
+
+    update: dict[str, Any] = {
+        "messages": [m for m in final["messages"] if m.id not in seen_ids]
+    }
+    for field in ACCUMULATOR_FIELDS:
+        if final.get(field):
+            update[field] = final[field]
+    changed = {
+        key: value
+        for key, value in final.items()
+        if key not in ACCUMULATOR_FIELDS
+        and key not in _PARENT_FIELDS
+        and (key not in state or state[key] != value)
+    }
+    update["parallel_results"] = [
+        {
+            "tool_call_id": tool_call["id"],
+            "tool": tool_call["name"],
+            "nodes": nodes,
+            "queries": final.get("queries_executed", 0)
+            - state.get("queries_executed", 0),
+            "state": changed,
+        }
+    ]
+    return update
+
+
+def _skipped_call_content(tool_name: str) -> str:
+    if tool_name in BUDGETED_TOOLS:
+        return "Error: Maximum number of queries exceeded."
+    return f"Error: Unknown tool '{tool_name}'."
+
+
+async def merge_parallel_results(state: AtlasAgentState) -> dict:
+    """Join node: fold the branch records of a fan-out into the parent state.
+
+    Branch pipeline fields are applied in tool-call order, so the last call
+    wins just as if the calls had run one after another.  Every tool call
+    without a ToolMessage (over budget or unknown) gets an error reply so
+    the message history stays valid for provider APIs.
+    """
+    last_ai = next(m for m in reversed(state["messages"]) if isinstance(m, AIMessage))
+    order = {tc["id"]: i for i, tc in enumerate(last_ai.tool_calls)}
+    branches = sorted(
+        state.get("parallel_results") or [],
+        key=lambda b: order.get(b["tool_call_id"], len(order)),
+    )
+
+    update: dict[str, Any] = {}
+    for branch in branches:
+        update.update(branch["state"])
+    update["queries_executed"] = state.get("queries_executed", 0) + sum(
+        b["queries"] for b in branches
+    )
+
+    answered = {m.tool_call_id for m in state["messages"] if isinstance(m, ToolMessage)}
+    skipped = [tc for tc in last_ai.tool_calls if tc["id"] not in answered]
+    if skipped:
+        logger.info(
+            "Ran %d of %d parallel tool_calls; answering %d with an error.",
+            len(branches),
+            len(last_ai.tool_calls),
+            len(skipped),
+        )
+    update["messages"] = [
+        ToolMessage(
+            content=_skipped_call_content(tc["name"]),
+            tool_call_id=tc["id"],
+            name=tc["name"],
+        )
+        for tc in skipped
+    ]
+    update["parallel_results"] = None
+    return update
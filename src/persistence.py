@@ -10,11 +10,29 @@ import logging
 import psycopg
 from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
 
 from src.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Application types stored in checkpoint state.  The serializer only loads
+# listed types (besides LangGraph's own safe ones), so a checkpoint loads
+# without warnings and under LANGGRAPH_STRICT_MSGPACK=true.  Add a type here
+# when a state field starts holding it.
+CHECKPOINT_MSGPACK_TYPES = (
+    ("src.result_set", "ResultSet"),
+    ("src.product_and_schema_lookup", "SchemasAndProductsFound"),
+    ("src.product_and_schema_lookup", "ProductDetails"),
+    ("src.product_and_schema_lookup", "CountryDetails"),
+)
+
+
+def checkpoint_serde() -> JsonPlusSerializer:
+    """Checkpoint serializer allowed to load ``CHECKPOINT_MSGPACK_TYPES``."""
+    return JsonPlusSerializer(allowed_msgpack_modules=CHECKPOINT_MSGPACK_TYPES)
+
+
 CONVERSATIONS_DDL = """\
 CREATE TABLE IF NOT EXISTS conversations (
     id VARCHAR PRIMARY KEY,
@@ -100,6 +118,7 @@ class CheckpointerManager:
 
                 self._pg_conn = PostgresSaver.from_conn_string(self._db_url)
                 saver = self._pg_conn.__enter__()
+                saver.serde = checkpoint_serde()  # from_conn_string takes no serde
                 saver.setup()
                 setup_app_tables_sync(self._db_url)
                 logger.info("Using PostgresSaver for checkpoint persistence")
@@ -111,7 +130,7 @@ class CheckpointerManager:
                 )
 
         logger.info("Using MemorySaver for checkpoint persistence")
-        return MemorySaver()
+        return MemorySaver(serde=checkpoint_serde())
 
     def close(self) -> None:
         """Release resources held by the checkpointer."""
@@ -186,7 +205,7 @@ class AsyncCheckpointerManager:
                 await pool.open()
                 self._pool = pool
 
-                saver = AsyncPostgresSaver(conn=pool)
+                saver = AsyncPostgresSaver(conn=pool, serde=checkpoint_serde())
                 await saver.setup()
                 await setup_app_tables(self._db_url)
                 logger.info("Using AsyncPostgresSaver for checkpoint persistence")
@@ -198,7 +217,7 @@ class AsyncCheckpointerManager:
                 )
 
         logger.info("Using MemorySaver for checkpoint persistence (async)")
-        return MemorySaver()
+        return MemorySaver(serde=checkpoint_serde())
 
     async def close(self) -> None:
         """Release resources held by the async checkpointer."""
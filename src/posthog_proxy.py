@@ -10,10 +10,17 @@ from fastapi import APIRouter, Request
 from starlette.background import BackgroundTask
 from starlette.responses import StreamingResponse
 
+from src.http_clients import outbound_http
+
 POSTHOG_API_HOST = "us.i.posthog.com"
 POSTHOG_ASSET_HOST = "us-assets.i.posthog.com"
 
-_client = httpx.AsyncClient(timeout=30.0)
+
+def _client() -> httpx.AsyncClient:
+    return outbound_http.shared(
+        "posthog", timeout=30.0, warm_urls=(f"https://{POSTHOG_API_HOST}/",)
+    )
+
 
 router = APIRouter()
 
@@ -45,13 +52,14 @@ async def posthog_proxy(request: Request, path: str) -> StreamingResponse:
 
     body = await request.body()
 
-    rp_req = _client.build_request(
+    client = _client()
+    rp_req = client.build_request(
         method=request.method,
         url=upstream_url,
         headers=headers,
         content=body,
     )
-    rp_resp = await _client.send(rp_req, stream=True)
+    rp_resp = await client.send(rp_req, stream=True)
 
     response_headers = dict(rp_resp.headers)
     # Strip encoding/length — httpx decompresses for us, so these would be wrong.
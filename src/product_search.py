@@ -10,6 +10,10 @@ and contains FTS5 full-text search + sqlite-vec embeddings for each product.
 Search uses embedding-only (no hybrid RRF) because the evaluation showed
 that hybrid embedding+BM25 *hurts* recall when the embedded text already
 contains LLM-generated synonyms.
+
+``NumpyProductSearch`` is an in-memory alternative over the same index: it
+loads the embeddings once into one matrix per schema and answers searches
+with a vectorized dot product, without touching SQLite afterwards.
 """
 
 from __future__ import annotations
@@ -21,11 +25,15 @@ import struct
 from pathlib import Path
 from typing import Any, Protocol
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 # Embedding settings — same model as docs pipeline
 EMBEDDING_MODEL = "text-embedding-3-small"
 EMBEDDING_DIM = 768
+# Rows of an int8 matrix converted to float32 at a time when scoring
+SCORE_CHUNK_ROWS = 4096
 
 
 class ProductSearchBackend(Protocol):
@@ -47,6 +55,23 @@ class ProductSearchBackend(Protocol):
         """
         ...
 
+    async def search_many(
+        self, query: str, schemas: list[str], top_k: int = 10
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Search for products matching the query in several schemas at once.
+
+        Args:
+            query: Natural language product name (e.g., "cars").
+            schemas: Classification schemas to search (e.g., ``["hs12", "sitc"]``).
+            top_k: Maximum results to return per schema.
+
+        Returns:
+            Dict mapping each schema to its results, in the same format and
+            order as :meth:`search`.  A schema whose search fails maps to an
+            empty list, so it does not drop the others' results.
+        """
+        ...
+
     async def verify_codes(self, codes: list[str], schema: str) -> list[dict[str, Any]]:
         """Verify that product codes exist in the catalog.
 
@@ -66,14 +91,21 @@ def _serialize_embedding(embedding: list[float]) -> bytes:
 
 
 async def _embed_query(text: str) -> list[float] | None:
-    """Embed a single query string via OpenAI text-embedding-3-small.
+    """Embed a single query string, served from the query embedding cache.
 
     Returns None on failure (caller falls back to FTS-only).
     """
-    try:
-        from openai import AsyncOpenAI
+    from src.cache import query_embedding_cache
+
+    return await query_embedding_cache.get_or_embed(
+        EMBEDDING_MODEL, EMBEDDING_DIM, text, _request_embedding
+    )
+
 
-        client = AsyncOpenAI()
+async def _request_embedding(text: str) -> list[float] | None:
+    """Embed a single query string via OpenAI text-embedding-3-small."""
+    try:
+        client = _openai_client()
         response = await client.embeddings.create(
             model=EMBEDDING_MODEL,
             input=text,
@@ -85,6 +117,26 @@ async def _embed_query(text: str) -> list[float] | None:
         return None
 
 
+def _openai_client():
+    """Return an ``AsyncOpenAI`` client on the shared OpenAI HTTP pool.
+
+    Rebuilt only when the pooled HTTP client has been replaced, so embedding
+    calls reuse warm connections instead of a new client per call.
+    """
+    global _openai
+    from src.http_clients import openai_http_client
+
+    http_client = openai_http_client()
+    if _openai is None or _openai[0] is not http_client:
+        from openai import AsyncOpenAI
+
+        _openai = (http_client, AsyncOpenAI(http_client=http_client))
+    return _openai[1]
+
+
+_openai: tuple | None = None
+
+
 def _fts5_escape(query: str) -> str:
     """Build an FTS5 query from a natural language string.
 
@@ -111,6 +163,50 @@ def rrf_fuse(
     return sorted(scores.items(), key=lambda x: x[1], reverse=True)
 
 
+def _open_index(db_path: Path) -> sqlite3.Connection:
+    """Open the product search index read-only with sqlite-vec loaded.
+
+    Raises:
+        FileNotFoundError: If the index has not been built.
+        ValueError: If the index was built with a different embedding size.
+    """
+    if not db_path.exists():
+        raise FileNotFoundError(f"Product search index not found: {db_path}")
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # Load sqlite-vec extension
+    import sqlite_vec
+
+    conn.enable_load_extension(True)
+    sqlite_vec.load(conn)
+    conn.enable_load_extension(False)
+
+    # Verify embedding dimensions match
+    _check_embedding_dim(conn)
+    return conn
+
+
+def _check_embedding_dim(conn: sqlite3.Connection) -> None:
+    """Verify the index embedding dimension matches the expected value."""
+    try:
+        cursor = conn.execute("SELECT value FROM meta WHERE key = 'embedding_dim'")
+        row = cursor.fetchone()
+        if row:
+            index_dim = int(row[0])
+            if index_dim != EMBEDDING_DIM:
+                logger.error(
+                    "Embedding dimension mismatch: index has %d, expected %d. "
+                    "Rebuild the index with: uv run python scripts/build_product_search_index.py --force",
+                    index_dim,
+                    EMBEDDING_DIM,
+                )
+                raise ValueError(
+                    f"Embedding dimension mismatch: index={index_dim}, expected={EMBEDDING_DIM}"
+                )
+    except sqlite3.OperationalError:
+        logger.warning("No meta table in index; skipping dimension check")
+
+
 class EmbeddingProductSearch:
     """Embedding-based product search using a pre-built SQLite index.
 
@@ -126,44 +222,8 @@ class EmbeddingProductSearch:
 
     def __init__(self, db_path: Path) -> None:
         """Open the SQLite index in read-only mode."""
-        if not db_path.exists():
-            raise FileNotFoundError(f"Product search index not found: {db_path}")
         self._db_path = db_path
-        self._conn = sqlite3.connect(
-            f"file:{db_path}?mode=ro", uri=True, check_same_thread=False
-        )
-        self._conn.row_factory = sqlite3.Row
-        # Load sqlite-vec extension
-        import sqlite_vec
-
-        self._conn.enable_load_extension(True)
-        sqlite_vec.load(self._conn)
-        self._conn.enable_load_extension(False)
-
-        # Verify embedding dimensions match
-        self._check_embedding_dim()
-
-    def _check_embedding_dim(self) -> None:
-        """Verify the index embedding dimension matches the expected value."""
-        try:
-            cursor = self._conn.execute(
-                "SELECT value FROM meta WHERE key = 'embedding_dim'"
-            )
-            row = cursor.fetchone()
-            if row:
-                index_dim = int(row[0])
-                if index_dim != EMBEDDING_DIM:
-                    logger.error(
-                        "Embedding dimension mismatch: index has %d, expected %d. "
-                        "Rebuild the index with: uv run python scripts/build_product_search_index.py --force",
-                        index_dim,
-                        EMBEDDING_DIM,
-                    )
-                    raise ValueError(
-                        f"Embedding dimension mismatch: index={index_dim}, expected={EMBEDDING_DIM}"
-                    )
-        except sqlite3.OperationalError:
-            logger.warning("No meta table in index; skipping dimension check")
+        self._conn = _open_index(db_path)
 
     def close(self) -> None:
         """Close the database connection."""
@@ -188,6 +248,44 @@ class EmbeddingProductSearch:
         """
         return await self._vector_search(query, schema, top_k)
 
+    async def search_many(
+        self, query: str, schemas: list[str], top_k: int = 10
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Embedding search across several schemas with a single embedding call.
+
+        The query is embedded once and every schema's KNN lookup runs in
+        one worker-thread hop, instead of one API round-trip and one thread
+        hop per schema.
+
+        Args:
+            query: Natural language product name.
+            schemas: Classification schemas to search.
+            top_k: Maximum results to return per schema.
+
+        Returns:
+            Dict mapping each schema to its product dicts, ordered by
+            relevance (empty lists if the embedding call fails, and for a
+            schema whose lookup fails).
+        """
+        embedding = await _embed_query(query)
+        if embedding is None:
+            return {schema: [] for schema in schemas}
+        query_bytes = _serialize_embedding(embedding)
+
+        def _search_all() -> dict[str, list[dict[str, Any]]]:
+            results = {}
+            for schema in schemas:
+                try:
+                    results[schema] = self._knn_search(query_bytes, schema, top_k)
+                except Exception:
+                    logger.warning(
+                        "Product search failed for %s", schema, exc_info=True
+                    )
+                    results[schema] = []
+            return results
+
+        return await asyncio.to_thread(_search_all)
+
     async def verify_codes(self, codes: list[str], schema: str) -> list[dict[str, Any]]:
         """Verify that product codes exist in the index.
 
@@ -222,39 +320,41 @@ class EmbeddingProductSearch:
         embedding = await _embed_query(query)
         if embedding is None:
             return []
+        query_bytes = _serialize_embedding(embedding)
+        return await asyncio.to_thread(self._knn_search, query_bytes, schema, top_k)
 
-        def _search() -> list[dict[str, Any]]:
-            query_bytes = _serialize_embedding(embedding)
-            cursor = self._conn.execute(
-                """
-                SELECT p.product_code, p.product_name, p.product_id,
-                       p.product_level, v.distance
-                FROM product_embeddings v
-                JOIN products p ON v.rowid = p.rowid
-                WHERE p.schema = ?
-                  AND v.embedding MATCH ?
-                  AND k = ?
-                ORDER BY v.distance
-                """,
-                [schema, query_bytes, top_k * 2],
-            )
-            results = []
-            seen = set()
-            for row in cursor.fetchall():
-                code = row[0]
-                if code not in seen:
-                    seen.add(code)
-                    results.append(
-                        {
-                            "product_code": row[0],
-                            "product_name": row[1],
-                            "product_id": str(row[2]),
-                            "product_level": str(row[3]),
-                        }
-                    )
-            return results[:top_k]
-
-        return await asyncio.to_thread(_search)
+    def _knn_search(
+        self, query_bytes: bytes, schema: str, top_k: int
+    ) -> list[dict[str, Any]]:
+        """KNN lookup of a serialized query embedding within one schema."""
+        cursor = self._conn.execute(
+            """
+            SELECT p.product_code, p.product_name, p.product_id,
+                   p.product_level, v.distance
+            FROM product_embeddings v
+            JOIN products p ON v.rowid = p.rowid
+            WHERE p.schema = ?
+              AND v.embedding MATCH ?
+              AND k = ?
+            ORDER BY v.distance
+            """,
+            [schema, query_bytes, top_k * 2],
+        )
+        results = []
+        seen = set()
+        for row in cursor.fetchall():
+            code = row[0]
+            if code not in seen:
+                seen.add(code)
+                results.append(
+                    {
+                        "product_code": row[0],
+                        "product_name": row[1],
+                        "product_id": str(row[2]),
+                        "product_level": str(row[3]),
+                    }
+                )
+        return results[:top_k]
 
     def _fts_search(self, query: str, schema: str, top_k: int) -> list[dict[str, Any]]:
         """Full-text search via FTS5 BM25."""
@@ -284,3 +384,223 @@ class EmbeddingProductSearch:
         except sqlite3.OperationalError:
             logger.warning("FTS search failed for query: %s", query, exc_info=True)
             return []
+
+
+class _SchemaMatrix:
+    """Embeddings and product rows of one classification schema.
+
+    ``matrix`` holds one row per product, either float32 or int8 with a
+    per-row ``scales`` factor.  ``half_sq_norms`` caches ``0.5 * |x|^2`` so
+    that ``q.x - 0.5 * |x|^2`` ranks rows exactly as the L2 distance
+    sqlite-vec uses.
+    """
+
+    __slots__ = ("matrix", "scales", "half_sq_norms", "products", "by_code")
+
+    def __init__(
+        self, embeddings: np.ndarray, products: list[dict[str, Any]], quantize: bool
+    ) -> None:
+        self.half_sq_norms = 0.5 * np.einsum("ij,ij->i", embeddings, embeddings)
+        if quantize:
+            peak = np.abs(embeddings).max(axis=1)
+            self.scales = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+            self.matrix = np.rint(embeddings / self.scales[:, None]).astype(np.int8)
+        else:
+            self.scales = None
+            self.matrix = embeddings
+        self.products = products
+        self.by_code: dict[str, dict[str, Any]] = {}
+        for product in products:
+            self.by_code.setdefault(product["product_code"], product)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """``q.x - 0.5 * |x|^2`` for every row (higher is nearer).
+
+        int8 rows are converted ``SCORE_CHUNK_ROWS`` at a time, so no
+        float32 copy of the whole matrix is made.
+        """
+        if self.scales is None:
+            scores = self.matrix @ query
+        else:
+            scores = np.empty(len(self.matrix), dtype=np.float32)
+            for start in range(0, len(self.matrix), SCORE_CHUNK_ROWS):
+                chunk = self.matrix[start : start + SCORE_CHUNK_ROWS]
+                scores[start : start + len(chunk)] = chunk.astype(np.float32) @ query
+            scores *= self.scales
+        scores -= self.half_sq_norms
+        return scores
+
+    def top_k(self, query: np.ndarray, top_k: int) -> list[dict[str, Any]]:
+        """Return the *top_k* products nearest to *query*, deduplicated by code."""
+        n = len(self.products)
+        if n == 0 or top_k <= 0:
+            return []
+        scores = self.scores(query)
+        # Over-fetch so duplicate codes (same code at several levels) do not
+        # leave the result short.
+        k = min(top_k * 2, n)
+        candidates = np.argpartition(scores, n - k)[n - k :]
+        candidates = candidates[np.argsort(scores[candidates])[::-1]]
+        results: list[dict[str, Any]] = []
+        seen: set[str] = set()
+        for i in candidates:
+            product = self.products[i]
+            if product["product_code"] in seen:
+                continue
+            seen.add(product["product_code"])
+            results.append(dict(product))
+            if len(results) == top_k:
+                break
+        return results
+
+
+class NumpyProductSearch:
+    """In-memory embedding search over the product index, one matrix per schema.
+
+    Loads every embedding from ``product_search.db`` once (see
+    :meth:`from_index`) and closes the database.  Searches are a float32
+    (or int8-quantized) matrix-vector product plus ``argpartition`` over the
+    requested schema only, run in a worker thread, so recall within a
+    schema is exact and no lock or connection is shared between concurrent
+    searches.  Ranking matches
+    the sqlite-vec L2 distance used by :class:`EmbeddingProductSearch`.
+
+    ``quantize=True`` stores int8 rows with a per-row scale (about a quarter
+    of the memory) at the cost of slightly approximate scores.
+
+    Usage::
+
+        search = NumpyProductSearch.from_index(Path("src/product_search.db"))
+        results = await search.search("cars", "hs12", top_k=10)
+    """
+
+    def __init__(
+        self,
+        products: list[dict[str, Any]],
+        embeddings: np.ndarray,
+        *,
+        quantize: bool = False,
+    ) -> None:
+        """Build per-schema matrices.
+
+        Args:
+            products: One dict per embedding row with ``schema``,
+                ``product_code``, ``product_name``, ``product_id`` and
+                ``product_level`` keys.
+            embeddings: ``(len(products), EMBEDDING_DIM)`` array.
+            quantize: Store int8 rows instead of float32.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.shape != (len(products), EMBEDDING_DIM):
+            raise ValueError(
+                f"Expected embeddings of shape ({len(products)}, {EMBEDDING_DIM}), "
+                f"got {embeddings.shape}"
+            )
+        rows_by_schema: dict[str, list[int]] = {}
+        for i, product in enumerate(products):
+            rows_by_schema.setdefault(product["schema"], []).append(i)
+        self._schemas = {
+            schema: _SchemaMatrix(
+                embeddings[rows],
+                [
+                    {
+                        "product_code": products[i]["product_code"],
+                        "product_name": products[i]["product_name"],
+                        "product_id": str(products[i]["product_id"]),
+                        "product_level": str(products[i]["product_level"]),
+                    }
+                    for i in rows
+                ],
+                quantize,
+            )
+            for schema, rows in rows_by_schema.items()
+        }
+
+    @classmethod
+    def from_index(cls, db_path: Path, *, quantize: bool = False) -> NumpyProductSearch:
+        """Load all products and embeddings from the SQLite index."""
+        conn = _open_index(db_path)
+        try:
+            cursor = conn.execute(
+                """
+                SELECT p.schema, p.product_code, p.product_name, p.product_id,
+                       p.product_level, v.embedding
+                FROM products p
+                JOIN product_embeddings v ON v.rowid = p.rowid
+                ORDER BY p.rowid
+                """
+            )
+            products = []
+            blobs = []
+            for row in cursor:
+                products.append(dict(row))
+                blobs.append(row["embedding"])
+        finally:
+            conn.close()
+        embeddings = np.frombuffer(b"".join(blobs), dtype="<f4").reshape(
+            len(blobs), EMBEDDING_DIM
+        )
+        for product in products:
+            del product["embedding"]
+        logger.info(
+            "Loaded %d product embeddings into memory%s",
+            len(products),
+            " (int8)" if quantize else "",
+        )
+        return cls(products, embeddings, quantize=quantize)
+
+    def close(self) -> None:
+        """Release the in-memory matrices."""
+        self._schemas = {}
+
+    async def search(
+        self, query: str, schema: str, top_k: int = 10
+    ) -> list[dict[str, Any]]:
+        """Embedding search within one schema (see :class:`EmbeddingProductSearch`)."""
+        return (await self.search_many(query, [schema], top_k))[schema]
+
+    async def search_many(
+        self, query: str, schemas: list[str], top_k: int = 10
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Embedding search across several schemas with a single embedding call.
+
+        Returns:
+            Dict mapping each schema to its product dicts, ordered by
+            relevance (empty lists if the embedding call fails, or for a
+            schema that is not in the index or whose lookup fails).
+        """
+        embedding = await _embed_query(query)
+        if embedding is None:
+            return {schema: [] for schema in schemas}
+        vector = np.asarray(embedding, dtype=np.float32)
+        matrices = {schema: self._schemas.get(schema) for schema in schemas}
+
+        def _search_all() -> dict[str, list[dict[str, Any]]]:
+            results = {}
+            for schema, matrix in matrices.items():
+                try:
+                    results[schema] = matrix.top_k(vector, top_k) if matrix else []
+                except Exception:
+                    logger.warning(
+                        "Product search failed for %s", schema, exc_info=True
+                    )
+                    results[schema] = []
+            return results
+
+        # numpy releases the GIL for the matrix products
+        return await asyncio.to_thread(_search_all)
+
+    async def verify_codes(self, codes: list[str], schema: str) -> list[dict[str, Any]]:
+        """Verify that product codes exist in the index.
+
+        Returns:
+            List of verified product dicts (only codes that exist).
+        """
+        matrix = self._schemas.get(schema)
+        if matrix is None:
+            return []
+        return [
+            dict(matrix.by_code[code])
+            for code in dict.fromkeys(codes)
+            if code in matrix.by_code
+        ]
@@ -36,9 +36,11 @@ from ._blocks import GRAPHQL_DATA_MAX_YEAR, SQL_DATA_MAX_YEAR
 
 # -- Agent system prompts + builders --
 from .prompt_agent import (
+    CONVERSATION_SUMMARY_PROMPT,
     DUAL_TOOL_SYSTEM_PROMPT,
     GRAPHQL_ONLY_OVERRIDE,
     SQL_ONLY_SYSTEM_PROMPT,
+    build_conversation_summary_prompt,
     build_dual_tool_system_prompt,
     build_sql_only_system_prompt,
 )
@@ -48,9 +50,11 @@ from .prompt_docs import DOCUMENT_SELECTION_PROMPT, DOCUMENTATION_SYNTHESIS_PROM
 
 # -- GraphQL prompts + builders --
 from .prompt_graphql import (
+    BATCH_ID_RESOLUTION_SELECTION_PROMPT,
     GRAPHQL_CLASSIFICATION_PROMPT,
     GRAPHQL_ENTITY_EXTRACTION_PROMPT,
     ID_RESOLUTION_SELECTION_PROMPT,
+    build_batch_id_resolution_prompt,
     build_classification_prompt,
     build_extraction_prompt,
     build_id_resolution_prompt,
@@ -81,18 +85,22 @@ __all__ = [
     "GRAPHQL_DATA_MAX_YEAR",
     "SQL_DATA_MAX_YEAR",
     # Agent prompts
+    "CONVERSATION_SUMMARY_PROMPT",
     "DUAL_TOOL_SYSTEM_PROMPT",
     "GRAPHQL_ONLY_OVERRIDE",
     "SQL_ONLY_SYSTEM_PROMPT",
+    "build_conversation_summary_prompt",
     "build_dual_tool_system_prompt",
     "build_sql_only_system_prompt",
     # Documentation prompts
     "DOCUMENT_SELECTION_PROMPT",
     "DOCUMENTATION_SYNTHESIS_PROMPT",
     # GraphQL prompts
+    "BATCH_ID_RESOLUTION_SELECTION_PROMPT",
     "GRAPHQL_CLASSIFICATION_PROMPT",
     "GRAPHQL_ENTITY_EXTRACTION_PROMPT",
     "ID_RESOLUTION_SELECTION_PROMPT",
+    "build_batch_id_resolution_prompt",
     "build_classification_prompt",
     "build_extraction_prompt",
     "build_id_resolution_prompt",
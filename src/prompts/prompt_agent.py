@@ -2,7 +2,8 @@
 
 Contains the two standalone agent system prompts (SQL-only and dual-tool)
 plus the GraphQL-only override prefix.  Each is assembled from shared
-``_BLOCK`` constants defined in :mod:`._blocks`.
+``_BLOCK`` constants defined in :mod:`._blocks`.  Also holds the prompt for
+the rolling summary of older conversation turns.
 
 Design rule: **zero imports from other ``src/`` modules**.
 """
@@ -117,7 +118,8 @@ Does NOT count against your query budget.""",
 - You may use query_tool up to {max_uses} times per question.
 - query_tool handles complex questions in a single call, so you rarely need more than one. \
 Use additional calls only for genuinely independent questions (e.g., the user asked two \
-unrelated things) or to retry with different framing after a failure.
+unrelated things) or to retry with different framing after a failure. Independent calls \
+issued in the same response run concurrently.
 - Each query returns at most {top_k_per_query} rows — plan accordingly.""",
         _RESPONSE_FORMAT_BLOCK,
     ]
@@ -151,6 +153,10 @@ query_tool calls.
 needs query_tool, route each part to the best tool, then synthesize.
 - **Retries:** If a tool returns an error or no data, try rephrasing or adding context.
 - **Independent questions:** If the user asked two unrelated things in one message.
+- **Independent lookups:** Tool calls issued in the same response run concurrently, so \
+when you already know you need several independent lookups (e.g., the same atlas_graphql \
+metric for two countries, or docs_tool alongside a data tool), issue them together rather \
+than one per turn. Each data tool call still counts against the query budget.
 Do NOT split a single analytical question into multiple query_tool calls. query_tool \
 uses CTEs and multi-step SQL internally to handle cross-referencing, comparisons, and \
 multi-table aggregations.
@@ -355,6 +361,31 @@ The `query_tool` (SQL) is currently disabled in this session. Ignore all SQL-rel
 instructions below. Use `atlas_graphql` for all data queries."""
 
 
+# =========================================================================
+# 2. Conversation history
+# =========================================================================
+
+# --- CONVERSATION_SUMMARY_PROMPT ---
+# Rolling summary of the turns that fall out of the agent's history window.
+# Pipeline: agent_node (AGENT_HISTORY_SUMMARY)
+# Placeholders: {previous_summary}, {turns}
+
+CONVERSATION_SUMMARY_PROMPT = """\
+You maintain a running summary of a conversation between a user and a trade \
+data assistant. The assistant will see this summary instead of the older turns.
+
+Summary so far:
+{previous_summary}
+
+Turns to add:
+{turns}
+
+Write the updated summary in at most 200 words. Keep what later questions may \
+refer back to: the countries, products, classifications and years discussed, \
+the key figures found, and any data caveats. Drop pleasantries and SQL details. \
+Return only the summary."""
+
+
 # =========================================================================
 # Builder functions
 # =========================================================================
@@ -404,3 +435,18 @@ def build_dual_tool_system_prompt(
         graphql_max_year=GRAPHQL_DATA_MAX_YEAR,
         budget_status=budget_status,
     )
+
+
+def build_conversation_summary_prompt(previous_summary: str, turns: str) -> str:
+    """Assemble the rolling conversation summary prompt.
+
+    Args:
+        previous_summary: The current summary, or empty for the first one.
+        turns: The turns to fold into the summary, rendered as text.
+
+    Returns:
+        Formatted prompt string.
+    """
+    return CONVERSATION_SUMMARY_PROMPT.format(
+        previous_summary=previous_summary or "(none yet)", turns=turns
+    )
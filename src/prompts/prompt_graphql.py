@@ -286,6 +286,28 @@ Consider the full question context to disambiguate (e.g., "Turkey" as a country
 
 Reply with just the number (1-{num_candidates}) of the best match, or 0 if none match."""
 
+# --- BATCH_ID_RESOLUTION_SELECTION_PROMPT ---
+# Used when several entities in the same question are ambiguous, so that
+# all of them are disambiguated in one structured LLM call.
+# Pipeline: graphql_pipeline (resolve_ids -> _select_entities)
+# Placeholders: {question}, {entities}
+
+BATCH_ID_RESOLUTION_SELECTION_PROMPT = """\
+You are resolving several entity references from a trade data question to the \
+correct entries in the Atlas database catalog.
+
+**Question context:** "{question}"
+
+**Entities and their candidate matches:**
+{entities}
+
+For each entity, which candidate is the best match for what the question refers to?
+Consider the full question context to disambiguate (e.g., "Turkey" as a country vs. \
+"turkey" as a poultry product).
+
+Return one selection per entity: the entity number and the number of its best \
+candidate, or 0 if none of its candidates match."""
+
 
 # =========================================================================
 # Builder functions
@@ -423,3 +445,28 @@ def build_id_resolution_prompt(
     if context:
         prompt += f"\n\nAgent guidance:\n{context}"
     return prompt
+
+
+def build_batch_id_resolution_prompt(
+    question: str,
+    entities: str,
+    context: str = "",
+) -> str:
+    """Assemble the prompt that disambiguates several entities at once.
+
+    Args:
+        question: The original user question for context.
+        entities: Formatted numbered list of entities, each followed by its
+            numbered candidates.
+        context: Optional agent guidance to aid disambiguation.
+
+    Returns:
+        Formatted batch ID resolution prompt string.
+    """
+    prompt = BATCH_ID_RESOLUTION_SELECTION_PROMPT.format(
+        question=question,
+        entities=entities,
+    )
+    if context:
+        prompt += f"\n\nAgent guidance:\n{context}"
+    return prompt
@@ -0,0 +1,258 @@
+"""Token-compact text encoding of tabular tool results.
+
+Every SQL and GraphQL result the agent sees is sent back to the LLM as a
+``ToolMessage``, so its size is paid in prompt tokens on every later turn.
+Rendering rows as dicts or pretty-printed JSON repeats each field name on
+every row; this module renders them as a header line plus delimited rows
+instead, formats numbers compactly, and sizes the output against a token
+budget.  Rows that do not fit are summarized (count plus min/max/sum of the
+numeric columns) rather than silently cut mid-row.
+
+Shared by ``execute_sql_node``, the SQL sub-agent's ``execute_sql`` tool
+and ``format_graphql_results``.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from collections.abc import Mapping, Sequence
+from decimal import Decimal
+from numbers import Number
+from typing import Any
+
+from src.result_set import ResultSet
+
+CHARS_PER_TOKEN = 3
+"""Token estimate used for budgeting.
+
+Digit- and delimiter-heavy tables tokenize denser than prose, so this is
+more conservative than the usual four characters per token.
+"""
+
+TABLE_TOKEN_BUDGET = 4_000
+"""Default budget for the data portion of a tool result."""
+
+TOOL_RESULT_TOKEN_BUDGET = 5_000
+"""Hard cap on a whole tool message (data plus notes and warnings)."""
+
+FLOAT_PRECISION = 4
+"""Decimal places kept for non-integer numbers (significant digits below 1)."""
+
+MIN_CELL_CHARS = 40
+"""Floor of the per-cell character cap :func:`encode_table` derives from its budget."""
+
+NULL = "NULL"
+
+
+def approx_tokens(text: str) -> int:
+    """Estimate the token count of *text* (see :data:`CHARS_PER_TOKEN`)."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def format_value(value: Any, *, precision: int = FLOAT_PRECISION) -> str:
+    """Render one cell compactly.
+
+    Integers are printed as-is.  Floats and Decimals keep *precision*
+    decimal places (trailing zeros dropped), or *precision* significant
+    digits when their magnitude is below 1 so small shares do not round to
+    zero.  Nested structures become compact JSON.
+    """
+    if value is None:
+        return NULL
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, (float, Decimal)):
+        if not math.isfinite(value):
+            return str(value)
+        if value == 0 or abs(value) >= 1:
+            text = f"{value:.{precision}f}"
+            return text.rstrip("0").rstrip(".") if "." in text else text
+        return f"{value:.{precision}g}"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"), default=str)
+    return " ".join(str(value).split())
+
+
+def _is_numeric(value: Any) -> bool:
+    return isinstance(value, Number) and not isinstance(value, bool)
+
+
+def _tail_stats(
+    columns: Sequence[str], rows: Sequence[Sequence[Any]], precision: int
+) -> str:
+    """Summarize the numeric columns of *rows* as ``col min/max/sum`` text."""
+    if isinstance(rows, ResultSet):
+        values_by_column = [rows.column(name) for name in columns]
+    else:
+        values_by_column = [list(col) for col in zip(*rows)]
+    parts = []
+    for name, values in zip(columns, values_by_column):
+        present = [v for v in values if v is not None]
+        if not present or not all(_is_numeric(v) for v in present):
+            continue
+        try:
+            lo, hi, total = min(present), max(present), sum(present)
+        except TypeError:
+            continue
+        fmt = [format_value(v, precision=precision) for v in (lo, hi, total)]
+        parts.append(f"{name} min={fmt[0]} max={fmt[1]} sum={fmt[2]}")
+    return "; ".join(parts)
+
+
+def encode_table(
+    columns: Sequence[str],
+    rows: Sequence[Sequence[Any]],
+    *,
+    token_budget: int = TABLE_TOKEN_BUDGET,
+    max_rows: int | None = None,
+    precision: int = FLOAT_PRECISION,
+    delimiter: str = "\t",
+    tail_stats: bool = True,
+) -> str:
+    """Encode rows as a header line plus one delimited line per row.
+
+    Rows are emitted in order until *max_rows* or the token budget is
+    reached.  Any remaining rows are replaced by a one-line footer giving
+    their count and, when *tail_stats* is set, the min/max/sum of each
+    numeric column over those omitted rows.  Cells are clipped so that one
+    row takes at most half the budget (but never below
+    :data:`MIN_CELL_CHARS` characters), so a single oversized value cannot
+    blow it.
+
+    Args:
+        columns: Column names.
+        rows: Row sequence (a :class:`ResultSet` or list of rows).
+        token_budget: Approximate token budget for the whole table.
+        max_rows: Optional cap on rows shown regardless of budget.
+        precision: Float precision passed to :func:`format_value`.
+        delimiter: Field separator (tab by default; ``","`` for CSV).
+        tail_stats: Whether to summarize numeric columns of omitted rows.
+
+    Returns:
+        The encoded table, or ``""`` when there are no rows.
+    """
+    if not rows:
+        return ""
+    total = len(rows)
+    limit = total if max_rows is None else min(max_rows, total)
+    cell_chars = max(
+        MIN_CELL_CHARS, token_budget * CHARS_PER_TOKEN // (2 * max(1, len(columns)))
+    )
+
+    def _cell(value: Any) -> str:
+        text = format_value(value, precision=precision).replace(delimiter, " ")
+        return text if len(text) <= cell_chars else text[: cell_chars - 1] + "…"
+
+    def _line(values: Sequence[Any]) -> str:
+        return delimiter.join(_cell(v) for v in values)
+
+    lines = [delimiter.join(str(c) for c in columns)]
+    used = approx_tokens(lines[0]) + 1
+    for i, row in enumerate(rows):
+        if i >= limit:
+            break
+        line = _line(row)
+        used += approx_tokens(line) + 1
+        lines.append(line)
+        if used > token_budget:
+            break
+
+    def _footer(shown: int) -> str:
+        omitted = total - shown
+        if not omitted:
+            return ""
+        text = f"[{omitted:,} more rows not shown ({total:,} total)"
+        if tail_stats:
+            stats = _tail_stats(columns, rows[shown:], precision)
+            if stats:
+                text += f"; omitted rows: {stats}"
+        return text + "]"
+
+    shown = len(lines) - 1
+    if shown == total and used <= token_budget:
+        return "\n".join(lines)
+
+    # Drop rows until the footer fits, keeping at least one data row.
+    footer = _footer(shown)
+    while shown > 1 and used + approx_tokens(footer) > token_budget:
+        used -= approx_tokens(lines.pop()) + 1
+        shown -= 1
+        footer = _footer(shown)
+    return "\n".join(lines + [footer] if footer else lines)
+
+
+def _is_record_list(value: Any) -> bool:
+    return (
+        isinstance(value, list)
+        and bool(value)
+        and all(isinstance(item, Mapping) for item in value)
+    )
+
+
+def encode_records(
+    data: Any,
+    *,
+    token_budget: int = TABLE_TOKEN_BUDGET,
+    precision: int = FLOAT_PRECISION,
+) -> str:
+    """Encode a JSON-like API response compactly.
+
+    Scalar fields become ``path: value`` lines (nested objects are
+    flattened to dotted paths) and every list of objects becomes a table
+    via :func:`encode_table`, with the keys of its records as columns.
+    Tables share what is left of *token_budget* in document order.
+    """
+    scalars: list[str] = []
+    tables: list[tuple[str, list[Mapping]]] = []
+
+    def _walk(value: Any, path: str) -> None:
+        if isinstance(value, Mapping):
+            for key, child in value.items():
+                _walk(child, f"{path}.{key}" if path else str(key))
+        elif _is_record_list(value):
+            tables.append((path, value))
+        else:
+            text = format_value(value, precision=precision)
+            scalars.append(f"{path}: {text}" if path else text)
+
+    _walk(data, "")
+    parts = scalars[:]
+    remaining = token_budget - sum(approx_tokens(s) + 1 for s in scalars)
+    for path, records in tables:
+        columns: dict[str, None] = {}
+        for record in records:
+            columns.update(dict.fromkeys(record))
+        rows = [[record.get(c) for c in columns] for record in records]
+        title = f"{path} ({len(rows)} rows):" if path else f"({len(rows)} rows):"
+        remaining -= approx_tokens(title) + 1
+        table = encode_table(
+            list(columns),
+            rows,
+            token_budget=max(remaining, 1),
+            precision=precision,
+        )
+        remaining -= approx_tokens(table) + 1
+        parts.append(f"{title}\n{table}")
+    return "\n".join(parts)
+
+
+def truncate_to_token_budget(
+    content: str, token_budget: int = TOOL_RESULT_TOKEN_BUDGET
+) -> str:
+    """Cap *content* at roughly *token_budget* tokens, cutting at a line break.
+
+    Appends a notice telling the model the data is partial.
+    """
+    tokens = approx_tokens(content)
+    if tokens <= token_budget:
+        return content
+    notice = (
+        f"\n\n[Response truncated from ~{tokens:,} to ~{token_budget:,} tokens. "
+        f"The data above is partial — answer based on what is shown.]"
+    )
+    max_chars = token_budget * CHARS_PER_TOKEN - len(notice)
+    cut = content.rfind("\n", 0, max_chars)
+    if cut < max_chars // 2:
+        cut = max_chars
+    return content[:cut] + notice
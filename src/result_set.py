@@ -0,0 +1,267 @@
+"""Compact columnar container for SQL result rows.
+
+Query results travel through graph state (``pipeline_result_rows``), the SQL
+result cache, SSE payloads, turn summaries and checkpoints.  Held as
+``list[list]``, every cell of a wide trade table is a boxed Python object
+inside a per-row list.  :class:`ResultSet` stores each column once instead:
+
+- integer and float columns as ``array('q')`` / ``array('d')`` (8 bytes per
+  cell) with a separate null mask only when the column contains NULLs;
+- string columns as lists of interned strings, so repeated values such as
+  ISO codes or product levels share one object;
+- anything else (``Decimal``, dates, mixed types) as a plain list.
+
+The conversion is lossless — values come back out with their original
+Python types.  Instances are immutable; slicing returns a view that shares
+the column storage, and iteration yields row tuples lazily.
+"""
+
+from __future__ import annotations
+
+import datetime
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from decimal import Decimal
+from itertools import islice
+from typing import Any
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+# Typed column payloads are written little-endian so checkpoints stay
+# portable across hosts.
+_SWAP_BYTES = sys.byteorder != "little"
+
+Column = array | list
+
+
+def json_safe(value: object) -> object:
+    """Convert non-JSON-serializable values to strings."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def _pack_column(values: list) -> tuple[Column, bytearray | None]:
+    """Choose the most compact lossless storage for one column of values."""
+    present = [v for v in values if v is not None]
+    nulls = bytearray(v is None for v in values) if len(present) < len(values) else None
+    if present:
+        kinds = {type(v) for v in present}
+        if kinds == {int} and _INT64_MIN <= min(present) and max(present) <= _INT64_MAX:
+            return array("q", [0 if v is None else v for v in values]), nulls
+        if kinds == {float}:
+            return array("d", [0.0 if v is None else v for v in values]), nulls
+        if kinds == {str}:
+            return [v if v is None else sys.intern(v) for v in values], None
+    return values, None
+
+
+def _encode_column(data: Column, nulls: bytearray | None) -> list:
+    """Checkpoint form of a column: ``[typecode, payload, null_mask]``."""
+    if isinstance(data, array):
+        if _SWAP_BYTES:
+            data = array(data.typecode, data)
+            data.byteswap()
+        return [data.typecode, data.tobytes(), bytes(nulls) if nulls else None]
+    return [None, data, None]
+
+
+def _decode_column(
+    typecode: str | None, payload: Any, nulls: bytes | None
+) -> tuple[Column, bytearray | None]:
+    """Inverse of :func:`_encode_column`."""
+    if typecode is None:
+        return _pack_column(list(payload))
+    data = array(typecode)
+    data.frombytes(payload)
+    if _SWAP_BYTES:
+        data.byteswap()
+    return data, bytearray(nulls) if nulls else None
+
+
+class ResultSet:
+    """Immutable, column-oriented table of query results.
+
+    Behaves like a read-only sequence of row tuples: ``len()``, iteration,
+    indexing and slicing all work, and a result set compares equal to a
+    ``list[list]`` holding the same rows.
+
+    Args:
+        columns: Column names.
+        rows: Row-oriented values, one sequence per row.
+        packed: Column payloads produced by :meth:`_asdict`; used instead
+            of *rows* when restoring from a checkpoint.
+
+    Raises:
+        ValueError: If the rows are not as wide as *columns*.
+    """
+
+    __slots__ = ("_columns", "_data", "_nulls", "_start", "_stop")
+
+    def __init__(
+        self,
+        columns: Sequence[str] = (),
+        rows: Iterable[Sequence[Any]] = (),
+        *,
+        packed: Sequence[Sequence[Any]] | None = None,
+    ) -> None:
+        self._columns = tuple(sys.intern(str(c)) for c in columns)
+        if packed is not None:
+            stored = [_decode_column(*col) for col in packed]
+        else:
+            rows = rows if isinstance(rows, list) else list(rows)
+            transposed = list(zip(*rows)) if rows else [()] * len(self._columns)
+            if rows and len(transposed) != len(self._columns):
+                raise ValueError(
+                    f"Rows have {len(transposed)} values but there are "
+                    f"{len(self._columns)} columns"
+                )
+            stored = [_pack_column(list(values)) for values in transposed]
+        self._data = tuple(data for data, _ in stored)
+        self._nulls = tuple(nulls for _, nulls in stored)
+        self._start = 0
+        self._stop = len(self._data[0]) if self._data else 0
+
+    @property
+    def columns(self) -> list[str]:
+        """Column names, in result order."""
+        return list(self._columns)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the underlying column storage.
+
+        Views share storage with their parent, so this reports the full
+        size of the shared columns rather than the visible window.
+        """
+        total = sys.getsizeof(self)
+        seen: set[int] = set()
+        for data, nulls in zip(self._data, self._nulls):
+            total += sys.getsizeof(data)
+            if nulls is not None:
+                total += sys.getsizeof(nulls)
+            if isinstance(data, list):
+                for value in data:
+                    if id(value) not in seen:
+                        seen.add(id(value))
+                        total += sys.getsizeof(value)
+        return total
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __iter__(self) -> Iterator[tuple]:
+        return zip(*(self._iter_column(i) for i in range(len(self._data))))
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return ResultSet(self._columns, list(self)[index])
+            return self._view(self._start + start, self._start + max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ResultSet index out of range")
+        pos = self._start + index
+        return tuple(
+            None if nulls is not None and nulls[pos] else data[pos]
+            for data, nulls in zip(self._data, self._nulls)
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ResultSet):
+            return self._columns == other._columns and list(self) == list(other)
+        if isinstance(other, list):
+            return len(self) == len(other) and all(
+                row == (tuple(o) if isinstance(o, (list, tuple)) else o)
+                for row, o in zip(self, other)
+            )
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"ResultSet(columns={list(self._columns)!r}, rows={len(self)})"
+
+    def _view(self, start: int, stop: int) -> ResultSet:
+        view = object.__new__(ResultSet)
+        view._columns = self._columns
+        view._data = self._data
+        view._nulls = self._nulls
+        view._start = start
+        view._stop = stop
+        return view
+
+    def _iter_column(self, i: int) -> Iterator[Any]:
+        values = islice(self._data[i], self._start, self._stop)
+        nulls = self._nulls[i]
+        if nulls is None:
+            return values
+        mask = islice(nulls, self._start, self._stop)
+        return (None if is_null else v for v, is_null in zip(values, mask))
+
+    def column(self, name: str) -> list:
+        """Return all values of one column as a list.
+
+        Raises:
+            KeyError: If there is no column called *name*.
+        """
+        try:
+            i = self._columns.index(name)
+        except ValueError:
+            raise KeyError(name) from None
+        data = self._data[i][self._start : self._stop]
+        if self._nulls[i] is None:
+            return data.tolist() if isinstance(data, array) else data
+        return list(self._iter_column(i))
+
+    def to_rows(self) -> list[list]:
+        """Materialize the rows as ``list[list]``."""
+        return [list(row) for row in self]
+
+    def to_json_rows(self) -> list[list]:
+        """Rows with every value made JSON-safe (see :func:`json_safe`).
+
+        Typed numeric and string columns are already JSON-safe, so only
+        generic columns pay for per-value conversion.
+        """
+        converted = []
+        for i, data in enumerate(self._data):
+            values = self._iter_column(i)
+            if isinstance(data, list) and any(
+                isinstance(v, (Decimal, datetime.date)) for v in data
+            ):
+                values = map(json_safe, values)
+            converted.append(values)
+        return [list(row) for row in zip(*converted)]
+
+    def to_arrow(self):
+        """Convert to a ``pyarrow.Table`` (requires the optional ``pyarrow``).
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        import pyarrow as pa
+
+        return pa.table({name: self.column(name) for name in self._columns})
+
+    def _asdict(self) -> dict[str, Any]:
+        """Constructor keyword arguments that rebuild this result set.
+
+        LangGraph's checkpoint serializer stores objects exposing ``_asdict``
+        as keyword arguments and calls the class with them on load, so this
+        doubles as the checkpoint format: typed columns are written as raw
+        little-endian bytes instead of one msgpack value per cell.
+        """
+        start, stop = self._start, self._stop
+        packed = []
+        for data, nulls in zip(self._data, self._nulls):
+            window = data[start:stop]
+            mask = nulls[start:stop] if nulls is not None else None
+            packed.append(_encode_column(window, mask if mask and any(mask) else None))
+        return {"columns": list(self._columns), "packed": packed}
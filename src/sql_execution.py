@@ -0,0 +1,142 @@
+"""Bounded row fetching shared by the SQL execution paths.
+
+Both the SQL sub-agent (``execute_sql_tool_node``) and the legacy
+``execute_sql_node`` run LLM-written SQL whose result size is unknown up
+front — an unfiltered ``country_country_product_year_6`` query can match
+millions of rows.  Instead of ``fetchall()``, results are streamed through
+a server-side cursor in ``fetchmany`` batches and fetching stops at a hard
+row cap.  The remainder is never pulled into the worker; when the cap is
+hit, the total is estimated from the Postgres planner (``EXPLAIN``) rather
+than by re-running the query.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.result_set import ResultSet
+
+logger = logging.getLogger(__name__)
+
+MAX_FETCH_ROWS = 5000
+"""Default hard cap on rows materialized per query."""
+
+FETCH_BATCH_SIZE = 500
+"""Rows pulled from the server-side cursor per ``fetchmany`` round-trip."""
+
+_STREAM_OPTIONS = {"stream_results": True, "max_row_buffer": FETCH_BATCH_SIZE}
+
+
+@dataclass
+class FetchedResult:
+    """Rows fetched from one query, plus what is known about the rest.
+
+    Attributes:
+        columns: Result column names.
+        rows: Fetched rows (at most the row cap).
+        truncated: Whether more rows matched than were fetched.
+        total_rows: Exact row count when not truncated; the planner's
+            estimate when truncated (``None`` if no estimate was available).
+    """
+
+    columns: list[str] = field(default_factory=list)
+    rows: ResultSet = field(default_factory=ResultSet)
+    truncated: bool = False
+    total_rows: int | None = None
+
+    def describe_total(self) -> str:
+        """Human-readable total, e.g. ``"42"`` or ``"~1,234,567 (estimated)"``."""
+        if not self.truncated:
+            return str(len(self.rows))
+        if self.total_rows is None:
+            return f"more than {len(self.rows):,} (total unknown)"
+        return f"~{max(self.total_rows, len(self.rows) + 1):,} (estimated)"
+
+
+def _finish(
+    columns: list[str], rows: list[Sequence[Any]], max_rows: int
+) -> tuple[FetchedResult, bool]:
+    """Build the result from up to ``max_rows + 1`` fetched rows.
+
+    Returns the result and whether the caller still needs a total estimate.
+    """
+    if len(rows) <= max_rows:
+        return FetchedResult(
+            columns, ResultSet(columns, rows), total_rows=len(rows)
+        ), False
+    result_set = ResultSet(columns, rows[:max_rows])
+    return FetchedResult(columns, result_set, truncated=True), True
+
+
+def _parse_plan_rows(plan: Any) -> int | None:
+    """Extract the top-level ``Plan Rows`` from ``EXPLAIN (FORMAT JSON)`` output."""
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    rows = plan[0]["Plan"]["Plan Rows"]
+    return int(rows) if isinstance(rows, (int, float)) else None
+
+
+def fetch_rows(
+    conn: Connection, sql: str, max_rows: int = MAX_FETCH_ROWS
+) -> FetchedResult:
+    """Execute *sql* on a sync connection, fetching at most *max_rows* rows."""
+    result = conn.execute(text(sql), execution_options=_STREAM_OPTIONS)
+    try:
+        if not result.returns_rows:
+            return FetchedResult()
+        columns = list(result.keys())
+        rows: list[Sequence[Any]] = []
+        while len(rows) <= max_rows:
+            size = min(FETCH_BATCH_SIZE, max_rows + 1 - len(rows))
+            batch = result.fetchmany(size)
+            rows.extend(batch)
+            if len(batch) < size:
+                break
+    finally:
+        result.close()
+
+    fetched, needs_estimate = _finish(columns, rows, max_rows)
+    if needs_estimate:
+        try:
+            plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+            fetched.total_rows = _parse_plan_rows(plan)
+        except Exception as e:
+            logger.debug("Row estimate unavailable: %s", e)
+    return fetched
+
+
+async def afetch_rows(
+    conn: AsyncConnection, sql: str, max_rows: int = MAX_FETCH_ROWS
+) -> FetchedResult:
+    """Async version of :func:`fetch_rows` using ``AsyncConnection.stream``."""
+    result = await conn.stream(text(sql), execution_options=_STREAM_OPTIONS)
+    try:
+        columns = list(result.keys())
+        if not columns:
+            return FetchedResult()
+        rows: list[Sequence[Any]] = []
+        while len(rows) <= max_rows:
+            size = min(FETCH_BATCH_SIZE, max_rows + 1 - len(rows))
+            batch = await result.fetchmany(size)
+            rows.extend(batch)
+            if len(batch) < size:
+                break
+    finally:
+        await result.close()
+
+    fetched, needs_estimate = _finish(columns, rows, max_rows)
+    if needs_estimate:
+        try:
+            plan = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar()
+            fetched.total_rows = _parse_plan_rows(plan)
+        except Exception as e:
+            logger.debug("Row estimate unavailable: %s", e)
+    return fetched
@@ -11,10 +11,14 @@ from langchain_core.prompts import FewShotPromptTemplate, PromptTemplate
 from langchain_core.runnables import Runnable
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
-from sqlalchemy import text
 from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncEngine
 
+from src.entity_memory import (
+    recall_sql_entities,
+    remember_sql_entities,
+    reuse_record,
+)
 from src.error_handling import (
     QueryExecutionError,
     async_execute_with_retry,
@@ -31,6 +35,9 @@ from src.product_and_schema_lookup import (
     validate_countries,
 )
 from src.prompts import SQL_RETRY_BLOCK, build_sql_generation_prefix
+from src.result_encoding import encode_table, truncate_to_token_budget
+from src.result_set import ResultSet
+from src.sql_execution import MAX_FETCH_ROWS, FetchedResult, afetch_rows, fetch_rows
 from src.sql_multiple_schemas import SQLDatabaseWithSchemas
 from src.sql_validation import validate_sql
 from src.state import AtlasAgentState, cap_snapshot_result
@@ -295,35 +302,39 @@ def get_table_info_for_schemas(
     registry.record_miss("table_info")
     logger.debug("Cache MISS for table_info key=%s", key)
 
-    # Get data schema tables (e.g. hs92.country_year, hs92.country_product_year_4, ...)
-    tables = get_tables_in_schemas(
-        table_descriptions=table_descriptions,
-        classification_schemas=classification_schemas,
-    )
-
-    # Add the specific classification lookup tables needed for JOINs
-    tables.extend(
-        _classification_tables_for_schemas(
-            classification_schemas, table_descriptions, requires_group_tables
+    def _build() -> str:
+        # Get data schema tables (e.g. hs92.country_year, hs92.country_product_year_4, ...)
+        tables = get_tables_in_schemas(
+            table_descriptions=table_descriptions,
+            classification_schemas=classification_schemas,
         )
-    )
 
-    # Exclude large group data tables (group_group_*) — we use aggregation
-    # via location_group_member instead.  Keep classification lookup tables.
-    tables = [table for table in tables if "group_group_" not in table["table_name"]]
-    table_info = ""
-    for table in tables:
-        try:
-            ddl = db.get_table_info(table_names=[table["table_name"]])
-        except Exception as e:
-            logger.warning("Skipping table %s: %s", table["table_name"], e)
-            continue
-        table_info += (
-            f"Table: {table['table_name']}\nDescription: {table['context_str']}\n"
+        # Add the specific classification lookup tables needed for JOINs
+        tables.extend(
+            _classification_tables_for_schemas(
+                classification_schemas, table_descriptions, requires_group_tables
+            )
         )
-        table_info += ddl
-        table_info += "\n\n"
 
+        # Exclude large group data tables (group_group_*) — we use aggregation
+        # via location_group_member instead.  Keep classification lookup tables.
+        tables = [t for t in tables if "group_group_" not in t["table_name"]]
+        table_info = ""
+        for table in tables:
+            try:
+                ddl = db.get_table_info(table_names=[table["table_name"]])
+            except Exception as e:
+                logger.warning("Skipping table %s: %s", table["table_name"], e)
+                continue
+            table_info += (
+                f"Table: {table['table_name']}\nDescription: {table['context_str']}\n"
+            )
+            table_info += ddl
+            table_info += "\n\n"
+        return table_info
+
+    # Other workers may already have reflected these tables (shared tier)
+    table_info = registry.read_through_sync("table_info", key, _build)
     table_info_cache[key] = table_info
     return table_info
 
@@ -359,30 +370,34 @@ async def aget_table_info_for_schemas(
     registry.record_miss("table_info")
     logger.debug("Cache MISS for table_info key=%s", key)
 
-    tables = get_tables_in_schemas(
-        table_descriptions=table_descriptions,
-        classification_schemas=classification_schemas,
-    )
-    tables.extend(
-        _classification_tables_for_schemas(
-            classification_schemas, table_descriptions, requires_group_tables
+    async def _build() -> str:
+        tables = get_tables_in_schemas(
+            table_descriptions=table_descriptions,
+            classification_schemas=classification_schemas,
         )
-    )
-    tables = [table for table in tables if "group_group_" not in table["table_name"]]
-
-    table_info = ""
-    for table in tables:
-        try:
-            ddl = await db.aget_table_info(table_names=[table["table_name"]])
-        except Exception as e:
-            logger.warning("Skipping table %s: %s", table["table_name"], e)
-            continue
-        table_info += (
-            f"Table: {table['table_name']}\nDescription: {table['context_str']}\n"
+        tables.extend(
+            _classification_tables_for_schemas(
+                classification_schemas, table_descriptions, requires_group_tables
+            )
         )
-        table_info += ddl
-        table_info += "\n\n"
+        tables = [t for t in tables if "group_group_" not in t["table_name"]]
+
+        table_info = ""
+        for table in tables:
+            try:
+                ddl = await db.aget_table_info(table_names=[table["table_name"]])
+            except Exception as e:
+                logger.warning("Skipping table %s: %s", table["table_name"], e)
+                continue
+            table_info += (
+                f"Table: {table['table_name']}\nDescription: {table['context_str']}\n"
+            )
+            table_info += ddl
+            table_info += "\n\n"
+        return table_info
 
+    # Other workers may already have reflected these tables (shared tier)
+    table_info = await registry.aread_through("table_info", key, _build)
     table_info_cache[key] = table_info
     return table_info
 
@@ -417,6 +432,23 @@ async def extract_products_node(
     from langchain_core.callbacks import UsageMetadataCallbackHandler
 
     async with node_timer("extract_products", "query_tool") as t:
+        recalled = recall_sql_entities(
+            state.get("sql_entity_memory"),
+            state["pipeline_question"],
+            override_schema=state.get("override_schema"),
+            override_mode=state.get("override_mode"),
+        )
+        if recalled is not None:
+            # Follow-up about the previous turn's entities: lookup_codes
+            # reuses the remembered codes as well.
+            products, codes = recalled
+            return {
+                "pipeline_products": products,
+                "pipeline_codes": codes,
+                "pipeline_entities_reused": True,
+                "entity_reuse": [reuse_record("extract_products", llm_calls=1)],
+                "step_timing": [t.record],
+            }
         try:
             usage_handler = UsageMetadataCallbackHandler()
             lookup = ProductAndSchemaLookup(llm=llm, connection=engine)
@@ -464,6 +496,7 @@ async def extract_products_node(
         except Exception as e:
             logger.error("extract_products_node failed: %s", e, exc_info=True)
             return {
+                "pipeline_entities_reused": False,
                 "last_error": f"Failed to extract products: {e}",
                 "step_timing": [t.record],
             }
@@ -473,6 +506,7 @@ async def extract_products_node(
     )
     return {
         "pipeline_products": products,
+        "pipeline_entities_reused": False,
         "token_usage": [usage_record],
         "step_timing": [t.record],
     }
@@ -489,10 +523,30 @@ async def lookup_codes_node(
     from langchain_core.callbacks import UsageMetadataCallbackHandler
 
     async with node_timer("lookup_codes", "query_tool") as t:
+        products = state.get("pipeline_products")
+        if state.get("pipeline_entities_reused"):
+            # extract_products already set the remembered pipeline_codes
+            reuse = (
+                [reuse_record("lookup_codes", llm_calls=1, lookups=1)]
+                if products and products.products
+                else []
+            )
+            return {"entity_reuse": reuse, "step_timing": [t.record]}
+        memory_kwargs = {
+            "override_schema": state.get("override_schema"),
+            "override_mode": state.get("override_mode"),
+        }
         try:
-            products = state.get("pipeline_products")
-            if not products or not products.products:
+            if not products:
                 return {"pipeline_codes": "", "step_timing": [t.record]}
+            if not products.products:
+                return {
+                    "pipeline_codes": "",
+                    "sql_entity_memory": remember_sql_entities(
+                        products, "", **memory_kwargs
+                    ),
+                    "step_timing": [t.record],
+                }
 
             lookup = ProductAndSchemaLookup(
                 llm=llm, connection=engine, async_engine=async_engine
@@ -526,8 +580,12 @@ async def lookup_codes_node(
     usage_record = make_usage_record_from_callback(
         "lookup_codes", "query_tool", usage_handler
     )
+    codes_str = format_product_codes_for_prompt(codes)
     return {
-        "pipeline_codes": format_product_codes_for_prompt(codes),
+        "pipeline_codes": codes_str,
+        "sql_entity_memory": remember_sql_entities(
+            products, codes_str, **memory_kwargs
+        ),
         "token_usage": [usage_record],
         "step_timing": [t.record],
     }
@@ -559,7 +617,33 @@ async def plan_sql_entities_node(
 
     from src.prompts import SQL_ENTITY_PLAN_PROMPT
 
+    override_schema = state.get("override_schema")
+    override_mode = state.get("override_mode")
+
     async with node_timer("plan_sql_entities", "query_tool") as t:
+        recalled = recall_sql_entities(
+            state.get("sql_entity_memory"),
+            state["pipeline_question"],
+            override_schema=override_schema,
+            override_mode=override_mode,
+        )
+        if recalled is not None:
+            products_found, codes_str = recalled
+            # Skipped: the product search and per-product code verification
+            # (when a search backend is configured) and country validation
+            lookups = 0
+            if product_search_backend is not None:
+                lookups += 1 + sum(1 for p in products_found.products if p.codes)
+            if products_found.countries and country_cache:
+                lookups += 1
+            return {
+                "pipeline_products": products_found,
+                "pipeline_codes": codes_str,
+                "entity_reuse": [
+                    reuse_record("plan_sql_entities", llm_calls=1, lookups=lookups)
+                ],
+                "step_timing": [t.record],
+            }
         try:
             question = state["pipeline_question"]
             context = state.get("pipeline_context", "")
@@ -606,9 +690,6 @@ async def plan_sql_entities_node(
             t.mark_llm(llm_start, time.monotonic())
 
             # --- Phase 3: Apply overrides ---
-            override_schema = state.get("override_schema")
-            override_mode = state.get("override_mode")
-
             if override_schema:
                 plan.classification_schemas = [override_schema]
                 for p in plan.products:
@@ -689,6 +770,12 @@ async def plan_sql_entities_node(
     return {
         "pipeline_products": products_found,
         "pipeline_codes": codes_str,
+        "sql_entity_memory": remember_sql_entities(
+            products_found,
+            codes_str,
+            override_schema=override_schema,
+            override_mode=override_mode,
+        ),
         "token_usage": [usage_record],
         "step_timing": [t.record],
     }
@@ -702,26 +789,22 @@ async def _gather_search_candidates(
     """Run product search for likely product terms in the question.
 
     Uses a simple heuristic: search the full question against each schema.
-    The LLM will refine which products are actually relevant.
+    The LLM will refine which products are actually relevant.  All schemas
+    are searched with one ``search_many`` call, so the question is embedded
+    only once.
     """
     if schemas is None:
         schemas = ["hs12", "hs92", "sitc", "services_unilateral"]
 
-    candidates: dict[str, list[dict]] = {}
-    tasks = []
-    for schema in schemas:
-        tasks.append(backend.search(question, schema, top_k=10))
-
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-    for schema, result in zip(schemas, results):
-        if isinstance(result, Exception):
-            logger.warning("Product search failed for schema %s: %s", schema, result)
-            continue
-        if result:
-            candidates[schema] = result
+    # search_many isolates per-schema failures; a backend lacking it is a bug
+    search_many = backend.search_many
+    try:
+        results = await search_many(question, schemas, top_k=10)
+    except Exception as e:
+        logger.warning("Product search failed for schemas %s: %s", schemas, e)
+        return {}
 
-    return candidates
+    return {schema: results[schema] for schema in schemas if results.get(schema)}
 
 
 def _format_search_candidates(candidates: dict[str, list[dict]]) -> str:
@@ -886,120 +969,99 @@ async def validate_sql_node(state: AtlasAgentState) -> dict:
 
 
 async def execute_sql_node(
-    state: AtlasAgentState, *, async_engine: AsyncEngine | Engine
+    state: AtlasAgentState,
+    *,
+    async_engine: AsyncEngine | Engine,
+    max_rows: int = MAX_FETCH_ROWS,
 ) -> dict:
     """Execute SQL via async or sync SQLAlchemy engine.
 
     Uses true async DB I/O when given an AsyncEngine (production path).
     Falls back to asyncio.to_thread with a sync Engine (test/legacy path).
+    Rows are streamed and capped at *max_rows* (see ``src.sql_execution``).
+    Results are served from ``sql_result_cache`` when an equivalent query
+    (per ``sql_result_key``) was executed recently.
 
     Returns structured columns/rows alongside the existing string representation
     and query execution timing in milliseconds.
     """
+    from src.cache import (
+        cache_sql_result,
+        registry,
+        sql_result_cache,
+        sql_result_cache_key,
+    )
+
     sql = state["pipeline_sql"]
     use_async = isinstance(async_engine, AsyncEngine)
     _empty_structured = {
         "pipeline_result_columns": [],
-        "pipeline_result_rows": [],
+        "pipeline_result_rows": ResultSet(),
         "pipeline_execution_time_ms": 0,
     }
 
-    async with node_timer("execute_sql", "query_tool") as t:
-        if use_async:
-
-            async def _run_query() -> tuple[str, list[str], list[list]]:
-                async with async_engine.connect() as conn:
-                    result = await conn.execute(text(sql))
-                    if not result.returns_rows:
-                        return "", [], []
-                    columns = list(result.keys())
-                    rows = result.fetchall()
-                    rows_as_lists = [list(row) for row in rows]
-                    if not rows:
-                        return "", columns, []
-                    result_str = "\n".join(str(dict(zip(columns, row))) for row in rows)
-                    return result_str, columns, rows_as_lists
+    def _error_update(e: Exception) -> dict:
+        return {
+            "pipeline_result": "",
+            "last_error": str(e),
+            "retry_count": state.get("retry_count", 0) + 1,
+            **_empty_structured,
+            "pipeline_sql_history": [
+                {"sql": sql, "stage": "execution_error", "errors": [str(e)]}
+            ],
+            "step_timing": [t.record],
+        }
 
-            try:
-                t0 = time.monotonic()
-                result_str, columns, rows = await async_execute_with_retry(_run_query)
-                elapsed_ms = int((time.monotonic() - t0) * 1000)
-                t.mark_io(t0, time.monotonic())
-            except QueryExecutionError as e:
-                logger.error("Query execution failed: %s", e)
-                return {
-                    "pipeline_result": "",
-                    "last_error": str(e),
-                    "retry_count": state.get("retry_count", 0) + 1,
-                    **_empty_structured,
-                    "pipeline_sql_history": [
-                        {"sql": sql, "stage": "execution_error", "errors": [str(e)]}
-                    ],
-                    "step_timing": [t.record],
-                }
-            except Exception as e:
-                logger.error("Unexpected error executing SQL: %s", e)
-                return {
-                    "pipeline_result": "",
-                    "last_error": str(e),
-                    "retry_count": state.get("retry_count", 0) + 1,
-                    **_empty_structured,
-                    "pipeline_sql_history": [
-                        {"sql": sql, "stage": "execution_error", "errors": [str(e)]}
-                    ],
-                    "step_timing": [t.record],
-                }
+    cache_key = sql_result_cache_key(sql, max_rows)
+    fetched = sql_result_cache.get(cache_key) if cache_key is not None else None
+
+    async with node_timer("execute_sql", "query_tool") as t:
+        if fetched is not None:
+            registry.record_hit("sql_result")
+            logger.debug("Cache HIT for sql_result")
+            elapsed_ms = 0
         else:
-            # Sync fallback (for tests or when async_engine is a sync Engine)
-            engine = async_engine
-
-            def _run_query_sync() -> tuple[str, list[str], list[list]]:
-                with engine.connect() as conn:
-                    result = conn.execute(text(sql))
-                    if not result.returns_rows:
-                        return "", [], []
-                    columns = list(result.keys())
-                    rows = result.fetchall()
-                    rows_as_lists = [list(row) for row in rows]
-                    if not rows:
-                        return "", columns, []
-                    result_str = "\n".join(str(dict(zip(columns, row))) for row in rows)
-                    return result_str, columns, rows_as_lists
+            registry.record_miss("sql_result")
+            if use_async:
+
+                async def _run_query() -> FetchedResult:
+                    async with async_engine.connect() as conn:
+                        return await afetch_rows(conn, sql, max_rows)
+
+                run = async_execute_with_retry(_run_query)
+            else:
+                # Sync fallback (for tests or when async_engine is a sync Engine)
+                engine = async_engine
+
+                def _run_query_sync() -> FetchedResult:
+                    with engine.connect() as conn:
+                        return fetch_rows(conn, sql, max_rows)
+
+                run = asyncio.to_thread(execute_with_retry, _run_query_sync)
 
             try:
                 t0 = time.monotonic()
-                result_str, columns, rows = await asyncio.to_thread(
-                    execute_with_retry, _run_query_sync
-                )
+                fetched = await run
                 elapsed_ms = int((time.monotonic() - t0) * 1000)
                 t.mark_io(t0, time.monotonic())
             except QueryExecutionError as e:
                 logger.error("Query execution failed: %s", e)
-                return {
-                    "pipeline_result": "",
-                    "last_error": str(e),
-                    "retry_count": state.get("retry_count", 0) + 1,
-                    **_empty_structured,
-                    "pipeline_sql_history": [
-                        {"sql": sql, "stage": "execution_error", "errors": [str(e)]}
-                    ],
-                    "step_timing": [t.record],
-                }
+                return _error_update(e)
             except Exception as e:
                 logger.error("Unexpected error executing SQL: %s", e)
-                return {
-                    "pipeline_result": "",
-                    "last_error": str(e),
-                    "retry_count": state.get("retry_count", 0) + 1,
-                    **_empty_structured,
-                    "pipeline_sql_history": [
-                        {"sql": sql, "stage": "execution_error", "errors": [str(e)]}
-                    ],
-                    "step_timing": [t.record],
-                }
+                return _error_update(e)
+
+            cache_sql_result(cache_key, fetched)
 
-    if not result_str or not result_str.strip():
+    columns, rows = fetched.columns, fetched.rows
+    result_str = encode_table(columns, rows)
+    if not result_str:
         result_str = "SQL query returned no results."
+    elif fetched.truncated:
+        result_str += (
+            f"\n[Fetching stopped at {len(rows):,} rows; total rows: "
+            f"{fetched.describe_total()}.]"
+        )
     return {
         "pipeline_result": result_str,
         "last_error": "",
@@ -1034,14 +1096,7 @@ async def format_results_node(state: AtlasAgentState) -> dict:
                 content = f"--- Assessment ---\n{assessment}\n--- Data ---\n{content}"
 
         # Cap response size to prevent context-window overflow
-        max_chars = 15_000
-        if len(content) > max_chars:
-            truncated_notice = (
-                f"\n\n[Response truncated from {len(content):,} to "
-                f"{max_chars:,} chars. "
-                f"The data above is partial — answer based on what is shown.]"
-            )
-            content = content[: max_chars - len(truncated_notice)] + truncated_notice
+        content = truncate_to_token_budget(content)
 
         messages: list[ToolMessage] = [
             ToolMessage(
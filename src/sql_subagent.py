@@ -45,6 +45,9 @@ from src.product_and_schema_lookup import (
 )
 from src.prompts import SQL_SUBAGENT_PROMPT
 from src.prompts._blocks import SQL_DATA_MAX_YEAR
+from src.result_encoding import encode_table
+from src.result_set import ResultSet
+from src.sql_execution import MAX_FETCH_ROWS, FetchedResult, afetch_rows, fetch_rows
 from src.sql_multiple_schemas import SQLDatabaseWithSchemas
 from src.sql_pipeline import get_table_info_for_schemas
 from src.sql_validation import validate_sql
@@ -170,7 +173,7 @@ class SQLSubAgentState(TypedDict):
     sql: str
     result: str
     result_columns: list[str]
-    result_rows: list[list]
+    result_rows: ResultSet
     execution_time_ms: int
     last_error: str
     iteration_count: int
@@ -321,8 +324,12 @@ async def execute_sql_tool_node(
     state: SQLSubAgentState,
     *,
     async_engine: AsyncEngine | Engine,
+    max_rows: int = MAX_FETCH_ROWS,
 ) -> dict:
-    """Validate and execute the SQL from the last tool_call."""
+    """Validate and execute the SQL from the last tool_call.
+
+    At most *max_rows* rows are fetched; see ``src.sql_execution``.
+    """
     last_msg = state["messages"][-1]
     tool_call = _find_tool_call(last_msg, "execute_sql")
     sql = tool_call["args"]["sql"]
@@ -345,61 +352,59 @@ async def execute_sql_tool_node(
             ],
         }
 
-    # Execute
+    # Execute (or serve an equivalent recent query from the result cache)
+    from src.cache import (
+        cache_sql_result,
+        registry,
+        sql_result_cache,
+        sql_result_cache_key,
+    )
+
     use_async = isinstance(async_engine, AsyncEngine)
+    cache_key = sql_result_cache_key(sql, max_rows)
+    fetched = sql_result_cache.get(cache_key) if cache_key is not None else None
     try:
-        if use_async:
-
-            async def _run_query() -> tuple[str, list[str], list[list]]:
-                async with async_engine.connect() as conn:
-                    result = await conn.execute(text(sql))
-                    if not result.returns_rows:
-                        return "", [], []
-                    columns = list(result.keys())
-                    rows = result.fetchall()
-                    rows_as_lists = [list(row) for row in rows]
-                    if not rows:
-                        return "", columns, []
-                    result_str = _format_result_rows(columns, rows_as_lists)
-                    return result_str, columns, rows_as_lists
-
-            t0 = time.monotonic()
-            result_str, columns, rows = await async_execute_with_retry(_run_query)
-            elapsed_ms = int((time.monotonic() - t0) * 1000)
+        if fetched is not None:
+            registry.record_hit("sql_result")
+            elapsed_ms = 0
+            logger.debug("Cache HIT for sql_result  rows=%d", len(fetched.rows))
         else:
-            engine = async_engine
-
-            def _run_query_sync() -> tuple[str, list[str], list[list]]:
-                with engine.connect() as conn:
-                    result = conn.execute(text(sql))
-                    if not result.returns_rows:
-                        return "", [], []
-                    columns = list(result.keys())
-                    rows = result.fetchall()
-                    rows_as_lists = [list(row) for row in rows]
-                    if not rows:
-                        return "", columns, []
-                    result_str = _format_result_rows(columns, rows_as_lists)
-                    return result_str, columns, rows_as_lists
-
-            t0 = time.monotonic()
-            result_str, columns, rows = await asyncio.to_thread(
-                execute_with_retry, _run_query_sync
+            registry.record_miss("sql_result")
+            if use_async:
+
+                async def _run_query() -> FetchedResult:
+                    async with async_engine.connect() as conn:
+                        return await afetch_rows(conn, sql, max_rows)
+
+                t0 = time.monotonic()
+                fetched = await async_execute_with_retry(_run_query)
+                elapsed_ms = int((time.monotonic() - t0) * 1000)
+            else:
+                engine = async_engine
+
+                def _run_query_sync() -> FetchedResult:
+                    with engine.connect() as conn:
+                        return fetch_rows(conn, sql, max_rows)
+
+                t0 = time.monotonic()
+                fetched = await asyncio.to_thread(execute_with_retry, _run_query_sync)
+                elapsed_ms = int((time.monotonic() - t0) * 1000)
+
+            cache_sql_result(cache_key, fetched)
+
+            # Record query metrics for observability
+            from src.db_pool_health import metrics as pool_metrics
+
+            engine_type = "async" if use_async else "sync"
+            pool_metrics.record_query(elapsed_ms, sql[:200], engine_type=engine_type)
+            logger.debug(
+                "%s query  elapsed=%dms  rows=%d  truncated=%s  sql=%s",
+                engine_type,
+                elapsed_ms,
+                len(fetched.rows),
+                fetched.truncated,
+                sql[:200],
             )
-            elapsed_ms = int((time.monotonic() - t0) * 1000)
-
-        # Record query metrics for observability
-        from src.db_pool_health import metrics as pool_metrics
-
-        engine_type = "async" if use_async else "sync"
-        pool_metrics.record_query(elapsed_ms, sql[:200], engine_type=engine_type)
-        logger.debug(
-            "%s query  elapsed=%dms  rows=%d  sql=%s",
-            engine_type,
-            elapsed_ms,
-            len(rows),
-            sql[:200],
-        )
 
     except (QueryExecutionError, Exception) as e:
         logger.error("SQL execution failed in sub-agent: %s", e)
@@ -418,6 +423,17 @@ async def execute_sql_tool_node(
             ],
         }
 
+    columns, rows = fetched.columns, fetched.rows
+    row_count = len(rows)
+    # Encoded once, at the size shown; only the footer's row count and
+    # min/max/sum of the omitted rows look at the whole result
+    shown_rows = (
+        RESULT_DISPLAY_ROWS
+        if fetched.truncated or row_count > RESULT_TRUNCATION_THRESHOLD
+        else None
+    )
+    result_str = encode_table(columns, rows, max_rows=shown_rows)
+
     # Prepend any validation warnings so the sub-agent LLM sees them
     warning_prefix = ""
     if validation.warnings:
@@ -427,19 +443,25 @@ async def execute_sql_tool_node(
         )
 
     # Format result for the agent
-    row_count = len(rows)
     if row_count == 0:
         display = (
             f"0 rows returned. Columns: {', '.join(columns) if columns else 'none'}\n\n"
             "Hint: Check product codes, table suffix (_1/_2/_4/_6), time period, "
             "or classification schema."
         )
-    elif row_count > RESULT_TRUNCATION_THRESHOLD:
-        truncated_str = _format_result_rows(columns, rows[:RESULT_DISPLAY_ROWS])
+    elif fetched.truncated:
+        display = (
+            f"Success. {row_count} rows fetched before hitting the {max_rows}-row "
+            f"cap; total rows: {fetched.describe_total()} "
+            f"(showing first {RESULT_DISPLAY_ROWS}):\n\n"
+            f"{result_str}\n\n"
+            "... (remaining rows not fetched — add filters, aggregation, or a "
+            "LIMIT if you need a complete result)"
+        )
+    elif shown_rows is not None:
         display = (
             f"Success. {row_count} rows returned (showing first {RESULT_DISPLAY_ROWS}):\n\n"
-            f"{truncated_str}\n\n"
-            f"... ({row_count - RESULT_DISPLAY_ROWS} more rows, {row_count} total)"
+            f"{result_str}"
         )
     else:
         display = f"Success. {row_count} rows returned:\n\n{result_str}"
@@ -947,6 +969,7 @@ def build_sql_subagent(
     async_engine: AsyncEngine | Engine | None = None,
     async_db=None,
     top_k: int = 15,
+    max_fetch_rows: int = MAX_FETCH_ROWS,
 ):
     """Build the SQL sub-agent subgraph.
 
@@ -959,6 +982,7 @@ def build_sql_subagent(
         async_engine: Async or sync engine for SQL execution.
         async_db: Optional AsyncSQLDatabaseWithSchemas for async DDL.
         top_k: Default row limit.
+        max_fetch_rows: Hard cap on rows fetched per executed query.
 
     Returns:
         A compiled LangGraph StateGraph.
@@ -976,7 +1000,9 @@ def build_sql_subagent(
     )
     builder.add_node(
         "execute_sql",
-        partial(execute_sql_tool_node, async_engine=_exec_engine),
+        partial(
+            execute_sql_tool_node, async_engine=_exec_engine, max_rows=max_fetch_rows
+        ),
     )
     # Use async_db for DDL if available; use async_engine for sample rows/table listing
     _explore_db = async_db if async_db is not None else db
@@ -1111,7 +1137,7 @@ async def sql_query_agent_node(
                 "pipeline_sql": "",
                 "pipeline_result": "",
                 "pipeline_result_columns": [],
-                "pipeline_result_rows": [],
+                "pipeline_result_rows": ResultSet(),
                 "pipeline_execution_time_ms": 0,
                 "last_error": upstream_error,
                 "retry_count": 0,
@@ -1146,7 +1172,7 @@ async def sql_query_agent_node(
                 "sql": "",
                 "result": "",
                 "result_columns": [],
-                "result_rows": [],
+                "result_rows": ResultSet(),
                 "execution_time_ms": 0,
                 "last_error": "",
                 "iteration_count": 0,
@@ -1166,7 +1192,7 @@ async def sql_query_agent_node(
                 "pipeline_sql": "",
                 "pipeline_result": "",
                 "pipeline_result_columns": [],
-                "pipeline_result_rows": [],
+                "pipeline_result_rows": ResultSet(),
                 "pipeline_execution_time_ms": 0,
                 "last_error": f"SQL sub-agent failed: {e}",
                 "retry_count": 0,
@@ -1207,7 +1233,7 @@ async def sql_query_agent_node(
         "pipeline_sql": result.get("sql", ""),
         "pipeline_result": result.get("result", ""),
         "pipeline_result_columns": result.get("result_columns", []),
-        "pipeline_result_rows": result.get("result_rows", []),
+        "pipeline_result_rows": result.get("result_rows", ResultSet()),
         "pipeline_execution_time_ms": result.get("execution_time_ms", 0),
         "last_error": result.get("last_error", ""),
         "retry_count": 0,
@@ -1232,12 +1258,3 @@ def _find_tool_call(msg: AIMessage, tool_name: str) -> dict:
             return tc
     # Fallback: return first tool_call
     return msg.tool_calls[0]
-
-
-def _format_result_rows(columns: list[str], rows: list[list]) -> str:
-    """Format result rows as a readable string with column headers."""
-    if not rows:
-        return ""
-    header = " | ".join(str(c) for c in columns)
-    data = "\n".join(" | ".join(str(v) for v in row) for row in rows)
-    return f"{header}\n{data}"
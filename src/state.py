@@ -11,6 +11,7 @@ from langgraph.graph.message import add_messages
 from typing_extensions import TypedDict
 
 from src.product_and_schema_lookup import SchemasAndProductsFound
+from src.result_set import ResultSet
 
 # Cap for result_content stored in call history snapshots.
 # Both SQL and GraphQL pipelines already truncate ToolMessage content at ~15K;
@@ -177,6 +178,45 @@ def add_graphql_atlas_links(
     return (existing or []) + (new or [])
 
 
+def add_parallel_results(
+    existing: list[dict] | None, new: list[dict] | None
+) -> list[dict]:
+    """Reducer that collects per-branch results of a parallel tool-call fan-out.
+
+    Every ``parallel_tool_call`` branch appends its record; the join node
+    writes ``None`` to clear the list once the branches have been merged.
+
+    Args:
+        existing: Records collected so far (may be None).
+        new: New records to append, or None to reset.
+
+    Returns:
+        Combined list of branch records (empty after a reset).
+    """
+    if new is None:
+        return []
+    return (existing or []) + new
+
+
+def add_entity_reuse(existing: list[dict] | None, new: list[dict] | None) -> list[dict]:
+    """Reducer that collects the current turn's entity-memory reuse records.
+
+    Each record names the node that reused remembered entities and the LLM
+    calls and lookups it avoided (see ``src.entity_memory``).  A new turn
+    writes ``None`` to start from an empty list.
+
+    Args:
+        existing: Records collected so far (may be None).
+        new: New records to append, or None to reset.
+
+    Returns:
+        Combined list of records (empty after a reset).
+    """
+    if new is None:
+        return []
+    return (existing or []) + new
+
+
 class AtlasAgentState(TypedDict):
     """State carried through each node of the Atlas agent graph.
 
@@ -193,9 +233,12 @@ class AtlasAgentState(TypedDict):
         pipeline_sql: Generated SQL query string.
         pipeline_result: Formatted query result string.
         pipeline_result_columns: Column names from the last executed query.
-        pipeline_result_rows: Row data from the last executed query.
+        pipeline_result_rows: Row data from the last executed query, stored
+            column-wise (see ``src.result_set``).
         pipeline_execution_time_ms: Query execution time in milliseconds.
         turn_summaries: Accumulated per-turn pipeline summaries (entities, queries, stats).
+        history_summary: Rolling summary of the turns the agent no longer sees
+            verbatim, as ``{"turns": n, "text": ...}`` (see ``src.agent_history``).
         override_schema: User-specified classification schema override.
         override_direction: User-specified trade direction override.
         override_mode: User-specified trade mode override (goods/services).
@@ -215,6 +258,16 @@ class AtlasAgentState(TypedDict):
         docs_context: Broader user context for the docs question.
         docs_selected_files: Filenames of documentation files selected by the LLM.
         docs_synthesis: Synthesized documentation response.
+        parallel_results: Per-branch records of a parallel tool-call fan-out,
+            cleared by ``merge_parallel_results`` (see ``src.parallel_tools``).
+        pipeline_entities_reused: Whether ``extract_products`` reused the
+            remembered SQL entities (so ``lookup_codes`` skips its work).
+        sql_entity_memory: Products, schemas, countries and codes the SQL
+            pipeline last resolved in this thread (see ``src.entity_memory``).
+        graphql_entity_memory: Catalog entries ``resolve_ids`` matched in
+            this thread, keyed by catalog and reference.
+        entity_reuse: This turn's records of LLM calls and lookups avoided
+            by reusing entity memory.
     """
 
     messages: Annotated[list[BaseMessage], add_messages]
@@ -230,12 +283,14 @@ class AtlasAgentState(TypedDict):
     pipeline_sql: str
     pipeline_result: str
     pipeline_result_columns: list[str]
-    pipeline_result_rows: list[list]
+    pipeline_result_rows: ResultSet
     pipeline_execution_time_ms: int
     pipeline_assessment: str
     pipeline_surface_to_agent: bool
     # Accumulated per-turn pipeline summaries (persisted in checkpoint)
     turn_summaries: Annotated[list[dict], add_turn_summaries]
+    # Rolling summary of older turns for the agent's context (persisted in checkpoint)
+    history_summary: dict | None
     # Accumulated LLM token usage records (per-node granularity)
     token_usage: Annotated[list[dict], add_token_usage]
     # Accumulated per-step timing records (wall clock, LLM, I/O per node)
@@ -277,3 +332,11 @@ class AtlasAgentState(TypedDict):
     docs_selected_files: list[str]
     docs_synthesis: str
     docs_retrieved_titles: list[str]
+    # === Parallel tool calls (transient; cleared by merge_parallel_results) ===
+    parallel_results: Annotated[list[dict], add_parallel_results]
+    # === Cross-turn entity memory (persisted in checkpoint) ===
+    pipeline_entities_reused: bool
+    sql_entity_memory: dict | None
+    graphql_entity_memory: dict | None
+    # Per-turn reuse records (reset by each new turn)
+    entity_reuse: Annotated[list[dict], add_entity_reuse]
@@ -1,10 +1,9 @@
-import datetime
+import asyncio
 import json
 import uuid
 import warnings
 from collections.abc import AsyncGenerator
 from dataclasses import dataclass
-from decimal import Decimal
 from pathlib import Path
 
 import sqlglot
@@ -14,11 +13,19 @@ from sqlalchemy import exc as sa_exc
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlglot import exp
 
-from src.config import AgentMode, create_router_llm, get_settings
+from src.config import (
+    AgentMode,
+    ProductSearchIndex,
+    create_router_llm,
+    get_settings,
+)
 from src.docs_pipeline import DOCS_PIPELINE_NODES
+from src.entity_memory import aggregate_reuse
 from src.graph import build_atlas_graph
 from src.graphql_pipeline import GRAPHQL_PIPELINE_NODES
+from src.parallel_tools import MERGE_NODE, PARALLEL_TOOL_NODE
 from src.persistence import AsyncCheckpointerManager
+from src.result_set import ResultSet, json_safe
 from src.sql_multiple_schemas import AsyncSQLDatabaseWithSchemas, SQLDatabaseWithSchemas
 from src.sql_pipeline import (
     PIPELINE_NODES as SQL_PIPELINE_NODES,
@@ -104,22 +111,15 @@ NODE_LABELS = {
 }
 
 
-def _json_safe(value: object) -> object:
-    """Convert non-JSON-serializable values to strings."""
-    if isinstance(value, Decimal):
-        return str(value)
-    if isinstance(value, (datetime.datetime, datetime.date)):
-        return value.isoformat()
-    return value
-
-
 def _json_safe_deep(obj: object) -> object:
     """Recursively make an object JSON-safe."""
     if isinstance(obj, dict):
         return {k: _json_safe_deep(v) for k, v in obj.items()}
+    if isinstance(obj, ResultSet):
+        return obj.to_json_rows()
     if isinstance(obj, (list, tuple)):
         return [_json_safe_deep(v) for v in obj]
-    return _json_safe(obj)
+    return json_safe(obj)
 
 
 def _extract_tables_from_sql(sql: str) -> list[str]:
@@ -292,6 +292,26 @@ def _extract_pipeline_state(node_name: str, state_snapshot: dict) -> dict:
     return base
 
 
+def _query_record(state: dict) -> dict:
+    """Describe the query held in a state's pipeline fields for AnswerResult."""
+    sql = state.get("pipeline_sql", "")
+    rows = state.get("pipeline_result_rows", [])
+    record = {
+        "sql": sql,
+        "columns": state.get("pipeline_result_columns", []),
+        "rows": _json_safe_deep(rows),
+        "row_count": len(rows),
+        "execution_time_ms": state.get("pipeline_execution_time_ms", 0),
+        "tables": _extract_tables_from_sql(sql),
+        "schema_name": None,
+    }
+    # Set schema_name from pipeline_products if available
+    products = state.get("pipeline_products")
+    if products and products.classification_schemas:
+        record["schema_name"] = products.classification_schemas[0]
+    return record
+
+
 @dataclass
 class AnswerResult:
     """Structured result from aanswer_question().
@@ -307,6 +327,8 @@ class AnswerResult:
         token_usage: Aggregated token usage by pipeline, or None.
         cost: Estimated cost breakdown by pipeline, or None.
         tool_call_counts: Tool invocation counts by name, or None.
+        entity_reuse: LLM calls and lookups avoided by reusing entities
+            resolved earlier in the thread, or None.
     """
 
     answer: str
@@ -319,6 +341,7 @@ class AnswerResult:
     cost: dict | None = None
     tool_call_counts: dict[str, int] | None = None
     step_timing: dict | None = None
+    entity_reuse: dict | None = None
 
 
 @dataclass
@@ -347,6 +370,7 @@ def _build_turn_summary(
     pipeline_steps: list[dict] | None = None,
     graphql_call_details: list[dict] | None = None,
     sql_call_details: list[dict] | None = None,
+    entity_reuse: dict | None = None,
 ) -> dict:
     """Build a turn summary dict from pipeline results.
 
@@ -360,12 +384,13 @@ def _build_turn_summary(
         pipeline_steps: Optional per-node step progression with detail.
         graphql_call_details: Optional per-call GraphQL pipeline snapshots.
         sql_call_details: Optional per-call SQL pipeline snapshots.
+        entity_reuse: Optional totals from :func:`src.entity_memory.aggregate_reuse`.
 
     Returns:
         A summary dict with entities, queries, total_rows, total_execution_time_ms,
         and optionally atlas_links, docs_consulted, graphql_summaries,
         total_graphql_time_ms, pipeline_steps, graphql_call_details,
-        sql_call_details.
+        sql_call_details, entity_reuse.
     """
     summary = {
         "entities": resolved_products,
@@ -387,6 +412,8 @@ def _build_turn_summary(
         summary["graphql_call_details"] = graphql_call_details
     if sql_call_details:
         summary["sql_call_details"] = sql_call_details
+    if entity_reuse:
+        summary["entity_reuse"] = entity_reuse
     return summary
 
 
@@ -418,7 +445,8 @@ class AtlasTextToSQL:
 
         Resets per-turn counters so that Turn N doesn't inherit
         Turn N-1's ``queries_executed`` / ``last_error`` / ``retry_count``
-        from the checkpoint.
+        / ``entity_reuse`` from the checkpoint.  The entity memories are
+        kept: follow-up questions reuse them.
 
         Args:
             question: The user's question.
@@ -433,8 +461,9 @@ class AtlasTextToSQL:
             "last_error": "",
             "retry_count": 0,
             "pipeline_result_columns": [],
-            "pipeline_result_rows": [],
+            "pipeline_result_rows": ResultSet(),
             "pipeline_execution_time_ms": 0,
+            "entity_reuse": None,
             "override_schema": override_schema,
             "override_direction": override_direction,
             "override_mode": override_mode,
@@ -467,6 +496,11 @@ class AtlasTextToSQL:
 
     async def aclose(self) -> None:
         """Async close — release async checkpointer and DB engines."""
+        from src.cache import data_version
+
+        await data_version.stop()
+        if getattr(self, "graphql_state_store", None) is not None:
+            await asyncio.to_thread(self.graphql_state_store.close)
         if hasattr(self, "_async_checkpointer_manager"):
             await self._async_checkpointer_manager.close()
         if hasattr(self, "async_engine"):
@@ -600,6 +634,7 @@ class AtlasTextToSQL:
 
         # Wire up GraphQL components (Explore + Country Pages clients, catalog caches)
         from src.cache import (
+            attach_catalog_snapshots,
             country_catalog,
             group_catalog,
             hs12_product_catalog,
@@ -608,21 +643,116 @@ class AtlasTextToSQL:
             sitc_product_catalog,
             wire_catalog_fetchers,
         )
-        from src.graphql_client import AtlasGraphQLClient, get_shared_budget_tracker
+        from src.graphql_client import (
+            AtlasGraphQLClient,
+            get_shared_budget_tracker,
+            set_shared_budget_tracker,
+        )
+        from src.graphql_shared_state import (
+            SharedBudgetTracker,
+            SharedCircuitBreaker,
+            create_state_store,
+        )
+
+        # Pool limits, keep-alive and HTTP/2 for every outbound HTTP client
+        from src.http_clients import (
+            gemini_http_client,
+            openai_http_client,
+            outbound_http,
+        )
 
+        outbound_http.configure(
+            http2=_settings.outbound_http2,
+            max_connections=_settings.outbound_max_connections,
+            max_keepalive_connections=_settings.outbound_keepalive_connections,
+            keepalive_expiry=_settings.outbound_keepalive_expiry,
+            warm_connections=_settings.outbound_warm_connections,
+        )
+
+        # Budget and breaker state shared by all workers, so the budget is
+        # per deployment rather than per process
+        state_store = create_state_store(
+            _settings.graphql_shared_state,
+            default_sqlite_path=BASE_DIR / "cache" / "graphql_state.db",
+        )
+        instance.graphql_state_store = state_store
+        set_shared_budget_tracker(
+            SharedBudgetTracker(
+                store=state_store,
+                admission=_settings.graphql_budget_admission,
+                max_queue_wait=_settings.graphql_budget_max_wait_seconds,
+            )
+        )
         budget_tracker = get_shared_budget_tracker()
         graphql_client = AtlasGraphQLClient(
             base_url=_settings.graphql_explore_url,
             timeout=30.0,
             budget_tracker=budget_tracker,
+            circuit_breaker=SharedCircuitBreaker(store=state_store, name="explore"),
+            cache_responses=True,
         )
         country_pages_client = AtlasGraphQLClient(
             base_url=_settings.graphql_country_pages_url,
             timeout=30.0,
             budget_tracker=budget_tracker,
+            circuit_breaker=SharedCircuitBreaker(
+                store=state_store, name="country_pages"
+            ),
+            cache_responses=True,
+            # Country Pages has the slow tail; a hedge after p95 trims it
+            hedge=_settings.graphql_hedge_country_pages,
         )
+        instance.graphql_clients = {
+            "explore": graphql_client,
+            "country_pages": country_pages_client,
+        }
         wire_catalog_fetchers(graphql_client)
 
+        # Open upstream connections now, so the first requests after a
+        # scale-up do not pay DNS + TCP + TLS
+        for client in instance.graphql_clients.values():
+            client.open_pool()
+        if _settings.openai_api_key:
+            openai_http_client()
+        if _settings.google_api_key:
+            gemini_http_client()
+        await outbound_http.warm_up()
+
+        # Data release fingerprint: scopes data cache keys, polled for changes
+        from src.cache import data_version, wire_data_version_probes
+
+        wire_data_version_probes(instance.async_engine, graphql_client)
+        data_version.poll_interval = _settings.data_version_poll_seconds
+        await data_version.check()
+        data_version.start()
+
+        # Shared on-disk tier of the query embedding cache
+        from src.cache import query_embedding_cache
+
+        if _settings.embedding_cache_path.lower() != "none":
+            query_embedding_cache.attach_disk(
+                Path(_settings.embedding_cache_path)
+                if _settings.embedding_cache_path
+                else BASE_DIR / "cache" / "query_embeddings.db"
+            )
+
+        # Shared tiers for the per-query caches (product details, text search, DDL,
+        # GraphQL responses)
+        from src.cache import attach_shared_backends
+
+        attach_shared_backends(
+            _settings.cache_backends,
+            default_sqlite_path=BASE_DIR / "cache" / "shared_cache.db",
+        )
+
+        # Catalog snapshots: the first worker fetches, the others load its files
+        if _settings.catalog_snapshot_dir.lower() != "none":
+            attach_catalog_snapshots(
+                Path(_settings.catalog_snapshot_dir)
+                if _settings.catalog_snapshot_dir
+                else BASE_DIR / "cache" / "catalogs"
+            )
+
         # Warm all catalog caches at startup (idempotent, has stampede prevention)
         import asyncio
 
@@ -667,13 +797,25 @@ class AtlasTextToSQL:
         _product_search = None
         if _settings.use_merged_extraction:
             try:
-                from src.product_search import EmbeddingProductSearch
+                from src.product_search import (
+                    EmbeddingProductSearch,
+                    NumpyProductSearch,
+                )
 
                 _product_index_path = BASE_DIR / "src" / "product_search.db"
                 if _product_index_path.exists():
-                    _product_search = EmbeddingProductSearch(_product_index_path)
+                    if _settings.product_search_index == ProductSearchIndex.SQLITE_VEC:
+                        _product_search = EmbeddingProductSearch(_product_index_path)
+                    else:
+                        _product_search = NumpyProductSearch.from_index(
+                            _product_index_path,
+                            quantize=_settings.product_search_index
+                            == ProductSearchIndex.NUMPY_INT8,
+                        )
                     _docs_logger.info(
-                        "Product search index loaded from %s", _product_index_path
+                        "Product search index (%s) loaded from %s",
+                        _settings.product_search_index,
+                        _product_index_path,
                     )
                 else:
                     _docs_logger.warning(
@@ -719,6 +861,10 @@ class AtlasTextToSQL:
             docs_index=_docs_index,
             product_search_backend=_product_search,
             use_merged_extraction=_use_merged,
+            max_fetch_rows=_settings.max_fetch_rows,
+            entity_choice_cache_scope=_settings.entity_choice_cache_scope,
+            agent_history_turns=_settings.agent_history_turns,
+            agent_history_summary=_settings.agent_history_summary,
         )
 
         return instance
@@ -768,26 +914,20 @@ class AtlasTextToSQL:
             message = step["messages"][-1]
             last_state = step
 
+            # Parallel tool calls: one query per branch, recorded before the
+            # join node bumps queries_executed for all of them at once.
+            branches = step.get("parallel_results") or []
+            for branch in branches:
+                if branch["queries"]:
+                    queries.append(_query_record(branch["state"]))
+            if branches:
+                prev_queries_executed += sum(b["queries"] for b in branches)
+
             # Detect when a new query has been executed
             current_queries_executed = step.get("queries_executed", 0)
             if current_queries_executed > prev_queries_executed:
-                sql = step.get("pipeline_sql", "")
-                queries.append(
-                    {
-                        "sql": sql,
-                        "columns": step.get("pipeline_result_columns", []),
-                        "rows": _json_safe_deep(step.get("pipeline_result_rows", [])),
-                        "row_count": len(step.get("pipeline_result_rows", [])),
-                        "execution_time_ms": step.get("pipeline_execution_time_ms", 0),
-                        "tables": _extract_tables_from_sql(sql),
-                        "schema_name": None,
-                    }
-                )
-                # Set schema_name from pipeline_products if available
-                products = step.get("pipeline_products")
-                if products and products.classification_schemas:
-                    queries[-1]["schema_name"] = products.classification_schemas[0]
-                prev_queries_executed = current_queries_executed
+                queries.append(_query_record(step))
+            prev_queries_executed = max(prev_queries_executed, current_queries_executed)
 
         # Extract resolved products from the final state
         resolved_products = None
@@ -834,6 +974,7 @@ class AtlasTextToSQL:
         # Read call histories from accumulators
         graphql_call_details = last_state.get("graphql_call_history", [])
         sql_call_details = last_state.get("sql_call_history", [])
+        entity_reuse = aggregate_reuse(last_state.get("entity_reuse"))
 
         # Persist turn summary to checkpoint for history restoration
         summary = _build_turn_summary(
@@ -842,6 +983,7 @@ class AtlasTextToSQL:
             pipeline_steps=pipeline_steps or None,
             graphql_call_details=graphql_call_details or None,
             sql_call_details=sql_call_details or None,
+            entity_reuse=entity_reuse,
         )
         await self.agent.aupdate_state(config, {"turn_summaries": [summary]})
 
@@ -873,6 +1015,7 @@ class AtlasTextToSQL:
             cost=cost,
             tool_call_counts=tool_counts,
             step_timing=step_timing,
+            entity_reuse=entity_reuse,
         )
 
     async def astream_agent_response(
@@ -1040,6 +1183,57 @@ class AtlasTextToSQL:
                                     )
                                 # Reset for next agent turn
                                 agent_talk_emitted_from_messages = False
+                elif PARALLEL_TOOL_NODE in stream_data:
+                    # One branch of a parallel fan-out finished.  Replay its
+                    # pipeline as if it had run on its own.
+                    in_tool_stream = True
+                    node_update = stream_data[PARALLEL_TOOL_NODE]
+                    for branch in node_update.get("parallel_results", []):
+                        if pipeline_started:
+                            query_index += 1
+                            yield (
+                                stream_mode,
+                                StreamData(
+                                    source="agent",
+                                    content="",
+                                    message_type="tool_call",
+                                    tool_call=branch["tool"],
+                                ),
+                            )
+                        pipeline_started = True
+                        pipeline_snapshot = {
+                            key: value
+                            for key, value in node_update.items()
+                            if key not in ("messages", "parallel_results")
+                        }
+                        pipeline_snapshot.update(branch["state"])
+                        for node_name in branch["nodes"]:
+                            if node_name in ALL_PIPELINE_NODES:
+                                yield stream_mode, _make_node_start(node_name)
+                                yield stream_mode, _make_pipeline_state(node_name)
+                    for msg in node_update.get("messages", []):
+                        if isinstance(msg, ToolMessage) and msg.content:
+                            yield (
+                                stream_mode,
+                                StreamData(
+                                    source="tool",
+                                    content=msg.content,
+                                    message_type="tool_output",
+                                    name=msg.name,
+                                ),
+                            )
+                elif MERGE_NODE in stream_data:
+                    # Error replies for calls the fan-out did not run
+                    for msg in stream_data[MERGE_NODE].get("messages", []):
+                        yield (
+                            stream_mode,
+                            StreamData(
+                                source="tool",
+                                content=msg.content,
+                                message_type="tool_output",
+                                name=msg.name,
+                            ),
+                        )
                 else:
                     pipeline_keys = set(stream_data.keys()) & ALL_PIPELINE_NODES
                     if pipeline_keys:
@@ -0,0 +1,254 @@
+"""Tests for src/agent_history.py — the agent's windowed view of the history."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.agent_history import (
+    TOOL_CALL_NUDGE_PREFIX,
+    build_history_view,
+    condense_turn,
+    split_turns,
+    turn_digest,
+)
+
+BIG_RESULT = "year,export_value\n" + "\n".join(f"{y},{y * 1000}" for y in range(2000))
+
+
+def _turn(index: int, *, tool_calls: int = 1) -> list:
+    """One user turn: question, tool calls with results, final answer."""
+    ids = [f"call_{index}_{n}" for n in range(tool_calls)]
+    return [
+        HumanMessage(content=f"Question {index}?"),
+        AIMessage(
+            content="",
+            tool_calls=[
+                {"id": i, "name": "query_tool", "args": {"question": f"q{index}"}}
+                for i in ids
+            ],
+        ),
+        *(
+            ToolMessage(content=BIG_RESULT, tool_call_id=i, name="query_tool")
+            for i in ids
+        ),
+        AIMessage(content=f"Answer {index}."),
+    ]
+
+
+def _summary(index: int) -> dict:
+    return {
+        "entities": {
+            "schemas": ["hs92"],
+            "products": [{"name": "coffee", "codes": ["0901"], "schema": "hs92"}],
+            "countries": [{"name": "Kenya", "iso3_code": "KEN"}],
+        },
+        "queries": [
+            {
+                "sql": f"SELECT year, export_value\nFROM hs92.t{index}",
+                "columns": ["year", "export_value"],
+                "row_count": 2000,
+            }
+        ],
+    }
+
+
+def _assert_tool_calls_paired(messages: list) -> None:
+    """Every tool call is answered, and every ToolMessage answers a call."""
+    calls = [
+        tc["id"]
+        for m in messages
+        if isinstance(m, AIMessage) and m.tool_calls
+        for tc in m.tool_calls
+    ]
+    results = [m.tool_call_id for m in messages if isinstance(m, ToolMessage)]
+    assert sorted(calls) == sorted(results)
+
+
+class TestSplitTurns:
+    def test_turns_start_at_user_messages(self):
+        messages = _turn(0) + _turn(1)
+
+        assert [len(t) for t in split_turns(messages)] == [4, 4]
+
+    def test_nudge_continues_the_turn(self):
+        messages = [
+            HumanMessage(content="Hi"),
+            AIMessage(content="Hello"),
+            HumanMessage(content=f"{TOOL_CALL_NUDGE_PREFIX} data questions."),
+            AIMessage(content="Hello again"),
+        ]
+
+        assert len(split_turns(messages)) == 1
+
+
+class TestTurnDigest:
+    def test_digest_lists_entities_and_queries(self):
+        digest = turn_digest(_summary(0))
+
+        assert "coffee (hs92: 0901)" in digest
+        assert "Kenya (KEN)" in digest
+        assert "SQL (2000 rows; columns: year, export_value): SELECT year" in digest
+
+    def test_empty_summary(self):
+        assert turn_digest(None) == ""
+        assert turn_digest({"entities": None, "queries": []}) == ""
+
+    def test_graphql_and_docs(self):
+        digest = turn_digest(
+            {
+                "graphql_summaries": [
+                    {
+                        "classification": {"query_type": "country_profile"},
+                        "entities": {"country": "Kenya"},
+                    }
+                ],
+                "docs_consulted": ["eci.md"],
+            }
+        )
+
+        assert 'GraphQL country_profile: {"country": "Kenya"}' in digest
+        assert "Docs consulted: eci.md" in digest
+
+
+class TestCondenseTurn:
+    def test_first_result_gets_digest_others_a_pointer(self):
+        condensed = condense_turn(_turn(0, tool_calls=2), _summary(0))
+        tool_msgs = [m for m in condensed if isinstance(m, ToolMessage)]
+
+        assert "Turn digest" in tool_msgs[0].content
+        assert "see the turn digest above" in tool_msgs[1].content
+        assert [m.tool_call_id for m in tool_msgs] == ["call_0_0", "call_0_1"]
+        assert tool_msgs[0].name == "query_tool"
+
+    def test_without_summary_keeps_head(self):
+        condensed = condense_turn(_turn(0), None)
+        tool_msg = next(m for m in condensed if isinstance(m, ToolMessage))
+
+        assert tool_msg.content.startswith(BIG_RESULT[:300])
+        assert tool_msg.content.endswith("[truncated]")
+
+    def test_short_results_unchanged(self):
+        turn = _turn(0)
+        turn[2] = ToolMessage(content="42", tool_call_id="call_0_0")
+
+        assert condense_turn(turn, _summary(0))[2].content == "42"
+
+
+class TestBuildHistoryView:
+    async def test_short_history_sent_unchanged(self):
+        messages = _turn(0) + _turn(1)
+
+        view = await build_history_view(
+            messages, turn_summaries=[_summary(0)], keep_turns=2
+        )
+
+        assert view.messages == messages
+        assert view.tokens_saved == 0
+
+    async def test_disabled_with_zero_turns(self):
+        messages = _turn(0) + _turn(1) + _turn(2)
+
+        view = await build_history_view(messages, turn_summaries=[], keep_turns=0)
+
+        assert view.messages == messages
+
+    async def test_older_tool_results_condensed(self):
+        messages = _turn(0) + _turn(1) + _turn(2)
+        summaries = [_summary(0), _summary(1)]
+
+        view = await build_history_view(
+            messages, turn_summaries=summaries, keep_turns=1
+        )
+
+        assert len(view.messages) == len(messages)
+        _assert_tool_calls_paired(view.messages)
+        assert "FROM hs92.t0" in view.messages[2].content
+        assert "FROM hs92.t1" in view.messages[6].content
+        assert view.messages[10].content == BIG_RESULT  # current turn verbatim
+        assert view.tokens_saved > 2000
+        # The input messages (checkpoint history) are not modified
+        assert messages[2].content == BIG_RESULT
+
+    async def test_rolling_summary_replaces_old_turns(self):
+        messages = _turn(0) + _turn(1) + _turn(2)
+        summary_llm = MagicMock()
+        summary_llm.ainvoke = AsyncMock(
+            return_value=AIMessage(content="Kenya coffee exports, 2000 rows.")
+        )
+
+        view = await build_history_view(
+            messages,
+            turn_summaries=[_summary(0), _summary(1)],
+            keep_turns=1,
+            summary_llm=summary_llm,
+        )
+
+        assert view.messages == _turn(2)
+        assert view.summary == "Kenya coffee exports, 2000 rows."
+        assert view.history_summary == {
+            "turns": 2,
+            "text": "Kenya coffee exports, 2000 rows.",
+        }
+        assert view.summary_message is not None
+        prompt = summary_llm.ainvoke.call_args.args[0]
+        assert "User: Question 0?" in prompt and "Assistant: Answer 1." in prompt
+
+    async def test_rolling_summary_only_extended_for_new_turns(self):
+        messages = _turn(0) + _turn(1) + _turn(2)
+        summary_llm = MagicMock()
+        summary_llm.ainvoke = AsyncMock()
+
+        view = await build_history_view(
+            messages,
+            turn_summaries=[],
+            keep_turns=1,
+            history_summary={"turns": 2, "text": "Earlier: Kenya coffee."},
+            summary_llm=summary_llm,
+        )
+
+        summary_llm.ainvoke.assert_not_awaited()
+        assert view.summary == "Earlier: Kenya coffee."
+        assert view.history_summary is None
+        assert view.messages == _turn(2)
+
+    async def test_summary_failure_condenses_uncovered_turns(self):
+        messages = _turn(0) + _turn(1) + _turn(2)
+        summary_llm = MagicMock()
+        summary_llm.ainvoke = AsyncMock(side_effect=RuntimeError("rate limited"))
+
+        view = await build_history_view(
+            messages,
+            turn_summaries=[_summary(0), _summary(1)],
+            keep_turns=1,
+            history_summary={"turns": 1, "text": "Turn 0 summary."},
+            summary_llm=summary_llm,
+        )
+
+        assert view.summary == "Turn 0 summary."
+        assert view.history_summary is None
+        assert view.messages[0].content == "Question 1?"
+        assert "FROM hs92.t1" in view.messages[2].content
+        _assert_tool_calls_paired(view.messages)
+
+    async def test_stub_for_dropped_tool_call_removed(self):
+        """An orphan-repair stub answering a summarized turn is not sent."""
+        orphan = [
+            HumanMessage(content="Question 0?"),
+            AIMessage(
+                content="",
+                tool_calls=[{"id": "call_orphan", "name": "query_tool", "args": {}}],
+            ),
+        ]
+        stub = ToolMessage(content="[cancelled]", tool_call_id="call_orphan")
+        messages = orphan + _turn(1) + [stub]
+
+        view = await build_history_view(
+            messages,
+            turn_summaries=[],
+            keep_turns=1,
+            history_summary={"turns": 1, "text": "Cancelled question."},
+            summary_llm=MagicMock(),
+        )
+
+        assert stub not in view.messages
+        _assert_tool_calls_paired(view.messages)
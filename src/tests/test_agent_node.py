@@ -1,6 +1,7 @@
 """Unit tests for src/agent_node.py — mode resolution and tool binding."""
 
-from unittest.mock import MagicMock
+import time
+from unittest.mock import AsyncMock, MagicMock
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 
@@ -76,6 +77,16 @@ class TestResolveEffectiveMode:
         result = resolve_effective_mode(AgentMode.AUTO, budget)
         assert result == AgentMode.SQL_ONLY
 
+    def test_mode_resolution_auto_queue_mode_waits_for_next_token(self):
+        """AUTO + full window in queue mode stays GRAPHQL_SQL if a token frees soon."""
+        budget = GraphQLBudgetTracker(
+            max_requests=1, window_seconds=5.0, admission="queue", max_queue_wait=10.0
+        )
+        budget._timestamps.append(time.monotonic())
+        assert resolve_effective_mode(AgentMode.AUTO, budget) == AgentMode.GRAPHQL_SQL
+        budget.max_queue_wait = 1.0
+        assert resolve_effective_mode(AgentMode.AUTO, budget) == AgentMode.SQL_ONLY
+
     def test_mode_resolution_auto_with_none_budget(self):
         """AUTO + None budget → effective mode is SQL_ONLY (no GraphQL available)."""
         result = resolve_effective_mode(AgentMode.AUTO, None)
@@ -649,3 +660,115 @@ class TestOrphanToolCallRepair:
         returned_stubs = [m for m in result["messages"] if isinstance(m, ToolMessage)]
         stub_ids = {m.tool_call_id for m in returned_stubs}
         assert stub_ids == {"call_A", "call_B"}
+
+
+# ---------------------------------------------------------------------------
+# Tests: history window
+# ---------------------------------------------------------------------------
+
+
+def _past_turn(index: int) -> list:
+    call_id = f"call_{index}"
+    return [
+        HumanMessage(content=f"Question {index}?"),
+        AIMessage(
+            content="",
+            tool_calls=[
+                {"id": call_id, "name": "query_tool", "args": {"question": "q"}}
+            ],
+        ),
+        ToolMessage(content="x" * 15000, tool_call_id=call_id, name="query_tool"),
+        AIMessage(content=f"Answer {index}."),
+    ]
+
+
+class TestHistoryWindow:
+    """The agent LLM sees a windowed history; the state keeps all of it."""
+
+    @staticmethod
+    def _capturing_llm(captured: list) -> MagicMock:
+        mock_bound = MagicMock()
+
+        async def _capture(messages):
+            captured.extend(messages)
+            return AIMessage(
+                content="answer",
+                usage_metadata={
+                    "input_tokens": 100,
+                    "output_tokens": 10,
+                    "total_tokens": 110,
+                },
+            )
+
+        mock_bound.ainvoke = _capture
+        mock_llm = MagicMock()
+        mock_llm.bind_tools.return_value = mock_bound
+        return mock_llm
+
+    async def test_old_tool_results_condensed_and_savings_reported(self):
+        captured: list = []
+        node = make_agent_node(
+            llm=self._capturing_llm(captured),
+            agent_mode=AgentMode.SQL_ONLY,
+            max_uses=3,
+            top_k_per_query=15,
+            history_turns=1,
+        )
+        messages = _past_turn(0) + [HumanMessage(content="And in 2015?")]
+        summary = {"entities": None, "queries": [{"sql": "SELECT 1", "row_count": 1}]}
+
+        result = await node(_base_state(messages=messages, turn_summaries=[summary]))
+
+        sent_tool = next(m for m in captured if isinstance(m, ToolMessage))
+        assert sent_tool.tool_call_id == "call_0"
+        assert "SELECT 1" in sent_tool.content
+        assert len(sent_tool.content) < 1000
+        assert messages[2].content == "x" * 15000
+        (record,) = result["token_usage"]
+        assert record["history_tokens_saved"] > 4000
+        assert "history_summary" not in result
+
+    async def test_rolling_summary_in_system_prompt(self):
+        captured: list = []
+        summary_llm = MagicMock()
+        summary_llm.ainvoke = AsyncMock(
+            return_value=AIMessage(content="User asked about Kenya coffee.")
+        )
+        node = make_agent_node(
+            llm=self._capturing_llm(captured),
+            agent_mode=AgentMode.SQL_ONLY,
+            max_uses=3,
+            top_k_per_query=15,
+            history_turns=1,
+            summary_llm=summary_llm,
+        )
+        messages = _past_turn(0) + [HumanMessage(content="And in 2015?")]
+
+        result = await node(_base_state(messages=messages, turn_summaries=[]))
+
+        assert isinstance(captured[0], SystemMessage)
+        assert "User asked about Kenya coffee." in captured[0].content
+        assert captured[1:] == [messages[-1]]
+        assert result["history_summary"] == {
+            "turns": 1,
+            "text": "User asked about Kenya coffee.",
+        }
+        assert [r["node"] for r in result["token_usage"]] == [
+            "agent_history_summary",
+            "agent",
+        ]
+
+    async def test_full_history_by_default(self):
+        captured: list = []
+        node = make_agent_node(
+            llm=self._capturing_llm(captured),
+            agent_mode=AgentMode.SQL_ONLY,
+            max_uses=3,
+            top_k_per_query=15,
+        )
+        messages = _past_turn(0) + [HumanMessage(content="And in 2015?")]
+
+        result = await node(_base_state(messages=messages))
+
+        assert captured[1:] == messages
+        assert "history_tokens_saved" not in result["token_usage"][0]
@@ -226,6 +226,7 @@ class TestChat:
             "cost",
             "tool_call_counts",
             "step_timing",
+            "entity_reuse",
         }
         assert set(data.keys()) == expected_keys
 
@@ -1,13 +1,29 @@
 """Tests for src/cache.py — cache behavior that matters for correctness."""
 
+import asyncio
+
 import pytest
 
 from src.cache import (
     CacheRegistry,
+    DataVersion,
+    EmbeddingCache,
+    WeightedTTLCache,
+    embedding_key,
+    entity_choice_key,
+    estimate_nbytes,
+    graphql_response_key,
+    normalize_graphql_query,
     product_details_key,
+    sql_result_cache_key,
+    sql_result_key,
+    sql_result_sizeof,
     table_info_key,
     text_search_key,
 )
+from src.cache_backends import SQLiteCacheBackend
+from src.result_set import ResultSet
+from src.sql_execution import FetchedResult
 
 # --- Key normalization: equivalent queries must share cache entries ---
 
@@ -45,6 +61,39 @@ class TestKeyNormalization:
         k2 = table_info_key(["hs22", "hs92"])
         assert k1 == k2
 
+    def test_graphql_query_layout_and_comments_are_ignored(self):
+        """Templates and the LLM format the same query differently."""
+        compact = normalize_graphql_query(
+            "query($id: ID!) { countryProfile(location: $id, year: 2022) { gdp } }"
+        )
+        spread = normalize_graphql_query(
+            """
+            # profile lookup
+            query ($id: ID!) {
+              countryProfile(location: $id year: 2022) {
+                gdp
+              }
+            }
+            """
+        )
+        assert (
+            compact
+            == spread
+            == ("query($id:ID!){countryProfile(location:$id year:2022){gdp}}")
+        )
+
+    def test_graphql_string_literals_are_kept(self):
+        assert normalize_graphql_query('{ f(q: "a  b, #c") }') == '{f(q:"a  b, #c")}'
+        assert normalize_graphql_query('{ f(q: "a") }') != normalize_graphql_query(
+            '{ f(q: "A") }'
+        )
+
+    def test_graphql_variables_order_does_not_matter(self):
+        k1 = graphql_response_key("u", "{ x }", {"a": 1, "b": [2]})
+        k2 = graphql_response_key("u", "{x}", {"b": [2], "a": 1})
+        assert k1 == k2
+        assert k1 != graphql_response_key("other", "{ x }", {"a": 1, "b": [2]})
+
 
 # --- Registry: only the behaviors needed for observability ---
 
@@ -95,3 +144,373 @@ class TestCacheStats:
         r = CacheRegistry()
         r.create("empty", maxsize=10, ttl=60)
         assert r.stats()["empty"]["hit_rate"] == 0.0
+
+    def test_calls_saved_reported_and_reset(self):
+        r = CacheRegistry()
+        r.create("choices", maxsize=10, ttl=60)
+        assert "calls_saved" not in r.stats()["choices"]
+        r.record_calls_saved("choices")
+        r.record_calls_saved("choices", 2)
+        assert r.stats()["choices"]["calls_saved"] == 3
+        r.clear_all()
+        assert "calls_saved" not in r.stats()["choices"]
+
+
+# --- Entity choice cache: memoized LLM disambiguation decisions ---
+
+
+class TestEntityChoiceCache:
+    def test_key_ignores_case_whitespace_and_candidate_order(self):
+        k1 = entity_choice_key(" Congo ", "country_catalog", ["178", "180"])
+        k2 = entity_choice_key("congo", "country_catalog", ["180", "178"])
+        assert k1 == k2
+        assert k1 != entity_choice_key("congo", "country_catalog", ["178"])
+        assert k1 != entity_choice_key("congo", "group_catalog", ["178", "180"])
+
+    def test_question_scoped_keys_differ_by_question(self):
+        k1 = entity_choice_key("chips", "hs12", ["1", "2"], question="potato chips?")
+        k2 = entity_choice_key("chips", "hs12", ["1", "2"], question="micro chips?")
+        assert k1 != k2
+
+    async def test_choices_persist_in_the_shared_tier(self, tmp_path):
+        """A decision stored by one process is read back after a restart."""
+        key = entity_choice_key("congo", "country_catalog", ["178", "180"])
+        backend = SQLiteCacheBackend(tmp_path / "shared.db")
+        r = CacheRegistry()
+        r.create("entity_choice", maxsize=10, ttl=60)
+        r.attach_backend("entity_choice", backend)
+        await r.aset("entity_choice", key, "180")
+        backend.close()
+
+        backend = SQLiteCacheBackend(tmp_path / "shared.db")
+        restarted = CacheRegistry()
+        cache = restarted.create("entity_choice", maxsize=10, ttl=60)
+        restarted.attach_backend("entity_choice", backend)
+        assert await restarted.aget("entity_choice", ("other",)) is None
+        assert await restarted.aget("entity_choice", key) == "180"
+        assert cache[key] == "180"  # copied into the in-process tier
+        stats = restarted.stats()["entity_choice"]
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        backend.close()
+
+
+# --- SQL result cache: equivalent SQL must share entries, volatile SQL must not ---
+
+
+class TestSqlResultKey:
+    def test_whitespace_and_keyword_case_ignored(self):
+        k1 = sql_result_key("select a,  b from hs92.country_year where year=2020")
+        k2 = sql_result_key("SELECT a, b\nFROM hs92.country_year\nWHERE year = 2020")
+        assert k1 == k2
+
+    def test_unquoted_identifier_case_ignored(self):
+        """Postgres folds unquoted identifiers, so these are the same query."""
+        k1 = sql_result_key("SELECT Export_Value FROM HS92.Country_Year")
+        k2 = sql_result_key("SELECT export_value FROM hs92.country_year")
+        assert k1 == k2
+
+    def test_and_predicate_order_ignored(self):
+        k1 = sql_result_key(
+            "SELECT a FROM t WHERE year = 2020 AND iso3_code = 'BRA' AND (x = 1 AND y = 2)"
+        )
+        k2 = sql_result_key(
+            "SELECT a FROM t WHERE (y = 2 AND x = 1) AND iso3_code = 'BRA' AND year = 2020"
+        )
+        assert k1 == k2
+
+    def test_string_literals_stay_case_sensitive(self):
+        k1 = sql_result_key("SELECT a FROM t WHERE iso3_code = 'BRA'")
+        k2 = sql_result_key("SELECT a FROM t WHERE iso3_code = 'bra'")
+        assert k1 != k2
+
+    def test_select_column_order_is_significant(self):
+        """Column order changes the result shape — must not share an entry."""
+        assert sql_result_key("SELECT a, b FROM t") != sql_result_key(
+            "SELECT b, a FROM t"
+        )
+
+    @pytest.mark.parametrize(
+        "sql",
+        [
+            "SELECT random()",
+            "SELECT now()",
+            "SELECT a FROM t WHERE d < CURRENT_DATE",
+            "SELECT clock_timestamp()",
+            "SELECT FROM WHERE",
+        ],
+    )
+    def test_volatile_or_unparseable_sql_is_uncacheable(self, sql):
+        assert sql_result_key(sql) is None
+
+
+class TestSqlResultCache:
+    def test_results_larger_than_budget_are_skipped(self, monkeypatch):
+        """A single huge result must not evict the whole cache or raise."""
+        import src.cache as cache_mod
+
+        r = CacheRegistry()
+        small = r.create("sql", maxsize=1024, ttl=60, getsizeof=sql_result_sizeof)
+        monkeypatch.setattr(cache_mod, "sql_result_cache", small)
+        cache_mod.cache_sql_result("k1", FetchedResult(["a"], ResultSet(["a"], [[1]])))
+        cache_mod.cache_sql_result(
+            "k2", FetchedResult(["a"], ResultSet(["a"], [[i] for i in range(1000)]))
+        )
+        assert "k1" in small
+        assert "k2" not in small
+        assert r.stats()["sql"]["bytes"] == small.currsize
+
+    def test_uncacheable_key_is_not_stored(self):
+        from src.cache import cache_sql_result, sql_result_cache
+
+        cache_sql_result(None, FetchedResult(["a"], ResultSet(["a"], [[1]])))
+        assert len(sql_result_cache) == 0
+
+
+class TestByteBudgets:
+    def test_estimate_follows_containers_and_counts_shared_objects_once(self):
+        row = {"product_code": "5201", "product_name": "Cotton, not carded"}
+        one = estimate_nbytes([row])
+        assert one > estimate_nbytes(row) > len("Cotton, not carded")
+        assert estimate_nbytes([row, row]) == one + 8  # one more list slot
+        assert estimate_nbytes(ResultSet(["a"], [[1], [2]])) > 0
+
+    async def test_future_is_reweighed_when_it_resolves(self):
+        cache = WeightedTTLCache(maxsize=10_000, ttl=60, getsizeof=estimate_nbytes)
+        future = asyncio.get_running_loop().create_future()
+        cache["k"] = future
+        assert cache.currsize == 1024  # placeholder while pending
+        future.set_result("x" * 5000)
+        await asyncio.sleep(0)
+        assert cache.currsize > 5000
+
+    async def test_resolved_value_over_budget_is_dropped(self):
+        cache = WeightedTTLCache(maxsize=2048, ttl=60, getsizeof=estimate_nbytes)
+        cache["small"] = "ok"
+        future = asyncio.get_running_loop().create_future()
+        cache["big"] = future
+        future.set_result("x" * 5000)
+        await asyncio.sleep(0)
+        assert "big" not in cache
+        assert "small" in cache
+
+    async def test_cached_lookups_evict_by_bytes(self):
+        from cachetools_async import cached
+
+        r = CacheRegistry()
+        cache = r.create("lookup", maxsize=4096, ttl=60, getsizeof=estimate_nbytes)
+
+        @cached(cache=cache)
+        async def lookup(n):
+            return "x" * n
+
+        await lookup(1500)
+        await lookup(1500)
+        await lookup(1500)  # same key, served from cache
+        assert len(cache) == 1
+        await lookup(2000)
+        await lookup(2500)
+        assert cache.currsize <= 4096
+        assert r.stats()["lookup"]["bytes"] == cache.currsize
+
+    def test_memory_report_totals_caches(self, monkeypatch):
+        import src.cache as cache_mod
+
+        r = CacheRegistry()
+        r.create("a", maxsize=10_000, ttl=60, getsizeof=estimate_nbytes)["k"] = (
+            "v" * 100
+        )
+        r.create("b", maxsize=10, ttl=60)["k"] = [1, 2, 3]
+        monkeypatch.setattr(cache_mod, "_cgroup_memory_limit", lambda: 1_000_000)
+        report = r.memory_report()
+        assert report["by_cache"]["a"] == r.stats()["a"]["bytes"] > 100
+        assert report["by_cache"]["b"] > 0
+        assert report["total_bytes"] == sum(report["by_cache"].values())
+        assert report["cache_share_of_limit"] == report["total_bytes"] / 1_000_000
+
+    def test_cgroup_limit_parsing(self, tmp_path, monkeypatch):
+        import src.cache as cache_mod
+
+        limit_file = tmp_path / "memory.max"
+        monkeypatch.setattr(cache_mod, "_CGROUP_MEMORY_FILES", (limit_file,))
+        assert cache_mod._cgroup_memory_limit() is None  # no cgroup
+        limit_file.write_text("max\n")
+        assert cache_mod._cgroup_memory_limit() is None
+        limit_file.write_text("2147483648\n")
+        assert cache_mod._cgroup_memory_limit() == 2 * 1024**3
+
+
+class TestDataVersion:
+    @staticmethod
+    def _probe(values):
+        async def probe():
+            value = values.pop(0)
+            if isinstance(value, Exception):
+                raise value
+            return value
+
+        return probe
+
+    async def test_listeners_run_only_on_later_changes(self):
+        version = DataVersion()
+        version.add_probe("db", self._probe(["2023", "2023", "2024"]))
+        changes = []
+        version.on_change(lambda old, new: changes.append((old, new)))
+
+        assert await version.check()  # startup: sets the fingerprint only
+        assert not await version.check()
+        assert await version.check()
+        assert version.current == "db=2024"
+        assert changes == [("db=2023", "db=2024")]
+        assert version.stats()["changes"] == 1
+
+    async def test_failed_probe_keeps_previous_fingerprint(self):
+        version = DataVersion()
+        version.add_probe("db", self._probe(["2023", "2024"]))
+        version.add_probe("api", self._probe(["hs92:1995-2023", ConnectionError()]))
+        await version.check()
+        assert version.current == "api=hs92:1995-2023;db=2023"
+        assert not await version.check()
+        assert version.current == "api=hs92:1995-2023;db=2023"
+        assert version.stats()["failures"] == 1
+
+    async def test_polling_picks_up_a_new_release(self):
+        version = DataVersion(poll_interval=0.01)
+        version.add_probe("db", self._probe(["2023"] + ["2024"] * 100))
+        await version.check()
+        changed = asyncio.Event()
+        version.on_change(lambda old, new: changed.set())
+        version.start()
+        try:
+            await asyncio.wait_for(changed.wait(), timeout=2)
+        finally:
+            await version.stop()
+        assert version.current == "db=2024"
+        assert not version.stats()["polling"]
+
+    def test_data_cache_keys_are_scoped_by_version(self, monkeypatch):
+        from src.cache import data_version
+
+        keys = lambda: (  # noqa: E731
+            product_details_key(["5201"], "hs92"),
+            text_search_key("cotton", "hs92"),
+            table_info_key(["hs92"]),
+            sql_result_cache_key("SELECT 1", 100),
+        )
+        monkeypatch.setattr(data_version, "current", "db=2023")
+        old = keys()
+        monkeypatch.setattr(data_version, "current", "db=2024")
+        new = keys()
+        assert all(a != b for a, b in zip(old, new))
+        assert sql_result_cache_key("SELECT random()", 100) is None
+
+    def test_release_change_clears_data_caches(self):
+        from src.cache import (
+            country_catalog,
+            invalidate_data_caches,
+            product_details_cache,
+        )
+
+        product_details_cache["k"] = [{"product_code": "5201"}]
+        country_catalog.populate([{"countryId": 404, "iso3Code": "KEN"}])
+        invalidate_data_caches("db=2023", "db=2024")
+        assert len(product_details_cache) == 0
+        assert country_catalog.stats()["stale"]
+
+
+class TestEmbeddingCache:
+    @pytest.fixture
+    def cache(self):
+        c = EmbeddingCache("emb", maxsize=16, ttl=60)
+        yield c
+        c.attach_disk(None)
+
+    def test_key_ignores_case_spacing_and_trailing_punctuation(self):
+        k1 = embedding_key("m", 4, "  Cotton   exports? ")
+        k2 = embedding_key("m", 4, "cotton exports")
+        assert k1 == k2
+        assert embedding_key("m", 8, "cotton exports") != k1
+
+    async def test_second_lookup_hits_memory(self, cache):
+        calls = []
+
+        async def embed(text):
+            calls.append(text)
+            return [0.5, 0.25]
+
+        assert await cache.get_or_embed("m", 2, "Cotton", embed) == [0.5, 0.25]
+        assert await cache.get_or_embed("m", 2, "cotton.", embed) == [0.5, 0.25]
+        assert calls == ["Cotton"]
+        stats = cache.stats()
+        assert (stats["memory_hits"], stats["misses"]) == (1, 1)
+
+    async def test_disk_tier_survives_a_new_instance(self, cache, tmp_path):
+        path = tmp_path / "emb.db"
+        cache.attach_disk(path)
+
+        async def embed(text):
+            return [1.0, -2.5, 0.125]
+
+        await cache.get_or_embed("m", 3, "coffee", embed)
+
+        fresh = EmbeddingCache("emb", maxsize=16, ttl=60)
+        fresh.attach_disk(path)
+        try:
+
+            async def fail(text):
+                raise AssertionError("should be served from disk")
+
+            assert await fresh.get_or_embed("m", 3, "Coffee", fail) == [
+                1.0,
+                -2.5,
+                0.125,
+            ]
+            stats = fresh.stats()
+            assert stats["disk_hits"] == 1
+            assert stats["disk_entries"] == 1
+        finally:
+            fresh.attach_disk(None)
+
+    async def test_failures_are_not_cached(self, cache):
+        results = iter([None, [0.1]])
+
+        async def embed(text):
+            return next(results)
+
+        assert await cache.get_or_embed("m", 1, "tea", embed) is None
+        assert await cache.get_or_embed("m", 1, "tea", embed) == [0.1]
+        assert cache.stats()["misses"] == 2
+
+    async def test_concurrent_lookups_share_one_call(self, cache):
+        calls = 0
+
+        async def embed(text):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return [0.3]
+
+        results = await asyncio.gather(
+            *(cache.get_or_embed("m", 1, "wine", embed) for _ in range(5))
+        )
+        assert results == [[0.3]] * 5
+        assert calls == 1
+        stats = cache.stats()
+        assert (stats["misses"], stats["inflight_joins"], stats["hits"]) == (1, 4, 0)
+
+    async def test_joined_failure_is_not_a_hit(self, cache):
+        async def embed(text):
+            await asyncio.sleep(0.01)
+            return None
+
+        results = await asyncio.gather(
+            *(cache.get_or_embed("m", 1, "beer", embed) for _ in range(3))
+        )
+        assert results == [None] * 3
+        stats = cache.stats()
+        assert (stats["hits"], stats["hit_rate"]) == (0, 0.0)
+
+    def test_registered_in_registry_stats(self):
+        from src.cache import registry
+
+        stats = registry.stats()["query_embedding"]
+        assert {"memory_hits", "disk_hits", "disk_entries"} <= set(stats)
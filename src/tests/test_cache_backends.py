@@ -0,0 +1,263 @@
+"""Tests for src/cache_backends.py — shared cache tiers behind CacheRegistry.
+
+Two ``CacheRegistry`` / ``SharedTier`` instances over one backend stand in
+for two uvicorn workers.  The Redis backend runs against a small in-memory
+client with the ``redis.Redis`` call signatures.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.cache import CacheRegistry, product_details_key, registry, text_search_key
+from src.cache_backends import (
+    RedisCacheBackend,
+    SharedTier,
+    SQLiteCacheBackend,
+    create_backend,
+)
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.Redis the backend uses."""
+
+    def __init__(self):
+        self.data: dict[str, tuple[bytes, float]] = {}
+
+    def get(self, key):
+        value = self.data.get(key)
+        if value is None or value[1] <= time.time():
+            return None
+        return value[0]
+
+    def set(self, key, value, px=None, nx=False):
+        if nx and self.get(key) is not None:
+            return None
+        self.data[key] = (value, time.time() + px / 1000)
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    backend = SQLiteCacheBackend(tmp_path / "shared.db")
+    yield backend
+    backend.close()
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "redis":
+        yield RedisCacheBackend(client=FakeRedis())
+        return
+    backend = SQLiteCacheBackend(tmp_path / "shared.db")
+    yield backend
+    backend.close()
+
+
+class TestBackends:
+    def test_set_get_and_expiry(self, backend):
+        backend.set("a", b"1", ttl=60)
+        backend.set("b", b"2", ttl=0.001)
+        time.sleep(0.01)
+        assert backend.get("a") == b"1"
+        assert backend.get("b") is None
+        backend.delete("a")
+        assert backend.get("a") is None
+
+    def test_add_only_stores_absent_or_expired_keys(self, backend):
+        assert backend.add("lease", b"1", ttl=60)
+        assert not backend.add("lease", b"1", ttl=60)
+        backend.set("old", b"1", ttl=0.001)
+        time.sleep(0.01)
+        assert backend.add("old", b"2", ttl=60)
+        assert backend.get("old") == b"2"
+
+    def test_create_backend_specs(self, tmp_path):
+        assert create_backend("memory", default_sqlite_path=tmp_path / "x.db") is None
+        default = create_backend("sqlite", default_sqlite_path=tmp_path / "x.db")
+        assert default.path == tmp_path / "x.db"
+        default.close()
+        custom = create_backend(
+            f"sqlite:{tmp_path / 'y.db'}", default_sqlite_path=tmp_path / "x.db"
+        )
+        assert custom.path == tmp_path / "y.db"
+        custom.close()
+        with pytest.raises(ValueError):
+            create_backend("memcached://x", default_sqlite_path=tmp_path / "x.db")
+
+
+class TestSharedTier:
+    def test_key_is_independent_of_set_order(self, sqlite_backend):
+        tier = SharedTier("product_details", sqlite_backend, ttl=60)
+        k1 = product_details_key(["5201", "5202", "0101"], "hs92")
+        k2 = product_details_key(["0101", "5202", "5201"], "hs92")
+        assert tier.storage_key(k1) == tier.storage_key(k2)
+        assert tier.storage_key(k1) != tier.storage_key(
+            product_details_key(["5201"], "hs92")
+        )
+
+    async def test_second_worker_reads_first_workers_value(self, backend):
+        worker_a = SharedTier("text_search", backend, ttl=60)
+        worker_b = SharedTier("text_search", backend, ttl=60)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return [{"product_code": "5201"}]
+
+        assert await worker_a.get_or_compute(("cotton", "hs92"), compute) == [
+            {"product_code": "5201"}
+        ]
+        assert await worker_b.get_or_compute(("cotton", "hs92"), compute) == [
+            {"product_code": "5201"}
+        ]
+        assert len(calls) == 1
+        assert (worker_b.stats()["hits"], worker_a.stats()["misses"]) == (1, 1)
+
+    async def test_concurrent_workers_compute_once(self, backend):
+        workers = [SharedTier("text_search", backend, ttl=60) for _ in range(3)]
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return "ddl"
+
+        results = await asyncio.gather(
+            *(w.get_or_compute("key", compute) for w in workers)
+        )
+        assert results == ["ddl"] * 3
+        assert len(calls) == 1
+        assert sum(w.lease_waits for w in workers) == 2
+
+    async def test_failed_compute_releases_lease(self, backend):
+        tier = SharedTier("t", backend, ttl=60)
+
+        async def boom():
+            raise RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            await tier.get_or_compute("k", boom)
+
+        async def ok():
+            return 1
+
+        started = time.monotonic()
+        assert await SharedTier("t", backend, ttl=60).get_or_compute("k", ok) == 1
+        assert time.monotonic() - started < 1
+
+    async def test_non_json_values_stay_local(self, sqlite_backend):
+        tier = SharedTier("t", sqlite_backend, ttl=60)
+        value = {1, 2}
+
+        async def compute():
+            return value
+
+        assert await tier.get_or_compute("k", compute) is value
+        assert tier.get("k") is None
+
+    async def test_backend_errors_fall_back_to_compute(self):
+        class Broken:
+            def __getattr__(self, name):
+                def fail(*args, **kwargs):
+                    raise ConnectionError("no server")
+
+                return fail
+
+        tier = SharedTier("t", Broken(), ttl=60)
+
+        async def compute():
+            return "value"
+
+        assert await tier.get_or_compute("k", compute) == "value"
+        assert tier.stats()["errors"] >= 2
+
+
+class TestRegistryReadThrough:
+    async def test_decorated_function_reads_through_shared_tier(self, sqlite_backend):
+        workers = [CacheRegistry(), CacheRegistry()]
+        calls = []
+
+        def make(reg):
+            reg.create("lookup", maxsize=8, ttl=60)
+            reg.attach_backend("lookup", sqlite_backend)
+
+            @reg.read_through("lookup", key=lambda term: term.lower())
+            async def lookup(term):
+                calls.append(term)
+                return term.upper()
+
+            return lookup
+
+        lookup_a, lookup_b = (make(reg) for reg in workers)
+        assert await lookup_a("Coffee") == "COFFEE"
+        assert await lookup_b("coffee") == "COFFEE"
+        assert calls == ["Coffee"]
+        assert workers[1].stats()["lookup"]["shared"]["hits"] == 1
+
+    def test_sync_read_through_and_detach(self, sqlite_backend):
+        reg = CacheRegistry()
+        reg.create("ddl", maxsize=8, ttl=60)
+        reg.attach_backend("ddl", sqlite_backend)
+        assert reg.read_through_sync("ddl", "k", lambda: "CREATE TABLE t") == (
+            "CREATE TABLE t"
+        )
+        assert reg.read_through_sync("ddl", "k", lambda: "other") == "CREATE TABLE t"
+
+        reg.attach_backend("ddl", None)
+        assert reg.read_through_sync("ddl", "k", lambda: "other") == "other"
+        assert "shared" not in reg.stats()["ddl"]
+
+    def test_attach_to_unknown_cache_raises(self, sqlite_backend):
+        with pytest.raises(KeyError):
+            CacheRegistry().attach_backend("nope", sqlite_backend)
+
+    async def test_cached_product_details_uses_shared_tier(self, sqlite_backend):
+        from src.cache import cached_product_details, product_details_cache
+
+        calls = []
+
+        class Engine:
+            def connect(self):
+                calls.append(1)
+                raise AssertionError("should be served from the shared tier")
+
+        tier = SharedTier("product_details", sqlite_backend, ttl=60)
+        tier.set(product_details_key(["5201"], "hs92"), [{"product_code": "5201"}])
+        registry.attach_backend("product_details", sqlite_backend)
+        try:
+            result = await cached_product_details(("5201",), "hs92", Engine())
+        finally:
+            registry.attach_backend("product_details", None)
+        assert result == [{"product_code": "5201"}]
+        assert calls == []
+        assert len(product_details_cache) == 1
+
+    async def test_database_errors_are_not_shared(self, sqlite_backend):
+        from sqlalchemy.exc import OperationalError
+
+        from src.cache import cached_text_search
+
+        calls = []
+
+        class Engine:
+            def connect(self):
+                calls.append(1)
+                raise OperationalError("SELECT", {}, Exception("connection reset"))
+
+        registry.attach_backend("text_search", sqlite_backend)
+        try:
+            assert await cached_text_search("coffee", "hs92", Engine()) == []
+            assert await cached_text_search("coffee", "hs92", Engine()) == []
+        finally:
+            registry.attach_backend("text_search", None)
+        tier = SharedTier("text_search", sqlite_backend, ttl=60)
+        assert tier.get(text_search_key("coffee", "hs92")) is None
+        assert len(calls) == 2  # the error was not cached in-process either
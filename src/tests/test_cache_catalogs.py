@@ -8,15 +8,22 @@ These verify the business-critical behaviors for the GraphQL pipeline's
 - Product catalog supports dual indexing (by HS code AND by name)
 - TTL expiry triggers re-fetch from source
 - Concurrent first-access triggers only ONE fetch (stampede prevention)
+- Snapshots let other workers start without fetching
 - Registry clear_all() resets catalog caches (test isolation)
 """
 
 import asyncio
-from unittest.mock import AsyncMock
+import json
+import os
+import threading
+import time
+from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
 
 from src.cache import (
+    CATALOG_SNAPSHOT_VERSION,
     CatalogCache,
     country_catalog,
     hs12_product_catalog,
@@ -26,6 +33,7 @@ from src.cache import (
     sitc_product_catalog,
     wire_catalog_fetchers,
 )
+from src.graphql_client import AtlasGraphQLClient, set_request_deadline
 
 # ---------------------------------------------------------------------------
 # Sample catalog data (mirrors real GraphQL API responses)
@@ -116,9 +124,10 @@ def _make_catalog(
     *,
     ttl: int = 3600,
     timer: object | None = None,
+    max_stale: float | None = None,
 ) -> CatalogCache:
     """Create a standalone CatalogCache with a country-like index setup."""
-    kwargs: dict = {"ttl": ttl}
+    kwargs: dict = {"ttl": ttl, "max_stale": max_stale}
     if timer is not None:
         kwargs["timer"] = timer
     cache = CatalogCache("test_catalog", **kwargs)
@@ -284,6 +293,346 @@ class TestCatalogCacheTTLExpiry:
         assert await cache.lookup("iso3", "ESP") is None
 
 
+class TestCatalogCacheStaleWhileRevalidate:
+    """With max_stale set, expired data is served while one task refetches."""
+
+    @staticmethod
+    def _clock(start: float = 1000.0):
+        now = [start]
+        return now, lambda: now[0]
+
+    async def test_serves_stale_data_while_single_refresh_runs(self):
+        now, timer = self._clock()
+        release = asyncio.Event()
+        calls = 0
+
+        async def fetcher():
+            nonlocal calls
+            calls += 1
+            if calls > 1:
+                await release.wait()
+                return [{"nameShortEn": "Kenya", "iso3Code": "KEN", "countryId": 1}]
+            return SAMPLE_COUNTRIES
+
+        cache = _make_catalog(ttl=60, timer=timer, max_stale=600)
+        cache.set_fetcher(fetcher)
+        await cache.get_all()
+
+        now[0] = 1100.0
+        results = await asyncio.gather(*(cache.lookup("iso3", "ESP") for _ in range(5)))
+        assert all(r["iso3Code"] == "ESP" for r in results)
+        await asyncio.sleep(0)
+        assert calls == 2
+        assert cache.stats()["stale"] and cache.stats()["refreshing"]
+
+        release.set()
+        await cache._refresh_task
+        assert await cache.lookup("iso3", "ESP") is None
+        assert (await cache.lookup("iso3", "KEN"))["countryId"] == 1
+        stats = cache.stats()
+        assert not stats["stale"] and not stats["refreshing"]
+        assert stats["refresh_count"] == 2
+        assert stats["last_refresh_seconds"] is not None
+
+    async def test_field_first_searched_during_refresh_is_kept(self, monkeypatch):
+        now, timer = self._clock()
+        started, go = threading.Event(), threading.Event()
+        build = CatalogCache._build_indexes
+
+        def slow_build(*args):
+            started.set()
+            go.wait(5)
+            return build(*args)
+
+        monkeypatch.setattr(CatalogCache, "_build_indexes", staticmethod(slow_build))
+        fetched = [
+            SAMPLE_COUNTRIES,
+            [{"nameShortEn": "Kenya Republic", "iso3Code": "KEN"}],
+        ]
+
+        async def fetcher():
+            return fetched.pop(0)
+
+        cache = _make_catalog(ttl=60, timer=timer, max_stale=600)
+        cache.set_fetcher(fetcher)
+        await cache.get_all()
+
+        now[0] = 1100.0
+        await cache.get_all()  # stale: starts the background refresh
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        assert await cache.search("nameShortEn", "spain")
+        go.set()
+        await cache._refresh_task
+
+        assert cache.stats()["text_indexes"] == ["nameShortEn"]
+        assert await cache.search("nameShortEn", "spain") == []
+        assert (await cache.search("nameShortEn", "republic"))[0]["iso3Code"] == "KEN"
+
+    async def test_refresh_is_not_bound_by_the_request_deadline(self):
+        now, timer = self._clock()
+        client = AtlasGraphQLClient(base_url="https://atlas.test/graphql")
+
+        async def slow_post(*args, timeout, **kwargs):
+            if timeout < 0.1:
+                await asyncio.sleep(timeout)
+                raise httpx.ReadTimeout("timed out")
+            await asyncio.sleep(0.1)
+            return httpx.Response(
+                200,
+                json={"data": {"locationCountry": SAMPLE_COUNTRIES[:1]}},
+                request=httpx.Request("POST", "https://atlas.test/graphql"),
+            )
+
+        async def fetcher():
+            data = await client.execute("{ locationCountry }", use_cache=False)
+            return data["locationCountry"]
+
+        cache = _make_catalog(ttl=60, timer=timer, max_stale=600)
+        cache.populate(SAMPLE_COUNTRIES)
+        cache.set_fetcher(fetcher)
+
+        async def request():
+            set_request_deadline(time.monotonic() + 0.02)
+            await cache.get_all()  # stale: starts the background refresh
+
+        now[0] = 1100.0
+        with patch.object(httpx.AsyncClient, "post", slow_post):
+            await asyncio.create_task(request())
+            await cache._refresh_task
+
+        assert cache.stats()["refresh_failures"] == 0
+        assert len(await cache.get_all()) == 1
+
+    async def test_failed_refresh_backs_off_and_keeps_stale_data(self):
+        now, timer = self._clock()
+        calls = 0
+
+        async def fetcher():
+            nonlocal calls
+            calls += 1
+            if calls > 1:
+                raise ConnectionError("atlas down")
+            return SAMPLE_COUNTRIES
+
+        cache = CatalogCache(
+            "swr", ttl=60, max_stale=600, refresh_backoff=10, timer=timer
+        )
+        cache.set_fetcher(fetcher)
+        await cache.get_all()
+
+        now[0] = 1100.0
+        assert len(await cache.get_all()) == 3
+        await cache._refresh_task
+        stats = cache.stats()
+        assert stats["refresh_failures"] == 1
+        assert stats["last_refresh_error"] == "ConnectionError: atlas down"
+
+        now[0] = 1105.0  # inside the 10s backoff: no new attempt
+        await cache.get_all()
+        assert calls == 2
+
+        now[0] = 1111.0
+        await cache.get_all()
+        await cache._refresh_task
+        assert calls == 3
+        assert cache.stats()["consecutive_failures"] == 2  # next delay is 20s
+
+    async def test_refetches_in_foreground_past_max_stale(self):
+        now, timer = self._clock()
+        calls = 0
+
+        async def fetcher():
+            nonlocal calls
+            calls += 1
+            return SAMPLE_COUNTRIES[: 4 - calls]
+
+        cache = _make_catalog(ttl=60, timer=timer, max_stale=600)
+        cache.set_fetcher(fetcher)
+        await cache.get_all()
+
+        now[0] = 1000.0 + 60 + 601
+        assert len(await cache.get_all()) == 2
+        assert calls == 2
+        assert cache._refresh_task is None
+
+
+class TestCatalogCacheSnapshots:
+    """Fetched catalogs are persisted and reloaded by other workers."""
+
+    @staticmethod
+    def _counting_fetcher(entries=SAMPLE_COUNTRIES, delay: float = 0.0):
+        calls = []
+
+        async def fetcher():
+            calls.append(1)
+            await asyncio.sleep(delay)
+            return entries
+
+        return fetcher, calls
+
+    async def test_fetch_writes_snapshot_loaded_by_next_worker(self, tmp_path):
+        path = tmp_path / "countries.json"
+        first = _make_catalog()
+        first.attach_snapshot(path)
+        fetcher, calls = self._counting_fetcher()
+        first.set_fetcher(fetcher)
+        await first.get_all()
+        assert first.stats()["snapshot_writes"] == 1
+
+        second = _make_catalog()
+        second.attach_snapshot(path)
+        second.set_fetcher(fetcher)
+        assert (await second.lookup("iso3", "KEN"))["countryId"] == 404
+        assert len(calls) == 1
+        assert second.stats()["snapshot_loads"] == 1
+
+    async def test_concurrent_workers_fetch_once(self, tmp_path):
+        path = tmp_path / "countries.json"
+        fetcher, calls = self._counting_fetcher(delay=0.05)
+        workers = [_make_catalog() for _ in range(3)]
+        for cache in workers:
+            cache.attach_snapshot(path)
+            cache.set_fetcher(fetcher)
+
+        results = await asyncio.gather(*(cache.get_all() for cache in workers))
+        assert [len(r) for r in results] == [3, 3, 3]
+        assert len(calls) == 1
+
+    async def test_lock_wait_times_out_and_fetches(self, tmp_path, monkeypatch):
+        fcntl = pytest.importorskip("fcntl")
+        monkeypatch.setattr("src.cache.CATALOG_SNAPSHOT_LOCK_TIMEOUT", 0.2)
+        path = tmp_path / "countries.json"
+        holder = os.open(tmp_path / "countries.json.lock", os.O_RDWR | os.O_CREAT)
+        fcntl.flock(holder, fcntl.LOCK_EX)
+        try:
+            cache = _make_catalog()
+            cache.attach_snapshot(path)
+            fetcher, calls = self._counting_fetcher()
+            cache.set_fetcher(fetcher)
+            assert len(await cache.get_all()) == 3
+            assert len(calls) == 1
+        finally:
+            os.close(holder)
+
+    async def test_cancelled_lock_wait_leaves_lock_free(self, tmp_path):
+        fcntl = pytest.importorskip("fcntl")
+        lock_path = tmp_path / "countries.json.lock"
+        holder = os.open(lock_path, os.O_RDWR | os.O_CREAT)
+        fcntl.flock(holder, fcntl.LOCK_EX)
+        cache = _make_catalog()
+        cache.attach_snapshot(tmp_path / "countries.json")
+        cache.set_fetcher(self._counting_fetcher()[0])
+        task = asyncio.create_task(cache.get_all())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        os.close(holder)
+
+        probe = os.open(lock_path, os.O_RDWR)
+        try:
+            fcntl.flock(probe, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        finally:
+            os.close(probe)
+
+    async def test_incompatible_snapshot_is_ignored(self, tmp_path):
+        path = tmp_path / "countries.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "version": 0,
+                    "name": "test_catalog",
+                    "created_at": time.time(),
+                    "entries": [],
+                }
+            )
+        )
+        cache = _make_catalog()
+        cache.attach_snapshot(path)
+        fetcher, calls = self._counting_fetcher()
+        cache.set_fetcher(fetcher)
+        assert len(await cache.get_all()) == 3
+        assert len(calls) == 1
+        assert json.loads(path.read_text())["version"] == CATALOG_SNAPSHOT_VERSION
+
+    async def test_expired_snapshot_is_served_stale_only_with_max_stale(self, tmp_path):
+        path = tmp_path / "countries.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "version": CATALOG_SNAPSHOT_VERSION,
+                    "name": "test_catalog",
+                    "created_at": time.time() - 120,
+                    "entries": SAMPLE_COUNTRIES[:1],
+                }
+            )
+        )
+        fetcher, calls = self._counting_fetcher()
+
+        strict = _make_catalog(ttl=60)
+        strict.attach_snapshot(path)
+        strict.set_fetcher(fetcher)
+        assert len(await strict.get_all()) == 3
+        assert len(calls) == 1
+
+        path.write_text(
+            json.dumps(
+                {
+                    "version": CATALOG_SNAPSHOT_VERSION,
+                    "name": "test_catalog",
+                    "created_at": time.time() - 120,
+                    "entries": SAMPLE_COUNTRIES[:1],
+                }
+            )
+        )
+        lenient = _make_catalog(ttl=60, max_stale=600)
+        lenient.attach_snapshot(path)
+        lenient.set_fetcher(fetcher)
+        assert len(await lenient.get_all()) == 1
+        assert lenient.stats()["stale"]
+        await lenient._refresh_task
+        assert len(await lenient.get_all()) == 3
+        assert len(calls) == 2
+
+    async def test_snapshot_of_another_data_release_is_stale(
+        self, tmp_path, monkeypatch
+    ):
+        from src.cache import data_version
+
+        path = tmp_path / "countries.json"
+        monkeypatch.setattr(data_version, "current", "db=2023")
+        writer = _make_catalog()
+        writer.attach_snapshot(path)
+        writer.set_fetcher(self._counting_fetcher(SAMPLE_COUNTRIES[:1])[0])
+        await writer.get_all()
+        assert json.loads(path.read_text())["data_version"] == "db=2023"
+
+        monkeypatch.setattr(data_version, "current", "db=2024")
+        fetcher, calls = self._counting_fetcher()
+        reader = _make_catalog(max_stale=600)
+        reader.attach_snapshot(path)
+        reader.set_fetcher(fetcher)
+        assert len(await reader.get_all()) == 1
+        assert reader.stats()["stale"]
+        await reader._refresh_task
+        assert len(await reader.get_all()) == 3
+        assert len(calls) == 1
+        assert json.loads(path.read_text())["data_version"] == "db=2024"
+
+    async def test_expire_serves_stale_and_refreshes(self):
+        fetcher, calls = self._counting_fetcher()
+        cache = _make_catalog(max_stale=600)
+        cache.set_fetcher(fetcher)
+        await cache.get_all()
+        cache.expire()
+        assert cache.stats()["stale"]
+        assert len(await cache.get_all()) == 3
+        await cache._refresh_task
+        assert not cache.stats()["stale"]
+        assert len(calls) == 2
+
+
 # ---------------------------------------------------------------------------
 # Stampede prevention
 # ---------------------------------------------------------------------------
@@ -421,6 +770,53 @@ class TestCatalogCacheSearch:
         results = await cache.search("nameShortEn", "zzzzz")
         assert results == []
 
+    async def test_search_ranks_exact_then_prefix_then_substring(self):
+        cache = CatalogCache("names", ttl=3600)
+        names = ["United States of America", "Motor cars", "Cars and trucks", "Cars"]
+        cache.populate([{"name": n} for n in names])
+
+        results = await cache.search("name", "cars", limit=5)
+        assert [r["name"] for r in results] == [
+            "Cars",
+            "Cars and trucks",
+            "Motor cars",
+        ]
+        results = await cache.search("name", "ca", limit=5)
+        assert results[-1]["name"] == "United States of America"
+
+    async def test_search_matches_words_in_any_order_and_accents(self):
+        cache = CatalogCache("names", ttl=3600)
+        cache.populate([{"name": "Motor cars"}, {"name": "Côte d'Ivoire"}])
+
+        assert [r["name"] for r in await cache.search("name", "cars motor")] == [
+            "Motor cars"
+        ]
+        assert [r["name"] for r in await cache.search("name", "cote")] == [
+            "Côte d'Ivoire"
+        ]
+
+    async def test_search_tolerates_typos_only_without_literal_matches(self):
+        cache = _make_catalog()
+        cache.populate(SAMPLE_COUNTRIES)
+
+        results = await cache.search("nameShortEn", "Keyna")
+        assert [r["iso3Code"] for r in results] == ["KEN"]
+        # A literal match suppresses fuzzy ones ("Spain" is not a typo of "usa").
+        results = await cache.search("nameShortEn", "usa")
+        assert [r["iso3Code"] for r in results] == ["USA"]
+
+    async def test_search_index_is_rebuilt_on_refresh(self):
+        cache = _make_catalog()
+        cache.populate(SAMPLE_COUNTRIES)
+        assert await cache.search("nameShortEn", "kenya")
+        assert cache.stats()["text_indexes"] == ["nameShortEn"]
+
+        cache.populate([{"nameShortEn": "Kenya Republic", "iso3Code": "KEN"}])
+        results = await cache.search("nameShortEn", "spain")
+        assert results == []
+        results = await cache.search("nameShortEn", "republic")
+        assert results[0]["nameShortEn"] == "Kenya Republic"
+
 
 # ---------------------------------------------------------------------------
 # Concrete catalog instances: country
@@ -555,6 +951,14 @@ class TestCatalogRegistryIntegration:
         assert stats["country_catalog"]["size"] == 3
         assert stats["country_catalog"]["populated"] is True
 
+    async def test_catalog_bytes_include_text_indexes(self):
+        """Memory reporting covers entries, then grows with each text index."""
+        country_catalog.populate(SAMPLE_COUNTRIES)
+        before = registry.stats()["country_catalog"]["bytes"]
+        assert before > 0
+        await country_catalog.search("nameShortEn", "ken")
+        assert registry.stats()["country_catalog"]["bytes"] > before
+
     async def test_unpopulated_catalog_stats(self):
         """Unpopulated catalog reports size=0 and populated=False."""
         stats = registry.stats()
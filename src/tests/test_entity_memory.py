@@ -0,0 +1,154 @@
+"""Tests for src/entity_memory.py — cross-turn entity reuse helpers."""
+
+import pytest
+
+from src.entity_memory import (
+    GRAPHQL_MEMORY_MAX_ENTRIES,
+    aggregate_reuse,
+    recall_graphql_entity,
+    recall_sql_entities,
+    refers_back,
+    remember_graphql_entities,
+    remember_sql_entities,
+    reuse_record,
+)
+from src.product_and_schema_lookup import (
+    CountryDetails,
+    ProductDetails,
+    SchemasAndProductsFound,
+)
+
+
+def _products() -> SchemasAndProductsFound:
+    return SchemasAndProductsFound(
+        classification_schemas=["hs92"],
+        products=[
+            ProductDetails(
+                name="crude oil", classification_schema="hs92", codes=["2709"]
+            )
+        ],
+        requires_product_lookup=False,
+        countries=[CountryDetails(name="Nigeria", iso3_code="NGA")],
+    )
+
+
+ENTITIES = [["crude oil"], ["Nigeria", "NGA"]]
+
+
+class TestRefersBack:
+    @pytest.mark.parametrize(
+        "question",
+        [
+            "And in 2015?",
+            "What about imports?",
+            "How did Nigeria's crude oil exports change since the 1990s?",
+            "Show the trend over the last 10 years",
+            "Crude oil share of NGA exports?",
+        ],
+    )
+    def test_follow_ups(self, question):
+        assert refers_back(question, ENTITIES)
+
+    @pytest.mark.parametrize(
+        "question",
+        [
+            "What about Ghana?",
+            "And coffee?",
+            "What about services?",
+            "Nigeria's exports of goods?",
+        ],
+    )
+    def test_new_entities(self, question):
+        assert not refers_back(question, ENTITIES)
+
+    @pytest.mark.parametrize(
+        "question",
+        [
+            "What are the top exports of Kenya?",
+            "What were Kenya total exports in 2015?",
+            "Who are the top exporters of coffee?",
+        ],
+    )
+    def test_dropping_an_entity_broadens_the_question(self, question):
+        assert not refers_back(question, [["coffee"], ["Kenya", "KEN"]])
+
+    def test_nothing_remembered(self):
+        assert not refers_back("And in 2015?", [])
+
+
+class TestSqlEntityMemory:
+    def test_round_trip(self):
+        memory = remember_sql_entities(_products(), "crude oil: 2709")
+
+        recalled = recall_sql_entities(
+            memory, "And Nigeria's crude oil imports in 2015?"
+        )
+
+        assert recalled == (_products(), "crude oil: 2709")
+
+    def test_partial_follow_up_not_recalled(self):
+        memory = remember_sql_entities(_products(), "crude oil: 2709")
+
+        assert recall_sql_entities(memory, "What are Nigeria's top exports?") is None
+
+    def test_no_memory(self):
+        assert recall_sql_entities(None, "And in 2015?") is None
+
+    def test_override_change_invalidates(self):
+        memory = remember_sql_entities(
+            _products(), "crude oil: 2709", override_mode="goods"
+        )
+
+        assert recall_sql_entities(memory, "And in 2015?") is None
+        assert (
+            recall_sql_entities(memory, "And in 2015?", override_mode="goods")
+            is not None
+        )
+
+    def test_new_entity_not_recalled(self):
+        memory = remember_sql_entities(_products(), "crude oil: 2709")
+
+        assert recall_sql_entities(memory, "What about Angola?") is None
+
+
+class TestGraphqlEntityMemory:
+    def test_recall_by_name_or_code(self):
+        entry = {"countryId": 404, "nameShortEn": "Kenya"}
+        memory = remember_graphql_entities(
+            None, {"country": ("country", ["Kenya", "KEN"], entry)}
+        )
+
+        assert recall_graphql_entity(memory, "country", [" kenya ", None]) == entry
+        assert recall_graphql_entity(memory, "country", [None, "ken"]) == entry
+        assert recall_graphql_entity(memory, "product_hs92", ["Kenya"]) is None
+        assert recall_graphql_entity(None, "country", ["Kenya"]) is None
+
+    def test_oldest_entries_dropped(self):
+        memory = None
+        for i in range(GRAPHQL_MEMORY_MAX_ENTRIES + 5):
+            memory = remember_graphql_entities(
+                memory, {"country": ("country", [f"c{i}"], {"countryId": i})}
+            )
+
+        assert len(memory) == GRAPHQL_MEMORY_MAX_ENTRIES
+        assert recall_graphql_entity(memory, "country", ["c0"]) is None
+        assert recall_graphql_entity(memory, "country", [f"c{i}"]) == {"countryId": i}
+
+
+class TestAggregateReuse:
+    def test_totals(self):
+        records = [
+            reuse_record("extract_products", llm_calls=1),
+            reuse_record("lookup_codes", llm_calls=1, lookups=1),
+            reuse_record("resolve_ids", lookups=2),
+        ]
+
+        assert aggregate_reuse(records) == {
+            "llm_calls_avoided": 2,
+            "lookups_avoided": 3,
+            "by_node": {"extract_products": 1, "lookup_codes": 1, "resolve_ids": 1},
+        }
+
+    def test_nothing_reused(self):
+        assert aggregate_reuse([]) is None
+        assert aggregate_reuse(None) is None
@@ -23,7 +23,9 @@ from src.graphql_client import (
     GraphQLBudgetTracker,
     GraphQLError,
     TransientGraphQLError,
+    _request_deadline,
     get_shared_budget_tracker,
+    set_request_deadline,
 )
 
 # ---------------------------------------------------------------------------
@@ -694,6 +696,494 @@ class TestAtlasGraphQLClient:
                 await client.execute(query="{ foo }")
 
 
+# ---------------------------------------------------------------------------
+# Request coalescing
+# ---------------------------------------------------------------------------
+
+
+class TestRequestCoalescing:
+    """Identical concurrent queries share one HTTP request."""
+
+    @staticmethod
+    def _slow_post(calls: list, response: httpx.Response | Exception):
+        async def post(*args, **kwargs):
+            calls.append(kwargs["json"])
+            await asyncio.sleep(0.05)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        return post
+
+    @pytest.fixture()
+    def budget_tracker(self) -> GraphQLBudgetTracker:
+        return GraphQLBudgetTracker(max_requests=10, window_seconds=60.0)
+
+    @pytest.fixture()
+    def client(self, budget_tracker) -> AtlasGraphQLClient:
+        return AtlasGraphQLClient(
+            base_url="https://atlas.cid.harvard.edu/api/graphql",
+            max_retries=0,
+            budget_tracker=budget_tracker,
+        )
+
+    async def test_concurrent_identical_queries_send_one_request(
+        self, client, budget_tracker
+    ) -> None:
+        calls: list = []
+        response = _make_httpx_response(json_data={"data": {"country": {"id": 1}}})
+        query = "query($id: ID!) { country(id: $id) { id } }"
+        with patch.object(httpx.AsyncClient, "post", self._slow_post(calls, response)):
+            results = await asyncio.gather(
+                *(client.execute(query, {"id": "1", "x": [1]}) for _ in range(4)),
+                client.execute(query, {"x": [1], "id": "1"}),  # same variables
+                client.execute(query, {"id": "2"}),
+            )
+
+        assert len(calls) == 2
+        assert results[:5] == [{"country": {"id": 1}}] * 5
+        assert results[0] is not results[1]  # callers may mutate their copy
+        assert budget_tracker.remaining() == 8
+        assert client.stats() == {
+            "base_url": "https://atlas.cid.harvard.edu/api/graphql",
+            "requests": 6,
+            "sent": 2,
+            "coalesced": 4,
+            "in_flight": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "circuit": None,
+        }
+
+    async def test_first_caller_mutation_not_seen_by_coalesced_callers(
+        self, client
+    ) -> None:
+        calls: list = []
+        response = _make_httpx_response(json_data={"data": {"country": {"id": 1}}})
+
+        async def mutating_caller():
+            data = await client.execute("{ country }")
+            data["country"]["id"] = 2
+            return data
+
+        with patch.object(httpx.AsyncClient, "post", self._slow_post(calls, response)):
+            first, second = await asyncio.gather(
+                mutating_caller(), client.execute("{ country }")
+            )
+
+        assert len(calls) == 1
+        assert first == {"country": {"id": 2}}
+        assert second == {"country": {"id": 1}}
+
+    async def test_joining_needs_no_budget(self, client, budget_tracker) -> None:
+        calls: list = []
+        response = _make_httpx_response(json_data={"data": {"x": 1}})
+        with patch.object(httpx.AsyncClient, "post", self._slow_post(calls, response)):
+            first = asyncio.ensure_future(client.execute("{ x }"))
+            await asyncio.sleep(0.01)
+            for _ in range(10):
+                assert await budget_tracker.consume()
+            assert await client.execute("{ x }") == {"x": 1}
+            assert await first == {"x": 1}
+            with pytest.raises(BudgetExhaustedError):
+                await client.execute("{ y }")
+        assert len(calls) == 1
+
+    async def test_sequential_queries_are_not_coalesced(self, client) -> None:
+        calls: list = []
+        response = _make_httpx_response(json_data={"data": {"x": 1}})
+        with patch.object(httpx.AsyncClient, "post", self._slow_post(calls, response)):
+            await client.execute("{ x }")
+            await client.execute("{ x }")
+        assert len(calls) == 2
+
+    async def test_errors_reach_every_coalesced_caller(self, client) -> None:
+        calls: list = []
+        error = httpx.ConnectError("refused")
+        with patch.object(httpx.AsyncClient, "post", self._slow_post(calls, error)):
+            results = await asyncio.gather(
+                client.execute("{ x }"),
+                client.execute("{ x }"),
+                return_exceptions=True,
+            )
+        assert len(calls) == 1
+        assert all(isinstance(r, TransientGraphQLError) for r in results)
+
+    async def test_cancelled_first_caller_does_not_cancel_others(self, client) -> None:
+        calls: list = []
+        response = _make_httpx_response(json_data={"data": {"x": 1}})
+        with patch.object(httpx.AsyncClient, "post", self._slow_post(calls, response)):
+            first = asyncio.create_task(client.execute("{ x }"))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(client.execute("{ x }"))
+            await asyncio.sleep(0)
+            first.cancel()
+            assert await second == {"x": 1}
+        assert first.cancelled()
+        assert len(calls) == 1
+
+
+# ---------------------------------------------------------------------------
+# Response cache
+# ---------------------------------------------------------------------------
+
+
+class TestResponseCache:
+    """Repeated queries are served from src.cache.graphql_response_cache."""
+
+    URL = "https://atlas.cid.harvard.edu/api/graphql"
+
+    @pytest.fixture()
+    def budget_tracker(self) -> GraphQLBudgetTracker:
+        return GraphQLBudgetTracker(max_requests=1, window_seconds=60.0)
+
+    @pytest.fixture()
+    def client(self, budget_tracker) -> AtlasGraphQLClient:
+        return AtlasGraphQLClient(
+            base_url=self.URL,
+            max_retries=0,
+            budget_tracker=budget_tracker,
+            cache_responses=True,
+        )
+
+    @staticmethod
+    def _post(body: dict) -> AsyncMock:
+        return AsyncMock(return_value=_make_httpx_response(json_data=body))
+
+    async def test_hits_skip_http_and_budget(self, client, budget_tracker) -> None:
+        post = self._post({"data": {"countryProfile": {"gdp": 1}}})
+        with patch.object(httpx.AsyncClient, "post", post):
+            first = await client.execute("{ countryProfile(location: 1) { gdp } }")
+            assert budget_tracker.remaining() == 0
+            # Budget is exhausted, but a differently formatted repeat still hits
+            second = await client.execute(
+                "{\n  countryProfile(location: 1) {\n    gdp\n  }\n}"
+            )
+        assert first == second == {"countryProfile": {"gdp": 1}}
+        assert post.await_count == 1
+
+        from src.cache import registry
+
+        stats = registry.stats()["graphql_response"]
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    async def test_callers_get_independent_copies(self, client) -> None:
+        with patch.object(httpx.AsyncClient, "post", self._post({"data": {"x": [1]}})):
+            (await client.execute("{ x }"))["x"].append(2)
+            assert await client.execute("{ x }") == {"x": [1]}
+
+    async def test_partial_errors_are_not_cached(self, client, budget_tracker) -> None:
+        budget_tracker.max_requests = 10
+        body = {"data": {"x": None}, "errors": [{"message": "timeout"}]}
+        post = self._post(body)
+        with patch.object(httpx.AsyncClient, "post", post):
+            await client.execute("{ x }")
+            await client.execute("{ x }")
+        assert post.await_count == 2
+
+    async def test_use_cache_false_and_disabled_client_bypass(
+        self, client, budget_tracker
+    ) -> None:
+        budget_tracker.max_requests = 10
+        plain = AtlasGraphQLClient(base_url=self.URL, max_retries=0)
+        post = self._post({"data": {"x": 1}})
+        with patch.object(httpx.AsyncClient, "post", post):
+            await client.execute("{ x }", use_cache=False)
+            await client.execute("{ x }", use_cache=False)
+            await plain.execute("{ x }")
+            await plain.execute("{ x }")
+        assert post.await_count == 4
+
+    async def test_shared_tier_serves_other_workers(self, client, tmp_path) -> None:
+        from src.cache import graphql_response_cache, registry
+        from src.cache_backends import SQLiteCacheBackend
+
+        backend = SQLiteCacheBackend(tmp_path / "shared.db")
+        registry.attach_backend("graphql_response", backend)
+        try:
+            post = self._post({"data": {"x": 1}})
+            with patch.object(httpx.AsyncClient, "post", post):
+                await client.execute("{ x }")
+                graphql_response_cache.clear()  # another worker's memory
+                assert await client.execute("{ x }") == {"x": 1}
+            assert post.await_count == 1
+            assert registry.stats()["graphql_response"]["shared"]["hits"] == 1
+        finally:
+            registry.attach_backend("graphql_response", None)
+            backend.close()
+
+
+# ---------------------------------------------------------------------------
+# Queued budget admission
+# ---------------------------------------------------------------------------
+
+
+class TestQueuedAdmission:
+    """admission="queue" waits for a token instead of failing fast."""
+
+    @staticmethod
+    def _tracker(**kwargs) -> GraphQLBudgetTracker:
+        return GraphQLBudgetTracker(admission="queue", **kwargs)
+
+    def test_rejects_unknown_admission_mode(self) -> None:
+        with pytest.raises(ValueError):
+            GraphQLBudgetTracker(admission="drop")
+
+    async def test_waits_for_window_to_slide(self) -> None:
+        tracker = self._tracker(max_requests=1, window_seconds=0.1)
+        assert await tracker.consume()
+        assert 0 < tracker.seconds_until_available() <= 0.1
+        started = time.monotonic()
+        assert await tracker.admit()
+        assert time.monotonic() - started >= 0.05
+        stats = tracker.queue_stats()
+        assert (stats["queued"], stats["timeouts"], stats["depth"]) == (1, 0, 0)
+        assert stats["wait_seconds_max"] > 0
+
+    async def test_gives_up_at_once_when_no_token_frees_in_time(self) -> None:
+        tracker = self._tracker(max_requests=1, window_seconds=60.0)
+        assert await tracker.consume()
+        started = time.monotonic()
+        assert not await tracker.admit()
+        assert time.monotonic() - started < 0.05
+        assert tracker.queue_stats()["timeouts"] == 1
+
+    async def test_deadline_bounds_the_wait(self) -> None:
+        tracker = self._tracker(max_requests=1, window_seconds=0.5, max_queue_wait=5)
+        assert await tracker.consume()
+        assert not await tracker.admit(deadline=time.monotonic() + 0.05)
+
+    async def test_waiters_are_admitted_in_arrival_order(self) -> None:
+        tracker = self._tracker(max_requests=1, window_seconds=0.05)
+        assert await tracker.consume()
+        order: list[int] = []
+
+        async def caller(i: int) -> None:
+            assert await tracker.admit()
+            order.append(i)
+            await tracker.consume()
+            tracker.release()
+
+        tasks = []
+        for i in range(3):
+            tasks.append(asyncio.create_task(caller(i)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        assert order == [0, 1, 2]
+        assert tracker.queue_stats()["max_depth"] == 3
+
+    async def test_reservations_prevent_overshoot(self) -> None:
+        tracker = self._tracker(max_requests=2, max_queue_wait=0.1)
+        assert await tracker.admit()
+        assert await tracker.admit()
+        assert not await tracker.admit()  # both tokens reserved by calls in flight
+        tracker.release()
+        assert await tracker.admit()
+
+    def test_admissible_looks_ahead_in_queue_mode(self) -> None:
+        tracker = self._tracker(max_requests=0)
+        assert not tracker.admissible()
+        fail_fast = GraphQLBudgetTracker(max_requests=1, window_seconds=0.1)
+        fail_fast._timestamps.append(time.monotonic())
+        assert not fail_fast.admissible()
+        queued = self._tracker(max_requests=1, window_seconds=0.1)
+        queued._timestamps.append(time.monotonic())
+        assert queued.admissible()
+
+    async def test_client_waits_instead_of_raising(self) -> None:
+        tracker = self._tracker(max_requests=1, window_seconds=0.1)
+        client = AtlasGraphQLClient(
+            base_url="https://atlas.cid.harvard.edu/api/graphql",
+            max_retries=0,
+            budget_tracker=tracker,
+        )
+        assert await tracker.consume()
+        response = _make_httpx_response(json_data={"data": {"x": 1}})
+        with patch.object(
+            httpx.AsyncClient, "post", new_callable=AsyncMock, return_value=response
+        ):
+            assert await client.execute("{ x }") == {"x": 1}
+        assert tracker.queue_stats()["reserved"] == 0
+        assert tracker.remaining() == 0
+
+    async def test_client_stops_waiting_at_request_deadline(self) -> None:
+        tracker = self._tracker(max_requests=1, window_seconds=1.0, max_queue_wait=5)
+        client = AtlasGraphQLClient(
+            base_url="https://atlas.cid.harvard.edu/api/graphql",
+            budget_tracker=tracker,
+        )
+        assert await tracker.consume()
+        token = set_request_deadline(time.monotonic() + 0.05)
+        try:
+            started = time.monotonic()
+            with pytest.raises(BudgetExhaustedError):
+                await client.execute("{ x }")
+            assert time.monotonic() - started < 0.5
+        finally:
+            _request_deadline.reset(token)
+        assert client.stats()["requests"] == 0
+
+
+# ---------------------------------------------------------------------------
+# Retry backoff, deadlines and hedging
+# ---------------------------------------------------------------------------
+
+
+class TestRetriesAndHedging:
+    """Jittered backoff with Retry-After, deadline-bounded retries, hedging."""
+
+    URL = "https://atlas.cid.harvard.edu/api/graphql"
+
+    def test_backoff_is_jittered_within_upper_half(self) -> None:
+        client = AtlasGraphQLClient(base_url=self.URL, backoff_base=1.0)
+        delays = {client._retry_delay(2, None) for _ in range(50)}
+        assert all(2.0 <= d <= 4.0 for d in delays)
+        assert len(delays) > 1
+
+    def test_retry_after_sets_a_floor_and_a_ceiling(self) -> None:
+        client = AtlasGraphQLClient(base_url=self.URL, backoff_base=0.0)
+        assert client._retry_delay(0, 5.0) == 5.0
+        assert client._retry_delay(0, 600.0) is None
+
+    def test_parse_retry_after(self) -> None:
+        parse = graphql_client_module._parse_retry_after
+        assert parse("7") == 7.0
+        assert parse(None) is None
+        assert parse("soon") is None
+        assert parse("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # in the past
+
+    async def test_429_retry_after_is_honoured(self) -> None:
+        client = AtlasGraphQLClient(base_url=self.URL, backoff_base=0.0)
+        throttled = httpx.Response(
+            429,
+            headers={"Retry-After": "3"},
+            request=httpx.Request("POST", self.URL),
+        )
+        ok = _make_httpx_response(json_data={"data": {"x": 1}})
+        with (
+            patch.object(
+                httpx.AsyncClient, "post", AsyncMock(side_effect=[throttled, ok])
+            ),
+            patch.object(graphql_client_module.asyncio, "sleep", AsyncMock()) as sleep,
+        ):
+            assert await client.execute("{ x }") == {"x": 1}
+        sleep.assert_awaited_once_with(3.0)
+
+    async def test_no_retry_past_the_deadline(self) -> None:
+        client = AtlasGraphQLClient(base_url=self.URL, backoff_base=1.0)
+        with patch.object(
+            httpx.AsyncClient,
+            "post",
+            AsyncMock(side_effect=httpx.ReadTimeout("slow")),
+        ) as post:
+            with pytest.raises(TransientGraphQLError):
+                await client.execute("{ x }", deadline=time.monotonic() + 0.2)
+        assert post.call_count == 1  # the first backoff (>= 0.5s) would overrun
+
+    async def test_attempt_timeout_is_cut_to_the_deadline(self) -> None:
+        client = AtlasGraphQLClient(base_url=self.URL, timeout=30.0)
+        ok = _make_httpx_response(json_data={"data": {"x": 1}})
+        with patch.object(
+            httpx.AsyncClient, "post", AsyncMock(return_value=ok)
+        ) as post:
+            await client.execute("{ x }", deadline=time.monotonic() + 5.0)
+        assert post.call_args.kwargs["timeout"] <= 5.0
+
+    async def test_timeout_cut_by_deadline_is_not_an_upstream_failure(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=1)
+        client = AtlasGraphQLClient(
+            base_url=self.URL, timeout=30.0, backoff_base=0.0, circuit_breaker=breaker
+        )
+        with patch.object(
+            httpx.AsyncClient,
+            "post",
+            AsyncMock(side_effect=httpx.ReadTimeout("slow")),
+        ) as post:
+            with pytest.raises(TransientGraphQLError):
+                await client.execute("{ x }", deadline=time.monotonic() + 5.0)
+        assert post.call_count == 1
+        assert breaker.state == CircuitState.CLOSED
+
+    async def test_timeout_within_the_deadline_still_counts(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=1)
+        client = AtlasGraphQLClient(
+            base_url=self.URL, timeout=1.0, max_retries=0, circuit_breaker=breaker
+        )
+        with patch.object(
+            httpx.AsyncClient, "post", AsyncMock(side_effect=httpx.ReadTimeout("slow"))
+        ):
+            with pytest.raises(TransientGraphQLError):
+                await client.execute("{ x }", deadline=time.monotonic() + 5.0)
+        assert breaker.state == CircuitState.OPEN
+
+    def test_hedge_delay_needs_samples(self) -> None:
+        client = AtlasGraphQLClient(base_url=self.URL, hedge=True, hedge_min_samples=5)
+        client._latencies.extend([0.1, 0.2, 0.3, 0.4])
+        assert client.hedge_delay() is None
+        client._latencies.extend([1.0] * 16)
+        assert client.hedge_delay() == 1.0
+        client.hedge = False
+        assert client.hedge_delay() is None
+
+    async def test_hedge_wins_when_primary_is_slow(self) -> None:
+        budget = GraphQLBudgetTracker(max_requests=10)
+        client = AtlasGraphQLClient(
+            base_url=self.URL, hedge=True, hedge_min_samples=1, budget_tracker=budget
+        )
+        client._latencies.append(0.02)
+        delays = iter([1.0, 0.0])
+
+        async def post(*args, **kwargs):
+            await asyncio.sleep(next(delays))
+            return _make_httpx_response(json_data={"data": {"x": 1}})
+
+        with patch.object(httpx.AsyncClient, "post", post):
+            assert await client.execute("{ x }") == {"x": 1}
+        assert (client.stats()["hedged"], client.stats()["hedge_wins"]) == (1, 1)
+        assert budget.remaining() == 8  # the hedge was a request too
+
+    async def test_no_hedge_without_a_spare_budget_token(self) -> None:
+        budget = GraphQLBudgetTracker(max_requests=1)
+        client = AtlasGraphQLClient(
+            base_url=self.URL, hedge=True, hedge_min_samples=1, budget_tracker=budget
+        )
+        client._latencies.append(0.01)
+
+        async def post(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return _make_httpx_response(json_data={"data": {"x": 1}})
+
+        with patch.object(httpx.AsyncClient, "post", post):
+            assert await client.execute("{ x }") == {"x": 1}
+        assert client.stats()["hedged"] == 0
+
+    async def test_hedge_does_not_take_a_reserved_token(self) -> None:
+        budget = GraphQLBudgetTracker(max_requests=2, admission="queue")
+        assert await budget.admit()  # another call in flight holds a token
+        client = AtlasGraphQLClient(
+            base_url=self.URL, hedge=True, hedge_min_samples=1, budget_tracker=budget
+        )
+        client._latencies.append(0.01)
+
+        async def post(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return _make_httpx_response(json_data={"data": {"x": 1}})
+
+        with patch.object(httpx.AsyncClient, "post", post):
+            assert await client.execute("{ x }") == {"x": 1}
+        assert client.stats()["hedged"] == 0
+        assert budget.remaining() == 1
+
+    async def test_try_consume_leaves_reserved_and_kept_tokens(self) -> None:
+        budget = GraphQLBudgetTracker(max_requests=3, admission="queue")
+        assert await budget.admit()
+        assert not await budget.try_consume(keep=2)
+        assert await budget.try_consume(keep=1)
+        assert await budget.try_consume()
+        assert not await budget.try_consume()  # the last token is reserved
+        assert budget.remaining() == 1
+
+
 # ---------------------------------------------------------------------------
 # Permanent errors must NOT trip circuit breaker
 # ---------------------------------------------------------------------------
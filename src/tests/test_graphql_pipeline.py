@@ -4,18 +4,21 @@ Every test constructs its own AtlasAgentState dict and mocks all external
 dependencies so that no LLM, database, or network access is required.
 """
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from langchain_core.messages import AIMessage, ToolMessage
 
-from src.cache import CatalogCache
+from src.cache import CatalogCache, registry
 from src.graphql_client import BudgetExhaustedError, GraphQLError
 from src.graphql_pipeline import (
     _POST_PROCESS_RULES,
     _QUERY_TYPE_TO_API,
     GRAPHQL_PIPELINE_NODES,
-    MAX_RESPONSE_CHARS,
+    MAX_RESPONSE_TOKENS,
+    EntitySelection,
+    EntitySelections,
     GraphQLEntityExtraction,
     GraphQLQueryClassification,
     GraphQLQueryPlan,
@@ -31,6 +34,7 @@ from src.graphql_pipeline import (
     post_process_response,
     resolve_ids,
 )
+from src.result_encoding import approx_tokens
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -1451,6 +1455,52 @@ class TestPostProcessResponse:
         ]
         assert non_null_values == sorted(non_null_values, reverse=True)
 
+    @pytest.mark.parametrize(
+        "query_type", ["treemap_products", "feasibility", "country_year"]
+    )
+    def test_matches_stable_sort_reference(self, query_type):
+        """Vectorized top-N equals filter + stable sort + slice, ties and Nones included."""
+        import random
+
+        rng = random.Random(7)
+
+        def value(choices):
+            return None if rng.random() < 0.1 else rng.choice(choices)
+
+        items = [
+            {
+                "productId": i,
+                "exportValue": value([0, 10, 20, 30, 1000]),
+                "year": value([2020, 2021, 2022]),
+                "exportRca": value([0.5, 0.99, 1.0, 2.0]),
+                "normalizedDistance": value([0.1, 0.2]),
+                "normalizedPci": value([0.3, 0.4]),
+                "normalizedCog": value([0.5, 0.6]),
+            }
+            for i in range(500)
+        ]
+        rules = _POST_PROCESS_RULES[query_type]
+        expected = [dict(item) for item in items]
+        if "score_weights" in rules:
+            for item in expected:
+                item["compositeScore"] = round(
+                    sum(
+                        (item.get(f) or 0.0) * w
+                        for f, w in rules["score_weights"].items()
+                    ),
+                    4,
+                )
+            expected = [item for item in expected if (item.get("exportRca") or 0) < 1]
+        sort_field = rules["sort"]
+        expected.sort(
+            key=lambda x: (x.get(sort_field) is not None, x.get(sort_field) or 0),
+            reverse=not rules.get("sort_ascending", False),
+        )
+
+        result = post_process_response(query_type, {rules["root"]: items})
+
+        assert result[rules["root"]] == expected[: rules["top_n"]]
+
 
 # ---------------------------------------------------------------------------
 # 10b. post_process_response: multi-level product enrichment
@@ -2507,7 +2557,9 @@ class TestResolveIdsExtended:
         # LLM selected "1" → Turkiye (792)
         assert result["graphql_resolved_params"]["country_id"] == 792
 
-        # Now mock LLM to return "2" (select second: Turkmenistan)
+        # Now mock LLM to return "2" (select second: Turkmenistan); the first
+        # decision is memoized, so drop it to ask the LLM again
+        registry.clear("entity_choice")
         mock_response_2 = MagicMock()
         mock_response_2.content = "2"
         mock_llm.ainvoke = AsyncMock(return_value=mock_response_2)
@@ -2522,6 +2574,280 @@ class TestResolveIdsExtended:
 
         assert result2["graphql_resolved_params"]["country_id"] == 795
 
+    @staticmethod
+    def _ambiguous_country_cache() -> CatalogCache:
+        """Country cache where the name "Turk" matches two countries."""
+        cache = CatalogCache("test_country_turk", ttl=3600)
+        cache.add_index(
+            "iso3",
+            key_fn=lambda e: (e.get("iso3Code") or "").upper() or None,
+            normalize_query=lambda q: q.strip().upper(),
+        )
+        cache.populate(
+            [
+                {"countryId": 792, "iso3Code": "TUR", "nameShortEn": "Turkiye"},
+                {"countryId": 795, "iso3Code": "TKM", "nameShortEn": "Turkmenistan"},
+            ]
+        )
+        return cache
+
+    async def test_several_ambiguous_entities_use_one_batched_llm_call(self):
+        """Ambiguous country and partner are disambiguated in one call."""
+        mock_llm = MagicMock()
+        mock_llm.ainvoke = AsyncMock()
+        mock_chain = AsyncMock(
+            return_value=EntitySelections(
+                selections=[
+                    EntitySelection(entity=1, choice=2),
+                    EntitySelection(entity=2, choice=1),
+                ]
+            )
+        )
+        mock_llm.with_structured_output.return_value.ainvoke = mock_chain
+
+        state = _base_graphql_state(
+            graphql_question="Trade between Turkmenistan and Turkey?",
+            graphql_classification=_explore_classification(),
+            graphql_entity_extraction=_explore_extraction(
+                country_name="Turk",
+                country_code_guess=None,
+                partner_name="Turk",
+            ),
+        )
+
+        result = await resolve_ids(
+            state,
+            lightweight_model=mock_llm,
+            country_cache=self._ambiguous_country_cache(),
+            product_caches={"HS92": _make_product_cache()},
+            services_cache=_make_services_cache(),
+        )
+
+        params = result["graphql_resolved_params"]
+        assert params["country_id"] == 795
+        assert params["partner_id"] == 792
+        mock_chain.assert_awaited_once()
+        mock_llm.ainvoke.assert_not_awaited()
+        prompt = mock_chain.call_args[0][0]
+        assert 'Entity 1: country "Turk"' in prompt
+        assert 'Entity 2: partner country "Turk"' in prompt
+        assert len(result["token_usage"]) == 1
+        assert result["token_usage"][0]["node"] == "resolve_ids"
+
+    async def test_batched_selection_failure_falls_back_to_first_candidates(self):
+        mock_llm = MagicMock()
+        mock_llm.with_structured_output.return_value.ainvoke = AsyncMock(
+            side_effect=RuntimeError("LLM down")
+        )
+
+        state = _base_graphql_state(
+            graphql_question="Trade between Turkey and Turkmenistan?",
+            graphql_classification=_explore_classification(),
+            graphql_entity_extraction=_explore_extraction(
+                country_name="Turk",
+                country_code_guess=None,
+                partner_name="Turk",
+            ),
+        )
+
+        result = await resolve_ids(
+            state,
+            lightweight_model=mock_llm,
+            country_cache=self._ambiguous_country_cache(),
+            product_caches={"HS92": _make_product_cache()},
+            services_cache=_make_services_cache(),
+        )
+
+        params = result["graphql_resolved_params"]
+        assert params["country_id"] == params["partner_id"] == 792
+        assert "token_usage" not in result
+
+    async def test_catalog_lookups_run_concurrently(self):
+        """Country, partner and product candidates are gathered concurrently."""
+        country_cache = _make_country_cache()
+        product_cache = _make_product_cache()
+        in_flight = 0
+        max_in_flight = 0
+
+        def slow(search):
+            async def wrapper(*args, **kwargs):
+                nonlocal in_flight, max_in_flight
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return await search(*args, **kwargs)
+
+            return wrapper
+
+        country_cache.search = slow(country_cache.search)
+        product_cache.search = slow(product_cache.search)
+
+        state = _base_graphql_state(
+            graphql_question="Kenya coffee exports to Brazil?",
+            graphql_classification=_explore_classification(),
+            graphql_entity_extraction=_explore_extraction(
+                partner_name="Brazil",
+                partner_code_guess="BRA",
+                product_name="Coffee",
+                product_code_guess="0901",
+            ),
+        )
+
+        result = await resolve_ids(
+            state,
+            lightweight_model=MagicMock(),
+            country_cache=country_cache,
+            product_caches={"HS92": product_cache},
+            services_cache=_make_services_cache(),
+        )
+
+        params = result["graphql_resolved_params"]
+        assert (params["country_id"], params["partner_id"]) == (404, 76)
+        assert params["product_id"] == 726
+        assert max_in_flight == 3
+
+    async def _resolve_turk(self, mock_llm, question: str, **kwargs) -> dict:
+        state = _base_graphql_state(
+            graphql_question=question,
+            graphql_classification=_explore_classification(),
+            graphql_entity_extraction=_explore_extraction(
+                country_name="Turk", country_code_guess=None
+            ),
+        )
+        result = await resolve_ids(
+            state,
+            lightweight_model=mock_llm,
+            country_cache=self._ambiguous_country_cache(),
+            product_caches={"HS92": _make_product_cache()},
+            services_cache=_make_services_cache(),
+            **kwargs,
+        )
+        return result
+
+    @staticmethod
+    def _llm_answering(answer: str) -> MagicMock:
+        mock_llm = MagicMock()
+        mock_llm.ainvoke = AsyncMock(return_value=AIMessage(content=answer))
+        return mock_llm
+
+    async def test_disambiguation_decision_is_memoized(self):
+        """The same name and candidates reuse the LLM's earlier choice."""
+        mock_llm = self._llm_answering("2")
+
+        first = await self._resolve_turk(mock_llm, "What does Turk export?")
+        second = await self._resolve_turk(mock_llm, "Turk imports in 2015?")
+
+        assert first["graphql_resolved_params"]["country_id"] == 795
+        assert second["graphql_resolved_params"]["country_id"] == 795
+        mock_llm.ainvoke.assert_awaited_once()
+        assert "token_usage" not in second
+        stats = registry.stats()["entity_choice"]
+        assert (stats["hits"], stats["calls_saved"]) == (1, 1)
+
+    async def test_question_scoped_decisions_are_per_question(self):
+        mock_llm = self._llm_answering("2")
+
+        await self._resolve_turk(
+            mock_llm, "What does Turk export?", choice_cache_scope="question"
+        )
+        await self._resolve_turk(
+            mock_llm, "What does Turk export?", choice_cache_scope="question"
+        )
+        await self._resolve_turk(
+            mock_llm, "Turk imports in 2015?", choice_cache_scope="question"
+        )
+
+        assert mock_llm.ainvoke.await_count == 2
+
+    async def test_choice_cache_can_be_disabled(self):
+        mock_llm = self._llm_answering("2")
+
+        for _ in range(2):
+            await self._resolve_turk(
+                mock_llm, "What does Turk export?", choice_cache_scope="off"
+            )
+
+        assert mock_llm.ainvoke.await_count == 2
+        assert len(registry._caches["entity_choice"]) == 0
+
+    async def test_unusable_llm_answers_are_not_memoized(self):
+        """A "none match" answer falls back to the first candidate, uncached."""
+        mock_llm = self._llm_answering("0")
+
+        result = await self._resolve_turk(mock_llm, "What does Turk export?")
+        await self._resolve_turk(mock_llm, "What does Turk export?")
+
+        assert result["graphql_resolved_params"]["country_id"] == 792
+        assert mock_llm.ainvoke.await_count == 2
+
+    async def test_entities_from_earlier_turns_are_reused(self):
+        """A follow-up naming the same entities skips the catalog lookups."""
+        extraction = _explore_extraction(
+            country_name="Kenya",
+            country_code_guess="KEN",
+            product_name="Coffee",
+            product_code_guess="0901",
+        )
+        first = await resolve_ids(
+            _base_graphql_state(
+                graphql_question="Kenya coffee exports?",
+                graphql_classification=_explore_classification(),
+                graphql_entity_extraction=extraction,
+            ),
+            lightweight_model=MagicMock(),
+            country_cache=_make_country_cache(),
+            product_caches={"HS92": _make_product_cache()},
+            services_cache=_make_services_cache(),
+        )
+        assert "entity_reuse" not in first
+
+        # Empty catalogs: only the remembered entries can resolve the entities
+        follow_up = await resolve_ids(
+            _base_graphql_state(
+                graphql_question="And in 2015?",
+                graphql_classification=_explore_classification(),
+                graphql_entity_extraction=extraction,
+                graphql_entity_memory=first["graphql_entity_memory"],
+            ),
+            lightweight_model=MagicMock(),
+            country_cache=CatalogCache("test_country", ttl=3600),
+            product_caches={"HS92": CatalogCache("test_product", ttl=3600)},
+            services_cache=_make_services_cache(),
+        )
+
+        params = follow_up["graphql_resolved_params"]
+        assert (params["country_id"], params["product_id"]) == (404, 726)
+        assert "resolution_notes" not in params
+        assert follow_up["entity_reuse"] == [
+            {"node": "resolve_ids", "llm_calls_avoided": 0, "lookups_avoided": 4}
+        ]
+        assert "graphql_entity_memory" not in follow_up
+
+    async def test_resolution_notes_keep_entity_order(self):
+        state = _base_graphql_state(
+            graphql_question="Narnia unicorn horn exports?",
+            graphql_classification=_explore_classification(),
+            graphql_entity_extraction=_explore_extraction(
+                country_name="Narnia",
+                country_code_guess="NAR",
+                product_name="Unicorn horns",
+            ),
+        )
+
+        result = await resolve_ids(
+            state,
+            lightweight_model=MagicMock(),
+            country_cache=_make_country_cache(),
+            product_caches={"HS92": _make_product_cache()},
+            services_cache=_make_services_cache(),
+        )
+
+        assert result["graphql_resolved_params"]["resolution_notes"] == [
+            "Could not resolve country 'Narnia' in catalog",
+            "Could not resolve product 'Unicorn horns' in catalog",
+        ]
+
 
 # ---------------------------------------------------------------------------
 # 12. Builder tests (Fixes 2.5, 2.11)
@@ -3304,7 +3630,6 @@ class TestTradeDirection:
 
     async def test_format_graphql_results_passes_direction(self):
         """format_graphql_results passes trade_direction from entity_extraction to post_process_response."""
-        import json
 
         raw_response = {
             "countryProductYear": [
@@ -3329,10 +3654,7 @@ class TestTradeDirection:
         )
         result = await format_graphql_results(state)
         content = result["messages"][0].content
-        # Content may have warning/note prefixes before the JSON
-        json_start = content.index("{")
-        parsed = json.loads(content[json_start:])
-        assert parsed["_postProcessed"]["tradeDirection"] == "imports"
+        assert "_postProcessed.tradeDirection: imports" in content
 
 
 # ---------------------------------------------------------------------------
@@ -4124,7 +4446,7 @@ class TestResponseSizeCap:
 
     @pytest.mark.asyncio
     async def test_format_graphql_results_truncates_large_content(self):
-        """Large responses should be truncated to MAX_RESPONSE_CHARS."""
+        """Large responses should be truncated to MAX_RESPONSE_TOKENS."""
         # Create a response that will produce very large JSON
         large_data = {"items": [{"id": i, "data": "x" * 500} for i in range(100)]}
         state = _base_graphql_state(
@@ -4138,7 +4460,8 @@ class TestResponseSizeCap:
         )
         result = await format_graphql_results(state)
         content = result["messages"][0].content
-        assert len(content) <= MAX_RESPONSE_CHARS + 200  # allow for warning prefix
+        # allow for warning prefix
+        assert approx_tokens(content) <= MAX_RESPONSE_TOKENS + 70
 
     @pytest.mark.asyncio
     async def test_format_graphql_results_preserves_small_content(self):
@@ -4160,7 +4483,7 @@ class TestResponseSizeCap:
     @pytest.mark.asyncio
     async def test_truncation_notice_appended(self):
         """Truncated responses should include a notice."""
-        # Generate content that exceeds MAX_RESPONSE_CHARS
+        # Generate content that exceeds MAX_RESPONSE_TOKENS
         large_data = {
             "countryProductYear": [
                 {
@@ -4185,7 +4508,7 @@ class TestResponseSizeCap:
         content = result["messages"][0].content
         # Post-processing truncates to top 20 items first;
         # if the JSON is still >15K chars after that, the cap applies
-        if len(content) > MAX_RESPONSE_CHARS:
+        if approx_tokens(content) > MAX_RESPONSE_TOKENS:
             assert "[Response truncated" in content
 
 
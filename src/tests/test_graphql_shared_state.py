@@ -0,0 +1,269 @@
+"""Tests for src/graphql_shared_state.py — budget and breaker state shared by workers.
+
+Two trackers or breakers over one store stand in for two uvicorn workers.
+The Redis store runs against a small in-memory client with the
+``redis.Redis`` call signatures.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.graphql_client import CircuitState
+from src.graphql_shared_state import (
+    RedisStateStore,
+    SharedBudgetTracker,
+    SharedCircuitBreaker,
+    SQLiteStateStore,
+    create_state_store,
+)
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.Redis the store uses."""
+
+    def __init__(self):
+        self.zsets: dict[str, dict[str, float]] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+
+    def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        for member in [m for m, score in zset.items() if score <= high]:
+            del zset[member]
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zrank(self, key, member):
+        zset = self.zsets.get(key, {})
+        if member not in zset:
+            return None
+        return sorted(zset, key=lambda m: (zset[m], m)).index(member)
+
+    def zrange(self, key, start, end, withscores=False):
+        zset = self.zsets.get(key, {})
+        members = sorted(zset, key=lambda m: (zset[m], m))[start : end + 1]
+        return [(m, zset[m]) for m in members] if withscores else members
+
+    def zrem(self, key, member):
+        self.zsets.get(key, {}).pop(member, None)
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def pexpire(self, key, ms):
+        pass
+
+    def hgetall(self, key):
+        return {k.encode(): v.encode() for k, v in self.hashes.get(key, {}).items()}
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+
+    def hincrby(self, key, field, amount):
+        h = self.hashes.setdefault(key, {})
+        h[field] = str(int(h.get(field, 0)) + amount)
+        return int(h[field])
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "redis":
+        yield RedisStateStore(client=FakeRedis())
+        return
+    store = SQLiteStateStore(tmp_path / "state.db")
+    yield store
+    store.close()
+
+
+class Broken:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("no server")
+
+        return fail
+
+
+class ThreadRecorder:
+    """Wraps a store and records the thread each call runs in."""
+
+    def __init__(self, store):
+        self.store = store
+        self.threads: set[int] = set()
+
+    def __getattr__(self, name):
+        method = getattr(self.store, name)
+
+        def call(*args, **kwargs):
+            self.threads.add(threading.get_ident())
+            return method(*args, **kwargs)
+
+        return call
+
+
+class TestSharedBudgetTracker:
+    async def test_workers_share_one_budget(self, store):
+        workers = [SharedBudgetTracker(max_requests=3, store=store) for _ in range(2)]
+        assert await workers[0].consume()
+        assert await workers[1].consume()
+        assert await workers[0].consume()
+        assert not await workers[1].consume()
+        assert workers[0].remaining() == workers[1].remaining() == 0
+
+    async def test_concurrent_consumers_never_over_admit(self, store):
+        workers = [SharedBudgetTracker(max_requests=5, store=store) for _ in range(4)]
+        results = await asyncio.gather(
+            *(w.consume() for w in workers for _ in range(4))
+        )
+        assert sum(results) == 5
+
+    async def test_window_slides(self, store):
+        tracker = SharedBudgetTracker(max_requests=1, window_seconds=0.05, store=store)
+        assert await tracker.consume()
+        assert not await tracker.consume()
+        await asyncio.sleep(0.06)
+        assert await asyncio.to_thread(tracker.remaining) == 1
+        assert await tracker.consume()
+
+    async def test_session_limit_rejection_returns_global_token(self, store):
+        worker_a = SharedBudgetTracker(
+            max_requests=10, max_requests_per_session=1, store=store
+        )
+        worker_b = SharedBudgetTracker(
+            max_requests=10, max_requests_per_session=1, store=store
+        )
+        assert await worker_a.consume("s1")
+        assert not await worker_b.consume("s1")
+        assert worker_b.remaining("s1") == 0
+        assert worker_b.remaining() == 9
+        assert await worker_b.consume("s2")
+
+    async def test_seconds_until_available_sees_other_workers(self, store):
+        worker_a = SharedBudgetTracker(max_requests=1, window_seconds=30, store=store)
+        worker_b = SharedBudgetTracker(
+            max_requests=1, window_seconds=30, store=store, admission="queue"
+        )
+        # Off the event loop the store is read directly
+        assert await asyncio.to_thread(worker_b.seconds_until_available) == 0.0
+        assert await worker_a.consume()
+        assert 29 < await asyncio.to_thread(worker_b.seconds_until_available) <= 30
+        assert not await worker_b.admit()
+
+    async def test_try_consume_keeps_spare_tokens_across_workers(self, store):
+        worker_a = SharedBudgetTracker(max_requests=3, store=store)
+        worker_b = SharedBudgetTracker(max_requests=3, store=store)
+        assert await worker_a.consume()
+        # worker_b's snapshot is not read: the store checks the spare token
+        assert await worker_b.try_consume(keep=1)
+        assert not await worker_b.try_consume(keep=1)
+        assert await worker_a.consume()
+
+    async def test_store_errors_fall_back_to_local_window(self):
+        tracker = SharedBudgetTracker(max_requests=1, store=Broken())
+        assert await tracker.consume()
+        assert not await tracker.consume()
+        assert tracker.remaining() == 0
+
+    async def test_reads_on_event_loop_use_snapshot(self, store):
+        recorder = ThreadRecorder(store)
+        worker_a = SharedBudgetTracker(max_requests=2, store=store)
+        worker_b = SharedBudgetTracker(max_requests=2, store=recorder)
+        assert await worker_a.consume()
+
+        # No snapshot yet: this worker's own window, refreshed in a thread
+        assert worker_b.remaining() == 2
+        await asyncio.gather(*worker_b._snapshots._refreshing.values())
+        assert worker_b.remaining() == 1
+        assert worker_b.seconds_until_available() == 0.0
+        assert threading.get_ident() not in recorder.threads
+
+
+class TestSharedCircuitBreaker:
+    def test_trip_in_one_worker_opens_all(self, store):
+        worker_a = SharedCircuitBreaker(failure_threshold=2, store=store)
+        worker_b = SharedCircuitBreaker(failure_threshold=2, store=store)
+        worker_a.record_failure()
+        assert not worker_b.is_open()
+        worker_b.record_failure()
+        assert worker_a.is_open() and worker_b.is_open()
+        assert worker_a.state == CircuitState.OPEN
+
+    def test_breakers_are_independent_by_name(self, store):
+        explore = SharedCircuitBreaker(failure_threshold=1, store=store, name="explore")
+        pages = SharedCircuitBreaker(
+            failure_threshold=1, store=store, name="country_pages"
+        )
+        explore.record_failure()
+        assert explore.is_open()
+        assert not pages.is_open()
+
+    def test_recovery_probe_and_close(self, store):
+        worker_a = SharedCircuitBreaker(
+            failure_threshold=1, recovery_timeout=0.05, store=store
+        )
+        worker_b = SharedCircuitBreaker(
+            failure_threshold=1, recovery_timeout=0.05, store=store
+        )
+        worker_a.record_failure()
+        time.sleep(0.06)
+        assert not worker_b.is_open()
+        assert worker_a.state == CircuitState.HALF_OPEN
+        worker_a.record_failure()
+        assert worker_b.is_open()
+
+        time.sleep(0.06)
+        assert not worker_a.is_open()
+        worker_a.record_success()
+        assert worker_b.state == CircuitState.CLOSED
+        assert not worker_b.is_open()
+
+    def test_success_resets_shared_failure_count(self, store):
+        worker_a = SharedCircuitBreaker(failure_threshold=2, store=store)
+        worker_b = SharedCircuitBreaker(failure_threshold=2, store=store)
+        worker_a.record_failure()
+        worker_b.record_success()
+        worker_a.record_failure()
+        assert not worker_b.is_open()
+
+    def test_store_errors_fall_back_to_local_state(self):
+        breaker = SharedCircuitBreaker(failure_threshold=1, store=Broken())
+        breaker.record_failure()
+        assert breaker.is_open()
+        assert breaker.state == CircuitState.OPEN
+
+    async def test_updates_on_event_loop_run_in_threads(self, store):
+        recorder = ThreadRecorder(store)
+        worker_a = SharedCircuitBreaker(failure_threshold=2, store=recorder)
+        worker_b = SharedCircuitBreaker(failure_threshold=2, store=store)
+        worker_a.record_failure()
+        worker_a.record_failure()
+        await worker_a._snapshots._last_write
+
+        assert worker_a.is_open()
+        assert await asyncio.to_thread(worker_b.is_open)
+        assert threading.get_ident() not in recorder.threads
+
+    async def test_store_errors_on_event_loop_fall_back_to_local_state(self):
+        breaker = SharedCircuitBreaker(failure_threshold=1, store=Broken())
+        breaker.record_failure()
+        await breaker._snapshots._last_write
+        assert breaker.is_open()
+
+
+def test_create_state_store_specs(tmp_path):
+    assert create_state_store("memory", default_sqlite_path=tmp_path / "x.db") is None
+    default = create_state_store("sqlite", default_sqlite_path=tmp_path / "x.db")
+    assert default.path == tmp_path / "x.db"
+    default.close()
+    custom = create_state_store(
+        f"sqlite:{tmp_path / 'y.db'}", default_sqlite_path=tmp_path / "x.db"
+    )
+    assert custom.path == tmp_path / "y.db"
+    custom.close()
+    with pytest.raises(ValueError):
+        create_state_store("memcached://x", default_sqlite_path=tmp_path / "x.db")
@@ -0,0 +1,93 @@
+"""Tests for src/http_clients.py — pooled outbound clients, warm-up and metrics."""
+
+import asyncio
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from src import http_clients
+from src.http_clients import OutboundHttp
+
+
+class KeepAliveServer:
+    """Minimal HTTP/1.1 keep-alive server on localhost that counts connections."""
+
+    def __init__(self) -> None:
+        self.connections = 0
+        self._server: asyncio.Server | None = None
+
+    async def __aenter__(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/"
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+
+    async def _handle(self, reader, writer) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                body = b"" if head.startswith(b"HEAD") else b"ok"
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n" + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+
+@pytest.fixture()
+def outbound() -> OutboundHttp:
+    return OutboundHttp()
+
+
+class TestOutboundHttp:
+    async def test_connections_are_reused_and_counted(self, outbound) -> None:
+        server = KeepAliveServer()
+        async with server as url:
+            client = outbound.create()
+            for _ in range(3):
+                assert (await client.get(url)).text == "ok"
+            await client.aclose()
+        assert server.connections == 1
+        stats = outbound.stats()["hosts"]["127.0.0.1"]
+        assert (stats["requests"], stats["connections"], stats["reused"]) == (3, 1, 2)
+        assert stats["tls_handshakes"] == 0
+
+    async def test_warm_up_opens_pooled_connections(self, outbound) -> None:
+        outbound.configure(warm_connections=2)
+        server = KeepAliveServer()
+        async with server as url:
+            client = outbound.create(warm_urls=(url,))
+            await outbound.warm_up()
+            assert server.connections == 2
+            await asyncio.gather(client.get(url), client.get(url))
+            assert server.connections == 2  # served on the warm connections
+            await client.aclose()
+        assert outbound.stats()["hosts"]["127.0.0.1"]["warmed"] == 2
+
+    async def test_warm_up_failures_are_ignored(self, outbound, caplog) -> None:
+        client = outbound.create(warm_urls=("http://127.0.0.1:9/",))
+        with caplog.at_level(logging.WARNING, logger="src.http_clients"):
+            await outbound.warm_up()
+        assert "Warm-up request" in caplog.text
+        await client.aclose()
+
+    async def test_shared_clients_are_singletons(self, outbound) -> None:
+        first = outbound.shared("posthog")
+        assert outbound.shared("posthog") is first
+        await outbound.aclose()
+        assert first.is_closed
+        assert outbound.shared("posthog") is not first
+        await outbound.aclose()
+
+    def test_http2_falls_back_without_h2(self, outbound, caplog) -> None:
+        outbound.configure(http2=True)
+        with (
+            patch.object(http_clients, "_h2_available", return_value=False),
+            caplog.at_level(logging.WARNING, logger="src.http_clients"),
+        ):
+            assert outbound.stats()["http2"] is False
+            assert outbound.stats()["http2"] is False
+        assert caplog.text.count("'h2' package is not installed") == 1
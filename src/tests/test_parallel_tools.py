@@ -0,0 +1,238 @@
+"""Tests for src/parallel_tools.py — concurrent execution of parallel tool calls.
+
+Unit tests for call selection, branch state and the join node, plus
+end-to-end runs of build_atlas_graph with several tool calls in one
+AIMessage.  No database or external LLM required.
+"""
+
+import asyncio
+import uuid
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph import END, START, StateGraph
+
+from src.parallel_tools import (
+    ACCUMULATOR_FIELDS,
+    branch_input,
+    merge_parallel_results,
+    run_tool_branch,
+    select_parallel_calls,
+)
+from src.state import AtlasAgentState
+from src.streaming import AtlasTextToSQL
+from src.tests.fake_model import FakeToolCallingModel
+from src.tests.test_graph import _build_graph, _tool_call
+
+
+def _calls(*names: str) -> list[dict]:
+    return [_tool_call(name, f"q{i}", f"c{i}") for i, name in enumerate(names)]
+
+
+class TestSelectParallelCalls:
+    def test_budget_limits_only_data_tools(self):
+        calls = _calls("query_tool", "docs_tool", "atlas_graphql", "query_tool")
+        selected = select_parallel_calls(calls, queries_executed=1, max_uses=3)
+        assert [tc["id"] for tc in selected] == ["c0", "c1", "c2"]
+
+    def test_budget_free_tools_run_when_budget_exhausted(self):
+        calls = _calls("query_tool", "lookup_catalog", "docs_tool")
+        selected = select_parallel_calls(calls, queries_executed=3, max_uses=3)
+        assert [tc["name"] for tc in selected] == ["lookup_catalog", "docs_tool"]
+
+    def test_unknown_tools_are_skipped(self):
+        assert select_parallel_calls(_calls("nope", "nope"), 0, 3) == []
+
+
+class TestBranchInput:
+    def test_narrows_last_message_and_drops_accumulators(self):
+        calls = _calls("query_tool", "docs_tool")
+        ai = AIMessage(content="", tool_calls=calls, id="ai-1")
+        state = {
+            "messages": [HumanMessage(content="hi", id="h-1"), ai],
+            "queries_executed": 1,
+            "override_schema": "hs92",
+            "step_timing": [{"node": "agent"}],
+            "parallel_results": [{"tool_call_id": "old"}],
+        }
+        branch = branch_input(state, calls[1])
+
+        assert branch["messages"][-1].tool_calls == [calls[1]]
+        assert branch["messages"][-1].id == "ai-1"
+        assert ai.tool_calls == calls  # parent message untouched
+        assert branch["queries_executed"] == 1
+        assert branch["override_schema"] == "hs92"
+        assert "step_timing" not in branch
+        assert "parallel_results" not in branch
+
+    def test_accumulator_fields_come_from_state_schema(self):
+        assert {"step_timing", "token_usage", "sql_call_history"} <= ACCUMULATOR_FIELDS
+        assert "messages" not in ACCUMULATOR_FIELDS
+        assert "pipeline_sql" not in ACCUMULATOR_FIELDS
+
+
+class TestRunToolBranch:
+    async def test_returns_new_messages_accumulators_and_changed_fields(self):
+        async def fake_pipeline(state: AtlasAgentState) -> dict:
+            tc = state["messages"][-1].tool_calls[0]
+            return {
+                "messages": [ToolMessage(content="rows", tool_call_id=tc["id"])],
+                "queries_executed": state["queries_executed"] + 1,
+                "pipeline_sql": f"SELECT '{tc['args']['question']}'",
+                "step_timing": [{"node": "fake_pipeline"}],
+            }
+
+        builder = StateGraph(AtlasAgentState)
+        builder.add_node("fake_pipeline", fake_pipeline)
+        builder.add_edge(START, "fake_pipeline")
+        builder.add_edge("fake_pipeline", END)
+        branch_graph = builder.compile(checkpointer=False)
+
+        calls = _calls("query_tool", "query_tool")
+        state = {
+            "messages": [
+                HumanMessage(content="hi", id="h-1"),
+                AIMessage(content="", tool_calls=calls, id="ai-1"),
+            ],
+            "queries_executed": 2,
+            "pipeline_sql": "SELECT 'old'",
+            "override_schema": "hs12",
+        }
+        update = await run_tool_branch(
+            branch_input(state, calls[1]), {}, branch_graph=branch_graph
+        )
+
+        assert [m.tool_call_id for m in update["messages"]] == ["c1"]
+        assert update["step_timing"] == [{"node": "fake_pipeline"}]
+        (record,) = update["parallel_results"]
+        assert record["tool_call_id"] == "c1"
+        assert record["nodes"] == ["fake_pipeline"]
+        assert record["queries"] == 1
+        assert record["state"] == {"pipeline_sql": "SELECT 'q1'"}
+
+
+class TestMergeParallelResults:
+    async def test_applies_branches_in_call_order_and_answers_skipped_calls(self):
+        calls = _calls("query_tool", "atlas_graphql", "query_tool")
+        state = {
+            "messages": [
+                AIMessage(content="", tool_calls=calls, id="ai-1"),
+                # Branches may finish in any order
+                ToolMessage(content="b", tool_call_id="c1", id="t-1"),
+                ToolMessage(content="a", tool_call_id="c0", id="t-0"),
+            ],
+            "queries_executed": 1,
+            "parallel_results": [
+                {
+                    "tool_call_id": "c1",
+                    "tool": "atlas_graphql",
+                    "nodes": [],
+                    "queries": 1,
+                    "state": {"last_error": "", "graphql_query": "{x}"},
+                },
+                {
+                    "tool_call_id": "c0",
+                    "tool": "query_tool",
+                    "nodes": [],
+                    "queries": 1,
+                    "state": {"last_error": "boom", "pipeline_sql": "SELECT 1"},
+                },
+            ],
+        }
+        update = await merge_parallel_results(state)
+
+        assert update["queries_executed"] == 3
+        assert update["last_error"] == ""  # c1 comes after c0
+        assert update["pipeline_sql"] == "SELECT 1"
+        assert update["graphql_query"] == "{x}"
+        assert update["parallel_results"] is None
+        (skipped,) = update["messages"]
+        assert skipped.tool_call_id == "c2"
+        assert "Maximum number of queries exceeded" in skipped.content
+
+
+class TestParallelToolCallsInGraph:
+    async def test_every_call_is_answered_and_budget_respected(self):
+        model = FakeToolCallingModel(
+            responses=[
+                AIMessage(
+                    content="",
+                    tool_calls=_calls(
+                        "docs_tool", "lookup_catalog", "docs_tool", "query_tool"
+                    ),
+                ),
+                AIMessage(content="done"),
+            ]
+        )
+        graph = _build_graph(model, max_uses=0)
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        result = await graph.ainvoke(
+            {"messages": [HumanMessage(content="compare")]}, config=config
+        )
+
+        tool_msgs = {
+            m.tool_call_id: m.content
+            for m in result["messages"]
+            if isinstance(m, ToolMessage)
+        }
+        assert set(tool_msgs) == {"c0", "c1", "c2", "c3"}
+        assert "Maximum number of queries exceeded" in tool_msgs["c3"]
+        assert result["queries_executed"] == 0
+        assert result["parallel_results"] == []
+        assert result["docs_question"] == "q2"  # last branch wins
+        nodes = [t["node"] for t in result["step_timing"]]
+        assert nodes.count("format_docs_results") == 2
+
+    async def test_branches_run_concurrently(self):
+        """Two docs branches each wait for the other; serial execution would hang."""
+        both_started = asyncio.Barrier(2)
+
+        async def waiting_retrieve_docs(state, *, docs_index=None, top_k=6):
+            await asyncio.wait_for(both_started.wait(), timeout=5)
+            return {"docs_synthesis": f"docs for {state['docs_question']}"}
+
+        model = FakeToolCallingModel(
+            responses=[
+                AIMessage(content="", tool_calls=_calls("docs_tool", "docs_tool")),
+                AIMessage(content="done"),
+            ]
+        )
+        with patch("src.graph.retrieve_docs", waiting_retrieve_docs):
+            graph = _build_graph(model)
+        result = await graph.ainvoke(
+            {"messages": [HumanMessage(content="two docs")]},
+            config={"configurable": {"thread_id": str(uuid.uuid4())}},
+        )
+
+        contents = [m.content for m in result["messages"] if isinstance(m, ToolMessage)]
+        assert sorted(contents) == ["docs for q0", "docs for q1"]
+
+    async def test_stream_replays_each_branch(self):
+        model = FakeToolCallingModel(
+            responses=[
+                AIMessage(content="", tool_calls=_calls("docs_tool", "docs_tool")),
+                AIMessage(content="done"),
+            ]
+        )
+        instance = AtlasTextToSQL.__new__(AtlasTextToSQL)
+        instance.agent = _build_graph(model)
+
+        events = []
+        async for _mode, data in instance.astream_agent_response(
+            "two docs", {"configurable": {"thread_id": str(uuid.uuid4())}}
+        ):
+            events.append(data)
+
+        assert [e.tool_call for e in events if e.message_type == "tool_call"] == [
+            "docs_tool",
+            "docs_tool",
+        ]
+        states = [e.payload for e in events if e.message_type == "pipeline_state"]
+        questions = [
+            s["question"] for s in states if s["stage"] == "extract_docs_question"
+        ]
+        assert sorted(questions) == ["q0", "q1"]
+        starts = [e.payload for e in events if e.message_type == "node_start"]
+        assert {s["query_index"] for s in starts} == {1, 2}
+        outputs = [e for e in events if e.message_type == "tool_output"]
+        assert len(outputs) == 2
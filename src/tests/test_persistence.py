@@ -6,8 +6,11 @@ Tests behavioral contracts only — no third-party API exercising (MemorySaver p
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
 
 from src.persistence import AsyncCheckpointerManager, CheckpointerManager
+from src.product_and_schema_lookup import SchemasAndProductsFound
+from src.result_set import ResultSet
 
 
 class TestCheckpointerManager:
@@ -125,3 +128,45 @@ class TestAsyncCheckpointerManager:
             await manager.close()
             # MemorySaver doesn't set _async_conn, so close is a no-op
             assert manager._checkpointer is not None
+
+
+class TestCheckpointSerde:
+    """Checkpointed application types load in strict msgpack mode."""
+
+    STATE = {
+        "pipeline_result_rows": ResultSet(["iso3", "year"], [["KEN", 2020]]),
+        "pipeline_products": SchemasAndProductsFound(
+            classification_schemas=["hs92"],
+            products=[],
+            requires_product_lookup=False,
+        ),
+    }
+
+    def test_strict_serializer_blocks_unregistered_types(self):
+        """Baseline: strict mode does not load ResultSet unless registered."""
+        strict = JsonPlusSerializer(allowed_msgpack_modules=None)
+        restored = strict.loads_typed(strict.dumps_typed(self.STATE))
+        assert not isinstance(restored["pipeline_result_rows"], ResultSet)
+
+    def test_round_trip_in_strict_mode(self, monkeypatch):
+        monkeypatch.setenv("LANGGRAPH_STRICT_MSGPACK", "true")
+        monkeypatch.setattr(
+            "langgraph.checkpoint.serde._msgpack.STRICT_MSGPACK_ENABLED", True
+        )
+        with patch("src.persistence.get_settings") as mock_settings:
+            mock_settings.return_value = MagicMock(checkpoint_db_url=None)
+            serde = CheckpointerManager().checkpointer.serde
+
+        restored = serde.loads_typed(serde.dumps_typed(self.STATE))
+
+        assert isinstance(restored["pipeline_result_rows"], ResultSet)
+        assert restored["pipeline_result_rows"] == [["KEN", 2020]]
+        assert restored["pipeline_products"] == self.STATE["pipeline_products"]
+
+    async def test_async_manager_uses_same_serializer(self):
+        with patch("src.persistence.get_settings") as mock_settings:
+            mock_settings.return_value = MagicMock(checkpoint_db_url=None)
+            saver = await AsyncCheckpointerManager().get_checkpointer()
+
+        restored = saver.serde.loads_typed(saver.serde.dumps_typed(self.STATE))
+        assert isinstance(restored["pipeline_result_rows"], ResultSet)
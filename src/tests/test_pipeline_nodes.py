@@ -9,6 +9,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 from langchain_core.messages import AIMessage, ToolMessage
 
+from src.entity_memory import remember_sql_entities
 from src.error_handling import QueryExecutionError
 from src.product_and_schema_lookup import (
     CountryDetails,
@@ -321,6 +322,65 @@ class TestExtractProductsNode:
         )
         assert call_kwargs.kwargs["context"] == "Use SITC classification, not HS."
 
+    async def test_follow_up_reuses_remembered_entities(self):
+        """A follow-up about the same product skips extraction and code lookup."""
+        remembered = SchemasAndProductsFound(
+            classification_schemas=["hs92"],
+            products=[
+                ProductDetails(name="coffee", classification_schema="hs92", codes=[])
+            ],
+            requires_product_lookup=True,
+        )
+        state = _base_state(
+            pipeline_question="And coffee imports in 2015?",
+            sql_entity_memory=remember_sql_entities(remembered, "coffee: 0901"),
+        )
+
+        with patch("src.sql_pipeline.ProductAndSchemaLookup") as MockLookup:
+            result = await extract_products_node(
+                state, llm=MagicMock(), engine=MagicMock()
+            )
+
+        MockLookup.assert_not_called()
+        assert result["pipeline_products"] == remembered
+        assert result["pipeline_codes"] == "coffee: 0901"
+        assert result["pipeline_entities_reused"] is True
+        assert result["entity_reuse"] == [
+            {"node": "extract_products", "llm_calls_avoided": 1, "lookups_avoided": 0}
+        ]
+        assert "token_usage" not in result
+
+    async def test_new_entity_is_extracted(self):
+        """A question naming another product is extracted from scratch."""
+        remembered = SchemasAndProductsFound(
+            classification_schemas=["hs92"],
+            products=[
+                ProductDetails(name="coffee", classification_schema="hs92", codes=[])
+            ],
+            requires_product_lookup=True,
+        )
+        canned = SchemasAndProductsFound(
+            classification_schemas=["hs92"], products=[], requires_product_lookup=True
+        )
+        state = _base_state(
+            pipeline_question="What about tea?",
+            sql_entity_memory=remember_sql_entities(remembered, "coffee: 0901"),
+        )
+
+        with patch("src.sql_pipeline.ProductAndSchemaLookup") as MockLookup:
+            mock_instance = MagicMock()
+            mock_instance.aextract_schemas_and_product_mentions_direct = AsyncMock(
+                return_value=canned
+            )
+            MockLookup.return_value = mock_instance
+            result = await extract_products_node(
+                state, llm=MagicMock(), engine=MagicMock()
+            )
+
+        assert result["pipeline_products"] == canned
+        assert result["pipeline_entities_reused"] is False
+        assert "entity_reuse" not in result
+
 
 # ---------------------------------------------------------------------------
 # 3. lookup_codes_node
@@ -512,6 +572,65 @@ class TestLookupCodesNode:
         call_kwargs = mock_instance.aselect_final_codes_direct.call_args
         assert call_kwargs.kwargs["context"] == "Prefer 4-digit codes over 2-digit."
 
+    async def test_remembers_resolved_entities(self):
+        products_found = SchemasAndProductsFound(
+            classification_schemas=["hs92"],
+            products=[
+                ProductDetails(
+                    name="wheat", classification_schema="hs92", codes=["1001"]
+                )
+            ],
+            requires_product_lookup=True,
+        )
+        final_codes = ProductCodesMapping(mappings=products_found.products)
+
+        with patch("src.sql_pipeline.ProductAndSchemaLookup") as MockLookup:
+            mock_instance = MagicMock()
+            mock_instance.get_candidate_codes.return_value = []
+            mock_instance.aselect_final_codes_direct = AsyncMock(
+                return_value=final_codes
+            )
+            MockLookup.return_value = mock_instance
+
+            state = _base_state(
+                pipeline_question="US wheat exports?",
+                pipeline_products=products_found,
+                override_mode="goods",
+            )
+            result = await lookup_codes_node(state, llm=MagicMock(), engine=MagicMock())
+
+        memory = result["sql_entity_memory"]
+        assert memory["codes"] == result["pipeline_codes"]
+        assert memory["override_mode"] == "goods"
+        assert memory["products"]["products"][0]["name"] == "wheat"
+
+    async def test_skipped_when_entities_reused(self):
+        """Codes recalled by extract_products are kept; no DB or LLM call."""
+        products_found = SchemasAndProductsFound(
+            classification_schemas=["hs92"],
+            products=[
+                ProductDetails(
+                    name="wheat", classification_schema="hs92", codes=["1001"]
+                )
+            ],
+            requires_product_lookup=True,
+        )
+        state = _base_state(
+            pipeline_question="And in 2015?",
+            pipeline_products=products_found,
+            pipeline_codes="wheat: 1001",
+            pipeline_entities_reused=True,
+        )
+
+        with patch("src.sql_pipeline.ProductAndSchemaLookup") as MockLookup:
+            result = await lookup_codes_node(state, llm=MagicMock(), engine=MagicMock())
+
+        MockLookup.assert_not_called()
+        assert "pipeline_codes" not in result
+        assert result["entity_reuse"] == [
+            {"node": "lookup_codes", "llm_calls_avoided": 1, "lookups_avoided": 1}
+        ]
+
 
 # ---------------------------------------------------------------------------
 # 4. get_table_info_node
@@ -830,6 +949,18 @@ class TestGenerateSqlNode:
         assert kwargs["retry_context"] == ""
 
 
+def _fetchmany_over(rows):
+    """Mimic ``Result.fetchmany`` batching over a fixed list of rows."""
+    remaining = list(rows)
+
+    def _fetchmany(size=None):
+        batch = remaining[:size]
+        del remaining[:size]
+        return batch
+
+    return _fetchmany
+
+
 # ---------------------------------------------------------------------------
 # 6. execute_sql_node
 # ---------------------------------------------------------------------------
@@ -846,7 +977,7 @@ class TestExecuteSqlNode:
         mock_result = MagicMock()
         mock_result.returns_rows = returns_rows
         mock_result.keys.return_value = columns
-        mock_result.fetchall.return_value = rows
+        mock_result.fetchmany.side_effect = _fetchmany_over(rows)
         mock_conn.execute.return_value = mock_result
         mock_engine.connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
         mock_engine.connect.return_value.__exit__ = MagicMock(return_value=False)
@@ -927,8 +1058,8 @@ class TestExecuteSqlNode:
         assert result["pipeline_result"] == ""
         assert "connection lost" in result["last_error"]
 
-    async def test_result_format_is_dict_per_row(self):
-        """Each row should be formatted as a dict string."""
+    async def test_result_format_is_header_plus_rows(self):
+        """Rows are encoded as a header line plus one tab-separated line each."""
         engine = self._mock_engine(
             rows=[("BRA", 500)],
             columns=["iso3_code", "export_value"],
@@ -941,9 +1072,7 @@ class TestExecuteSqlNode:
         ):
             result = await execute_sql_node(state, async_engine=engine)
 
-        # The formatting is str(dict(zip(columns, row)))
-        assert "'iso3_code': 'BRA'" in result["pipeline_result"]
-        assert "'export_value': 500" in result["pipeline_result"]
+        assert result["pipeline_result"] == "iso3_code\texport_value\nBRA\t500"
 
     async def test_execution_error_increments_retry_count(self):
         """QueryExecutionError should increment retry_count."""
@@ -989,7 +1118,7 @@ class TestExecuteSqlNodeStructuredData:
         mock_result = MagicMock()
         mock_result.returns_rows = returns_rows
         mock_result.keys.return_value = columns
-        mock_result.fetchall.return_value = rows
+        mock_result.fetchmany.side_effect = _fetchmany_over(rows)
         mock_conn.execute.return_value = mock_result
         mock_engine.connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
         mock_engine.connect.return_value.__exit__ = MagicMock(return_value=False)
@@ -1578,7 +1707,7 @@ class TestPlanSqlEntitiesNode:
 
         # Mock product search backend
         mock_backend = AsyncMock()
-        mock_backend.search = AsyncMock(return_value=[])
+        mock_backend.search_many = AsyncMock(return_value={})
         mock_backend.verify_codes = AsyncMock(
             return_value=[
                 {"product_code": "5201", "product_name": "Cotton, not carded"},
@@ -1620,7 +1749,7 @@ class TestPlanSqlEntitiesNode:
         mock_llm = self._mock_llm_for_plan(plan)
 
         mock_backend = AsyncMock()
-        mock_backend.search = AsyncMock(return_value=[])
+        mock_backend.search_many = AsyncMock(return_value={})
         mock_backend.verify_codes = AsyncMock(
             return_value=[{"product_code": "1001", "product_name": "Wheat"}]
         )
@@ -1692,7 +1821,7 @@ class TestPlanSqlEntitiesNode:
         mock_llm = self._mock_llm_for_plan(plan)
 
         mock_backend = AsyncMock()
-        mock_backend.search = AsyncMock(return_value=[])
+        mock_backend.search_many = AsyncMock(return_value={})
         mock_backend.verify_codes = AsyncMock(
             return_value=[
                 {"product_code": "5201", "product_name": "Cotton"},
@@ -1750,6 +1879,79 @@ class TestPlanSqlEntitiesNode:
             mock_validate.assert_called_once()
             assert result["pipeline_products"].countries[0].iso3_code == "IND"
 
+    async def test_follow_up_reuses_previous_plan(self):
+        """A follow-up about the same entities skips search, LLM and checks."""
+        plan = SQLEntityPlan(
+            classification_schemas=["hs12"],
+            products=[
+                ResolvedProduct(
+                    name="cotton", classification_schema="hs12", selected_codes=["5201"]
+                )
+            ],
+            countries=[CountryDetails(name="India", iso3_code="IND")],
+        )
+        mock_llm = self._mock_llm_for_plan(plan)
+        mock_backend = AsyncMock()
+        mock_backend.search_many = AsyncMock(return_value={})
+        mock_backend.verify_codes = AsyncMock(
+            return_value=[{"product_code": "5201", "product_name": "Cotton"}]
+        )
+        mock_cache = AsyncMock()
+
+        with patch(
+            "src.sql_pipeline.validate_countries", new_callable=AsyncMock
+        ) as mock_validate:
+            mock_validate.return_value = plan.countries
+            first = await plan_sql_entities_node(
+                _base_state(pipeline_question="What did India export of cotton?"),
+                llm=mock_llm,
+                product_search_backend=mock_backend,
+                country_cache=mock_cache,
+            )
+            follow_up = await plan_sql_entities_node(
+                _base_state(
+                    pipeline_question="And India's cotton imports since 2010?",
+                    sql_entity_memory=first["sql_entity_memory"],
+                ),
+                llm=mock_llm,
+                product_search_backend=mock_backend,
+                country_cache=mock_cache,
+            )
+
+        mock_llm.with_structured_output.assert_called_once()
+        mock_backend.verify_codes.assert_awaited_once()
+        mock_validate.assert_called_once()
+        assert follow_up["pipeline_products"] == first["pipeline_products"]
+        assert follow_up["pipeline_codes"] == first["pipeline_codes"]
+        # Search, one code verification, country validation
+        assert follow_up["entity_reuse"] == [
+            {"node": "plan_sql_entities", "llm_calls_avoided": 1, "lookups_avoided": 3}
+        ]
+        assert "token_usage" not in follow_up
+
+    async def test_memory_ignored_when_overrides_change(self):
+        plan = SQLEntityPlan(
+            classification_schemas=["hs12"],
+            products=[],
+            countries=[CountryDetails(name="Brazil", iso3_code="BRA")],
+        )
+        mock_llm = self._mock_llm_for_plan(plan)
+        first = await plan_sql_entities_node(
+            _base_state(pipeline_question="What is Brazil's ECI?"), llm=mock_llm
+        )
+
+        result = await plan_sql_entities_node(
+            _base_state(
+                pipeline_question="And Brazil's exports?",
+                override_schema="hs92",
+                sql_entity_memory=first["sql_entity_memory"],
+            ),
+            llm=mock_llm,
+        )
+
+        assert mock_llm.with_structured_output.call_count == 2
+        assert "entity_reuse" not in result
+
 
 # ---------------------------------------------------------------------------
 # _format_search_candidates / _gather_search_candidates helpers
@@ -1782,27 +1984,35 @@ class TestSearchCandidateHelpers:
     def test_format_empty_candidates(self):
         assert _format_search_candidates({}) == ""
 
-    async def test_gather_candidates_calls_search(self):
+    async def test_gather_candidates_searches_all_schemas_at_once(self):
+        cotton = {
+            "product_code": "5201",
+            "product_name": "Cotton",
+            "product_level": "4",
+        }
         mock_backend = AsyncMock()
-        mock_backend.search = AsyncMock(
-            return_value=[
-                {
-                    "product_code": "5201",
-                    "product_name": "Cotton",
-                    "product_level": "4",
-                }
-            ]
+        mock_backend.search_many = AsyncMock(
+            return_value={"hs12": [cotton], "sitc": []}
         )
 
         result = await _gather_search_candidates(
-            "cotton exports", mock_backend, schemas=["hs12"]
+            "cotton exports", mock_backend, schemas=["hs12", "sitc"]
         )
-        assert "hs12" in result
-        assert len(result["hs12"]) == 1
+        assert result == {"hs12": [cotton]}
+        mock_backend.search_many.assert_awaited_once_with(
+            "cotton exports", ["hs12", "sitc"], top_k=10
+        )
+        mock_backend.search.assert_not_called()
+
+    async def test_gather_candidates_requires_search_many(self):
+        backend = MagicMock(spec=["search", "verify_codes"])
+
+        with pytest.raises(AttributeError):
+            await _gather_search_candidates("cotton", backend, schemas=["hs12"])
 
     async def test_gather_candidates_handles_search_error(self):
         mock_backend = AsyncMock()
-        mock_backend.search = AsyncMock(side_effect=RuntimeError("Search failed"))
+        mock_backend.search_many = AsyncMock(side_effect=RuntimeError("Search failed"))
 
         result = await _gather_search_candidates(
             "cotton", mock_backend, schemas=["hs12"]
@@ -0,0 +1,258 @@
+"""Tests for src/product_search.py — embedding product search over a tiny index.
+
+Builds a throwaway sqlite-vec index with the same tables as
+``scripts/build_product_search_index.py`` and stubs the embedding API.
+The NumPy backend is also tested from in-memory arrays, which needs no
+sqlite extension.
+"""
+
+import asyncio
+import sqlite3
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.product_search import (
+    EMBEDDING_DIM,
+    EmbeddingProductSearch,
+    NumpyProductSearch,
+    _SchemaMatrix,
+    _serialize_embedding,
+)
+
+sqlite_vec = pytest.importorskip("sqlite_vec")
+
+# (schema, code, name, axis) — each product's embedding is a unit vector
+# on one axis, so the query vector on axis 0 ranks "cars" first.
+PRODUCTS = [
+    ("hs12", "8703", "Cars", 0),
+    ("hs12", "5201", "Cotton", 1),
+    ("hs92", "8703", "Motor cars", 0),
+    ("sitc", "7810", "Passenger motor cars", 0),
+    ("sitc", "2631", "Raw cotton", 1),
+]
+
+
+def _unit(axis: int) -> list[float]:
+    vec = [0.0] * EMBEDDING_DIM
+    vec[axis] = 1.0
+    return vec
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    if not hasattr(sqlite3.Connection, "enable_load_extension"):
+        pytest.skip("sqlite3 built without extension loading")
+    path = tmp_path / "products.db"
+    conn = sqlite3.connect(path)
+    conn.enable_load_extension(True)
+    sqlite_vec.load(conn)
+    conn.executescript(
+        """
+        CREATE TABLE products (
+            rowid INTEGER PRIMARY KEY AUTOINCREMENT,
+            schema TEXT NOT NULL,
+            product_code TEXT NOT NULL,
+            product_name TEXT NOT NULL,
+            product_id TEXT NOT NULL,
+            product_level TEXT NOT NULL
+        );
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """
+    )
+    conn.execute(
+        f"CREATE VIRTUAL TABLE product_embeddings USING vec0(embedding float[{EMBEDDING_DIM}])"
+    )
+    conn.execute("INSERT INTO meta VALUES ('embedding_dim', ?)", [str(EMBEDDING_DIM)])
+    for i, (schema, code, name, axis) in enumerate(PRODUCTS, start=1):
+        conn.execute(
+            "INSERT INTO products VALUES (?, ?, ?, ?, ?, '4')",
+            [i, schema, code, name, str(100 + i)],
+        )
+        conn.execute(
+            "INSERT INTO product_embeddings(rowid, embedding) VALUES (?, ?)",
+            [i, _serialize_embedding(_unit(axis))],
+        )
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def search(index_path):
+    backend = EmbeddingProductSearch(index_path)
+    yield backend
+    backend.close()
+
+
+class TestSearchManyDispatch:
+    async def test_one_embedding_and_one_thread_hop(self):
+        backend = EmbeddingProductSearch.__new__(EmbeddingProductSearch)
+        backend._knn_search = MagicMock(side_effect=lambda q, schema, k: [schema])
+        embed = AsyncMock(return_value=_unit(0))
+        with (
+            patch("src.product_search._embed_query", embed),
+            patch(
+                "src.product_search.asyncio.to_thread", wraps=asyncio.to_thread
+            ) as hop,
+        ):
+            results = await backend.search_many("cars", ["hs12", "sitc"], 3)
+
+        assert results == {"hs12": ["hs12"], "sitc": ["sitc"]}
+        embed.assert_awaited_once_with("cars")
+        assert hop.call_count == 1
+        query_bytes = _serialize_embedding(_unit(0))
+        assert [c.args for c in backend._knn_search.call_args_list] == [
+            (query_bytes, "hs12", 3),
+            (query_bytes, "sitc", 3),
+        ]
+
+    async def test_failing_schema_does_not_drop_the_others(self):
+        backend = EmbeddingProductSearch.__new__(EmbeddingProductSearch)
+
+        def knn(query_bytes, schema, top_k):
+            if schema == "hs12":
+                raise sqlite3.OperationalError("database is locked")
+            return [schema]
+
+        backend._knn_search = MagicMock(side_effect=knn)
+        with patch("src.product_search._embed_query", AsyncMock(return_value=_unit(0))):
+            results = await backend.search_many("cars", ["hs12", "sitc"], 3)
+
+        assert results == {"hs12": [], "sitc": ["sitc"]}
+
+
+class TestSearchMany:
+    async def test_embeds_once_and_groups_by_schema(self, search):
+        embed = AsyncMock(return_value=_unit(0))
+        with patch("src.product_search._embed_query", embed):
+            results = await search.search_many("cars", ["hs12", "hs92", "sitc"], 5)
+
+        embed.assert_awaited_once_with("cars")
+        assert list(results) == ["hs12", "hs92", "sitc"]
+        assert [r["product_code"] for r in results["hs12"]] == ["8703", "5201"]
+        assert [r["product_name"] for r in results["hs92"]] == ["Motor cars"]
+        assert results["sitc"][0]["product_code"] == "7810"
+
+    async def test_matches_per_schema_search(self, search):
+        with patch("src.product_search._embed_query", AsyncMock(return_value=_unit(1))):
+            grouped = await search.search_many("cotton", ["hs12", "sitc"], 1)
+            single = {s: await search.search("cotton", s, 1) for s in ("hs12", "sitc")}
+        assert grouped == single
+        assert grouped["sitc"][0]["product_name"] == "Raw cotton"
+
+    async def test_embedding_failure_returns_empty_groups(self, search):
+        with patch("src.product_search._embed_query", AsyncMock(return_value=None)):
+            results = await search.search_many("cars", ["hs12", "sitc"])
+        assert results == {"hs12": [], "sitc": []}
+
+
+def _numpy_search(quantize: bool = False) -> NumpyProductSearch:
+    products = [
+        {
+            "schema": schema,
+            "product_code": code,
+            "product_name": name,
+            "product_id": 100 + i,
+            "product_level": 4,
+        }
+        for i, (schema, code, name, _axis) in enumerate(PRODUCTS, start=1)
+    ]
+    embeddings = np.array([_unit(axis) for *_, axis in PRODUCTS])
+    return NumpyProductSearch(products, embeddings, quantize=quantize)
+
+
+class TestNumpyProductSearch:
+    @pytest.mark.parametrize("quantize", [False, True])
+    async def test_ranks_within_schema_only(self, quantize):
+        search = _numpy_search(quantize)
+        with patch("src.product_search._embed_query", AsyncMock(return_value=_unit(1))):
+            results = await search.search_many("cotton", ["hs12", "hs92", "sitc"], 5)
+
+        assert [r["product_code"] for r in results["hs12"]] == ["5201", "8703"]
+        assert [r["product_code"] for r in results["hs92"]] == ["8703"]
+        assert results["sitc"][0] == {
+            "product_code": "2631",
+            "product_name": "Raw cotton",
+            "product_id": "105",
+            "product_level": "4",
+        }
+
+    async def test_top_k_and_duplicate_codes(self):
+        products = [
+            {
+                "schema": "hs12",
+                "product_code": code,
+                "product_name": f"p{i}",
+                "product_id": i,
+                "product_level": level,
+            }
+            for i, (code, level) in enumerate(
+                [("01", "2"), ("01", "4"), ("02", "4"), ("03", "4")]
+            )
+        ]
+        # Unit vectors rotating away from axis 0; the code "01" appears twice.
+        angles = np.array([0.1, 0.2, 0.3, 0.4])
+        embeddings = np.zeros((4, EMBEDDING_DIM))
+        embeddings[:, 0], embeddings[:, 1] = np.cos(angles), np.sin(angles)
+        search = NumpyProductSearch(products, embeddings)
+        with patch("src.product_search._embed_query", AsyncMock(return_value=_unit(0))):
+            results = await search.search("x", "hs12", top_k=2)
+        assert [(r["product_code"], r["product_level"]) for r in results] == [
+            ("01", "2"),
+            ("02", "4"),
+        ]
+
+    async def test_scores_off_the_event_loop(self):
+        search = _numpy_search()
+        with (
+            patch("src.product_search._embed_query", AsyncMock(return_value=_unit(1))),
+            patch(
+                "src.product_search.asyncio.to_thread", wraps=asyncio.to_thread
+            ) as hop,
+        ):
+            await search.search_many("cotton", ["hs12", "sitc"], 5)
+        assert hop.call_count == 1
+
+    def test_int8_scores_in_chunks(self, monkeypatch):
+        rng = np.random.default_rng(0)
+        embeddings = rng.standard_normal((10, EMBEDDING_DIM)).astype(np.float32)
+        matrix = _SchemaMatrix(embeddings, [{"product_code": "1"}] * 10, True)
+        query = rng.standard_normal(EMBEDDING_DIM).astype(np.float32)
+        expected = (
+            matrix.matrix.astype(np.float32) @ query * matrix.scales
+            - matrix.half_sq_norms
+        )
+
+        monkeypatch.setattr("src.product_search.SCORE_CHUNK_ROWS", 3)
+        np.testing.assert_allclose(matrix.scores(query), expected, rtol=1e-5)
+
+    async def test_unknown_schema_and_failed_embedding(self):
+        search = _numpy_search()
+        with patch("src.product_search._embed_query", AsyncMock(return_value=_unit(0))):
+            assert await search.search("cars", "hs22") == []
+        with patch("src.product_search._embed_query", AsyncMock(return_value=None)):
+            assert await search.search_many("cars", ["hs12"]) == {"hs12": []}
+
+    async def test_verify_codes(self):
+        search = _numpy_search()
+        verified = await search.verify_codes(["8703", "9999", "8703"], "hs12")
+        assert [v["product_name"] for v in verified] == ["Cars"]
+        assert await search.verify_codes(["8703"], "hs22") == []
+
+    def test_rejects_mismatched_dimensions(self):
+        with pytest.raises(ValueError, match="shape"):
+            NumpyProductSearch(
+                [{"schema": "hs12", "product_code": "1"}], np.zeros((1, 3))
+            )
+
+    async def test_from_index_matches_sqlite_vec(self, index_path, search):
+        numpy_search = NumpyProductSearch.from_index(index_path)
+        with patch("src.product_search._embed_query", AsyncMock(return_value=_unit(0))):
+            expected = await search.search_many("cars", ["hs12", "hs92", "sitc"], 3)
+            actual = await numpy_search.search_many("cars", ["hs12", "hs92", "sitc"], 3)
+        assert actual == expected
+        assert await numpy_search.verify_codes(
+            ["8703"], "sitc"
+        ) == await search.verify_codes(["8703"], "sitc")
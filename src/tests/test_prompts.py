@@ -52,6 +52,8 @@ _PROMPT_CONSTANTS = [
     "GRAPHQL_CLASSIFICATION_PROMPT",
     "GRAPHQL_ENTITY_EXTRACTION_PROMPT",
     "ID_RESOLUTION_SELECTION_PROMPT",
+    "BATCH_ID_RESOLUTION_SELECTION_PROMPT",
+    "CONVERSATION_SUMMARY_PROMPT",
     "DOCUMENT_SELECTION_PROMPT",
     "DOCUMENTATION_SYNTHESIS_PROMPT",
 ]
@@ -123,6 +125,18 @@ class TestFormatPlaceholderContracts:
             "num_candidates",
         }
 
+    def test_batch_id_resolution_prompt_matches_builder(self):
+        assert _get_format_fields(prompts.BATCH_ID_RESOLUTION_SELECTION_PROMPT) == {
+            "question",
+            "entities",
+        }
+
+    def test_conversation_summary_prompt_matches_builder(self):
+        assert _get_format_fields(prompts.CONVERSATION_SUMMARY_PROMPT) == {
+            "previous_summary",
+            "turns",
+        }
+
     def test_document_selection_prompt_matches_caller(self):
         assert _get_format_fields(prompts.DOCUMENT_SELECTION_PROMPT) == {
             "question",
@@ -385,6 +399,19 @@ class TestBuildIdResolutionPrompt:
         assert "Agent guidance:" not in result
 
 
+class TestBuildBatchIdResolutionPrompt:
+    def test_no_unresolved_placeholders(self):
+        result = prompts.build_batch_id_resolution_prompt("q", 'Entity 1: country "x"')
+        assert not _has_unresolved_format_fields(result)
+
+    def test_context_appended_when_provided(self):
+        result = prompts.build_batch_id_resolution_prompt(
+            "q", 'Entity 1: country "x"', context="use HS92 classification"
+        )
+        assert "Agent guidance:" in result
+        assert "use HS92 classification" in result
+
+
 # ---------------------------------------------------------------------------
 # Guard rail: no XML tags (provider-agnostic design rule)
 # ---------------------------------------------------------------------------
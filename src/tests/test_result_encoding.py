@@ -0,0 +1,129 @@
+"""Tests for src/result_encoding.py — compact tool-result encoding."""
+
+from decimal import Decimal
+
+import pytest
+
+from src.result_encoding import (
+    MIN_CELL_CHARS,
+    approx_tokens,
+    encode_records,
+    encode_table,
+    format_value,
+    truncate_to_token_budget,
+)
+from src.result_set import ResultSet
+
+
+class TestFormatValue:
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [
+            (None, "NULL"),
+            (42, "42"),
+            (True, "True"),
+            (1000.0, "1000"),
+            (1234.56789, "1234.5679"),
+            (Decimal("10.2500"), "10.25"),
+            (0.000012345, "1.234e-05"),
+            (0.0, "0"),
+            (float("nan"), "nan"),
+            ("Brazil\tNorth\n", "Brazil North"),
+            ({"a": 1}, '{"a":1}'),
+        ],
+    )
+    def test_formats(self, value, expected):
+        assert format_value(value) == expected
+
+
+class TestEncodeTable:
+    def test_header_and_rows(self):
+        out = encode_table(["a", "b"], [[1, 2], [3, None]])
+        assert out == "a\tb\n1\t2\n3\tNULL"
+
+    def test_empty(self):
+        assert encode_table(["a"], []) == ""
+
+    def test_csv_delimiter_escapes_cells(self):
+        assert encode_table(["name"], [["a,b"]], delimiter=",") == "name\na b"
+
+    def test_max_rows_adds_tail_stats(self):
+        rows = [["BRA", i] for i in range(10)]
+        out = encode_table(["iso", "v"], rows, max_rows=3)
+        lines = out.split("\n")
+        assert lines[1:4] == ["BRA\t0", "BRA\t1", "BRA\t2"]
+        assert lines[-1] == (
+            "[7 more rows not shown (10 total); omitted rows: v min=3 max=9 sum=42]"
+        )
+
+    def test_tail_stats_optional(self):
+        out = encode_table(["v"], [[1], [2]], max_rows=1, tail_stats=False)
+        assert out.endswith("[1 more rows not shown (2 total)]")
+
+    def test_respects_token_budget(self):
+        rows = ResultSet(
+            ["iso", "year", "value"],
+            [["BRA", 2000 + i % 20, i * 1.5] for i in range(5000)],
+        )
+        out = encode_table(rows.columns, rows, token_budget=500)
+        assert approx_tokens(out) <= 500
+        assert "(5,000 total)" in out
+        assert "value min=" in out
+
+    def test_keeps_one_row_even_when_over_budget(self):
+        out = encode_table(["v"], [["x" * 3000], ["y"]], token_budget=10)
+        assert out.split("\n")[1] == "x" * (MIN_CELL_CHARS - 1) + "…"
+        assert "[1 more rows not shown (2 total)]" in out
+
+    def test_oversized_cell_is_clipped_to_the_budget(self):
+        out = encode_table(["a", "b"], [["x" * 5000, 1]], token_budget=100)
+        assert approx_tokens(out) <= 100
+        assert out.endswith("…\t1")
+
+    def test_no_footer_when_every_row_is_shown(self):
+        columns = [f"c{i}" for i in range(20)]
+        out = encode_table(columns, [["x" * 100] * 20], token_budget=50)
+        assert len(out.split("\n")) == 2
+        assert "more rows not shown" not in out
+
+    def test_much_smaller_than_dict_per_row(self):
+        columns = ["iso3_code", "product_code", "year", "export_value"]
+        rows = [["BRA", f"{i:04d}", 2022, i * 1000.25] for i in range(200)]
+        old = "\n".join(str(dict(zip(columns, row))) for row in rows)
+        new = encode_table(columns, rows, token_budget=100_000)
+        assert len(new) < len(old) / 2
+
+
+class TestEncodeRecords:
+    def test_flattens_scalars_and_tabulates_record_lists(self):
+        out = encode_records(
+            {
+                "countryProductYear": [
+                    {"productId": 1, "exportValue": 10.5},
+                    {"productId": 2, "exportValue": 3, "year": 2024},
+                ],
+                "_postProcessed": {"tradeDirection": "imports"},
+            }
+        )
+        assert out.split("\n") == [
+            "_postProcessed.tradeDirection: imports",
+            "countryProductYear (2 rows):",
+            "productId\texportValue\tyear",
+            "1\t10.5\tNULL",
+            "2\t3\t2024",
+        ]
+
+    def test_empty_list_is_scalar(self):
+        assert encode_records({"items": []}) == "items: []"
+
+
+class TestTruncateToTokenBudget:
+    def test_short_content_unchanged(self):
+        assert truncate_to_token_budget("abc", 10) == "abc"
+
+    def test_cuts_at_line_break_with_notice(self):
+        content = "\n".join(f"row {i:04d}" for i in range(1000))
+        out = truncate_to_token_budget(content, 100)
+        assert approx_tokens(out) <= 100
+        assert "[Response truncated" in out
+        assert out.split("\n\n[Response")[0].endswith(tuple("0123456789"))
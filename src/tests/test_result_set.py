@@ -0,0 +1,110 @@
+"""Tests for src/result_set.py — columnar storage of query results."""
+
+import datetime
+import sys
+from array import array
+from decimal import Decimal
+
+import pytest
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.result_set import ResultSet
+
+ROWS = [
+    ["BRA", 2022, 1.5, Decimal("10.25"), datetime.date(2022, 1, 1)],
+    ["USA", None, None, Decimal("3"), None],
+    ["BRA", 2021, 0.25, None, datetime.date(2021, 1, 1)],
+]
+COLUMNS = ["iso3_code", "year", "share", "export_value", "as_of"]
+
+
+@pytest.fixture
+def rs():
+    return ResultSet(COLUMNS, ROWS)
+
+
+class TestStorage:
+    def test_round_trips_rows_losslessly(self, rs):
+        assert rs == ROWS
+        assert rs.to_rows() == ROWS
+        assert rs[1] == ("USA", None, None, Decimal("3"), None)
+        assert [type(v) for v in rs[0]] == [str, int, float, Decimal, datetime.date]
+
+    def test_numeric_columns_are_typed_arrays(self, rs):
+        assert isinstance(rs._data[1], array) and rs._data[1].typecode == "q"
+        assert isinstance(rs._data[2], array) and rs._data[2].typecode == "d"
+        assert isinstance(rs._data[3], list)  # Decimal stays generic
+
+    def test_strings_are_interned(self):
+        a = "".join(["B", "RA"])
+        b = "".join(["BR", "A"])
+        assert a is not b
+        rs = ResultSet(["iso"], [[a], [b]])
+        assert rs[0][0] is rs[1][0]
+
+    def test_bools_and_huge_ints_are_not_coerced(self):
+        rs = ResultSet(["flag", "big"], [[True, 2**70], [False, 1]])
+        assert rs == [[True, 2**70], [False, 1]]
+        assert rs[0][0] is True
+
+    def test_mismatched_width_raises(self):
+        with pytest.raises(ValueError):
+            ResultSet(["a", "b"], [[1]])
+
+    def test_empty(self):
+        rs = ResultSet(["a"])
+        assert len(rs) == 0
+        assert not rs
+        assert rs == []
+        assert rs.columns == ["a"]
+
+    def test_smaller_than_nested_lists_for_wide_tables(self):
+        rows = [["BRA", "hs92", 2000 + i % 20, i, float(i), i * 3] for i in range(5000)]
+        list_bytes = sys.getsizeof(rows) + sum(
+            sys.getsizeof(r) + sum(sys.getsizeof(v) for v in r) for r in rows
+        )
+        assert ResultSet(list("abcdef"), rows).nbytes < list_bytes / 3
+
+
+class TestAccess:
+    def test_slices_are_views(self, rs):
+        view = rs[1:]
+        assert view == ROWS[1:]
+        assert view._data is rs._data
+        assert view[1:2] == ROWS[2:3]
+        assert rs[::2] == ROWS[::2]
+        assert rs[5:] == []
+
+    def test_negative_index_and_bounds(self, rs):
+        assert rs[-1] == tuple(ROWS[-1])
+        with pytest.raises(IndexError):
+            rs[3]
+
+    def test_iteration_is_lazy(self, rs):
+        it = iter(rs)
+        assert next(it) == tuple(ROWS[0])
+
+    def test_column(self, rs):
+        assert rs.column("year") == [2022, None, 2021]
+        assert rs[1:].column("iso3_code") == ["USA", "BRA"]
+        with pytest.raises(KeyError):
+            rs.column("nope")
+
+
+class TestSerialization:
+    def test_json_rows(self, rs):
+        assert rs.to_json_rows()[0] == ["BRA", 2022, 1.5, "10.25", "2022-01-01"]
+        assert rs.to_json_rows()[1] == ["USA", None, None, "3", None]
+
+    def test_checkpoint_round_trip(self, rs):
+        serde = JsonPlusSerializer()
+        restored = serde.loads_typed(serde.dumps_typed({"rows": rs[1:]}))["rows"]
+        assert isinstance(restored, ResultSet)
+        assert restored == ROWS[1:]
+        assert restored.columns == COLUMNS
+
+    def test_arrow(self, rs):
+        pa = pytest.importorskip("pyarrow")
+        table = rs.to_arrow()
+        assert isinstance(table, pa.Table)
+        assert table.column("year").to_pylist() == [2022, None, 2021]
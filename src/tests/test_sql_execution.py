@@ -0,0 +1,115 @@
+"""Tests for src/sql_execution.py — bounded streaming row fetch."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.sql_execution import (
+    FETCH_BATCH_SIZE,
+    FetchedResult,
+    afetch_rows,
+    fetch_rows,
+)
+
+
+def _recording_fetchmany(rows, sizes):
+    remaining = list(rows)
+
+    def _fetchmany(size=None):
+        sizes.append(size)
+        batch = remaining[:size]
+        del remaining[:size]
+        return batch
+
+    return _fetchmany
+
+
+def _sync_conn(rows, columns=("n",), plan=None):
+    """Mock sync connection; the second execute() answers the EXPLAIN."""
+    sizes: list[int] = []
+    result = MagicMock()
+    result.returns_rows = True
+    result.keys.return_value = list(columns)
+    result.fetchmany.side_effect = _recording_fetchmany(rows, sizes)
+    explain = MagicMock()
+    explain.scalar.return_value = plan
+    conn = MagicMock()
+    conn.execute.side_effect = [result, explain]
+    return conn, result, sizes
+
+
+class TestFetchRows:
+    def test_small_result_is_complete(self):
+        conn, result, _ = _sync_conn([(1,), (2,)])
+        fetched = fetch_rows(conn, "SELECT n FROM t", max_rows=10)
+        assert fetched.rows == [[1], [2]]
+        assert not fetched.truncated
+        assert fetched.describe_total() == "2"
+        assert conn.execute.call_count == 1  # no EXPLAIN needed
+        result.close.assert_called_once()
+
+    def test_stops_at_cap_and_estimates_total(self):
+        rows = [(i,) for i in range(3 * FETCH_BATCH_SIZE)]
+        plan = json.dumps([{"Plan": {"Plan Rows": 1234567}}])
+        conn, result, sizes = _sync_conn(rows, plan=plan)
+
+        fetched = fetch_rows(conn, "SELECT n FROM t", max_rows=FETCH_BATCH_SIZE + 10)
+
+        assert len(fetched.rows) == FETCH_BATCH_SIZE + 10
+        assert fetched.truncated
+        assert fetched.total_rows == 1234567
+        assert fetched.describe_total() == "~1,234,567 (estimated)"
+        # Only one row past the cap is ever pulled from the cursor
+        assert sum(sizes) == FETCH_BATCH_SIZE + 11
+        assert "EXPLAIN" in str(conn.execute.call_args_list[1].args[0])
+        result.close.assert_called_once()
+
+    def test_exactly_cap_rows_is_not_truncated(self):
+        conn, _, _ = _sync_conn([(i,) for i in range(5)])
+        fetched = fetch_rows(conn, "SELECT n FROM t", max_rows=5)
+        assert len(fetched.rows) == 5
+        assert not fetched.truncated
+
+    def test_estimate_failure_still_returns_rows(self):
+        conn, result, _ = _sync_conn([(i,) for i in range(5)])
+        conn.execute.side_effect = [result, Exception("permission denied")]
+        fetched = fetch_rows(conn, "SELECT n FROM t", max_rows=2)
+        assert fetched.rows == [[0], [1]]
+        assert fetched.total_rows is None
+        assert fetched.describe_total() == "more than 2 (total unknown)"
+
+    def test_non_row_statement(self):
+        conn = MagicMock()
+        conn.execute.return_value.returns_rows = False
+        assert fetch_rows(conn, "SET search_path TO hs92") == FetchedResult()
+
+
+class TestAfetchRows:
+    async def test_streams_with_cap(self):
+        sizes: list[int] = []
+        result = MagicMock()
+        result.keys.return_value = ["n"]
+        result.fetchmany = AsyncMock(
+            side_effect=_recording_fetchmany([(i,) for i in range(50)], sizes)
+        )
+        result.close = AsyncMock()
+        explain = MagicMock()
+        explain.scalar.return_value = [{"Plan": {"Plan Rows": 50}}]
+        conn = MagicMock()
+        conn.stream = AsyncMock(return_value=result)
+        conn.execute = AsyncMock(return_value=explain)
+
+        fetched = await afetch_rows(conn, "SELECT n FROM t", max_rows=20)
+
+        assert len(fetched.rows) == 20
+        assert fetched.truncated
+        assert fetched.total_rows == 50
+        assert sum(sizes) == 21
+        result.close.assert_awaited_once()
+
+    @pytest.mark.parametrize("plan_rows", [3, 0])
+    async def test_estimate_never_below_fetched(self, plan_rows):
+        """Stale planner statistics must not report fewer rows than we saw."""
+        fetched = FetchedResult(["n"], [[1]] * 10, truncated=True, total_rows=plan_rows)
+        assert fetched.describe_total() == "~11 (estimated)"
@@ -9,6 +9,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 
+from src.result_encoding import encode_table
 from src.sql_subagent import (
     MAX_ITERATIONS,
     RESULT_DISPLAY_ROWS,
@@ -16,7 +17,6 @@ from src.sql_subagent import (
     _build_initial_message,
     _explore_schema_sync,
     _extract_table_name,
-    _format_result_rows,
     _summarize_execute_sql_result,
     build_sql_subagent,
     execute_sql_tool_node,
@@ -116,6 +116,18 @@ def _base_parent_state(**overrides) -> dict:
     return state
 
 
+def _fetchmany_over(rows):
+    """Mimic ``Result.fetchmany`` batching over a fixed list of rows."""
+    remaining = list(rows)
+
+    def _fetchmany(size=None):
+        batch = remaining[:size]
+        del remaining[:size]
+        return batch
+
+    return _fetchmany
+
+
 def _mock_engine_with_results(columns, rows):
     """Create a mock sync engine that returns the given results."""
     mock_engine = MagicMock()
@@ -123,7 +135,7 @@ def _mock_engine_with_results(columns, rows):
     mock_result = MagicMock()
     mock_result.returns_rows = True
     mock_result.keys.return_value = columns
-    mock_result.fetchall.return_value = rows
+    mock_result.fetchmany.side_effect = _fetchmany_over(rows)
     mock_conn.execute.return_value = mock_result
     mock_conn.__enter__ = MagicMock(return_value=mock_conn)
     mock_conn.__exit__ = MagicMock(return_value=False)
@@ -144,7 +156,7 @@ def _mock_engine_fail_then_succeed(error_msg, columns, rows):
         result = MagicMock()
         result.returns_rows = True
         result.keys.return_value = columns
-        result.fetchall.return_value = rows
+        result.fetchmany.side_effect = _fetchmany_over(rows)
         return result
 
     mock_conn.execute.side_effect = _side_effect
@@ -369,7 +381,9 @@ class TestExecuteSqlToolNode:
         mock_result = MagicMock()
         mock_result.returns_rows = True
         mock_result.keys.return_value = ["iso3_code", "export_value"]
-        mock_result.fetchall.return_value = [("BRA", 100000), ("USA", 200000)]
+        mock_result.fetchmany.side_effect = _fetchmany_over(
+            [("BRA", 100000), ("USA", 200000)]
+        )
         mock_conn.execute.return_value = mock_result
         mock_conn.__enter__ = MagicMock(return_value=mock_conn)
         mock_conn.__exit__ = MagicMock(return_value=False)
@@ -408,7 +422,7 @@ class TestExecuteSqlToolNode:
         mock_result = MagicMock()
         mock_result.returns_rows = True
         mock_result.keys.return_value = ["iso3_code"]
-        mock_result.fetchall.return_value = []
+        mock_result.fetchmany.side_effect = _fetchmany_over([])
         mock_conn.execute.return_value = mock_result
         mock_conn.__enter__ = MagicMock(return_value=mock_conn)
         mock_conn.__exit__ = MagicMock(return_value=False)
@@ -445,20 +459,58 @@ class TestExecuteSqlToolNode:
         mock_result = MagicMock()
         mock_result.returns_rows = True
         mock_result.keys.return_value = ["iso3_code", "export_value"]
-        mock_result.fetchall.return_value = many_rows
+        mock_result.fetchmany.side_effect = _fetchmany_over(many_rows)
         mock_conn.execute.return_value = mock_result
         mock_conn.__enter__ = MagicMock(return_value=mock_conn)
         mock_conn.__exit__ = MagicMock(return_value=False)
         mock_engine.connect.return_value = mock_conn
 
-        result = await execute_sql_tool_node(state, async_engine=mock_engine)
+        with patch("src.sql_subagent.encode_table", wraps=encode_table) as encode:
+            result = await execute_sql_tool_node(state, async_engine=mock_engine)
 
         msg = result["messages"][0]
         assert "60 rows" in msg.content
         assert f"showing first {RESULT_DISPLAY_ROWS}" in msg.content.lower()
+        # Encoded once, at the displayed size
+        assert encode.call_count == 1
+        assert result["result"] in msg.content
+        assert "[40 more rows not shown (60 total)" in result["result"]
         # Full rows should still be stored in state
         assert len(result["result_rows"]) == 60
 
+    async def test_row_cap_stops_fetching(self):
+        """Results beyond max_rows are never fetched and the LLM is told so."""
+        many_rows = [(f"C{i:03d}", i * 1000) for i in range(60)]
+        state = _base_subagent_state(
+            messages=[
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        _tool_call(
+                            "execute_sql",
+                            {
+                                "sql": "SELECT iso3_code, export_value FROM hs12.country_year"
+                            },
+                        )
+                    ],
+                )
+            ]
+        )
+        mock_engine = _mock_engine_with_results(
+            ["iso3_code", "export_value"], many_rows
+        )
+
+        result = await execute_sql_tool_node(
+            state, async_engine=mock_engine, max_rows=25
+        )
+
+        msg = result["messages"][0]
+        assert len(result["result_rows"]) == 25
+        assert "25-row cap" in msg.content
+        assert "remaining rows not fetched" in msg.content
+        mock_result = mock_engine.connect.return_value.execute.return_value
+        assert mock_result.fetchall.call_count == 0
+
     async def test_exactly_threshold_rows_not_truncated(self):
         """Boundary: exactly RESULT_TRUNCATION_THRESHOLD rows should NOT be truncated."""
         exact_rows = [
@@ -487,6 +539,69 @@ class TestExecuteSqlToolNode:
         assert "showing first" not in msg.content.lower()
         assert len(result["result_rows"]) == RESULT_TRUNCATION_THRESHOLD
 
+    async def test_equivalent_sql_served_from_result_cache(self):
+        """Re-running an equivalent query must not touch the database again."""
+        from src.cache import registry
+
+        mock_engine = _mock_engine_with_results(["a", "b"], [("BRA", 1), ("USA", 2)])
+        first = _base_subagent_state(
+            messages=[
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        _tool_call(
+                            "execute_sql",
+                            {"sql": "SELECT a, b FROM t WHERE x = 1 AND y = 2"},
+                        )
+                    ],
+                )
+            ]
+        )
+        second = _base_subagent_state(
+            messages=[
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        _tool_call(
+                            "execute_sql",
+                            {"sql": "select a,b from T where y=2 and x=1"},
+                        )
+                    ],
+                )
+            ]
+        )
+
+        r1 = await execute_sql_tool_node(first, async_engine=mock_engine)
+        r2 = await execute_sql_tool_node(second, async_engine=mock_engine)
+
+        assert mock_engine.connect.call_count == 1
+        assert r2["result_rows"] == r1["result_rows"]
+        assert r2["messages"][0].content == r1["messages"][0].content
+        stats = registry.stats()["sql_result"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    async def test_execution_errors_are_not_cached(self):
+        """A transient failure must not poison later executions of the same SQL."""
+        mock_engine = _mock_engine_fail_then_succeed(
+            "connection reset", ["a"], [("BRA",)]
+        )
+        state = _base_subagent_state(
+            messages=[
+                AIMessage(
+                    content="",
+                    tool_calls=[_tool_call("execute_sql", {"sql": "SELECT a FROM t"})],
+                )
+            ]
+        )
+
+        r1 = await execute_sql_tool_node(state, async_engine=mock_engine)
+        r2 = await execute_sql_tool_node(state, async_engine=mock_engine)
+
+        assert r1["last_error"]
+        assert r2["last_error"] == ""
+        assert r2["result_rows"] == [["BRA"]]
+
 
 # ---------------------------------------------------------------------------
 # Initial context message tests
@@ -702,22 +817,6 @@ class TestSqlQueryAgentNode:
         assert result["pipeline_surface_to_agent"] is False
 
 
-# ---------------------------------------------------------------------------
-# Format result rows helper
-# ---------------------------------------------------------------------------
-
-
-class TestFormatResultRows:
-    def test_formats_with_header(self):
-        result = _format_result_rows(["a", "b"], [[1, 2], [3, 4]])
-        assert "a | b" in result
-        assert "1 | 2" in result
-        assert "3 | 4" in result
-
-    def test_empty_rows(self):
-        assert _format_result_rows(["a"], []) == ""
-
-
 # ---------------------------------------------------------------------------
 # Schema exploration tests
 # ---------------------------------------------------------------------------
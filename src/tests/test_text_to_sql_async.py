@@ -478,6 +478,15 @@ class TestAClose:
         instance.async_engine.dispose.assert_awaited_once()
         instance.engine.dispose.assert_called_once()
 
+    async def test_aclose_closes_graphql_state_store(self):
+        """aclose should close the shared GraphQL budget/breaker store."""
+        instance = AtlasTextToSQL.__new__(AtlasTextToSQL)
+        instance.graphql_state_store = MagicMock()
+
+        await instance.aclose()
+
+        instance.graphql_state_store.close.assert_called_once()
+
     async def test_aclose_without_async_manager_is_safe(self):
         """aclose should not fail if no async checkpointer manager exists."""
         instance = AtlasTextToSQL.__new__(AtlasTextToSQL)
@@ -199,6 +199,15 @@ class TestAggregateUsage:
         assert result["total"]["call_count"] == 0
         assert result["by_pipeline"] == {}
 
+    def test_history_tokens_saved_totalled(self):
+        first = _record(pipeline="agent", input_tokens=100, output_tokens=50)
+        second = _record(pipeline="agent", input_tokens=100, output_tokens=50)
+        first["history_tokens_saved"] = 1200
+        second["history_tokens_saved"] = 800
+
+        assert aggregate_usage([first, second])["total"]["history_tokens_saved"] == 2000
+        assert "history_tokens_saved" not in aggregate_usage([_record()])["total"]
+
 
 # ---------------------------------------------------------------------------
 # Tests: count_tool_calls
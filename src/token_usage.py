@@ -34,6 +34,8 @@ logger = logging.getLogger(__name__)
 #   total_tokens: int
 #   input_token_details: dict | None  — {cache_read: int, cache_creation: int}
 #   output_token_details: dict | None — {reasoning: int}
+#   history_tokens_saved: int  — (agent only, optional) prompt tokens saved by
+#                                 the history window (see src/agent_history.py)
 
 UsageRecord = dict[str, Any]
 
@@ -254,6 +256,8 @@ def aggregate_usage(records: list[UsageRecord]) -> dict[str, Any]:
     Returns:
         Dict with ``by_pipeline`` (per-pipeline totals) and ``total``
         (grand totals for input_tokens, output_tokens, total_tokens).
+        ``total`` also has ``history_tokens_saved`` when the agent's history
+        window saved prompt tokens (see ``src.agent_history``).
     """
     by_pipeline: dict[str, dict[str, int]] = defaultdict(
         lambda: {
@@ -273,6 +277,10 @@ def aggregate_usage(records: list[UsageRecord]) -> dict[str, Any]:
         by_pipeline[pipeline]["call_count"] += 1
         grand["call_count"] += 1
 
+    history_saved = sum(rec.get("history_tokens_saved", 0) for rec in records)
+    if history_saved:
+        grand["history_tokens_saved"] = history_saved
+
     return {
         "by_pipeline": dict(by_pipeline),
         "total": grand,